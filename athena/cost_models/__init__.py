@@ -0,0 +1,18 @@
+from .cost_model import (
+    AnalyticalCostModel,
+    CostModel,
+    FunctionCostModel,
+    get_cost_model,
+    register_cost_model,
+)
+from .featurization import FeaturizedCostModel, ScheduleFeaturizer
+
+__all__ = [
+    "AnalyticalCostModel",
+    "CostModel",
+    "FeaturizedCostModel",
+    "FunctionCostModel",
+    "ScheduleFeaturizer",
+    "get_cost_model",
+    "register_cost_model",
+]
@@ -0,0 +1,311 @@
+from __future__ import annotations
+
+import importlib
+import math
+import os
+from dataclasses import dataclass, replace
+from typing import Callable, Dict, List, Sequence, Tuple, Type
+
+import numpy as np
+
+from athena.tiramisu.dependence_analysis import parse_write_access
+from athena.tiramisu.schedule import Schedule
+from athena.tiramisu.static_filter import get_action_factors, get_extent
+from athena.tiramisu.tiramisu_actions.tiramisu_action import TiramisuActionType
+from athena.tiramisu.tiramisu_program import TiramisuProgram
+from athena.utils.config import BaseConfig
+
+COST_MODELS: Dict[str, Type[CostModel]] = {}
+
+
+def register_cost_model(name: str):
+    """
+    Registers a cost model class under `name` so that it can be created with `get_cost_model`
+    """
+
+    def decorator(cost_model_class: Type[CostModel]) -> Type[CostModel]:
+        COST_MODELS[name] = cost_model_class
+        return cost_model_class
+
+    return decorator
+
+
+def get_cost_model(name: str, **kwargs) -> CostModel:
+    """
+    Creates a cost model from its registered name or from the `module:attribute` path of an external class or factory
+
+    Parameters
+    ----------
+    `name`: str
+        The registered name, e.g. `analytical`, or the path of an external model, e.g. `my_package.models:LearnedModel`
+    `kwargs`:
+        Passed to the constructor of the model
+    """
+    if name in COST_MODELS:
+        return COST_MODELS[name](**kwargs)
+    if ":" not in name:
+        raise ValueError(f"Unknown cost model {name}")
+    module_name, attribute = name.split(":", 1)
+    factory = getattr(importlib.import_module(module_name), attribute)
+    cost_model = factory(**kwargs)
+    if not isinstance(cost_model, CostModel):
+        raise ValueError(f"{name} doesn't create a CostModel")
+    return cost_model
+
+
+class CostModel:
+    """
+    Predicts the speedups of schedules over their unscheduled program without executing them.
+    Subclasses implement `predict`, which handles batches of schedules.
+    """
+
+    def predict(self, schedules: Sequence[Schedule]) -> np.ndarray:
+        """
+        Predicts the speedups of a batch of schedules
+
+        Returns
+        -------
+        `np.ndarray`
+            The predicted speedups, of shape `(len(schedules),)`
+        """
+        raise NotImplementedError
+
+    def rank(
+        self, schedules: Sequence[Schedule], k: int | None = None
+    ) -> List[Tuple[Schedule, float]]:
+        """
+        Returns the `k` schedules with the best predicted speedups with their predictions, best first
+        """
+        if not schedules:
+            return []
+        predictions = self.predict(schedules)
+        order = np.argsort(-predictions, kind="stable")[:k]
+        return [(schedules[index], float(predictions[index])) for index in order]
+
+    def __call__(self, schedule: Schedule) -> float:
+        return float(self.predict([schedule])[0])
+
+
+@register_cost_model("function")
+class FunctionCostModel(CostModel):
+    """
+    Wraps an external function predicting the speedups of a batch of schedules, e.g. a learned model
+
+    Parameters
+    ----------
+    `predict_function`: Callable[[Sequence[Schedule]], Sequence[float]]
+        Returns the predicted speedups of a batch of schedules
+    """
+
+    def __init__(
+        self, predict_function: Callable[[Sequence[Schedule]], Sequence[float]]
+    ):
+        self.predict_function = predict_function
+
+    def predict(self, schedules: Sequence[Schedule]) -> np.ndarray:
+        predictions = np.asarray(self.predict_function(schedules), dtype=np.float64)
+        if predictions.shape != (len(schedules),):
+            raise ValueError(
+                f"Expected {len(schedules)} predictions, got an array of shape {predictions.shape}"
+            )
+        return predictions
+
+
+@dataclass
+class Loop:
+    # the index of the iterator of the loop in the iterators of the computation
+    iterator: int
+    extent: int
+    parallel: bool = False
+    unrolling_factor: int = 1
+    tiled: bool = False
+
+
+@dataclass
+class ComputationModel:
+    loops: List[Loop]
+    # access matrices of the reads and the write, without their constant column
+    accesses: List[np.ndarray]
+
+
+@register_cost_model("analytical")
+class AnalyticalCostModel(CostModel):
+    """
+    A coarse model of the cost of the loop nests of a program. Each computation costs its number of iterations times
+    a cost per iteration, which grows with the accesses that aren't contiguous along the innermost loop. Tiling reduces
+    the cost of these accesses to its square root, unrolling the innermost loop lowers the loop overhead and parallelizing a loop
+    divides the cost by its extent, up to the number of cores.
+
+    Parameters
+    ----------
+    `nb_cores`: int | None
+        The number of cores of the parallel loops, the `nb_threads` option or the number of cpus by default
+    `default_extent`: int
+        The extent of the loops whose bounds aren't integers
+    `strided_access_cost`: float
+        The cost of an access that isn't contiguous along the innermost loop, relative to a contiguous one
+    `invariant_access_cost`: float
+        The cost of an access that doesn't depend on the innermost loop
+    `loop_overhead`: float
+        The part of the cost of an iteration saved by unrolling with a large factor
+    `parallel_efficiency`: float
+        The efficiency of the parallel loops
+    """
+
+    def __init__(
+        self,
+        nb_cores: int | None = None,
+        default_extent: int = 1024,
+        strided_access_cost: float = 8.0,
+        invariant_access_cost: float = 0.1,
+        loop_overhead: float = 0.2,
+        parallel_efficiency: float = 0.9,
+    ):
+        if nb_cores is None:
+            if BaseConfig.base_config and BaseConfig.base_config.tiramisu.nb_threads:
+                nb_cores = BaseConfig.base_config.tiramisu.nb_threads
+            else:
+                nb_cores = os.cpu_count() or 1
+        self.nb_cores = nb_cores
+        self.default_extent = default_extent
+        self.strided_access_cost = strided_access_cost
+        self.invariant_access_cost = invariant_access_cost
+        self.loop_overhead = loop_overhead
+        self.parallel_efficiency = parallel_efficiency
+        # the computations of the programs, computed once per program
+        self._programs: Dict[
+            int, Tuple[TiramisuProgram, Dict[str, ComputationModel]]
+        ] = {}
+
+    def get_computations(
+        self, tiramisu_program: TiramisuProgram
+    ) -> Dict[str, ComputationModel]:
+        key = id(tiramisu_program)
+        if key not in self._programs or self._programs[key][0] is not tiramisu_program:
+            self._programs[key] = (
+                tiramisu_program,
+                self._build_computations(tiramisu_program),
+            )
+        return self._programs[key][1]
+
+    def _build_computations(
+        self, tiramisu_program: TiramisuProgram
+    ) -> Dict[str, ComputationModel]:
+        assert tiramisu_program.annotations and tiramisu_program.tree
+        computations = {}
+        for comp, comp_annotations in tiramisu_program.annotations[
+            "computations"
+        ].items():
+            iterators = comp_annotations["iterators"]
+            loops = []
+            for index, iterator in enumerate(iterators):
+                extent = get_extent(tiramisu_program.tree.iterators[iterator])
+                loops.append(
+                    Loop(index, extent if extent is not None else self.default_extent)
+                )
+            accesses = [
+                np.array(access["access_matrix"], dtype=np.int64)[:, :-1]
+                for access in comp_annotations["accesses"]
+            ]
+            write_access = parse_write_access(
+                comp_annotations["write_access_relation"], iterators
+            )
+            if write_access is not None:
+                accesses.append(write_access[:, :-1])
+            computations[comp] = ComputationModel(loops, accesses)
+        return computations
+
+    def apply_schedule(self, schedule: Schedule) -> Dict[str, List[Loop]]:
+        """
+        Returns the loops of each computation after the actions of the schedule
+        """
+        assert schedule.tiramisu_program
+        loops = {
+            comp: [replace(loop) for loop in computation.loops]
+            for comp, computation in self.get_computations(
+                schedule.tiramisu_program
+            ).items()
+        }
+        for action in schedule.optims_list:
+            levels = [param[1] for param in action.params if isinstance(param, tuple)]
+            factors = get_action_factors(action)
+            for comp in action.comps or []:
+                comp_loops = loops.get(comp)
+                if comp_loops is None or any(
+                    level >= len(comp_loops) for level in levels
+                ):
+                    continue
+                if action.type == TiramisuActionType.INTERCHANGE:
+                    comp_loops[levels[0]], comp_loops[levels[1]] = (
+                        comp_loops[levels[1]],
+                        comp_loops[levels[0]],
+                    )
+                elif action.type == TiramisuActionType.PARALLELIZATION:
+                    comp_loops[levels[0]].parallel = True
+                elif action.type == TiramisuActionType.UNROLLING:
+                    comp_loops[levels[0]].unrolling_factor = factors[0]
+                elif action.is_any_tiling() and levels == list(
+                    range(levels[0], levels[0] + len(levels))
+                ):
+                    # the tiled loops are split into the loops over the tiles and the loops inside the tiles
+                    tiled = comp_loops[levels[0] : levels[-1] + 1]
+                    outer_loops = [
+                        replace(loop, extent=math.ceil(loop.extent / size))
+                        for loop, size in zip(tiled, factors)
+                    ]
+                    inner_loops = [
+                        replace(loop, extent=min(loop.extent, size), tiled=True)
+                        for loop, size in zip(tiled, factors)
+                    ]
+                    comp_loops[levels[0] : levels[-1] + 1] = outer_loops + inner_loops
+        return loops
+
+    def get_cost(self, computation: ComputationModel, loops: List[Loop]) -> float:
+        innermost = loops[-1]
+        tiled = any(loop.tiled for loop in loops)
+        iteration_cost = 1.0
+        for access in computation.accesses:
+            column = access[:, innermost.iterator]
+            if not column.any():
+                iteration_cost += self.invariant_access_cost
+            elif not column[:-1].any() and abs(column[-1]) == 1:
+                iteration_cost += 1.0
+            else:
+                iteration_cost += (
+                    math.sqrt(self.strided_access_cost)
+                    if tiled
+                    else self.strided_access_cost
+                )
+        if innermost.unrolling_factor > 1:
+            iteration_cost *= 1 - self.loop_overhead * (
+                1 - 1 / min(innermost.unrolling_factor, innermost.extent)
+            )
+
+        nb_iterations = math.prod(loop.extent for loop in loops)
+        parallel_loops = [loop for loop in loops if loop.parallel]
+        parallel_speedup = 1.0
+        if parallel_loops:
+            parallel_speedup = max(
+                1.0,
+                min(parallel_loops[0].extent, self.nb_cores) * self.parallel_efficiency,
+            )
+        return nb_iterations * iteration_cost / parallel_speedup
+
+    def predict(self, schedules: Sequence[Schedule]) -> np.ndarray:
+        baselines: Dict[int, float] = {}
+        predictions = np.empty(len(schedules), dtype=np.float64)
+        for index, schedule in enumerate(schedules):
+            assert schedule.tiramisu_program
+            computations = self.get_computations(schedule.tiramisu_program)
+            key = id(schedule.tiramisu_program)
+            if key not in baselines:
+                baselines[key] = sum(
+                    self.get_cost(computation, computation.loops)
+                    for computation in computations.values()
+                )
+            cost = sum(
+                self.get_cost(computations[comp], comp_loops)
+                for comp, comp_loops in self.apply_schedule(schedule).items()
+            )
+            predictions[index] = baselines[key] / cost
+        return predictions
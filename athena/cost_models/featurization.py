@@ -0,0 +1,377 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from athena.cost_models.cost_model import CostModel, register_cost_model
+from athena.tiramisu.dependence_analysis import parse_write_access, skewing_completion
+from athena.tiramisu.schedule import Schedule
+from athena.tiramisu.static_filter import get_action_factors, get_extent
+from athena.tiramisu.tiramisu_actions.tiramisu_action import (
+    TiramisuAction,
+    TiramisuActionType,
+)
+from athena.tiramisu.tiramisu_program import TiramisuProgram
+
+ACTION_TYPES = list(TiramisuActionType)
+
+# the operation counts of the annotations of a computation
+OPERATION_KEYS = [
+    "number_of_additions",
+    "number_of_subtraction",
+    "number_of_multiplication",
+    "number_of_division",
+]
+
+# the loop levels and factors kept for each action, tiling in 3 dimensions has the most of both
+MAX_ACTION_LEVELS = 3
+MAX_ACTION_FACTORS = 3
+
+
+class FeaturizationError(ValueError):
+    """Raised when a program or a schedule doesn't fit in the shapes of the featurizer."""
+
+
+@dataclass
+class ProgramFeatures:
+    """
+    The features of a program, computed once and shared by all its schedules.
+
+    Attributes
+    ----------
+    `comp_indices`: Dict[str, int]
+        The index of each computation in the tensors, in the order of execution
+    `comp_depths`: Dict[str, int]
+        The number of loops of each computation
+    `arrays`: Dict[str, np.ndarray]
+        The tensors of the program, see `ScheduleFeaturizer`
+    """
+
+    comp_indices: Dict[str, int]
+    comp_depths: Dict[str, int]
+    arrays: Dict[str, np.ndarray]
+
+
+class ScheduleFeaturizer:
+    """
+    Turns schedules into fixed shape tensors. The tensors of a batch are stacked along a first dimension of the size
+    of the batch, the features of each program are computed once and shared by its schedules.
+
+    Program tensors:
+
+    - `comp_mask` `(max_comps,)`: 1 for the computations of the program
+    - `loop_extents` `(max_comps, max_depth)`: log2 of the number of iterations of the loops of each computation, 0 for padding
+    - `loop_mask` `(max_comps, max_depth)`: 1 for the loops of each computation
+    - `operations` `(max_comps, 4)`: the number of additions, subtractions, multiplications and divisions
+    - `access_matrices` `(max_comps, max_accesses, max_depth, max_depth + 1)`: the access matrices of the reads and of
+      the write (last access), with the iterator columns padded to `max_depth` and the constant in the last column
+    - `access_mask` `(max_comps, max_accesses)`: 1 for the accesses of each computation
+
+    Schedule tensors:
+
+    - `actions` `(max_actions, nb_action_types + 2 * 3 + max_comps)`: one hot type, loop levels (-1 for padding), log2
+      of the factors and computations of each action
+    - `action_mask` `(max_actions,)`: 1 for the actions of the schedule
+    - `transformations` `(max_comps, max_depth, max_depth)`: the product of the interchange, reversal and skewing
+      matrices applied to the loops of each computation
+    - `parallel` `(max_comps, max_depth)`: 1 for the parallelized loops
+    - `unrolling` `(max_comps, max_depth)`: log2 of the unrolling factors
+    - `tiling` `(max_comps, max_depth)`: log2 of the tile sizes
+
+    Parameters
+    ----------
+    `max_comps`: int
+        The maximum number of computations of a program
+    `max_depth`: int
+        The maximum number of loops around a computation
+    `max_accesses`: int
+        The maximum number of accesses of a computation, including its write
+    `max_actions`: int
+        The maximum number of actions of a schedule
+    `default_extent`: int
+        The number of iterations of the loops whose bounds aren't integers
+    """
+
+    def __init__(
+        self,
+        max_comps: int = 8,
+        max_depth: int = 6,
+        max_accesses: int = 8,
+        max_actions: int = 12,
+        default_extent: int = 1024,
+    ):
+        self.max_comps = max_comps
+        self.max_depth = max_depth
+        self.max_accesses = max_accesses
+        self.max_actions = max_actions
+        self.default_extent = default_extent
+        self.action_width = (
+            len(ACTION_TYPES) + MAX_ACTION_LEVELS + MAX_ACTION_FACTORS + max_comps
+        )
+        self._programs: Dict[int, Tuple[TiramisuProgram, ProgramFeatures]] = {}
+
+    def get_program_features(
+        self, tiramisu_program: TiramisuProgram
+    ) -> ProgramFeatures:
+        key = id(tiramisu_program)
+        if key not in self._programs or self._programs[key][0] is not tiramisu_program:
+            self._programs[key] = (
+                tiramisu_program,
+                self.featurize_program(tiramisu_program),
+            )
+        return self._programs[key][1]
+
+    def featurize_program(self, tiramisu_program: TiramisuProgram) -> ProgramFeatures:
+        assert tiramisu_program.annotations and tiramisu_program.tree
+        computations = sorted(
+            tiramisu_program.annotations["computations"].items(),
+            key=lambda item: item[1]["absolute_order"],
+        )
+        if len(computations) > self.max_comps:
+            raise FeaturizationError(
+                f"{tiramisu_program.name} has {len(computations)} computations, more than {self.max_comps}"
+            )
+
+        comp_mask = np.zeros(self.max_comps, dtype=np.float32)
+        loop_extents = np.zeros((self.max_comps, self.max_depth), dtype=np.float32)
+        loop_mask = np.zeros((self.max_comps, self.max_depth), dtype=np.float32)
+        operations = np.zeros((self.max_comps, len(OPERATION_KEYS)), dtype=np.float32)
+        access_matrices = np.zeros(
+            (self.max_comps, self.max_accesses, self.max_depth, self.max_depth + 1),
+            dtype=np.float32,
+        )
+        access_mask = np.zeros((self.max_comps, self.max_accesses), dtype=np.float32)
+        comp_indices = {}
+        comp_depths = {}
+
+        for index, (comp, comp_annotations) in enumerate(computations):
+            iterators = comp_annotations["iterators"]
+            depth = len(iterators)
+            if depth > self.max_depth:
+                raise FeaturizationError(
+                    f"{comp} of {tiramisu_program.name} has {depth} loops, more than {self.max_depth}"
+                )
+            comp_indices[comp] = index
+            comp_depths[comp] = depth
+            comp_mask[index] = 1
+            loop_mask[index, :depth] = 1
+            for level, iterator in enumerate(iterators):
+                extent = get_extent(tiramisu_program.tree.iterators[iterator])
+                loop_extents[index, level] = math.log2(
+                    max(extent if extent is not None else self.default_extent, 1)
+                )
+            operations[index] = [
+                comp_annotations.get(operation_key, 0)
+                for operation_key in OPERATION_KEYS
+            ]
+
+            matrices = [
+                np.array(access["access_matrix"], dtype=np.float32)
+                for access in comp_annotations["accesses"]
+            ]
+            write_access = parse_write_access(
+                comp_annotations["write_access_relation"], iterators
+            )
+            if write_access is not None:
+                matrices.append(write_access.astype(np.float32))
+            if len(matrices) > self.max_accesses:
+                raise FeaturizationError(
+                    f"{comp} of {tiramisu_program.name} has {len(matrices)} accesses, more than {self.max_accesses}"
+                )
+            for access_index, matrix in enumerate(matrices):
+                nb_dims = min(matrix.shape[0], self.max_depth)
+                access_matrices[index, access_index, :nb_dims, :depth] = matrix[
+                    :nb_dims, :depth
+                ]
+                access_matrices[index, access_index, :nb_dims, -1] = matrix[
+                    :nb_dims, -1
+                ]
+                access_mask[index, access_index] = 1
+
+        return ProgramFeatures(
+            comp_indices,
+            comp_depths,
+            {
+                "comp_mask": comp_mask,
+                "loop_extents": loop_extents,
+                "loop_mask": loop_mask,
+                "operations": operations,
+                "access_matrices": access_matrices,
+                "access_mask": access_mask,
+            },
+        )
+
+    def featurize_schedule(
+        self, schedule: Schedule, program_features: ProgramFeatures
+    ) -> Dict[str, np.ndarray]:
+        if len(schedule.optims_list) > self.max_actions:
+            raise FeaturizationError(
+                f"{schedule} has {len(schedule.optims_list)} actions, more than {self.max_actions}"
+            )
+        actions = np.zeros((self.max_actions, self.action_width), dtype=np.float32)
+        action_mask = np.zeros(self.max_actions, dtype=np.float32)
+        transformations = np.tile(
+            np.eye(self.max_depth, dtype=np.float32), (self.max_comps, 1, 1)
+        )
+        parallel = np.zeros((self.max_comps, self.max_depth), dtype=np.float32)
+        unrolling = np.zeros((self.max_comps, self.max_depth), dtype=np.float32)
+        tiling = np.zeros((self.max_comps, self.max_depth), dtype=np.float32)
+
+        for action_index, action in enumerate(schedule.optims_list):
+            levels = [param[1] for param in action.params if isinstance(param, tuple)]
+            factors = get_action_factors(action)
+            comp_indices = [
+                program_features.comp_indices[comp]
+                for comp in get_action_comps(action)
+                if comp in program_features.comp_indices
+            ]
+
+            row = actions[action_index]
+            row[ACTION_TYPES.index(action.type)] = 1
+            offset = len(ACTION_TYPES)
+            row[offset : offset + MAX_ACTION_LEVELS] = -1
+            for slot, level in enumerate(levels[:MAX_ACTION_LEVELS]):
+                row[offset + slot] = level
+            offset += MAX_ACTION_LEVELS
+            for slot, factor in enumerate(factors[:MAX_ACTION_FACTORS]):
+                row[offset + slot] = signed_log2(factor)
+            offset += MAX_ACTION_FACTORS
+            row[[offset + comp_index for comp_index in comp_indices]] = 1
+            action_mask[action_index] = 1
+
+            if any(level >= self.max_depth for level in levels):
+                continue
+            for comp_index in comp_indices:
+                if action.type == TiramisuActionType.INTERCHANGE:
+                    transformations[comp_index, levels] = transformations[
+                        comp_index, levels[::-1]
+                    ]
+                elif action.type == TiramisuActionType.REVERSAL:
+                    transformations[comp_index, levels[0]] *= -1
+                elif action.type == TiramisuActionType.SKEWING:
+                    completion = skewing_completion(factors[0], factors[1])
+                    gamma, sigma = completion if completion is not None else (0, 1)
+                    rows = transformations[comp_index, levels].copy()
+                    transformations[comp_index, levels[0]] = (
+                        factors[0] * rows[0] + factors[1] * rows[1]
+                    )
+                    transformations[comp_index, levels[1]] = (
+                        gamma * rows[0] + sigma * rows[1]
+                    )
+                elif action.type == TiramisuActionType.PARALLELIZATION:
+                    parallel[comp_index, levels[0]] = 1
+                elif action.type == TiramisuActionType.UNROLLING:
+                    unrolling[comp_index, levels[0]] = math.log2(factors[0])
+                elif action.is_any_tiling():
+                    for level, size in zip(levels, factors):
+                        tiling[comp_index, level] = math.log2(size)
+
+        return {
+            "actions": actions,
+            "action_mask": action_mask,
+            "transformations": transformations,
+            "parallel": parallel,
+            "unrolling": unrolling,
+            "tiling": tiling,
+        }
+
+    def featurize(self, schedules: Sequence[Schedule]) -> Dict[str, np.ndarray]:
+        """
+        Returns the program and schedule tensors of a batch of schedules, of shape `(len(schedules), ...)`
+
+        Raises
+        ------
+        `FeaturizationError`
+            When a program or a schedule doesn't fit in the shapes of the featurizer
+        """
+        batches: Dict[str, List[np.ndarray]] = {}
+        for schedule in schedules:
+            assert schedule.tiramisu_program
+            program_features = self.get_program_features(schedule.tiramisu_program)
+            features = {
+                **program_features.arrays,
+                **self.featurize_schedule(schedule, program_features),
+            }
+            for name, array in features.items():
+                batches.setdefault(name, []).append(array)
+        if not batches:
+            return {
+                name: np.zeros((0, *shape), dtype=np.float32)
+                for name, shape in self.get_shapes().items()
+            }
+        return {name: np.stack(arrays) for name, arrays in batches.items()}
+
+    def get_shapes(self) -> Dict[str, Tuple[int, ...]]:
+        """
+        Returns the shape of each tensor of a single schedule
+        """
+        return {
+            "comp_mask": (self.max_comps,),
+            "loop_extents": (self.max_comps, self.max_depth),
+            "loop_mask": (self.max_comps, self.max_depth),
+            "operations": (self.max_comps, len(OPERATION_KEYS)),
+            "access_matrices": (
+                self.max_comps,
+                self.max_accesses,
+                self.max_depth,
+                self.max_depth + 1,
+            ),
+            "access_mask": (self.max_comps, self.max_accesses),
+            "actions": (self.max_actions, self.action_width),
+            "action_mask": (self.max_actions,),
+            "transformations": (self.max_comps, self.max_depth, self.max_depth),
+            "parallel": (self.max_comps, self.max_depth),
+            "unrolling": (self.max_comps, self.max_depth),
+            "tiling": (self.max_comps, self.max_depth),
+        }
+
+
+def get_action_comps(action: TiramisuAction) -> List[str]:
+    # the computations of distributions are grouped in lists
+    comps: List[str] = []
+    for comp in action.comps or []:
+        if isinstance(comp, list):
+            comps.extend(comp)
+        else:
+            comps.append(comp)
+    return comps
+
+
+def signed_log2(value: int) -> float:
+    return math.copysign(math.log2(abs(value) + 1), value)
+
+
+@register_cost_model("featurized")
+class FeaturizedCostModel(CostModel):
+    """
+    Predicts the speedups of schedules with a function of their tensors, e.g. a learned model
+
+    Parameters
+    ----------
+    `predict_function`: Callable[[Dict[str, np.ndarray]], Sequence[float]]
+        Returns the predicted speedups of a batch of featurized schedules
+    `featurizer`: ScheduleFeaturizer | None
+        The featurizer of the schedules, with the default shapes when None
+    """
+
+    def __init__(
+        self,
+        predict_function: Callable[[Dict[str, np.ndarray]], Sequence[float]],
+        featurizer: ScheduleFeaturizer | None = None,
+    ):
+        self.predict_function = predict_function
+        self.featurizer = featurizer if featurizer is not None else ScheduleFeaturizer()
+
+    def predict(self, schedules: Sequence[Schedule]) -> np.ndarray:
+        predictions = np.asarray(
+            self.predict_function(self.featurizer.featurize(schedules)),
+            dtype=np.float64,
+        ).reshape(-1)
+        if predictions.shape != (len(schedules),):
+            raise ValueError(
+                f"Expected {len(schedules)} predictions, got {predictions.shape[0]}"
+            )
+        return predictions
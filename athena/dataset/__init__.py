@@ -0,0 +1,8 @@
+from .dataset import Dataset, DatasetWriter, ProgramRecord, convert_pickled_dataset
+
+__all__ = [
+    "Dataset",
+    "DatasetWriter",
+    "ProgramRecord",
+    "convert_pickled_dataset",
+]
@@ -0,0 +1,320 @@
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import pickle
+from typing import Any, Dict, Iterator, List
+
+import numpy as np
+
+from athena.tiramisu.tiramisu_program import TiramisuProgram
+
+# the fields of a program record, each one is decoded only when it is accessed
+RECORD_FIELDS = ["annotations", "data", "cpp", "wrapper"]
+
+MAX_NAME_LENGTH = 128
+
+index_dtype = np.dtype(
+    [("name", f"S{MAX_NAME_LENGTH}"), ("shard", "<i4")]
+    + [
+        (f"{field}_{part}", "<i8")
+        for field in RECORD_FIELDS
+        for part in ["offset", "length"]
+    ]
+)
+
+INDEX_FILE = "index.npy"
+SHARD_FILE = "shard_{:05d}.bin"
+
+
+class ProgramRecord:
+    """
+    A program of a dataset whose fields are decoded on access.
+
+    Attributes
+    ----------
+    `name`: str
+        The name of the program
+    """
+
+    def __init__(self, dataset: Dataset, entry: np.void):
+        self.dataset = dataset
+        self.entry = entry
+        self.name: str = entry["name"].decode()
+        self._annotations: Dict | None = None
+        self._data: Dict | None = None
+
+    def read_field(self, field: str) -> bytes | None:
+        length = int(self.entry[f"{field}_length"])
+        if length <= 0:
+            return None if length < 0 else b""
+        offset = int(self.entry[f"{field}_offset"])
+        shard = self.dataset.get_shard(int(self.entry["shard"]))
+        return shard[offset : offset + length]
+
+    @property
+    def annotations(self) -> Dict | None:
+        """The tiramisu annotations of the program"""
+        if self._annotations is None:
+            annotations = self.read_field("annotations")
+            if annotations is not None:
+                self._annotations = json.loads(annotations)
+        return self._annotations
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        """The data of the program, including its annotations"""
+        if self._data is None:
+            data = self.read_field("data")
+            self._data = pickle.loads(data) if data is not None else {}
+            self._data["program_annotation"] = self.annotations
+        return self._data
+
+    @property
+    def cpp_code(self) -> str | None:
+        """The C++ code of the tiramisu generator of the program"""
+        cpp = self.read_field("cpp")
+        return cpp.decode() if cpp is not None else None
+
+    @property
+    def wrapper_obj(self) -> bytes | None:
+        """The compiled wrapper of the program"""
+        wrapper = self.read_field("wrapper")
+        return wrapper
+
+    def to_tiramisu_program(
+        self, load_code_lines: bool = True, load_tree: bool = True
+    ) -> TiramisuProgram:
+        return TiramisuProgram.from_dict(
+            name=self.name,
+            data=self.data,
+            original_str=self.cpp_code,
+            load_code_lines=load_code_lines,
+            load_tree=load_tree,
+            wrapper_obj=self.wrapper_obj,
+        )
+
+    def __repr__(self) -> str:
+        return f"ProgramRecord(name={self.name})"
+
+
+class Dataset:
+    """
+    A collection of programs stored in sharded files. The index is memory mapped and the records are read
+    from memory mapped shards when they are accessed, so opening a dataset doesn't depend on its size.
+
+    Parameters
+    ----------
+    `folder`: str
+        The folder of the dataset, written by `DatasetWriter`
+    """
+
+    def __init__(self, folder: str):
+        self.folder = folder
+        # the index is sorted by name
+        self.index = np.load(os.path.join(folder, INDEX_FILE), mmap_mode="r")
+        self.shards: Dict[int, mmap.mmap] = {}
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def get_shard(self, shard_id: int) -> mmap.mmap:
+        if shard_id not in self.shards:
+            with open(
+                os.path.join(self.folder, SHARD_FILE.format(shard_id)), "rb"
+            ) as f:
+                self.shards[shard_id] = mmap.mmap(
+                    f.fileno(), 0, access=mmap.ACCESS_READ
+                )
+        return self.shards[shard_id]
+
+    @property
+    def names(self) -> Iterator[str]:
+        for name in self.index["name"]:
+            yield name.decode()
+
+    def find(self, name: str) -> int | None:
+        """
+        Returns the position of the program in the index, None if it is not in the dataset
+        """
+        encoded_name = name.encode()
+        position = int(np.searchsorted(self.index["name"], encoded_name))
+        if position < len(self.index) and self.index[position]["name"] == encoded_name:
+            return position
+        return None
+
+    def __contains__(self, name: str) -> bool:
+        return self.find(name) is not None
+
+    def __getitem__(self, key: str | int) -> ProgramRecord:
+        if isinstance(key, str):
+            position = self.find(key)
+            if position is None:
+                raise KeyError(key)
+            key = position
+        return ProgramRecord(self, self.index[key])
+
+    def __iter__(self) -> Iterator[ProgramRecord]:
+        return self.iter_records()
+
+    def iter_records(
+        self, start: int = 0, stop: int | None = None, step: int = 1
+    ) -> Iterator[ProgramRecord]:
+        """
+        Iterates over the records of the programs between the positions `start` and `stop`.
+        `step` allows splitting the dataset between workers, e.g. worker `i` out of `n` iterates with `start=i, step=n`.
+        """
+        stop = len(self) if stop is None else min(stop, len(self))
+        for position in range(start, stop, step):
+            yield ProgramRecord(self, self.index[position])
+
+    def iter_programs(self, **kwargs) -> Iterator[TiramisuProgram]:
+        """
+        Iterates over the programs of the dataset, the keyword arguments are passed to `to_tiramisu_program`
+        """
+        for record in self:
+            yield record.to_tiramisu_program(**kwargs)
+
+    def close(self):
+        for shard in self.shards.values():
+            shard.close()
+        self.shards = {}
+
+    def __enter__(self) -> Dataset:
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class DatasetWriter:
+    """
+    Writes programs to a sharded dataset readable by `Dataset`.
+
+    Parameters
+    ----------
+    `folder`: str
+        The folder of the dataset
+    `shard_size`: int
+        The size in bytes after which a new shard is started
+    """
+
+    def __init__(self, folder: str, shard_size: int = 1 << 30):
+        self.folder = folder
+        self.shard_size = shard_size
+        self.entries: List[tuple] = []
+        self.shard_id = -1
+        self.shard_file = None
+        os.makedirs(folder, exist_ok=True)
+        self.start_shard()
+
+    def start_shard(self):
+        if self.shard_file:
+            self.shard_file.close()
+        self.shard_id += 1
+        self.shard_file = open(
+            os.path.join(self.folder, SHARD_FILE.format(self.shard_id)), "wb"
+        )
+
+    def add(
+        self,
+        name: str,
+        data: Dict[str, Any],
+        cpp_code: str | None = None,
+        wrapper_obj: bytes | None = None,
+    ):
+        """
+        Adds a program to the dataset
+
+        Parameters
+        ----------
+        `name`: str
+            The name of the program
+        `data`: Dict[str, Any]
+            The data of the program, its annotations are under `program_annotation`
+        `cpp_code`: str | None
+            The C++ code of the tiramisu generator of the program
+        `wrapper_obj`: bytes | None
+            The compiled wrapper of the program
+        """
+        if len(name.encode()) > MAX_NAME_LENGTH:
+            raise ValueError(f"Program names are limited to {MAX_NAME_LENGTH} bytes")
+        assert self.shard_file
+        if self.shard_file.tell() >= self.shard_size:
+            self.start_shard()
+
+        data = dict(data)
+        annotations = data.pop("program_annotation", None)
+        fields = {
+            "annotations": None
+            if annotations is None
+            else json.dumps(annotations).encode(),
+            "data": pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL),
+            "cpp": None if cpp_code is None else cpp_code.encode(),
+            "wrapper": wrapper_obj,
+        }
+
+        entry: List[Any] = [name.encode(), self.shard_id]
+        for field in RECORD_FIELDS:
+            if fields[field] is None:
+                entry += [0, -1]
+            else:
+                entry += [self.shard_file.tell(), len(fields[field])]
+                self.shard_file.write(fields[field])
+        self.entries.append(tuple(entry))
+
+    def close(self):
+        """
+        Writes the index of the dataset
+        """
+        if self.shard_file:
+            self.shard_file.close()
+            self.shard_file = None
+        index = np.array(self.entries, dtype=index_dtype)
+        index.sort(order="name")
+        if len(index) > 1 and np.any(index["name"][1:] == index["name"][:-1]):
+            raise ValueError("The dataset contains duplicate program names")
+        # write the index under a temporary name so that readers never see a partial index
+        tmp_path = os.path.join(self.folder, "index.tmp.npy")
+        np.save(tmp_path, index)
+        os.replace(tmp_path, os.path.join(self.folder, INDEX_FILE))
+
+    def __enter__(self) -> DatasetWriter:
+        return self
+
+    def __exit__(self, exc_type, *args):
+        if exc_type is None:
+            self.close()
+        elif self.shard_file:
+            self.shard_file.close()
+
+
+def convert_pickled_dataset(
+    dataset_path: str,
+    cpps_path: str,
+    folder: str,
+    wrappers_path: str | None = None,
+    shard_size: int = 1 << 30,
+) -> int:
+    """
+    Converts a dataset stored as pickled dicts (like `examples/test_data.pkl` and `examples/test_data_cpps.pkl`)
+    to a sharded dataset
+
+    Returns
+    -------
+    The number of programs written
+    """
+    with open(dataset_path, "rb") as f:
+        dataset = pickle.load(f)
+    with open(cpps_path, "rb") as f:
+        cpps = pickle.load(f)
+    wrappers = {}
+    if wrappers_path:
+        with open(wrappers_path, "rb") as f:
+            wrappers = pickle.load(f)
+
+    with DatasetWriter(folder, shard_size=shard_size) as writer:
+        for name, data in dataset.items():
+            writer.add(name, data, cpps.get(name), wrappers.get(name))
+    return len(dataset)
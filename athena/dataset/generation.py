@@ -0,0 +1,356 @@
+"""
+Generates training data: samples schedules of the programs of a dataset, measures them and streams the records
+to sharded JSON lines files.
+
+Usage:
+    python -m athena.dataset.generation DATASET_DIR OUTPUT_DIR [--schedules-per-program N] [--workers N] [--shard-records N]
+
+Each record holds the program name, the schedule string, its canonical string, its legality, its execution times, the
+machine they were measured on and the execution time of the unscheduled program on that machine. Shards are written under a temporary name and renamed once they are complete, and
+the programs whose records are all in complete shards are listed in the checkpoint. Running the same command again
+resumes after the programs of the checkpoint, without writing a schedule of a program twice.
+"""
+from __future__ import annotations
+
+import argparse
+import glob
+import json
+import logging
+import os
+import random
+import re
+import uuid
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+from athena.dataset.dataset import Dataset
+from athena.evaluation.backend import EvaluationBackend
+from athena.tiramisu.candidates import sample_candidates
+from athena.tiramisu.schedule import Schedule
+from athena.tiramisu.static_filter import filter_candidates
+from athena.tiramisu.tiramisu_program import TiramisuProgram
+from athena.utils.config import BaseConfig
+
+SHARD_FILE = "records-{:05d}.jsonl"
+shard_file_regex = re.compile(r"records-(\d{5})\.jsonl$")
+IN_PROGRESS_SUFFIX = ".inprogress"
+CHECKPOINT_FILE = "checkpoint.json"
+
+# the number of candidates sampled for each action of a random schedule
+NB_SAMPLED_CANDIDATES = 8
+
+
+def get_shard_paths(folder: str) -> List[str]:
+    return sorted(
+        path
+        for path in glob.glob(os.path.join(folder, "records-*.jsonl"))
+        if shard_file_regex.search(path)
+    )
+
+
+def write_json_atomically(path: str, data: Any):
+    tmp_path = f"{path}.{uuid.uuid4().hex}"
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+class ShardedRecordWriter:
+    """
+    Streams records to JSON lines shards of at most `shard_records` records. A shard is written under a temporary name
+    and renamed when it is complete, so the shards of an interrupted run are either complete or ignored.
+    Records whose program and canonical schedule string are already in a complete shard are dropped.
+
+    Parameters
+    ----------
+    `folder`: str
+        The folder of the shards and of the checkpoint
+    `shard_records`: int
+        The number of records of a shard
+    """
+
+    def __init__(self, folder: str, shard_records: int = 10000):
+        self.folder = folder
+        self.shard_records = shard_records
+        os.makedirs(folder, exist_ok=True)
+        for path in glob.glob(os.path.join(folder, f"*{IN_PROGRESS_SUFFIX}")):
+            os.remove(path)
+
+        self.keys: Set[Tuple[str, str]] = set()
+        shard_ids = [-1]
+        for path in get_shard_paths(folder):
+            shard_ids.append(int(shard_file_regex.search(path).group(1)))  # type: ignore
+            with open(path) as f:
+                for line in f:
+                    record = json.loads(line)
+                    self.keys.add((record["program"], record["canonical_schedule"]))
+        self.next_shard_id = max(shard_ids) + 1
+
+        self.completed_programs: Set[str] = set()
+        checkpoint_path = os.path.join(folder, CHECKPOINT_FILE)
+        if os.path.exists(checkpoint_path):
+            with open(checkpoint_path) as f:
+                self.completed_programs = set(json.load(f)["completed_programs"])
+        # programs whose records are all written but not all in complete shards yet
+        self.finished_programs: Set[str] = set()
+
+        self.shard_file = None
+        self.shard_path: str | None = None
+        self.nb_shard_records = 0
+        self.nb_records = 0
+
+    def add(self, record: Dict[str, Any]) -> bool:
+        """
+        Writes a record, returns False when it is a duplicate
+        """
+        key = (record["program"], record["canonical_schedule"])
+        if key in self.keys:
+            return False
+        self.keys.add(key)
+        if self.shard_file is None:
+            self.shard_path = os.path.join(
+                self.folder, SHARD_FILE.format(self.next_shard_id)
+            )
+            self.next_shard_id += 1
+            self.shard_file = open(self.shard_path + IN_PROGRESS_SUFFIX, "w")
+        self.shard_file.write(json.dumps(record) + "\n")
+        self.nb_shard_records += 1
+        self.nb_records += 1
+        if self.nb_shard_records >= self.shard_records:
+            self.complete_shard()
+        return True
+
+    def contains(self, program_name: str, canonical_str: str) -> bool:
+        return (program_name, canonical_str) in self.keys
+
+    def finish_program(self, program_name: str):
+        """
+        Marks all the records of a program as written, it is added to the checkpoint once they are in complete shards
+        """
+        self.finished_programs.add(program_name)
+        if self.shard_file is None:
+            self.write_checkpoint()
+
+    def complete_shard(self):
+        if self.shard_file is not None:
+            assert self.shard_path
+            self.shard_file.close()
+            os.replace(self.shard_path + IN_PROGRESS_SUFFIX, self.shard_path)
+            self.shard_file = None
+            self.shard_path = None
+            self.nb_shard_records = 0
+        self.write_checkpoint()
+
+    def write_checkpoint(self):
+        self.completed_programs |= self.finished_programs
+        self.finished_programs = set()
+        write_json_atomically(
+            os.path.join(self.folder, CHECKPOINT_FILE),
+            {"completed_programs": sorted(self.completed_programs)},
+        )
+
+    def close(self):
+        self.complete_shard()
+
+    def __enter__(self) -> ShardedRecordWriter:
+        return self
+
+    def __exit__(self, exc_type, *args):
+        # the records of an interrupted program stay in progress and are generated again by the next run
+        if exc_type is None:
+            self.close()
+        elif self.shard_file is not None:
+            self.shard_file.close()
+
+
+def sample_schedule(
+    tiramisu_program: TiramisuProgram,
+    max_depth: int,
+    rng: random.Random,
+    **candidate_kwargs,
+) -> Schedule:
+    """
+    Returns a random schedule of up to `max_depth` actions, each sampled among the candidates the static rules accept
+    """
+    schedule = Schedule(tiramisu_program)
+    for _ in range(rng.randint(1, max_depth)):
+        assert schedule.tree
+        candidates = sample_candidates(
+            schedule.tree, NB_SAMPLED_CANDIDATES, rng, **candidate_kwargs
+        )
+        rng.shuffle(candidates)
+        for candidate in filter_candidates(schedule, candidates):
+            child = schedule.branch()
+            try:
+                child.add_optimizations([candidate])
+            except Exception as e:
+                logging.debug(f"Skipping candidate of {schedule}: {e}")
+                continue
+            schedule = child
+            break
+        else:
+            break
+    return schedule
+
+
+def generate_program_records(
+    tiramisu_program: TiramisuProgram,
+    writer: ShardedRecordWriter,
+    backend: EvaluationBackend,
+    nb_schedules: int,
+    max_depth: int = 4,
+    keep_illegal: bool = False,
+    seed: int = 0,
+    max_attempts: int | None = None,
+    **candidate_kwargs,
+) -> int:
+    """
+    Samples up to `nb_schedules` new schedules of a program, measures them in a single batch and writes their records
+
+    Returns
+    -------
+    `int`
+        The number of records written
+    """
+    assert tiramisu_program.name
+    rng = random.Random(f"{seed}-{tiramisu_program.name}")
+    schedules: Dict[str, Schedule] = {}
+    for _ in range(max_attempts if max_attempts is not None else 4 * nb_schedules):
+        if len(schedules) >= nb_schedules:
+            break
+        schedule = sample_schedule(tiramisu_program, max_depth, rng, **candidate_kwargs)
+        canonical_str = schedule.canonical_str()
+        if (
+            schedule.optims_list
+            and canonical_str not in schedules
+            and not writer.contains(tiramisu_program.name, canonical_str)
+        ):
+            schedules[canonical_str] = schedule
+
+    results = backend.evaluate(
+        tiramisu_program, [str(schedule) for schedule in schedules.values()]
+    )
+    results_by_str = {result.sched_str: result for result in results}
+    nb_records = 0
+    for canonical_str, schedule in schedules.items():
+        result = results_by_str.get(str(schedule))
+        if result is None or (not result.legal and not keep_illegal):
+            continue
+        nb_records += writer.add(
+            {
+                "program": tiramisu_program.name,
+                "schedule": result.sched_str,
+                "canonical_schedule": canonical_str,
+                "legal": result.legal,
+                "execution_times": result.execution_times,
+                "error": result.error,
+                "machine": result.machine,
+                "baseline_time": result.baseline_time,
+            }
+        )
+    writer.finish_program(tiramisu_program.name)
+    return nb_records
+
+
+def run_generation(
+    programs: Iterable[TiramisuProgram],
+    output_folder: str,
+    nb_schedules: int = 32,
+    backend: EvaluationBackend | None = None,
+    shard_records: int = 10000,
+    **kwargs,
+) -> Dict[str, int]:
+    """
+    Generates the records of the programs that aren't in the checkpoint of `output_folder`
+
+    Parameters
+    ----------
+    `programs`: Iterable[TiramisuProgram]
+        The programs to sample schedules of
+    `output_folder`: str
+        The folder of the shards and of the checkpoint
+    `nb_schedules`: int
+        The number of schedules sampled per program
+    `backend`: EvaluationBackend | None
+        The backend measuring the schedules, a single process backend by default
+    `shard_records`: int
+        The number of records of a shard
+    `kwargs`:
+        Passed to `generate_program_records`, e.g. `max_depth`, `keep_illegal`, `seed` or `action_types`
+
+    Returns
+    -------
+    The number of `processed` and `skipped` (already in the checkpoint) programs and of written `records`
+    """
+    own_backend = backend is None
+    if backend is None:
+        backend = EvaluationBackend()
+    stats = {"processed": 0, "skipped": 0, "records": 0}
+    try:
+        with ShardedRecordWriter(output_folder, shard_records) as writer:
+            for tiramisu_program in programs:
+                if tiramisu_program.name in writer.completed_programs:
+                    stats["skipped"] += 1
+                    continue
+                stats["records"] += generate_program_records(
+                    tiramisu_program, writer, backend, nb_schedules, **kwargs
+                )
+                stats["processed"] += 1
+                logging.info(
+                    f"Generated the records of {tiramisu_program.name}, {writer.nb_records} records written"
+                )
+    finally:
+        if own_backend:
+            backend.close()
+    return stats
+
+
+def iter_records(folder: str) -> Iterable[Dict[str, Any]]:
+    """
+    Iterates over the records of the complete shards of a folder
+    """
+    for path in get_shard_paths(folder):
+        with open(path) as f:
+            for line in f:
+                yield json.loads(line)
+
+
+def main(args: List[str] | None = None):
+    parser = argparse.ArgumentParser(
+        description="Sample and measure schedules of the programs of a dataset"
+    )
+    parser.add_argument("dataset_folder", help="Folder of the programs dataset")
+    parser.add_argument("output_folder", help="Folder of the records")
+    parser.add_argument("--schedules-per-program", type=int, default=32)
+    parser.add_argument("--max-depth", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--shard-records", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--config", default="config.yaml")
+    parser.add_argument(
+        "--keep-illegal",
+        action="store_true",
+        help="Write the records of the illegal schedules too",
+    )
+    parsed_args = parser.parse_args(args)
+
+    BaseConfig.init(parsed_args.config, logging_level=logging.INFO)
+    with Dataset(parsed_args.dataset_folder) as dataset, EvaluationBackend(
+        nb_workers=parsed_args.workers, config_path=parsed_args.config
+    ) as backend:
+        stats = run_generation(
+            dataset.iter_programs(),
+            parsed_args.output_folder,
+            nb_schedules=parsed_args.schedules_per_program,
+            backend=backend,
+            shard_records=parsed_args.shard_records,
+            max_depth=parsed_args.max_depth,
+            keep_illegal=parsed_args.keep_illegal,
+            seed=parsed_args.seed,
+        )
+    logging.info(
+        f"Processed {stats['processed']} programs, skipped {stats['skipped']}, wrote {stats['records']} records"
+    )
+
+
+if __name__ == "__main__":
+    main()
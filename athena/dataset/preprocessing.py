@@ -0,0 +1,289 @@
+"""
+Turns a directory of Tiramisu generator files into a sharded dataset.
+
+Usage:
+    python -m athena.dataset.preprocessing INPUT_DIR OUTPUT_DIR [--workers N] [--steps annotations,isl_ast,baseline,wrapper]
+
+The results of each program are staged as soon as it is processed, so an interrupted run resumes
+where it stopped when it is started again with the same output directory.
+"""
+from __future__ import annotations
+
+import argparse
+import glob
+import json
+import logging
+import os
+import pickle
+import shutil
+import traceback
+import uuid
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List
+
+from athena.dataset.dataset import DatasetWriter
+from athena.storage.baseline_store import (
+    BaselineStore,
+    MachineFingerprint,
+    get_program_hash,
+)
+from athena.tiramisu.compiling_service import CompilingService
+from athena.tiramisu.tiramisu_program import TiramisuProgram
+from athena.utils.config import BaseConfig
+
+PREPROCESSING_STEPS = ["annotations", "isl_ast", "baseline", "wrapper"]
+
+STAGING_FOLDER = "staging"
+FAILURES_FILE = "failures.jsonl"
+
+
+def preprocess_program(file_path: str, steps: List[str]) -> Dict[str, Any]:
+    """
+    Computes the requested steps for the generator at `file_path`
+
+    Parameters
+    ----------
+    `file_path`: str
+        The path of the generator `.cpp` file
+    `steps`: List[str]
+        The steps to compute, out of `annotations`, `isl_ast`, `baseline` and `wrapper`
+
+    Returns
+    -------
+    The record of the program: its `name`, `data`, `cpp_code` and `wrapper_obj`
+    """
+    assert BaseConfig.base_config
+    tiramisu_program = TiramisuProgram.from_file(file_path)
+    assert tiramisu_program.name and tiramisu_program.original_str
+
+    data: Dict[str, Any] = {"program_annotation": None}
+    if "annotations" in steps:
+        data["program_annotation"] = json.loads(
+            CompilingService.compile_annotations(tiramisu_program)
+        )
+    if "isl_ast" in steps:
+        data["isl_ast"] = CompilingService.compile_isl_ast_tree(tiramisu_program)
+
+    if "wrapper" in steps:
+        # running the empty schedule with the reused generator keeps the compiled wrapper
+        execution_times = CompilingService.get_cpu_exec_times(
+            tiramisu_program,
+            [],
+            max_runs=BaseConfig.base_config.tiramisu.max_runs
+            if "baseline" in steps
+            else 1,
+            reuse_generator=True,
+            execution_backend="wrapper",
+        )
+        if "baseline" in steps:
+            fingerprint = MachineFingerprint.current()
+            BaselineStore.get_instance().put(
+                get_program_hash(tiramisu_program),
+                fingerprint,
+                execution_times,
+                program_name=tiramisu_program.name,
+            )
+            tiramisu_program.initial_execution_times[fingerprint.key] = execution_times
+    elif "baseline" in steps:
+        tiramisu_program.get_current_machine_initial_execution_times()
+    data["initial_execution_times"] = tiramisu_program.initial_execution_times
+
+    return {
+        "name": tiramisu_program.name,
+        "data": data,
+        "cpp_code": tiramisu_program.original_str,
+        "wrapper_obj": tiramisu_program.wrapper_obj,
+    }
+
+
+def init_worker(config_path: str):
+    BaseConfig.init(config_path, logging_level=logging.WARNING)
+
+
+def get_staging_path(output_folder: str, input_folder: str, file_path: str) -> str:
+    """
+    Returns the path of the staged record of a generator, the subfolders of the input folder are kept so that
+    generators with the same name in different subfolders don't collide
+    """
+    relative_path = os.path.splitext(os.path.relpath(file_path, input_folder))[0]
+    return os.path.join(output_folder, STAGING_FOLDER, f"{relative_path}.pkl")
+
+
+def write_staged_record(path: str, record: Dict[str, Any]):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(record, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def run_preprocessing(
+    input_folder: str,
+    output_folder: str,
+    steps: List[str] = PREPROCESSING_STEPS,
+    nb_workers: int = 1,
+    config_path: str = "config.yaml",
+    retry_failed: bool = True,
+    clean_staging: bool = False,
+    shard_size: int = 1 << 30,
+) -> Dict[str, int]:
+    """
+    Preprocesses all the `.cpp` generators of `input_folder` with a pool of workers and writes them to a dataset in `output_folder`
+
+    Parameters
+    ----------
+    `input_folder`: str
+        The folder containing the generator files, searched recursively
+    `output_folder`: str
+        The folder of the dataset
+    `steps`: List[str]
+        The steps to compute for each program
+    `nb_workers`: int
+        The number of worker processes
+    `config_path`: str
+        The config file loaded by the workers
+    `retry_failed`: bool
+        Whether to retry the programs that failed in a previous run
+    `clean_staging`: bool
+        Whether to delete the staged records once all the programs are in the dataset,
+        a later run then processes all the programs again
+
+    Returns
+    -------
+    The number of `processed`, `skipped` (already processed) and `failed` programs
+    """
+    unknown_steps = set(steps) - set(PREPROCESSING_STEPS)
+    if unknown_steps:
+        raise ValueError(f"Unknown preprocessing steps: {unknown_steps}")
+
+    os.makedirs(os.path.join(output_folder, STAGING_FOLDER), exist_ok=True)
+    failures_path = os.path.join(output_folder, FAILURES_FILE)
+
+    previous_failures = set()
+    if os.path.exists(failures_path):
+        if retry_failed:
+            # the programs failing again are recorded again
+            os.remove(failures_path)
+        else:
+            with open(failures_path) as f:
+                previous_failures = {json.loads(line)["file_path"] for line in f}
+
+    file_paths = sorted(
+        glob.glob(os.path.join(input_folder, "**", "*.cpp"), recursive=True)
+    )
+    todo = [
+        file_path
+        for file_path in file_paths
+        if not os.path.exists(get_staging_path(output_folder, input_folder, file_path))
+        and file_path not in previous_failures
+    ]
+    stats = {"processed": 0, "skipped": len(file_paths) - len(todo), "failed": 0}
+    logging.info(
+        f"Preprocessing {len(todo)} programs, {stats['skipped']} already done or failed"
+    )
+
+    with ProcessPoolExecutor(
+        max_workers=nb_workers, initializer=init_worker, initargs=(config_path,)
+    ) as executor:
+        futures = {
+            executor.submit(preprocess_program, file_path, steps): file_path
+            for file_path in todo
+        }
+        for future in as_completed(futures):
+            file_path = futures[future]
+            try:
+                record = future.result()
+            except Exception as e:
+                stats["failed"] += 1
+                logging.error(f"Failed to preprocess {file_path}: {e}")
+                with open(failures_path, "a") as f:
+                    f.write(
+                        json.dumps(
+                            {
+                                "file_path": file_path,
+                                "error": "".join(
+                                    traceback.format_exception_only(type(e), e)
+                                ),
+                            }
+                        )
+                        + "\n"
+                    )
+                continue
+            write_staged_record(
+                get_staging_path(output_folder, input_folder, file_path), record
+            )
+            stats["processed"] += 1
+
+    write_dataset(output_folder, shard_size=shard_size)
+    if clean_staging and stats["failed"] == 0:
+        shutil.rmtree(os.path.join(output_folder, STAGING_FOLDER))
+    return stats
+
+
+def write_dataset(output_folder: str, shard_size: int = 1 << 30):
+    """
+    Writes the staged records of the output folder to its dataset
+    """
+    staged_paths = sorted(
+        glob.glob(
+            os.path.join(output_folder, STAGING_FOLDER, "**", "*.pkl"), recursive=True
+        )
+    )
+    with DatasetWriter(output_folder, shard_size=shard_size) as writer:
+        for staged_path in staged_paths:
+            with open(staged_path, "rb") as f:
+                record = pickle.load(f)
+            writer.add(
+                record["name"],
+                record["data"],
+                record["cpp_code"],
+                record["wrapper_obj"],
+            )
+
+
+def main(args: List[str] | None = None):
+    parser = argparse.ArgumentParser(
+        description="Preprocess a directory of Tiramisu generators into a dataset"
+    )
+    parser.add_argument("input_folder", help="Folder of the generator .cpp files")
+    parser.add_argument("output_folder", help="Folder of the dataset")
+    parser.add_argument(
+        "--steps",
+        default=",".join(PREPROCESSING_STEPS),
+        help=f"Comma separated steps out of {','.join(PREPROCESSING_STEPS)}",
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--config", default="config.yaml")
+    parser.add_argument(
+        "--skip-failed",
+        action="store_true",
+        help="Don't retry the programs that failed in a previous run",
+    )
+    parser.add_argument(
+        "--clean-staging",
+        action="store_true",
+        help="Delete the staged records once all the programs are in the dataset",
+    )
+    parser.add_argument(
+        "--shard-size", type=int, default=1 << 30, help="Shard size in bytes"
+    )
+    parsed_args = parser.parse_args(args)
+
+    BaseConfig.init(parsed_args.config, logging_level=logging.INFO)
+    stats = run_preprocessing(
+        parsed_args.input_folder,
+        parsed_args.output_folder,
+        steps=[step for step in parsed_args.steps.split(",") if step],
+        nb_workers=parsed_args.workers,
+        config_path=parsed_args.config,
+        retry_failed=not parsed_args.skip_failed,
+        clean_staging=parsed_args.clean_staging,
+        shard_size=parsed_args.shard_size,
+    )
+    logging.info(
+        f"Processed {stats['processed']} programs, skipped {stats['skipped']}, {stats['failed']} failed"
+    )
+
+
+if __name__ == "__main__":
+    main()
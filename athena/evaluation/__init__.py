@@ -0,0 +1,12 @@
+from .backend import EvaluationBackend, EvaluationResult, evaluate_schedule
+from .work_queue import QueueBackend, QueueWorker, SQLiteWorkQueue, WorkQueue
+
+__all__ = [
+    "EvaluationBackend",
+    "EvaluationResult",
+    "QueueBackend",
+    "QueueWorker",
+    "SQLiteWorkQueue",
+    "WorkQueue",
+    "evaluate_schedule",
+]
@@ -0,0 +1,283 @@
+from __future__ import annotations
+
+import logging
+import os
+import shutil
+import signal
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Dict, List
+
+from athena.storage.baseline_store import MachineFingerprint
+from athena.tiramisu.schedule import Schedule
+from athena.tiramisu.tiramisu_program import TiramisuProgram
+from athena.utils.config import BaseConfig
+
+# the compiled schedule loader generators are shared by all the jobs of a workspace
+SHARED_WORKSPACE_FOLDERS = ["generators"]
+
+# the time in seconds given to the terminated workers to clean up before they are killed
+TERMINATION_TIMEOUT = 10
+
+
+@dataclass
+class EvaluationResult:
+    """
+    The result of the evaluation of a schedule.
+
+    Attributes
+    ----------
+    `sched_str`: str
+        The string representation of the schedule
+    `legal`: bool | None
+        The legality of the schedule, None when it couldn't be checked
+    `execution_times`: List[float] | None
+        The execution times of the schedule, None when it wasn't measured
+    `error`: str | None
+        The error that stopped the evaluation
+    `machine`: str | None
+        The fingerprint key of the machine the schedule was measured on
+    `baseline_time`: float | None
+        The execution time of the unscheduled program on the machine the schedule was measured on
+    """
+
+    sched_str: str
+    legal: bool | None = None
+    execution_times: List[float] | None = None
+    error: str | None = None
+    machine: str | None = None
+    baseline_time: float | None = None
+
+    @property
+    def execution_time(self) -> float | None:
+        return min(self.execution_times) if self.execution_times else None
+
+
+def get_speedup(tiramisu_program: TiramisuProgram, result: EvaluationResult) -> float:
+    """
+    Returns the speedup of a measured schedule over the unscheduled program measured on the same machine. The results
+    that don't carry the baseline of their machine are compared to the baseline of the current machine.
+    """
+    assert result.execution_time is not None
+    baseline_time = result.baseline_time
+    if baseline_time is None:
+        baseline_time = tiramisu_program.current_machine_initial_execution_time
+    return baseline_time / result.execution_time
+
+
+def create_job_workspace(base_workspace: str) -> str:
+    """
+    Creates a workspace of its own for a job under `base_workspace` so that concurrent jobs don't overwrite each other's files
+    """
+    os.makedirs(base_workspace, exist_ok=True)
+    job_workspace = tempfile.mkdtemp(prefix="job_", dir=base_workspace)
+    for folder in SHARED_WORKSPACE_FOLDERS:
+        shared_folder = os.path.abspath(os.path.join(base_workspace, folder))
+        os.makedirs(shared_folder, exist_ok=True)
+        os.symlink(shared_folder, os.path.join(job_workspace, folder))
+    return job_workspace
+
+
+def evaluate_schedule(
+    tiramisu_program: TiramisuProgram,
+    sched_str: str,
+    measure: bool = True,
+    nb_exec_times: int = 1,
+    legality: bool | None = None,
+) -> EvaluationResult:
+    """
+    Checks the legality of a schedule and measures it when it is legal, in a workspace of its own. A measured
+    schedule comes with the machine it was measured on and the baseline of the program on that machine, which is
+    looked up in the baseline store and only measured the first time the machine evaluates the program.
+
+    Parameters
+    ----------
+    `tiramisu_program`: TiramisuProgram
+        The program of the schedule
+    `sched_str`: str
+        The string representation of the schedule
+    `measure`: bool
+        Whether to measure the execution times of the legal schedule
+    `nb_exec_times`: int
+        The number of executions of the schedule
+    `legality`: bool | None
+        The legality of the schedule when it is already known, it is checked when None
+
+    Returns
+    -------
+    `EvaluationResult`
+        The result of the evaluation, errors are recorded instead of raised
+    """
+    assert BaseConfig.base_config
+    base_workspace = BaseConfig.base_config.workspace
+    job_workspace = create_job_workspace(base_workspace)
+    BaseConfig.base_config.workspace = job_workspace
+    result = EvaluationResult(sched_str)
+    try:
+        schedule = Schedule.from_sched_str(sched_str, tiramisu_program)
+        result.legal = legality if legality is not None else schedule.is_legal()
+        schedule.legality = result.legal
+        if result.legal and measure:
+            result.machine = MachineFingerprint.current().key
+            result.baseline_time = min(
+                tiramisu_program.get_current_machine_initial_execution_times()
+            )
+            result.execution_times = schedule.execute(nb_exec_tiems=nb_exec_times)
+    except Exception as e:
+        logging.debug(f"Evaluation of {sched_str} failed: {e}")
+        result.error = f"{type(e).__name__}: {e}"
+    finally:
+        BaseConfig.base_config.workspace = base_workspace
+        shutil.rmtree(job_workspace, ignore_errors=True)
+    return result
+
+
+def stop_worker(signum, frame):
+    # exit through an exception so that the compiler and kernel subprocesses are killed and the workspace removed
+    raise SystemExit(f"Stopped by signal {signum}")
+
+
+def init_worker(config_path: str):
+    BaseConfig.init(config_path, logging_level=logging.WARNING)
+    signal.signal(signal.SIGTERM, stop_worker)
+
+
+def terminate_executor(executor: ProcessPoolExecutor):
+    """
+    Shuts a pool down without waiting for its running jobs: they are stopped by terminating the worker processes,
+    which are killed if they don't exit in time
+    """
+    # the pool has no public way to stop its running jobs
+    processes = list((executor._processes or {}).values())
+    for process in processes:
+        process.terminate()
+    executor.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        process.join(TERMINATION_TIMEOUT)
+        if process.is_alive():
+            process.kill()
+            process.join()
+
+
+class EvaluationBackend:
+    """
+    Evaluates schedules concurrently in a pool of worker processes, each schedule in a workspace of its own.
+    With a single worker, the schedules are evaluated in the current process.
+
+    Parameters
+    ----------
+    `nb_workers`: int
+        The number of worker processes
+    `config_path`: str
+        The config file loaded by the workers
+    `nb_exec_times`: int
+        The number of executions of each measured schedule
+    """
+
+    def __init__(
+        self,
+        nb_workers: int = 1,
+        config_path: str = "config.yaml",
+        nb_exec_times: int = 1,
+    ):
+        self.nb_workers = nb_workers
+        self.config_path = config_path
+        self.nb_exec_times = nb_exec_times
+        self.executor: ProcessPoolExecutor | None = None
+
+    def get_executor(self) -> ProcessPoolExecutor:
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                self.nb_workers,
+                initializer=init_worker,
+                initargs=(self.config_path,),
+            )
+        return self.executor
+
+    def evaluate(
+        self,
+        tiramisu_program: TiramisuProgram,
+        sched_strs: List[str],
+        measure: bool = True,
+        timeout: float | None = None,
+    ) -> List[EvaluationResult]:
+        """
+        Evaluates the schedules of a program
+
+        Parameters
+        ----------
+        `tiramisu_program`: TiramisuProgram
+            The program of the schedules
+        `sched_strs`: List[str]
+            The string representations of the schedules
+        `measure`: bool
+            Whether to measure the execution times of the legal schedules or only check their legality
+        `timeout`: float | None
+            The time in seconds after which the remaining evaluations are cancelled. With a single worker, the
+            evaluation running at the deadline finishes, otherwise the workers are terminated to stop the running
+            evaluations and a new pool is started by the next call
+
+        Returns
+        -------
+        `List[EvaluationResult]`
+            The results of the evaluations that finished in time, in the order of `sched_strs`
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+
+        if self.nb_workers <= 1:
+            results = []
+            for sched_str in sched_strs:
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+                results.append(
+                    evaluate_schedule(
+                        tiramisu_program, sched_str, measure, self.nb_exec_times
+                    )
+                )
+            return results
+
+        executor = self.get_executor()
+        futures: Dict[Future, int] = {
+            executor.submit(
+                evaluate_schedule,
+                tiramisu_program,
+                sched_str,
+                measure,
+                self.nb_exec_times,
+            ): index
+            for index, sched_str in enumerate(sched_strs)
+        }
+        finished: Dict[int, EvaluationResult] = {}
+        pending = set(futures)
+        while pending:
+            remaining = None
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+            done, pending = wait(
+                pending, timeout=remaining, return_when=FIRST_COMPLETED
+            )
+            for future in done:
+                finished[futures[future]] = future.result()
+        running = [future for future in pending if not future.cancel()]
+        if running:
+            logging.debug(f"Stopping {len(running)} evaluations still running")
+            self.close()
+        return [finished[index] for index in sorted(finished)]
+
+    def close(self):
+        """
+        Cancels the queued evaluations and terminates the workers, stopping the running evaluations
+        """
+        if self.executor is not None:
+            terminate_executor(self.executor)
+            self.executor = None
+
+    def __enter__(self) -> EvaluationBackend:
+        return self
+
+    def __exit__(self, *args):
+        self.close()
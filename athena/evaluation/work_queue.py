@@ -0,0 +1,535 @@
+"""
+Evaluates schedules on other machines through a queue of jobs: the coordinator running the search publishes its
+programs and legality or execution jobs, and workers started on any machine with a local Tiramisu pull the jobs,
+evaluate them and push their results back.
+
+Usage of a worker:
+    python -m athena.evaluation.work_queue QUEUE_PATH [--kinds legality,execution] [--config config.yaml]
+
+Legality jobs only compile the schedules while execution jobs measure them, so the measurements can be kept on
+quiet machines by starting their workers with `--kinds execution` and the other workers with `--kinds legality`.
+`SQLiteWorkQueue` stores the queue in a SQLite database, which serves the workers of a single machine or of machines
+sharing a filesystem with working locks.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from typing import ContextManager, Dict, Iterable, List, Sequence
+
+from athena.evaluation.backend import (
+    EvaluationBackend,
+    EvaluationResult,
+    evaluate_schedule,
+)
+from athena.storage.baseline_store import get_program_hash
+from athena.storage.sqlite_utils import open_database
+from athena.tiramisu.tiramisu_program import TiramisuProgram
+from athena.utils.config import BaseConfig
+
+LEGALITY_JOB = "legality"
+EXECUTION_JOB = "execution"
+JOB_KINDS = [LEGALITY_JOB, EXECUTION_JOB]
+
+# SQLite limits the number of parameters of a query
+MAX_QUERY_PARAMETERS = 900
+
+
+@dataclass
+class Job:
+    """
+    The evaluation of a schedule of a program by a worker.
+
+    Attributes
+    ----------
+    `job_id`: int
+        The identifier of the job in its queue
+    `program_id`: str
+        The identifier of the published program of the schedule
+    `sched_str`: str
+        The string representation of the schedule
+    `kind`: str
+        `legality` to only check the legality of the schedule, `execution` to measure it when it is legal
+    `nb_exec_times`: int
+        The number of executions of a measured schedule
+    `legality`: bool | None
+        The legality of the schedule when it was checked by a previous job
+    """
+
+    job_id: int
+    program_id: str
+    sched_str: str
+    kind: str
+    nb_exec_times: int = 1
+    legality: bool | None = None
+
+
+class WorkQueue:
+    """
+    The interface between the coordinator and the workers. The coordinator publishes programs and submits jobs, the
+    workers claim the jobs and complete them with their results. A job claimed by a worker that didn't complete it
+    within the lease timeout is given to another worker.
+    """
+
+    def publish_program(self, tiramisu_program: TiramisuProgram) -> str:
+        """
+        Makes a program available to the workers, returns its identifier
+        """
+        raise NotImplementedError
+
+    def load_program(self, program_id: str) -> TiramisuProgram:
+        raise NotImplementedError
+
+    def submit(
+        self,
+        program_id: str,
+        sched_strs: Sequence[str],
+        kind: str,
+        nb_exec_times: int = 1,
+        legalities: Sequence[bool | None] | None = None,
+        priority: float = 0.0,
+    ) -> List[int]:
+        """
+        Submits jobs evaluating schedules of a published program, returns their identifiers in the order of `sched_strs`
+        """
+        raise NotImplementedError
+
+    def claim(self, worker_id: str, kinds: Iterable[str] = JOB_KINDS) -> Job | None:
+        """
+        Assigns the pending job with the highest priority among `kinds` to a worker, None when there is none
+        """
+        raise NotImplementedError
+
+    def complete(self, job_id: int, result: EvaluationResult):
+        raise NotImplementedError
+
+    def get_results(self, job_ids: Sequence[int]) -> Dict[int, EvaluationResult]:
+        """
+        Returns the results of the completed jobs among `job_ids`
+        """
+        raise NotImplementedError
+
+    def cancel(self, job_ids: Sequence[int]):
+        """
+        Removes jobs that are no longer needed, the running ones are completed but their results are dropped
+        """
+        raise NotImplementedError
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """
+    A work queue stored in a SQLite database
+
+    Parameters
+    ----------
+    `path`: str
+        The path of the database of the queue
+    `lease_timeout`: float
+        The time in seconds after which a job claimed by a worker is given to another worker
+    `max_attempts`: int
+        The number of workers a job is given to before it fails
+    """
+
+    def __init__(self, path: str, lease_timeout: float = 3600, max_attempts: int = 3):
+        self.path = path
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        # the programs loaded by this process
+        self.programs: Dict[str, TiramisuProgram] = {}
+        with self.connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                """CREATE TABLE IF NOT EXISTS programs (
+                    program_id TEXT PRIMARY KEY,
+                    name TEXT,
+                    data TEXT NOT NULL,
+                    original_str TEXT,
+                    isl_ast_string TEXT,
+                    wrapper_obj BLOB
+                )"""
+            )
+            connection.execute(
+                """CREATE TABLE IF NOT EXISTS jobs (
+                    job_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    program_id TEXT NOT NULL,
+                    sched_str TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    nb_exec_times INTEGER NOT NULL,
+                    legality INTEGER,
+                    priority REAL NOT NULL,
+                    status TEXT NOT NULL,
+                    worker TEXT,
+                    attempts INTEGER NOT NULL,
+                    claimed_at REAL,
+                    result TEXT
+                )"""
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS pending_jobs ON jobs (status, kind, priority)"
+            )
+
+    def connect(self) -> ContextManager[sqlite3.Connection]:
+        return open_database(self.path)
+
+    def publish_program(self, tiramisu_program: TiramisuProgram) -> str:
+        program_id = get_program_hash(tiramisu_program)
+        if program_id in self.programs:
+            return program_id
+        data = {
+            "program_annotation": tiramisu_program.annotations,
+            "initial_execution_times": tiramisu_program.initial_execution_times,
+        }
+        with self.connect() as connection:
+            connection.execute(
+                "INSERT OR IGNORE INTO programs VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    program_id,
+                    tiramisu_program.name,
+                    json.dumps(data),
+                    tiramisu_program.original_str,
+                    tiramisu_program.isl_ast_string,
+                    tiramisu_program.wrapper_obj,
+                ),
+            )
+        self.programs[program_id] = tiramisu_program
+        return program_id
+
+    def load_program(self, program_id: str) -> TiramisuProgram:
+        if program_id not in self.programs:
+            with self.connect() as connection:
+                row = connection.execute(
+                    "SELECT name, data, original_str, isl_ast_string, wrapper_obj FROM programs WHERE program_id = ?",
+                    (program_id,),
+                ).fetchone()
+            if row is None:
+                raise KeyError(f"Program {program_id} isn't published")
+            name, data, original_str, isl_ast_string, wrapper_obj = row
+            tiramisu_program = TiramisuProgram.from_dict(
+                name=name,
+                data=json.loads(data),
+                original_str=original_str,
+                wrapper_obj=wrapper_obj,
+            )
+            # the published code was already processed by `load_code_lines`, it is kept as is so that the program
+            # has the same hash on all the machines
+            tiramisu_program.original_str = original_str
+            tiramisu_program.name = name
+            tiramisu_program.isl_ast_string = isl_ast_string
+            self.programs[program_id] = tiramisu_program
+        return self.programs[program_id]
+
+    def submit(
+        self,
+        program_id: str,
+        sched_strs: Sequence[str],
+        kind: str,
+        nb_exec_times: int = 1,
+        legalities: Sequence[bool | None] | None = None,
+        priority: float = 0.0,
+    ) -> List[int]:
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind {kind}")
+        if legalities is None:
+            legalities = [None] * len(sched_strs)
+        job_ids = []
+        with self.connect() as connection:
+            for sched_str, legality in zip(sched_strs, legalities):
+                cursor = connection.execute(
+                    "INSERT INTO jobs (program_id, sched_str, kind, nb_exec_times, legality, priority, status, attempts)"
+                    " VALUES (?, ?, ?, ?, ?, ?, 'pending', 0)",
+                    (
+                        program_id,
+                        sched_str,
+                        kind,
+                        nb_exec_times,
+                        None if legality is None else int(legality),
+                        priority,
+                    ),
+                )
+                job_ids.append(cursor.lastrowid)
+        return job_ids
+
+    def claim(self, worker_id: str, kinds: Iterable[str] = JOB_KINDS) -> Job | None:
+        kinds = list(kinds)
+        now = time.time()
+        with self.connect() as connection:
+            # the claim is a single write transaction so that two workers never get the same job
+            connection.execute("BEGIN IMMEDIATE")
+            expired = now - self.lease_timeout
+            connection.execute(
+                "UPDATE jobs SET status = 'done', result = ? WHERE status = 'running' AND claimed_at < ? AND attempts >= ?",
+                (
+                    json.dumps({"error": "The workers of the job didn't complete it"}),
+                    expired,
+                    self.max_attempts,
+                ),
+            )
+            row = connection.execute(
+                "SELECT job_id, program_id, sched_str, kind, nb_exec_times, legality FROM jobs"
+                f" WHERE kind IN ({','.join('?' * len(kinds))})"
+                " AND (status = 'pending' OR (status = 'running' AND claimed_at < ?))"
+                " ORDER BY priority DESC, job_id LIMIT 1",
+                [*kinds, expired],
+            ).fetchone()
+            if row is None:
+                return None
+            connection.execute(
+                "UPDATE jobs SET status = 'running', worker = ?, claimed_at = ?, attempts = attempts + 1 WHERE job_id = ?",
+                (worker_id, now, row[0]),
+            )
+        job_id, program_id, sched_str, kind, nb_exec_times, legality = row
+        return Job(
+            job_id,
+            program_id,
+            sched_str,
+            kind,
+            nb_exec_times,
+            None if legality is None else bool(legality),
+        )
+
+    def complete(self, job_id: int, result: EvaluationResult):
+        with self.connect() as connection:
+            connection.execute(
+                "UPDATE jobs SET status = 'done', result = ? WHERE job_id = ?",
+                (json.dumps(asdict(result)), job_id),
+            )
+
+    def get_results(self, job_ids: Sequence[int]) -> Dict[int, EvaluationResult]:
+        results: Dict[int, EvaluationResult] = {}
+        with self.connect() as connection:
+            for i in range(0, len(job_ids), MAX_QUERY_PARAMETERS):
+                chunk = job_ids[i : i + MAX_QUERY_PARAMETERS]
+                for job_id, sched_str, result in connection.execute(
+                    "SELECT job_id, sched_str, result FROM jobs WHERE status = 'done'"
+                    f" AND job_id IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                ):
+                    results[job_id] = EvaluationResult(
+                        **{"sched_str": sched_str, **json.loads(result)}
+                    )
+        return results
+
+    def cancel(self, job_ids: Sequence[int]):
+        with self.connect() as connection:
+            for i in range(0, len(job_ids), MAX_QUERY_PARAMETERS):
+                chunk = job_ids[i : i + MAX_QUERY_PARAMETERS]
+                connection.execute(
+                    f"DELETE FROM jobs WHERE job_id IN ({','.join('?' * len(chunk))})",
+                    chunk,
+                )
+
+    def get_counts(self) -> Dict[str, int]:
+        """
+        Returns the number of jobs of each status
+        """
+        with self.connect() as connection:
+            return dict(
+                connection.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status")
+            )
+
+
+class QueueBackend(EvaluationBackend):
+    """
+    Evaluates schedules through a work queue, so that the workers of many machines evaluate the schedules of a search.
+    When `separate_measurements` is set, the legality of the schedules is checked by legality jobs first and only
+    the legal schedules are measured by execution jobs, which the workers of the quiet machines are dedicated to.
+
+    Parameters
+    ----------
+    `queue`: WorkQueue
+        The queue shared with the workers
+    `nb_exec_times`: int
+        The number of executions of each measured schedule
+    `separate_measurements`: bool
+        Whether to check the legality and measure the schedules in separate jobs
+    `poll_interval`: float
+        The time in seconds between two checks of the results
+    `priority`: float
+        The priority of the jobs of the backend, the workers claim the jobs with the highest priority first
+    """
+
+    def __init__(
+        self,
+        queue: WorkQueue,
+        nb_exec_times: int = 1,
+        separate_measurements: bool = True,
+        poll_interval: float = 0.5,
+        priority: float = 0.0,
+    ):
+        super().__init__(nb_exec_times=nb_exec_times)
+        self.queue = queue
+        self.separate_measurements = separate_measurements
+        self.poll_interval = poll_interval
+        self.priority = priority
+
+    def wait_for_results(
+        self, job_ids: List[int], deadline: float | None
+    ) -> Dict[int, EvaluationResult]:
+        """
+        Waits until the jobs are completed or the deadline is reached, the jobs still pending then are cancelled
+        """
+        results: Dict[int, EvaluationResult] = {}
+        while True:
+            pending = [job_id for job_id in job_ids if job_id not in results]
+            results.update(self.queue.get_results(pending))
+            if len(results) == len(job_ids):
+                break
+            if deadline is not None and time.monotonic() >= deadline:
+                self.queue.cancel(
+                    [job_id for job_id in job_ids if job_id not in results]
+                )
+                break
+            time.sleep(self.poll_interval)
+        return results
+
+    def evaluate(
+        self,
+        tiramisu_program: TiramisuProgram,
+        sched_strs: List[str],
+        measure: bool = True,
+        timeout: float | None = None,
+    ) -> List[EvaluationResult]:
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        program_id = self.queue.publish_program(tiramisu_program)
+
+        kind = (
+            EXECUTION_JOB
+            if measure and not self.separate_measurements
+            else LEGALITY_JOB
+        )
+        job_ids = self.queue.submit(
+            program_id, sched_strs, kind, self.nb_exec_times, priority=self.priority
+        )
+        results = self.wait_for_results(job_ids, deadline)
+        finished = {
+            index: results[job_id]
+            for index, job_id in enumerate(job_ids)
+            if job_id in results
+        }
+
+        if measure and self.separate_measurements:
+            legal_indices = [
+                index for index, result in finished.items() if result.legal
+            ]
+            execution_ids = self.queue.submit(
+                program_id,
+                [sched_strs[index] for index in legal_indices],
+                EXECUTION_JOB,
+                self.nb_exec_times,
+                legalities=[True] * len(legal_indices),
+                priority=self.priority,
+            )
+            results = self.wait_for_results(execution_ids, deadline)
+            for index, job_id in zip(legal_indices, execution_ids):
+                if job_id in results:
+                    finished[index] = results[job_id]
+                else:
+                    del finished[index]
+        return [finished[index] for index in sorted(finished)]
+
+
+class QueueWorker:
+    """
+    Evaluates the jobs of a work queue with the local Tiramisu
+
+    Parameters
+    ----------
+    `queue`: WorkQueue
+        The queue of the jobs
+    `kinds`: Iterable[str]
+        The kinds of the jobs the worker evaluates, `legality` and `execution` by default
+    `worker_id`: str | None
+        The identifier of the worker in the queue, made of the host name and the process id by default
+    """
+
+    def __init__(
+        self,
+        queue: WorkQueue,
+        kinds: Iterable[str] = JOB_KINDS,
+        worker_id: str | None = None,
+    ):
+        self.queue = queue
+        self.kinds = list(kinds)
+        self.worker_id = (
+            worker_id
+            if worker_id is not None
+            else f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        )
+        self.nb_processed = 0
+
+    def process(self, job: Job) -> EvaluationResult:
+        try:
+            tiramisu_program = self.queue.load_program(job.program_id)
+        except Exception as e:
+            result = EvaluationResult(job.sched_str, error=f"{type(e).__name__}: {e}")
+        else:
+            result = evaluate_schedule(
+                tiramisu_program,
+                job.sched_str,
+                measure=job.kind == EXECUTION_JOB,
+                nb_exec_times=job.nb_exec_times,
+                legality=job.legality,
+            )
+        self.queue.complete(job.job_id, result)
+        self.nb_processed += 1
+        return result
+
+    def run(
+        self,
+        max_jobs: int | None = None,
+        idle_timeout: float | None = None,
+        poll_interval: float = 1.0,
+    ):
+        """
+        Evaluates jobs until `max_jobs` jobs were evaluated or no job was available for `idle_timeout` seconds
+        """
+        idle_since = time.monotonic()
+        while max_jobs is None or self.nb_processed < max_jobs:
+            job = self.queue.claim(self.worker_id, self.kinds)
+            if job is None:
+                if (
+                    idle_timeout is not None
+                    and time.monotonic() - idle_since >= idle_timeout
+                ):
+                    break
+                time.sleep(poll_interval)
+                continue
+            self.process(job)
+            idle_since = time.monotonic()
+
+
+def main(args: List[str] | None = None):
+    parser = argparse.ArgumentParser(description="Evaluate the jobs of a work queue")
+    parser.add_argument("queue_path", help="Path of the SQLite database of the queue")
+    parser.add_argument(
+        "--kinds",
+        default=",".join(JOB_KINDS),
+        help="Comma separated kinds of the jobs to evaluate",
+    )
+    parser.add_argument("--config", default="config.yaml")
+    parser.add_argument("--max-jobs", type=int, default=None)
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=None,
+        help="Stop after this many seconds without jobs",
+    )
+    parsed_args = parser.parse_args(args)
+
+    BaseConfig.init(parsed_args.config, logging_level=logging.INFO)
+    worker = QueueWorker(
+        SQLiteWorkQueue(parsed_args.queue_path), parsed_args.kinds.split(",")
+    )
+    logging.info(f"Worker {worker.worker_id} evaluating {worker.kinds} jobs")
+    worker.run(max_jobs=parsed_args.max_jobs, idle_timeout=parsed_args.idle_timeout)
+
+
+if __name__ == "__main__":
+    main()
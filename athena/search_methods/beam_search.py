@@ -0,0 +1,286 @@
+from __future__ import annotations
+
+import itertools
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Set
+
+from athena.cost_models.cost_model import CostModel
+from athena.evaluation.backend import (
+    EvaluationBackend,
+    EvaluationResult,
+    get_speedup,
+)
+from athena.search_methods.checkpoint import (
+    SearchCheckpoint,
+    decode_result,
+    encode_result,
+    get_checkpoint,
+)
+from athena.tiramisu.candidates import iter_candidates
+from athena.tiramisu.schedule import Schedule
+from athena.tiramisu.static_filter import filter_candidates
+from athena.tiramisu.tiramisu_program import TiramisuProgram
+
+METHOD = "beam_search"
+
+
+@dataclass
+class BeamNode:
+    """
+    A schedule of the beam with its speedup over the unscheduled program.
+    """
+
+    schedule: Schedule
+    speedup: float
+    result: EvaluationResult | None = None
+
+
+@dataclass
+class BeamSearchResult:
+    """
+    The outcome of a beam search.
+
+    Attributes
+    ----------
+    `best_schedule`: Schedule
+        The schedule with the best speedup, the empty schedule when no candidate improved it
+    `best_speedup`: float
+        The speedup of the best schedule
+    `nb_evaluated`: int
+        The number of schedules evaluated by the backend
+    `depth`: int
+        The number of actions of the deepest expanded schedules
+    `budget_exhausted`: bool
+        Whether the search stopped because of its time budget
+    """
+
+    best_schedule: Schedule
+    best_speedup: float
+    nb_evaluated: int
+    depth: int
+    budget_exhausted: bool
+
+
+def encode_node(node: BeamNode) -> Dict[str, Any]:
+    return {
+        "schedule": str(node.schedule),
+        "speedup": node.speedup,
+        "result": encode_result(node.result),
+    }
+
+
+def expand_node(
+    node: BeamNode, max_children: int | None = None, **candidate_kwargs
+) -> List[Schedule]:
+    """
+    Returns the schedules made of the schedule of `node` followed by one of its candidate actions that the static rules
+    don't reject, the keyword arguments are passed to `iter_candidates`
+    """
+    schedule = node.schedule
+    assert schedule.tree
+    candidates = filter_candidates(
+        schedule, iter_candidates(schedule.tree, **candidate_kwargs)
+    )
+    children = []
+    for candidate in itertools.islice(candidates, max_children):
+        child = schedule.branch()
+        try:
+            child.add_optimizations([candidate])
+        except Exception as e:
+            logging.debug(f"Skipping candidate of {schedule}: {e}")
+            continue
+        children.append(child)
+    return children
+
+
+def beam_search(
+    tiramisu_program: TiramisuProgram,
+    beam_size: int = 4,
+    max_depth: int = 4,
+    backend: EvaluationBackend | None = None,
+    time_budget: float | None = None,
+    predictor: Callable[[Schedule], float] | None = None,
+    max_children: int | None = None,
+    cost_model: CostModel | None = None,
+    nb_measured: int | None = None,
+    checkpoint: SearchCheckpoint | str | None = None,
+    **candidate_kwargs,
+) -> BeamSearchResult:
+    """
+    Searches the schedules of a program level by level, keeping the `beam_size` best schedules of each level.
+    The children of all the schedules of the beam are evaluated together by the backend so that its workers stay busy.
+
+    Parameters
+    ----------
+    `tiramisu_program`: TiramisuProgram
+        The program to schedule
+    `beam_size`: int
+        The number of schedules kept at each level
+    `max_depth`: int
+        The maximum number of actions of the schedules
+    `backend`: EvaluationBackend | None
+        The backend checking and measuring the schedules, a single process backend by default
+    `time_budget`: float | None
+        The time in seconds after which the search returns its best schedule, evaluations still running are stopped
+    `predictor`: Callable[[Schedule], float] | None
+        Predicts the speedup of a schedule, when given the schedules are ranked by their predicted speedup and the
+        backend only checks their legality
+    `max_children`: int | None
+        The maximum number of children of each schedule of the beam
+    `cost_model`: CostModel | None
+        Ranks the children of each level before they are measured, only the `nb_measured` best ones are evaluated
+    `nb_measured`: int | None
+        The number of children measured at each level when there is a cost model, twice the beam size by default
+    `checkpoint`: SearchCheckpoint | str | None
+        The checkpoint, or its path, where the beam is saved after the levels and when the search stops. The search
+        resumes from it when it exists.
+    `candidate_kwargs`:
+        Passed to `iter_candidates`, e.g. `action_types` or `candidate_filter`
+
+    Returns
+    -------
+    `BeamSearchResult`
+        The best schedule found and statistics of the search
+    """
+    start = time.monotonic()
+    deadline = start + time_budget if time_budget is not None else None
+    own_backend = backend is None
+    if backend is None:
+        backend = EvaluationBackend()
+
+    checkpoint = get_checkpoint(checkpoint)
+    root = BeamNode(Schedule(tiramisu_program), 1.0)
+    best = root
+    beam = [root]
+    seen = {root.schedule.canonical_str()}
+    # the level being evaluated: its children not evaluated yet, the keys of all its children and its scored children
+    pending: List[Schedule] = []
+    level_keys: Set[str] = set()
+    scored: List[BeamNode] = []
+    nb_evaluated = 0
+    depth = 0
+    budget_exhausted = False
+
+    state = checkpoint.load(METHOD, tiramisu_program) if checkpoint else None
+    if state is not None:
+        nodes = [state["best"], *state["beam"], *state["scored"]]
+        schedules = Schedule.from_sched_strs(
+            [node["schedule"] for node in nodes] + state["pending"], tiramisu_program
+        )
+        for schedule in schedules[1 : len(nodes)]:
+            schedule.legality = True
+        best, *evaluated_nodes = [
+            BeamNode(schedule, node["speedup"], decode_result(node["result"]))
+            for schedule, node in zip(schedules, nodes)
+        ]
+        beam = evaluated_nodes[: len(state["beam"])]
+        scored = evaluated_nodes[len(state["beam"]) :]
+        pending = schedules[len(nodes) :]
+        level_keys = set(state["level_keys"])
+        seen = set(state["seen"])
+        nb_evaluated = state["nb_evaluated"]
+        depth = state["depth"]
+
+    def get_state() -> Dict[str, Any]:
+        return {
+            "best": encode_node(best),
+            "beam": [encode_node(node) for node in beam],
+            "scored": [encode_node(node) for node in scored],
+            "pending": [str(schedule) for schedule in pending],
+            "level_keys": sorted(level_keys),
+            "seen": sorted(seen),
+            "nb_evaluated": nb_evaluated,
+            "depth": depth,
+        }
+
+    try:
+        while pending or depth < max_depth:
+            if deadline is not None and time.monotonic() >= deadline:
+                budget_exhausted = True
+                break
+
+            # a level cut by the budget of a previous run is finished before the next one starts
+            if not pending:
+                children = []
+                level_keys = set()
+                for node in beam:
+                    for child in expand_node(node, max_children, **candidate_kwargs):
+                        # equivalent schedules are only evaluated once
+                        canonical_str = child.canonical_str()
+                        if (
+                            canonical_str not in seen
+                            and canonical_str not in level_keys
+                        ):
+                            level_keys.add(canonical_str)
+                            children.append(child)
+                if not children:
+                    break
+                if cost_model is not None:
+                    children = [
+                        child
+                        for child, _ in cost_model.rank(
+                            children,
+                            nb_measured if nb_measured is not None else 2 * beam_size,
+                        )
+                    ]
+                pending = children
+                scored = []
+
+            results = backend.evaluate(
+                tiramisu_program,
+                [str(child) for child in pending],
+                measure=predictor is None,
+                timeout=deadline - time.monotonic() if deadline is not None else None,
+            )
+            nb_evaluated += len(results)
+
+            results_by_str = {result.sched_str: result for result in results}
+            for child in pending:
+                result = results_by_str.get(str(child))
+                if result is None or not result.legal:
+                    continue
+                child.legality = True
+                if predictor is not None:
+                    speedup = predictor(child)
+                else:
+                    if result.execution_time is None:
+                        continue
+                    speedup = get_speedup(tiramisu_program, result)
+                scored.append(BeamNode(child, speedup, result))
+            scored.sort(key=lambda node: node.speedup, reverse=True)
+            if scored and scored[0].speedup > best.speedup:
+                best = scored[0]
+
+            pending = [child for child in pending if str(child) not in results_by_str]
+            if pending:
+                # the children left are saved with the level so that a resumed search evaluates them
+                budget_exhausted = True
+                break
+
+            depth += 1
+            seen |= level_keys
+            logging.info(
+                f"Beam search depth {depth}: {len(level_keys)} children, best speedup {best.speedup:.3f} with {best.schedule}"
+            )
+            if not scored:
+                break
+            beam = scored[:beam_size]
+            scored = []
+            if checkpoint is not None:
+                checkpoint.save_if_due(METHOD, tiramisu_program, get_state)
+    finally:
+        if own_backend:
+            backend.close()
+    # an interrupted search resumes from the last periodic save instead
+    if checkpoint is not None:
+        checkpoint.save(METHOD, tiramisu_program, get_state())
+
+    return BeamSearchResult(
+        best_schedule=best.schedule,
+        best_speedup=best.speedup,
+        nb_evaluated=nb_evaluated,
+        depth=depth,
+        budget_exhausted=budget_exhausted,
+    )
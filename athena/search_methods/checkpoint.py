@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import random
+import time
+import uuid
+from dataclasses import asdict
+from typing import Any, Callable, Dict, List
+
+from athena.evaluation.backend import EvaluationResult
+from athena.tiramisu.tiramisu_program import TiramisuProgram
+
+CHECKPOINT_VERSION = 2
+
+
+class SearchCheckpoint:
+    """
+    Persists the state of a search to a JSON file so that a search interrupted by a crash or a preemption resumes
+    without evaluating its evaluated schedules again. The state is saved at most every `interval` seconds and when the
+    search stops, schedules are stored as strings and rebuilt with `Schedule.from_sched_strs` when the search resumes.
+
+    Parameters
+    ----------
+    `path`: str
+        The path of the checkpoint file
+    `interval`: float
+        The minimum time in seconds between two saves during the search
+    """
+
+    def __init__(self, path: str, interval: float = 60.0):
+        self.path = path
+        self.interval = interval
+        self.last_save = time.monotonic()
+
+    def load(
+        self, method: str, tiramisu_program: TiramisuProgram
+    ) -> Dict[str, Any] | None:
+        """
+        Returns the state saved by a search of `method` on the program, None when there is no checkpoint
+
+        Raises
+        ------
+        `ValueError`
+            When the checkpoint was saved by another search method or for another program
+        """
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path) as f:
+            checkpoint = json.load(f)
+        if checkpoint["version"] != CHECKPOINT_VERSION:
+            raise ValueError(
+                f"Unsupported version {checkpoint['version']} of the checkpoint {self.path}"
+            )
+        if (
+            checkpoint["method"] != method
+            or checkpoint["program"] != tiramisu_program.name
+        ):
+            raise ValueError(
+                f"{self.path} is a checkpoint of a {checkpoint['method']} search of {checkpoint['program']}, not of a {method} search of {tiramisu_program.name}"
+            )
+        logging.info(f"Resuming the {method} search from {self.path}")
+        return checkpoint["state"]
+
+    def save(
+        self, method: str, tiramisu_program: TiramisuProgram, state: Dict[str, Any]
+    ):
+        # the previous checkpoint is only replaced once the new one is complete
+        tmp_path = f"{self.path}.{uuid.uuid4().hex}"
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {
+                    "version": CHECKPOINT_VERSION,
+                    "method": method,
+                    "program": tiramisu_program.name,
+                    "state": state,
+                },
+                f,
+            )
+        os.replace(tmp_path, self.path)
+        self.last_save = time.monotonic()
+
+    def save_if_due(
+        self,
+        method: str,
+        tiramisu_program: TiramisuProgram,
+        get_state: Callable[[], Dict[str, Any]],
+    ) -> bool:
+        """
+        Saves the state returned by `get_state` if the last save is older than the interval, returns whether it did
+        """
+        if time.monotonic() - self.last_save < self.interval:
+            return False
+        self.save(method, tiramisu_program, get_state())
+        return True
+
+
+def get_checkpoint(
+    checkpoint: SearchCheckpoint | str | None,
+) -> SearchCheckpoint | None:
+    if isinstance(checkpoint, str):
+        return SearchCheckpoint(checkpoint)
+    return checkpoint
+
+
+def encode_rng_state(rng: random.Random) -> List[Any]:
+    version, internal_state, gauss_next = rng.getstate()
+    return [version, list(internal_state), gauss_next]
+
+
+def decode_rng_state(rng: random.Random, state: List[Any]):
+    version, internal_state, gauss_next = state
+    rng.setstate((version, tuple(internal_state), gauss_next))
+
+
+def encode_result(result: EvaluationResult | None) -> Dict[str, Any] | None:
+    return asdict(result) if result is not None else None
+
+
+def decode_result(result: Dict[str, Any] | None) -> EvaluationResult | None:
+    return EvaluationResult(**result) if result is not None else None
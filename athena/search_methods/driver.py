@@ -0,0 +1,315 @@
+from __future__ import annotations
+
+import logging
+import math
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List
+
+from athena.evaluation.backend import (
+    EvaluationBackend,
+    EvaluationResult,
+    get_speedup,
+)
+from athena.tiramisu.tiramisu_program import TiramisuProgram
+
+# the attributes of the reports holding the spending of each limit of a budget
+SPENT_ATTRIBUTES = {
+    "wall_time": "wall_time",
+    "evaluations": "nb_evaluations",
+    "execution_time": "execution_time",
+}
+
+
+@dataclass
+class SearchBudget:
+    """
+    Limits on the work spent on a search, None for no limit.
+
+    Attributes
+    ----------
+    `wall_time`: float | None
+        The time in seconds
+    `evaluations`: int | None
+        The number of schedules evaluated, each of them is compiled
+    `execution_time`: float | None
+        The sum of the measured execution times, in the unit of the execution times (milliseconds)
+    """
+
+    wall_time: float | None = None
+    evaluations: int | None = None
+    execution_time: float | None = None
+
+
+@dataclass
+class SearchReport:
+    """
+    The best schedule found so far for a program and the work spent on it.
+
+    Attributes
+    ----------
+    `program`: str
+        The name of the program
+    `best_schedule`: str
+        The string representation of the best measured schedule, empty when no schedule beat the program
+    `best_speedup`: float
+        The speedup of the best schedule
+    `nb_evaluations`: int
+        The number of schedules evaluated
+    `execution_time`: float
+        The sum of the measured execution times
+    `wall_time`: float
+        The time in seconds spent on the program
+    `finished`: bool
+        Whether the search of the program ended before its budget
+    """
+
+    program: str
+    best_schedule: str = ""
+    best_speedup: float = 1.0
+    nb_evaluations: int = 0
+    execution_time: float = 0.0
+    wall_time: float = 0.0
+    finished: bool = False
+
+
+class BudgetedBackend(EvaluationBackend):
+    """
+    Wraps a backend to enforce a budget on any search method. A batch is cut to the remaining evaluations and
+    cancelled at the end of the remaining time, and no schedule is evaluated once the budget is spent, so searches
+    stop as when their own budget runs out. The best measured schedule is kept up to date in `report`.
+
+    Parameters
+    ----------
+    `backend`: EvaluationBackend
+        The backend evaluating the schedules
+    `budget`: SearchBudget
+        The budget of the evaluations going through this backend
+    `report`: SearchReport
+        The report updated with the evaluations
+    `on_improvement`: Callable[[SearchReport], None] | None
+        Called with the report each time a better schedule is measured
+    """
+
+    def __init__(
+        self,
+        backend: EvaluationBackend,
+        budget: SearchBudget,
+        report: SearchReport,
+        on_improvement: Callable[[SearchReport], None] | None = None,
+    ):
+        super().__init__(nb_exec_times=backend.nb_exec_times)
+        self.backend = backend
+        self.budget = budget
+        self.report = report
+        self.on_improvement = on_improvement
+        self.start = time.monotonic()
+        self.nb_evaluations = 0
+        self.execution_time = 0.0
+
+    def get_remaining_time(self) -> float | None:
+        if self.budget.wall_time is None:
+            return None
+        return self.budget.wall_time - (time.monotonic() - self.start)
+
+    def is_exhausted(self) -> bool:
+        remaining_time = self.get_remaining_time()
+        return (
+            (remaining_time is not None and remaining_time <= 0)
+            or (
+                self.budget.evaluations is not None
+                and self.nb_evaluations >= self.budget.evaluations
+            )
+            or (
+                self.budget.execution_time is not None
+                and self.execution_time >= self.budget.execution_time
+            )
+        )
+
+    def evaluate(
+        self,
+        tiramisu_program: TiramisuProgram,
+        sched_strs: List[str],
+        measure: bool = True,
+        timeout: float | None = None,
+    ) -> List[EvaluationResult]:
+        if self.is_exhausted():
+            return []
+        if self.budget.evaluations is not None:
+            sched_strs = sched_strs[: self.budget.evaluations - self.nb_evaluations]
+        remaining_time = self.get_remaining_time()
+        if remaining_time is not None:
+            timeout = (
+                remaining_time if timeout is None else min(timeout, remaining_time)
+            )
+
+        results = self.backend.evaluate(tiramisu_program, sched_strs, measure, timeout)
+        self.nb_evaluations += len(results)
+        self.report.nb_evaluations += len(results)
+        improved = False
+        for result in results:
+            if result.execution_times:
+                self.execution_time += sum(result.execution_times)
+                self.report.execution_time += sum(result.execution_times)
+            if result.legal and result.execution_time is not None:
+                speedup = get_speedup(tiramisu_program, result)
+                if speedup > self.report.best_speedup:
+                    self.report.best_schedule = result.sched_str
+                    self.report.best_speedup = speedup
+                    improved = True
+        if improved and self.on_improvement is not None:
+            self.on_improvement(self.report)
+        return results
+
+    def close(self):
+        pass
+
+
+def min_budget(*values: float | None) -> float | None:
+    limits = [value for value in values if value is not None]
+    return min(limits) if limits else None
+
+
+class SearchDriver:
+    """
+    Runs a search method on many programs within budgets. The programs take turns: each turn resumes the search of a
+    program from its checkpoint with a slice of budget, so every program progresses before any of them uses up the
+    suite budget, and the budget left by the programs whose searches ended goes to the others.
+
+    Parameters
+    ----------
+    `search_method`: Callable[..., Any]
+        Called as `search_method(tiramisu_program, backend=backend, checkpoint=checkpoint_path)`, e.g.
+        `functools.partial(beam_search, beam_size=8)`, and returning a result with a `budget_exhausted` attribute
+    `backend`: EvaluationBackend | None
+        The backend evaluating the schedules of all the programs, a single process backend by default
+    `program_budget`: SearchBudget | None
+        The budget of each program
+    `total_budget`: SearchBudget | None
+        The budget of the whole suite, shared between the programs that aren't finished
+    `slice_budget`: SearchBudget | None
+        The budget of a turn, the programs don't take turns and are searched one after the other by default
+    `checkpoint_folder`: str | None
+        The folder of the checkpoints of the searches, a temporary folder by default
+    `on_improvement`: Callable[[SearchReport], None] | None
+        Called with the report of a program each time a better schedule of the program is measured
+    """
+
+    def __init__(
+        self,
+        search_method: Callable[..., Any],
+        backend: EvaluationBackend | None = None,
+        program_budget: SearchBudget | None = None,
+        total_budget: SearchBudget | None = None,
+        slice_budget: SearchBudget | None = None,
+        checkpoint_folder: str | None = None,
+        on_improvement: Callable[[SearchReport], None] | None = None,
+    ):
+        self.search_method = search_method
+        self.backend = backend
+        self.program_budget = program_budget or SearchBudget()
+        self.total_budget = total_budget or SearchBudget()
+        self.slice_budget = slice_budget or SearchBudget()
+        self.checkpoint_folder = checkpoint_folder
+        self.on_improvement = on_improvement
+        self.reports: Dict[str, SearchReport] = {}
+
+    def get_turn_budget(self, report: SearchReport) -> SearchBudget:
+        """
+        Returns the budget of the next turn of a program: its slice, bounded by the budget left to the program and by
+        what is left of its equal share of the suite budget. The budget spent by the finished programs is taken out of
+        the suite budget before it is shared.
+        """
+        nb_shares = sum(not other.finished for other in self.reports.values())
+        limits: Dict[str, float | None] = {}
+        for name, attribute in SPENT_ATTRIBUTES.items():
+            spent = getattr(report, attribute)
+            program_limit = getattr(self.program_budget, name)
+            total = getattr(self.total_budget, name)
+            share = None
+            if total is not None:
+                finished_spent = sum(
+                    getattr(other, attribute)
+                    for other in self.reports.values()
+                    if other.finished
+                )
+                share = (total - finished_spent) / nb_shares - spent
+            limits[name] = min_budget(
+                getattr(self.slice_budget, name),
+                None if program_limit is None else program_limit - spent,
+                share,
+            )
+        evaluations = limits.pop("evaluations")
+        return SearchBudget(
+            evaluations=None if evaluations is None else math.floor(evaluations),
+            **limits,
+        )
+
+    def run(self, programs: Iterable[TiramisuProgram]) -> Dict[str, SearchReport]:
+        """
+        Searches the programs until their searches end or the budgets are spent
+
+        Returns
+        -------
+        `Dict[str, SearchReport]`
+            The reports of the programs by name
+        """
+        programs = list(programs)
+        own_backend = self.backend is None
+        backend = self.backend if self.backend is not None else EvaluationBackend()
+        temporary_folder = None
+        checkpoint_folder = self.checkpoint_folder
+        if checkpoint_folder is None:
+            temporary_folder = tempfile.TemporaryDirectory()
+            checkpoint_folder = temporary_folder.name
+        os.makedirs(checkpoint_folder, exist_ok=True)
+
+        for tiramisu_program in programs:
+            assert tiramisu_program.name
+            self.reports.setdefault(
+                tiramisu_program.name, SearchReport(tiramisu_program.name)
+            )
+        remaining = [
+            program for program in programs if not self.reports[program.name].finished
+        ]
+        try:
+            while remaining:
+                progressed = False
+                for tiramisu_program in list(remaining):
+                    report = self.reports[tiramisu_program.name]
+                    budget = self.get_turn_budget(report)
+                    budgeted_backend = BudgetedBackend(
+                        backend, budget, report, self.on_improvement
+                    )
+                    if budgeted_backend.is_exhausted():
+                        remaining.remove(tiramisu_program)
+                        continue
+                    nb_evaluations = report.nb_evaluations
+                    turn_start = time.monotonic()
+                    result = self.search_method(
+                        tiramisu_program,
+                        backend=budgeted_backend,
+                        checkpoint=os.path.join(
+                            checkpoint_folder, f"{tiramisu_program.name}.json"
+                        ),
+                    )
+                    report.wall_time += time.monotonic() - turn_start
+                    progressed |= report.nb_evaluations > nb_evaluations
+                    if not result.budget_exhausted:
+                        report.finished = True
+                        remaining.remove(tiramisu_program)
+                    logging.info(
+                        f"{report.program}: {report.nb_evaluations} evaluations, best speedup {report.best_speedup:.3f}"
+                        + (" (finished)" if report.finished else "")
+                    )
+                # a turn without evaluations means the searches can't progress within the budget anymore
+                if not progressed:
+                    break
+        finally:
+            if own_backend:
+                backend.close()
+            if temporary_folder is not None:
+                temporary_folder.cleanup()
+        return self.reports
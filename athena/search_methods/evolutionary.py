@@ -0,0 +1,489 @@
+from __future__ import annotations
+
+import logging
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+from athena.evaluation.backend import EvaluationBackend, get_speedup
+from athena.search_methods.checkpoint import (
+    SearchCheckpoint,
+    decode_rng_state,
+    encode_rng_state,
+    get_checkpoint,
+)
+from athena.tiramisu.candidates import (
+    DEFAULT_SKEWING_FACTORS,
+    DEFAULT_TILING_SIZES,
+    DEFAULT_UNROLLING_FACTORS,
+    sample_candidates,
+)
+from athena.tiramisu.schedule import Schedule
+from athena.tiramisu.schedule_parser import (
+    ParsedAction,
+    build_action,
+    format_parsed_action,
+    parse_sched_str,
+)
+from athena.tiramisu.static_filter import (
+    StaticVerdict,
+    classify_action,
+    filter_candidates,
+)
+from athena.tiramisu.tiramisu_actions.tiramisu_action import TiramisuActionType
+from athena.tiramisu.tiramisu_program import TiramisuProgram
+
+# the number of candidates sampled when a random action is needed, the first one the static rules accept is used
+NB_SAMPLED_CANDIDATES = 8
+
+# the number of decoded schedules kept to decode the genomes sharing their prefixes, the cache is cleared when full
+DECODING_CACHE_SIZE = 10000
+
+METHOD = "evolutionary"
+
+
+@dataclass
+class EvolutionResult:
+    """
+    The outcome of an evolutionary search.
+
+    Attributes
+    ----------
+    `best_schedule`: Schedule
+        The evaluated schedule with the best fitness
+    `best_speedup`: float
+        The fitness of the best schedule, its measured or predicted speedup
+    `nb_evaluated`: int
+        The number of schedules evaluated by the backend
+    `nb_generations`: int
+        The number of generations evaluated, including the initial population
+    `budget_exhausted`: bool
+        Whether the search stopped because of its time or evaluation budget
+    """
+
+    best_schedule: Schedule
+    best_speedup: float
+    nb_evaluated: int
+    nb_generations: int
+    budget_exhausted: bool
+
+
+class EvolutionarySearch:
+    """
+    Evolves a population of schedules of a program. The genome of a schedule is its sequence of actions: mutations
+    insert, delete or replace an action or change its factors within the domain of its action type, and crossovers
+    join the head of a parent with the tail of another. Children are decoded by applying their actions to the tree of
+    the program, dropping the ones that don't apply anymore. The decoded schedules are cached so that the genomes
+    sharing a prefix apply it, with the compilations it needs, only once. Each generation is evaluated as a single
+    batch by the backend and the fitness of the schedules is cached by canonical schedule string.
+
+    Parameters
+    ----------
+    `tiramisu_program`: TiramisuProgram
+        The program to schedule
+    `backend`: EvaluationBackend | None
+        The backend checking and measuring the schedules, a single process backend by default
+    `population_size`: int
+        The number of schedules of each generation
+    `nb_elites`: int
+        The number of best schedules kept unchanged in the next generation
+    `tournament_size`: int
+        The number of schedules competing to be selected as parent
+    `crossover_rate`: float
+        The probability that a child is the crossover of two parents
+    `mutation_rate`: float
+        The probability that a child is mutated
+    `max_depth`: int
+        The maximum number of actions of the schedules
+    `action_types`: Iterable[TiramisuActionType] | None
+        The types of the actions of the schedules, all the enumerated types when None
+    `unrolling_factors`: Sequence[int]
+        The domain of the unrolling factors
+    `tiling_sizes`: Sequence[int]
+        The domain of the tile sizes
+    `skewing_factors`: Sequence[Tuple[int, int]]
+        The domain of the skewing factors
+    `predictor`: Callable[[Schedule], float] | None
+        Predicts the speedup of a schedule, when given it is used as fitness and the backend only checks the legality
+    `seed`: int | None
+        The seed of the random generator of the search
+    `checkpoint`: SearchCheckpoint | str | None
+        The checkpoint, or its path, where the population, the fitness cache and the state of the random generator
+        are saved after the generations and when a run stops. The search resumes from it when it exists.
+    """
+
+    def __init__(
+        self,
+        tiramisu_program: TiramisuProgram,
+        backend: EvaluationBackend | None = None,
+        population_size: int = 32,
+        nb_elites: int = 2,
+        tournament_size: int = 3,
+        crossover_rate: float = 0.5,
+        mutation_rate: float = 0.8,
+        max_depth: int = 6,
+        action_types: Iterable[TiramisuActionType] | None = None,
+        unrolling_factors: Sequence[int] = DEFAULT_UNROLLING_FACTORS,
+        tiling_sizes: Sequence[int] = DEFAULT_TILING_SIZES,
+        skewing_factors: Sequence[Tuple[int, int]] = DEFAULT_SKEWING_FACTORS,
+        predictor: Callable[[Schedule], float] | None = None,
+        seed: int | None = None,
+        checkpoint: SearchCheckpoint | str | None = None,
+    ):
+        self.tiramisu_program = tiramisu_program
+        self.backend = backend if backend is not None else EvaluationBackend()
+        self.population_size = population_size
+        self.nb_elites = nb_elites
+        self.tournament_size = tournament_size
+        self.crossover_rate = crossover_rate
+        self.mutation_rate = mutation_rate
+        self.max_depth = max_depth
+        self.unrolling_factors = unrolling_factors
+        self.tiling_sizes = tiling_sizes
+        self.skewing_factors = skewing_factors
+        self.candidate_kwargs = {
+            "action_types": list(action_types) if action_types is not None else None,
+            "unrolling_factors": unrolling_factors,
+            "tiling_sizes": tiling_sizes,
+            "skewing_factors": skewing_factors,
+        }
+        self.predictor = predictor
+        self.rng = random.Random(seed)
+
+        # fitness of the evaluated schedules by canonical string
+        self.fitness_cache: Dict[str, float] = {}
+        self.best_schedule = Schedule(tiramisu_program)
+        self.best_speedup = 1.0
+        self.fitness_cache[self.best_schedule.canonical_str()] = 1.0
+        self.nb_evaluated = 0
+        self.nb_generations = 0
+        # the last population, a run evolves it instead of a random population or finishes its evaluation first
+        self.population: List[Schedule] = []
+        self.population_evaluated = False
+        # the outcome of applying an action to a decoded schedule, None when the action was dropped
+        self.decoded: Dict[Tuple[str, str], Schedule | None] = {}
+        self.empty_schedule = Schedule(tiramisu_program)
+
+        self.checkpoint = get_checkpoint(checkpoint)
+        if self.checkpoint is not None:
+            state = self.checkpoint.load(METHOD, tiramisu_program)
+            if state is not None:
+                self.load_state(state)
+
+    def get_state(self) -> Dict[str, Any]:
+        return {
+            "population": [str(schedule) for schedule in self.population],
+            "population_evaluated": self.population_evaluated,
+            "fitness_cache": self.fitness_cache,
+            "best_schedule": str(self.best_schedule),
+            "best_speedup": self.best_speedup,
+            "rng_state": encode_rng_state(self.rng),
+            "nb_evaluated": self.nb_evaluated,
+            "nb_generations": self.nb_generations,
+        }
+
+    def load_state(self, state: Dict[str, Any]):
+        self.best_schedule, *self.population = Schedule.from_sched_strs(
+            [state["best_schedule"], *state["population"]], self.tiramisu_program
+        )
+        self.population_evaluated = state["population_evaluated"]
+        self.fitness_cache = state["fitness_cache"]
+        self.best_speedup = state["best_speedup"]
+        decode_rng_state(self.rng, state["rng_state"])
+        self.nb_evaluated = state["nb_evaluated"]
+        self.nb_generations = state["nb_generations"]
+
+    def get_decoding_key(
+        self, schedule: Schedule, gene: ParsedAction
+    ) -> Tuple[str, str]:
+        key = (str(schedule), format_parsed_action(gene))
+        if key not in self.decoded and len(self.decoded) >= DECODING_CACHE_SIZE:
+            self.decoded.clear()
+        return key
+
+    def apply_gene(self, schedule: Schedule, gene: ParsedAction) -> Schedule | None:
+        """
+        Returns the schedule with the action of the gene applied, None when the action doesn't apply to the tree or
+        the static rules find it illegal
+        """
+        key = self.get_decoding_key(schedule, gene)
+        if key in self.decoded:
+            return self.decoded[key]
+        assert schedule.tree
+        child = None
+        try:
+            action = build_action(gene, schedule.tree)
+            if (
+                classify_action(action, schedule.tree, schedule.optims_list).verdict
+                != StaticVerdict.ILLEGAL
+            ):
+                child = schedule.branch()
+                child.add_optimizations([action])
+        except Exception as e:
+            logging.debug(f"Dropping {gene.name} from {schedule}: {e}")
+            child = None
+        self.decoded[key] = child
+        return child
+
+    def decode(self, genome: Sequence[ParsedAction]) -> Schedule:
+        """
+        Builds the schedule of a genome, skipping the actions that don't apply to the tree or that the static rules
+        find illegal. The decoded schedules are shared by the genomes decoding to them and must not be modified.
+        """
+        schedule = self.empty_schedule
+        for gene in genome[: self.max_depth]:
+            schedule = self.apply_gene(schedule, gene) or schedule
+        return schedule
+
+    def random_gene(self, schedule: Schedule) -> Tuple[ParsedAction, Schedule] | None:
+        """
+        Returns a random action applicable after `schedule` with the schedule it leads to, None when there is none
+        """
+        assert schedule.tree
+        candidates = sample_candidates(
+            schedule.tree, NB_SAMPLED_CANDIDATES, self.rng, **self.candidate_kwargs
+        )
+        self.rng.shuffle(candidates)
+        for candidate in filter_candidates(schedule, candidates):
+            child = schedule.branch()
+            try:
+                child.add_optimizations([candidate])
+            except Exception as e:
+                logging.debug(f"Skipping candidate of {schedule}: {e}")
+                continue
+            # the child is cached so that decoding a genome with the gene doesn't apply it again
+            gene = parse_sched_str(str(candidate))[0]
+            self.decoded[self.get_decoding_key(schedule, gene)] = child
+            return gene, child
+        return None
+
+    def random_schedule(self) -> Schedule:
+        schedule = self.empty_schedule
+        for _ in range(self.rng.randint(1, self.max_depth)):
+            applied = self.random_gene(schedule)
+            if applied is None:
+                break
+            schedule = applied[1]
+        return schedule
+
+    def mutate_factors(self, gene: ParsedAction) -> ParsedAction | None:
+        """
+        Draws new factors for the action within the domain of its type, None when the action has no factors
+        """
+        if gene.name == "U":
+            return gene._replace(factors=(self.rng.choice(self.unrolling_factors),))
+        if gene.name == "S":
+            return gene._replace(factors=tuple(self.rng.choice(self.skewing_factors)))
+        if gene.name in ["T2", "T3", "TG"]:
+            factors = list(gene.factors)
+            factors[self.rng.randrange(len(factors))] = self.rng.choice(
+                self.tiling_sizes
+            )
+            return gene._replace(factors=tuple(factors))
+        return None
+
+    def mutate(self, schedule: Schedule) -> Schedule:
+        genome = list(parse_sched_str(str(schedule)))
+        mutations = ["insert"]
+        if genome:
+            mutations += ["delete", "replace", "factors"]
+        mutation = self.rng.choice(mutations)
+        if mutation == "insert" and len(genome) < self.max_depth:
+            position = self.rng.randint(0, len(genome))
+            applied = self.random_gene(self.decode(genome[:position]))
+            if applied is not None:
+                genome.insert(position, applied[0])
+        elif mutation == "delete":
+            del genome[self.rng.randrange(len(genome))]
+        elif mutation in ["replace", "factors"]:
+            position = self.rng.randrange(len(genome))
+            gene = None
+            if mutation == "factors":
+                gene = self.mutate_factors(genome[position])
+            if gene is None:
+                applied = self.random_gene(self.decode(genome[:position]))
+                gene = applied[0] if applied is not None else None
+            if gene is not None:
+                genome[position] = gene
+        return self.decode(genome)
+
+    def crossover(self, first: Schedule, second: Schedule) -> Schedule:
+        first_genome = parse_sched_str(str(first))
+        second_genome = parse_sched_str(str(second))
+        head = first_genome[: self.rng.randint(0, len(first_genome))]
+        tail = second_genome[self.rng.randint(0, len(second_genome)) :]
+        return self.decode([*head, *tail])
+
+    def select_parent(self, population: List[Schedule]) -> Schedule:
+        contestants = self.rng.sample(
+            population, min(self.tournament_size, len(population))
+        )
+        return max(contestants, key=self.get_fitness)
+
+    def get_fitness(self, schedule: Schedule) -> float:
+        return self.fitness_cache.get(schedule.canonical_str(), 0.0)
+
+    def evaluate(
+        self, population: List[Schedule], timeout: float | None = None
+    ) -> bool:
+        """
+        Evaluates the schedules of the population missing from the fitness cache in a single batch.
+        Returns whether all of them were evaluated before the timeout.
+        """
+        pending: Dict[str, Schedule] = {}
+        for schedule in population:
+            key = schedule.canonical_str()
+            if key not in self.fitness_cache and key not in pending:
+                pending[key] = schedule
+        if not pending:
+            return True
+
+        results = self.backend.evaluate(
+            self.tiramisu_program,
+            [str(schedule) for schedule in pending.values()],
+            measure=self.predictor is None,
+            timeout=timeout,
+        )
+        self.nb_evaluated += len(results)
+        results_by_str = {result.sched_str: result for result in results}
+        for key, schedule in pending.items():
+            result = results_by_str.get(str(schedule))
+            if result is None:
+                continue
+            schedule.legality = bool(result.legal)
+            fitness = 0.0
+            if result.legal and self.predictor is not None:
+                fitness = self.predictor(schedule)
+            elif result.legal and result.execution_time is not None:
+                fitness = get_speedup(self.tiramisu_program, result)
+            self.fitness_cache[key] = fitness
+            if fitness > self.best_speedup:
+                self.best_schedule, self.best_speedup = schedule, fitness
+        return len(results) == len(pending)
+
+    def next_generation(self, population: List[Schedule]) -> List[Schedule]:
+        ranked = sorted(population, key=self.get_fitness, reverse=True)
+        next_population: List[Schedule] = []
+        keys = set()
+        for schedule in ranked:
+            if len(next_population) >= self.nb_elites:
+                break
+            if schedule.canonical_str() not in keys:
+                keys.add(schedule.canonical_str())
+                next_population.append(schedule)
+
+        # duplicates are retried a bounded number of times to keep the population diverse
+        attempts = 0
+        while (
+            len(next_population) < self.population_size
+            and attempts < 4 * self.population_size
+        ):
+            attempts += 1
+            if self.rng.random() < self.crossover_rate:
+                child = self.crossover(
+                    self.select_parent(population), self.select_parent(population)
+                )
+            else:
+                child = self.select_parent(population)
+            if self.rng.random() < self.mutation_rate:
+                child = self.mutate(child)
+            if child.canonical_str() not in keys:
+                keys.add(child.canonical_str())
+                next_population.append(child)
+        return next_population
+
+    def run(
+        self,
+        nb_generations: int = 10,
+        time_budget: float | None = None,
+        max_evaluations: int | None = None,
+    ) -> EvolutionResult:
+        """
+        Evolves the population for `nb_generations` generations or until the budget is spent. A search resumed from a
+        checkpoint first finishes evaluating its saved population when the budget cut it, then evolves it until
+        `nb_generations` generations were evaluated in total.
+
+        Parameters
+        ----------
+        `nb_generations`: int
+            The number of generations after the initial population
+        `time_budget`: float | None
+            The time in seconds after which the search returns its best schedule
+        `max_evaluations`: int | None
+            The number of evaluations after which no new generation is evaluated
+
+        Returns
+        -------
+        `EvolutionResult`
+            The best schedule found and statistics of the search
+        """
+        deadline = time.monotonic() + time_budget if time_budget is not None else None
+        budget_exhausted = False
+        population = self.population
+        # a generation cut by the budget of a previous run finishes its evaluation before the next one is bred
+        evaluated = self.population_evaluated
+        first_generation = self.nb_generations if population else 0
+        keys = set()
+        for _ in range(4 * self.population_size if not population else 0):
+            if len(population) >= self.population_size:
+                break
+            schedule = self.random_schedule()
+            if schedule.canonical_str() not in keys:
+                keys.add(schedule.canonical_str())
+                population.append(schedule)
+
+        for generation in range(first_generation, nb_generations + 1):
+            if evaluated:
+                population = self.next_generation(population)
+                evaluated = False
+            self.population, self.population_evaluated = population, False
+            if (deadline is not None and time.monotonic() >= deadline) or (
+                max_evaluations is not None and self.nb_evaluated >= max_evaluations
+            ):
+                budget_exhausted = True
+                break
+            finished = self.evaluate(
+                population,
+                timeout=deadline - time.monotonic() if deadline is not None else None,
+            )
+            if not finished:
+                budget_exhausted = True
+                break
+            self.nb_generations += 1
+            evaluated = self.population_evaluated = True
+            logging.info(
+                f"Generation {generation}: best speedup {self.best_speedup:.3f} with {self.best_schedule}"
+            )
+            if self.checkpoint is not None:
+                self.checkpoint.save_if_due(
+                    METHOD, self.tiramisu_program, self.get_state
+                )
+
+        if self.checkpoint is not None:
+            self.checkpoint.save(METHOD, self.tiramisu_program, self.get_state())
+        return EvolutionResult(
+            best_schedule=self.best_schedule,
+            best_speedup=self.best_speedup,
+            nb_evaluated=self.nb_evaluated,
+            nb_generations=self.nb_generations,
+            budget_exhausted=budget_exhausted,
+        )
+
+
+def evolutionary_search(
+    tiramisu_program: TiramisuProgram,
+    nb_generations: int = 10,
+    time_budget: float | None = None,
+    max_evaluations: int | None = None,
+    **kwargs,
+) -> EvolutionResult:
+    """
+    Runs an evolutionary search on a program, the keyword arguments are passed to `EvolutionarySearch`
+    """
+    search = EvolutionarySearch(tiramisu_program, **kwargs)
+    try:
+        return search.run(nb_generations, time_budget, max_evaluations)
+    finally:
+        if "backend" not in kwargs:
+            search.backend.close()
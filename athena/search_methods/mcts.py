@@ -0,0 +1,449 @@
+from __future__ import annotations
+
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List
+
+from athena.evaluation.backend import (
+    EvaluationBackend,
+    EvaluationResult,
+    get_speedup,
+)
+from athena.search_methods.checkpoint import (
+    SearchCheckpoint,
+    decode_result,
+    encode_result,
+    get_checkpoint,
+)
+from athena.tiramisu.candidates import iter_candidates
+from athena.tiramisu.schedule import Schedule
+from athena.tiramisu.static_filter import filter_candidates
+from athena.tiramisu.tiramisu_actions.tiramisu_action import TiramisuAction
+from athena.tiramisu.tiramisu_program import TiramisuProgram
+
+METHOD = "mcts"
+
+
+@dataclass(eq=False)
+class MCTSNode:
+    """
+    A state of the search, shared by all the paths leading to equivalent schedules.
+
+    Attributes
+    ----------
+    `schedule`: Schedule
+        The schedule of the state
+    `key`: str
+        The canonical string of the schedule
+    `visits`: int
+        The number of rollouts that went through the node
+    `total_reward`: float
+        The sum of the rewards of these rollouts
+    `virtual_loss`: int
+        The number of rollouts going through the node that are still being evaluated
+    `reward`: float | None
+        The reward of the schedule of the node, None until it is evaluated
+    `legal`: bool | None
+        The legality of the schedule, None until it is evaluated
+    `fully_expanded`: bool
+        Whether all the candidates of the schedule were added to the children
+    `exhausted`: bool
+        Whether there is nothing left to evaluate under the node
+    """
+
+    schedule: Schedule
+    key: str
+    visits: int = 0
+    total_reward: float = 0.0
+    virtual_loss: int = 0
+    reward: float | None = None
+    legal: bool | None = None
+    result: EvaluationResult | None = None
+    children: List[MCTSNode] = field(default_factory=list)
+    candidates: Iterator[TiramisuAction] | None = None
+    fully_expanded: bool = False
+    exhausted: bool = False
+
+    def uct(self, parent_visits: int, exploration: float) -> float:
+        visits = self.visits + self.virtual_loss
+        if visits == 0:
+            return math.inf
+        # the rollouts in flight count as visits without reward so that parallel selections spread out
+        return self.total_reward / visits + exploration * math.sqrt(
+            math.log(max(parent_visits, 1)) / visits
+        )
+
+
+class TranspositionTable:
+    """
+    The nodes of a search indexed by the canonical strings of their schedules, so equivalent schedules reached by
+    different sequences of actions share their statistics and their evaluation.
+    A table can be reused by several searches of the same program.
+    """
+
+    def __init__(self):
+        self.nodes: Dict[str, MCTSNode] = {}
+
+    def get_or_create(self, schedule: Schedule) -> MCTSNode:
+        key = schedule.canonical_str()
+        if key not in self.nodes:
+            self.nodes[key] = MCTSNode(schedule, key)
+        return self.nodes[key]
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.nodes
+
+
+@dataclass
+class MCTSResult:
+    """
+    The outcome of a Monte Carlo tree search.
+
+    Attributes
+    ----------
+    `best_schedule`: Schedule
+        The evaluated schedule with the best speedup
+    `best_speedup`: float
+        The speedup of the best schedule
+    `nb_evaluated`: int
+        The number of schedules evaluated by the backend
+    `nb_rollouts`: int
+        The number of rollouts backpropagated
+    `budget_exhausted`: bool
+        Whether the search stopped because of its time or evaluation budget
+    """
+
+    best_schedule: Schedule
+    best_speedup: float
+    nb_evaluated: int
+    nb_rollouts: int
+    budget_exhausted: bool
+
+
+class MonteCarloTreeSearch:
+    """
+    Searches the schedules of a program with UCT. Each rollout selects a path from the empty schedule, expands its
+    last node with one untried candidate action and evaluates the new schedule, whose speedup is the reward of the
+    rollout. `nb_parallel` rollouts are evaluated together by the backend, virtual losses keep them on different paths.
+
+    Parameters
+    ----------
+    `tiramisu_program`: TiramisuProgram
+        The program to schedule
+    `backend`: EvaluationBackend | None
+        The backend checking and measuring the schedules, a single process backend by default
+    `table`: TranspositionTable | None
+        The nodes of the search, a new table by default
+    `exploration`: float
+        The exploration constant of UCT
+    `nb_parallel`: int
+        The number of rollouts evaluated together
+    `max_depth`: int
+        The maximum number of actions of the schedules
+    `max_children`: int | None
+        The maximum number of children of a node
+    `predictor`: Callable[[Schedule], float] | None
+        Predicts the speedup of a schedule, when given it is used as reward and the backend only checks the legality
+    `checkpoint`: SearchCheckpoint | str | None
+        The checkpoint, or its path, where the nodes are saved between the batches and when a run stops. The search
+        resumes from it when it exists.
+    `candidate_kwargs`:
+        Passed to `iter_candidates`, e.g. `action_types` or `candidate_filter`
+    """
+
+    def __init__(
+        self,
+        tiramisu_program: TiramisuProgram,
+        backend: EvaluationBackend | None = None,
+        table: TranspositionTable | None = None,
+        exploration: float = math.sqrt(2),
+        nb_parallel: int = 1,
+        max_depth: int = 6,
+        max_children: int | None = None,
+        predictor: Callable[[Schedule], float] | None = None,
+        checkpoint: SearchCheckpoint | str | None = None,
+        **candidate_kwargs,
+    ):
+        self.tiramisu_program = tiramisu_program
+        self.backend = backend if backend is not None else EvaluationBackend()
+        self.table = table if table is not None else TranspositionTable()
+        self.exploration = exploration
+        self.nb_parallel = nb_parallel
+        self.max_depth = max_depth
+        self.max_children = max_children
+        self.predictor = predictor
+        self.candidate_kwargs = candidate_kwargs
+
+        self.root = self.table.get_or_create(Schedule(tiramisu_program))
+        if self.root.reward is None:
+            self.root.reward = 1.0
+            self.root.legal = True
+        self.nb_evaluated = 0
+        self.nb_rollouts = 0
+
+        self.checkpoint = get_checkpoint(checkpoint)
+        if self.checkpoint is not None:
+            state = self.checkpoint.load(METHOD, tiramisu_program)
+            if state is not None:
+                self.load_state(state)
+
+    def get_state(self) -> Dict[str, Any]:
+        return {
+            "nodes": [
+                {
+                    "key": node.key,
+                    "schedule": str(node.schedule),
+                    "visits": node.visits,
+                    "total_reward": node.total_reward,
+                    "reward": node.reward,
+                    "legal": node.legal,
+                    "result": encode_result(node.result),
+                    "children": [child.key for child in node.children],
+                    "fully_expanded": node.fully_expanded,
+                    "exhausted": node.exhausted,
+                }
+                for node in self.table.nodes.values()
+            ],
+            "nb_evaluated": self.nb_evaluated,
+            "nb_rollouts": self.nb_rollouts,
+        }
+
+    def load_state(self, state: Dict[str, Any]):
+        """
+        Restores the nodes of a checkpoint, the untried candidates of the nodes that aren't fully expanded are
+        enumerated again when they are expanded
+        """
+        schedules = Schedule.from_sched_strs(
+            [node_state["schedule"] for node_state in state["nodes"]],
+            self.tiramisu_program,
+        )
+        for schedule, node_state in zip(schedules, state["nodes"]):
+            node = self.table.nodes.setdefault(
+                node_state["key"], MCTSNode(schedule, node_state["key"])
+            )
+            node.visits = node_state["visits"]
+            node.total_reward = node_state["total_reward"]
+            node.reward = node_state["reward"]
+            node.legal = node_state["legal"]
+            node.result = decode_result(node_state["result"])
+            node.fully_expanded = node_state["fully_expanded"]
+            node.exhausted = node_state["exhausted"]
+            node.schedule.legality = node.legal
+        for node_state in state["nodes"]:
+            self.table.nodes[node_state["key"]].children = [
+                self.table.nodes[key] for key in node_state["children"]
+            ]
+        self.nb_evaluated = state["nb_evaluated"]
+        self.nb_rollouts = state["nb_rollouts"]
+
+    def expand(self, node: MCTSNode, path: List[MCTSNode]) -> MCTSNode | None:
+        """
+        Adds the next untried candidate of `node` to its children and returns it, None when all were tried
+        """
+        if node.candidates is None:
+            assert node.schedule.tree
+            node.candidates = filter_candidates(
+                node.schedule,
+                iter_candidates(node.schedule.tree, **self.candidate_kwargs),
+            )
+        path_keys = {path_node.key for path_node in path}
+        while self.max_children is None or len(node.children) < self.max_children:
+            candidate = next(node.candidates, None)
+            if candidate is None:
+                break
+            schedule = node.schedule.branch()
+            try:
+                schedule.add_optimizations([candidate])
+            except Exception as e:
+                logging.debug(f"Skipping candidate of {node.schedule}: {e}")
+                continue
+            child = self.table.get_or_create(schedule)
+            # actions cancelling out lead back to a state of the path
+            if child.key in path_keys or child in node.children:
+                continue
+            node.children.append(child)
+            return child
+        node.fully_expanded = True
+        node.candidates = None
+        return None
+
+    def select(self) -> List[MCTSNode]:
+        """
+        Returns the path of the next rollout, from the root to the node to evaluate, and adds virtual losses along it
+        """
+        path = [self.root]
+        node = self.root
+        while True:
+            if not node.legal or len(node.schedule.optims_list) >= self.max_depth:
+                node.exhausted = True
+                break
+            child = None if node.fully_expanded else self.expand(node, path)
+            if child is None:
+                choices = [
+                    choice
+                    for choice in node.children
+                    if choice.legal is not False
+                    and not choice.exhausted
+                    and choice not in path
+                ]
+                if not choices:
+                    node.exhausted = True
+                    break
+                parent_visits = node.visits + node.virtual_loss
+                child = max(
+                    choices,
+                    key=lambda choice: choice.uct(parent_visits, self.exploration),
+                )
+            path.append(child)
+            node = child
+            if node.reward is None:
+                break
+        for path_node in path:
+            path_node.virtual_loss += 1
+        return path
+
+    def get_reward(self, node: MCTSNode, result: EvaluationResult) -> float:
+        node.result = result
+        node.legal = bool(result.legal)
+        node.schedule.legality = node.legal
+        if not result.legal:
+            return 0.0
+        if self.predictor is not None:
+            return self.predictor(node.schedule)
+        if result.execution_time is None:
+            node.legal = False
+            return 0.0
+        return get_speedup(self.tiramisu_program, result)
+
+    def backpropagate(self, path: List[MCTSNode], reward: float | None):
+        for node in path:
+            node.virtual_loss -= 1
+            if reward is not None:
+                node.visits += 1
+                node.total_reward += reward
+        if reward is not None:
+            self.nb_rollouts += 1
+
+    def get_best(self) -> MCTSNode:
+        return max(
+            (node for node in self.table.nodes.values() if node.legal),
+            key=lambda node: node.reward or 0.0,
+        )
+
+    def run(
+        self,
+        time_budget: float | None = None,
+        max_evaluations: int | None = None,
+    ) -> MCTSResult:
+        """
+        Runs rollouts until the budget is spent or the whole tree is explored
+
+        Parameters
+        ----------
+        `time_budget`: float | None
+            The time in seconds after which the search returns its best schedule
+        `max_evaluations`: int | None
+            The maximum number of schedules evaluated by the backend during this run
+
+        Returns
+        -------
+        `MCTSResult`
+            The best schedule found and statistics of the search
+        """
+        deadline = time.monotonic() + time_budget if time_budget is not None else None
+        nb_evaluated = 0
+        budget_exhausted = False
+        while True:
+            if (deadline is not None and time.monotonic() >= deadline) or (
+                max_evaluations is not None and nb_evaluated >= max_evaluations
+            ):
+                budget_exhausted = True
+                break
+
+            paths = []
+            pending: Dict[str, MCTSNode] = {}
+            tree_exhausted = False
+            for _ in range(self.nb_parallel):
+                path = self.select()
+                leaf = path[-1]
+                if leaf.reward is not None:
+                    if leaf is self.root:
+                        self.backpropagate(path, None)
+                        tree_exhausted = True
+                        break
+                    # the rollouts ending on evaluated nodes reuse their reward
+                    self.backpropagate(path, leaf.reward)
+                    continue
+                if (
+                    max_evaluations is not None
+                    and leaf.key not in pending
+                    and nb_evaluated + len(pending) >= max_evaluations
+                ):
+                    self.backpropagate(path, None)
+                    break
+                pending[leaf.key] = leaf
+                paths.append(path)
+
+            if pending:
+                results = self.backend.evaluate(
+                    self.tiramisu_program,
+                    [str(leaf.schedule) for leaf in pending.values()],
+                    measure=self.predictor is None,
+                    timeout=deadline - time.monotonic()
+                    if deadline is not None
+                    else None,
+                )
+                nb_evaluated += len(results)
+                self.nb_evaluated += len(results)
+                results_by_str = {result.sched_str: result for result in results}
+                for leaf in pending.values():
+                    result = results_by_str.get(str(leaf.schedule))
+                    if result is not None:
+                        leaf.reward = self.get_reward(leaf, result)
+                for path in paths:
+                    self.backpropagate(path, path[-1].reward)
+                if len(results) < len(pending):
+                    budget_exhausted = True
+                    break
+            if tree_exhausted:
+                break
+            if self.checkpoint is not None:
+                self.checkpoint.save_if_due(
+                    METHOD, self.tiramisu_program, self.get_state
+                )
+
+        if self.checkpoint is not None:
+            self.checkpoint.save(METHOD, self.tiramisu_program, self.get_state())
+        best = self.get_best()
+        logging.info(
+            f"MCTS: {self.nb_rollouts} rollouts, best speedup {best.reward} with {best.schedule}"
+        )
+        return MCTSResult(
+            best_schedule=best.schedule,
+            best_speedup=best.reward or 1.0,
+            nb_evaluated=self.nb_evaluated,
+            nb_rollouts=self.nb_rollouts,
+            budget_exhausted=budget_exhausted,
+        )
+
+
+def mcts_search(
+    tiramisu_program: TiramisuProgram,
+    time_budget: float | None = None,
+    max_evaluations: int | None = None,
+    **kwargs,
+) -> MCTSResult:
+    """
+    Runs a Monte Carlo tree search on a program, the keyword arguments are passed to `MonteCarloTreeSearch`
+    """
+    search = MonteCarloTreeSearch(tiramisu_program, **kwargs)
+    try:
+        return search.run(time_budget=time_budget, max_evaluations=max_evaluations)
+    finally:
+        if "backend" not in kwargs:
+            search.backend.close()
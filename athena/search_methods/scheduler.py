@@ -0,0 +1,333 @@
+from __future__ import annotations
+
+import functools
+import itertools
+import logging
+import math
+import threading
+import time
+from concurrent.futures import (
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List
+
+from athena.evaluation.backend import (
+    EvaluationBackend,
+    EvaluationResult,
+    evaluate_schedule,
+    init_worker,
+    terminate_executor,
+)
+from athena.search_methods.driver import BudgetedBackend, SearchBudget, SearchReport
+from athena.tiramisu.tiramisu_program import TiramisuProgram
+
+
+@dataclass(eq=False)
+class ProgramState:
+    """
+    The progress of the search of a program, from which the priority of its evaluations is computed.
+
+    Attributes
+    ----------
+    `tiramisu_program`: TiramisuProgram
+        The program
+    `report`: SearchReport
+        The best schedule found so far and the work spent on the program
+    `best_time`: float | None
+        The best execution time measured, None until a legal schedule is measured
+    `recent_improvement`: float
+        The moving average of the relative improvements of the best execution time by the batches of the search
+    `nb_evaluations`: int
+        The number of evaluations dispatched for the program
+    """
+
+    tiramisu_program: TiramisuProgram
+    report: SearchReport
+    best_time: float | None = None
+    recent_improvement: float = 0.0
+    nb_evaluations: int = 0
+
+
+@dataclass(eq=False)
+class PendingEvaluation:
+    state: ProgramState
+    sched_str: str
+    measure: bool
+    sequence: int
+    future: Future = field(default_factory=Future)
+
+
+def expected_gain(state: ProgramState) -> float:
+    """
+    The default priority of the evaluations of a program: the execution time it could still save, estimated by its
+    best measured execution time, raised by its recent improvements and lowered as evaluations are spent on it.
+    The programs without measurements come first.
+    """
+    if state.best_time is None:
+        return math.inf
+    return (
+        state.best_time
+        * (1 + state.recent_improvement)
+        / math.sqrt(1 + state.nb_evaluations)
+    )
+
+
+class SchedulerBackend(EvaluationBackend):
+    """
+    The backend of the search of a program run by a `SearchScheduler`, its evaluations are queued to the shared pool
+    """
+
+    def __init__(self, scheduler: SearchScheduler, state: ProgramState):
+        super().__init__(nb_exec_times=scheduler.nb_exec_times)
+        self.scheduler = scheduler
+        self.state = state
+
+    def evaluate(
+        self,
+        tiramisu_program: TiramisuProgram,
+        sched_strs: List[str],
+        measure: bool = True,
+        timeout: float | None = None,
+    ) -> List[EvaluationResult]:
+        futures = self.scheduler.enqueue(self.state, sched_strs, measure)
+        wait(futures, timeout=timeout)
+        results = []
+        for future in futures:
+            if future.done() and not future.cancelled():
+                results.append(future.result())
+            else:
+                # the evaluations already running finish but their results are dropped
+                future.cancel()
+
+        times = [
+            result.execution_time
+            for result in results
+            if result.legal and result.execution_time is not None
+        ]
+        if times:
+            best_time = min(times)
+            improvement = 0.0
+            if self.state.best_time is not None:
+                improvement = max(self.state.best_time / best_time - 1, 0.0)
+            self.state.recent_improvement = (
+                self.state.recent_improvement + improvement
+            ) / 2
+            if self.state.best_time is None or best_time < self.state.best_time:
+                self.state.best_time = best_time
+        return results
+
+    def close(self):
+        pass
+
+
+class SearchScheduler:
+    """
+    Runs the searches of many programs concurrently and interleaves their evaluations on a shared pool of worker
+    processes, so the workers stay busy while the searches process their results. Each search runs in a thread of
+    its own, and whenever a worker is free it evaluates the pending schedule of the program with the highest priority,
+    the expected gain of the program by default.
+
+    Parameters
+    ----------
+    `search_method`: Callable[..., Any]
+        Called as `search_method(tiramisu_program, backend=backend)`, e.g. `functools.partial(beam_search, beam_size=8)`,
+        and returning a result with a `budget_exhausted` attribute
+    `nb_workers`: int
+        The number of worker processes of the pool
+    `config_path`: str
+        The config file loaded by the workers
+    `nb_exec_times`: int
+        The number of executions of each measured schedule
+    `max_concurrent_searches`: int | None
+        The number of searches running at the same time, twice the number of workers by default so that a search
+        prepares its next batch while the others keep the workers busy
+    `priority_function`: Callable[[ProgramState], float]
+        Returns the priority of the evaluations of a program, the pending evaluations with the highest priority run first
+    `program_budget`: SearchBudget | None
+        The budget of the search of each program
+    `on_improvement`: Callable[[SearchReport], None] | None
+        Called with the report of a program each time a better schedule of the program is measured
+    """
+
+    def __init__(
+        self,
+        search_method: Callable[..., Any],
+        nb_workers: int = 1,
+        config_path: str = "config.yaml",
+        nb_exec_times: int = 1,
+        max_concurrent_searches: int | None = None,
+        priority_function: Callable[[ProgramState], float] = expected_gain,
+        program_budget: SearchBudget | None = None,
+        on_improvement: Callable[[SearchReport], None] | None = None,
+    ):
+        self.search_method = search_method
+        self.nb_workers = nb_workers
+        self.config_path = config_path
+        self.nb_exec_times = nb_exec_times
+        self.max_concurrent_searches = max_concurrent_searches
+        self.priority_function = priority_function
+        self.program_budget = program_budget or SearchBudget()
+        self.on_improvement = on_improvement
+
+        self.executor: ProcessPoolExecutor | None = None
+        self.pending: List[PendingEvaluation] = []
+        self.nb_running = 0
+        self.sequence = itertools.count()
+        self.condition = threading.Condition()
+        self.dispatcher: threading.Thread | None = None
+        self.stopped = False
+
+    def submit(self, evaluation: PendingEvaluation) -> Future:
+        """
+        Starts an evaluation on the pool, returns the future of its `EvaluationResult`
+        """
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                self.nb_workers,
+                initializer=init_worker,
+                initargs=(self.config_path,),
+            )
+        return self.executor.submit(
+            evaluate_schedule,
+            evaluation.state.tiramisu_program,
+            evaluation.sched_str,
+            evaluation.measure,
+            self.nb_exec_times,
+        )
+
+    def enqueue(
+        self, state: ProgramState, sched_strs: Iterable[str], measure: bool
+    ) -> List[Future]:
+        with self.condition:
+            evaluations = [
+                PendingEvaluation(state, sched_str, measure, next(self.sequence))
+                for sched_str in sched_strs
+            ]
+            self.pending += evaluations
+            self.condition.notify_all()
+        return [evaluation.future for evaluation in evaluations]
+
+    def dispatch(self):
+        """
+        Starts the pending evaluations with the highest priorities whenever workers are free, until stopped
+        """
+        with self.condition:
+            while True:
+                while not self.stopped and (
+                    not self.pending or self.nb_running >= self.nb_workers
+                ):
+                    self.condition.wait()
+                if self.stopped:
+                    return
+                evaluation = max(
+                    self.pending,
+                    key=lambda evaluation: (
+                        self.priority_function(evaluation.state),
+                        -evaluation.sequence,
+                    ),
+                )
+                self.pending.remove(evaluation)
+                if not evaluation.future.set_running_or_notify_cancel():
+                    continue
+                self.nb_running += 1
+                evaluation.state.nb_evaluations += 1
+                try:
+                    future = self.submit(evaluation)
+                except Exception as e:
+                    future = Future()
+                    future.set_exception(e)
+                future.add_done_callback(
+                    functools.partial(self.on_evaluation_done, evaluation)
+                )
+
+    def on_evaluation_done(self, evaluation: PendingEvaluation, future: Future):
+        with self.condition:
+            self.nb_running -= 1
+            self.condition.notify_all()
+        try:
+            result = future.result()
+        except Exception as e:
+            result = EvaluationResult(
+                evaluation.sched_str, error=f"{type(e).__name__}: {e}"
+            )
+        evaluation.future.set_result(result)
+
+    def start(self):
+        self.stopped = False
+        self.dispatcher = threading.Thread(target=self.dispatch, daemon=True)
+        self.dispatcher.start()
+
+    def stop(self):
+        with self.condition:
+            self.stopped = True
+            for evaluation in self.pending:
+                evaluation.future.cancel()
+            self.pending = []
+            self.condition.notify_all()
+        if self.dispatcher is not None:
+            self.dispatcher.join()
+            self.dispatcher = None
+        if self.executor is not None:
+            terminate_executor(self.executor)
+            self.executor = None
+
+    def search(self, state: ProgramState) -> Any:
+        backend = BudgetedBackend(
+            SchedulerBackend(self, state),
+            self.program_budget,
+            state.report,
+            self.on_improvement,
+        )
+        start = time.monotonic()
+        try:
+            return self.search_method(state.tiramisu_program, backend=backend)
+        finally:
+            state.report.wall_time += time.monotonic() - start
+
+    def run(self, programs: Iterable[TiramisuProgram]) -> Dict[str, SearchReport]:
+        """
+        Searches the programs concurrently
+
+        Returns
+        -------
+        `Dict[str, SearchReport]`
+            The reports of the programs by name
+        """
+        states = []
+        for tiramisu_program in programs:
+            assert tiramisu_program.name
+            states.append(
+                ProgramState(tiramisu_program, SearchReport(tiramisu_program.name))
+            )
+        if not states:
+            return {}
+
+        self.start()
+        try:
+            max_concurrent_searches = self.max_concurrent_searches or 2 * max(
+                self.nb_workers, 1
+            )
+            with ThreadPoolExecutor(
+                min(max_concurrent_searches, len(states))
+            ) as search_threads:
+                futures = {
+                    search_threads.submit(self.search, state): state for state in states
+                }
+                for future in as_completed(futures):
+                    report = futures[future].report
+                    try:
+                        report.finished = not future.result().budget_exhausted
+                    except Exception as e:
+                        logging.error(f"The search of {report.program} failed: {e}")
+                        continue
+                    logging.info(
+                        f"{report.program}: {report.nb_evaluations} evaluations, best speedup {report.best_speedup:.3f}"
+                    )
+        finally:
+            self.stop()
+        return {state.report.program: state.report for state in states}
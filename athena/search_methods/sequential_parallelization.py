@@ -1,3 +1,5 @@
+from __future__ import annotations
+
 from athena.tiramisu.schedule import Schedule
 from athena.tiramisu.tiramisu_actions.parallelization import Parallelization
 from athena.tiramisu.tiramisu_program import TiramisuProgram
@@ -5,13 +7,20 @@ from athena.tiramisu.tiramisu_program import TiramisuProgram
 
 def parallelize_first_legal_outermost(
     tiramisu_program: TiramisuProgram,
+    max_checks: int | None = None,
 ) -> Schedule:
+    """
+    Parallelizes the outermost legal loops of each root, checking at most `max_checks` schedules when it is given
+    """
     schedule = Schedule(tiramisu_program)
     candidates_per_root = Parallelization.get_candidates(tiramisu_program.tree)
+    nb_checks = 0
 
     for root in tiramisu_program.tree.roots:
         tmp_schedule = schedule.copy()
         for candidate in candidates_per_root[root]:
+            if max_checks is not None and nb_checks >= max_checks:
+                break
             for node in candidate:
                 comps = tiramisu_program.tree.get_iterator_subtree_computations(node)
                 tmp_schedule.add_optimizations(
@@ -21,6 +30,7 @@ def parallelize_first_legal_outermost(
                         )
                     ]
                 )
+            nb_checks += 1
             if tmp_schedule.is_legal():
                 schedule = tmp_schedule
                 break
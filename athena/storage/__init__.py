@@ -0,0 +1,10 @@
+from .baseline_store import BaselineStore, MachineFingerprint, get_program_hash
+from .result_store import ResultStore, ScheduleResult
+
+__all__ = [
+    "BaselineStore",
+    "MachineFingerprint",
+    "ResultStore",
+    "ScheduleResult",
+    "get_program_hash",
+]
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import platform
+import sqlite3
+import time
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, ContextManager, Dict, List
+
+from athena.storage.sqlite_utils import open_database
+from athena.utils.config import BaseConfig
+
+if TYPE_CHECKING:
+    from athena.tiramisu.tiramisu_program import TiramisuProgram
+
+
+def get_program_hash(tiramisu_program: TiramisuProgram) -> str:
+    """
+    Returns the hash of the code of the program, programs with the same code share their baselines
+    """
+    if not tiramisu_program.original_str:
+        raise ValueError("The program is not loaded yet")
+    return hashlib.sha256(tiramisu_program.original_str.encode()).hexdigest()
+
+
+def get_cpu_model() -> str:
+    try:
+        with open("/proc/cpuinfo") as cpuinfo:
+            for line in cpuinfo:
+                if line.startswith("model name"):
+                    return line.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+def get_tiramisu_build() -> str:
+    """
+    Identifies the Tiramisu build by the size and modification time of its library
+    """
+    assert BaseConfig.base_config
+    tiramisu_root = os.path.expandvars(
+        BaseConfig.base_config.env_vars.get("TIRAMISU_ROOT", "")
+    )
+    for library in ["build/libtiramisu.so", "build/libtiramisu.dylib"]:
+        library_path = os.path.join(tiramisu_root, library)
+        if os.path.exists(library_path):
+            stat = os.stat(library_path)
+            return f"{library_path}:{stat.st_size}:{int(stat.st_mtime)}"
+    return tiramisu_root
+
+
+@dataclass(frozen=True)
+class MachineFingerprint:
+    """
+    Identifies the machine and Tiramisu build an execution time was measured with.
+
+    Attributes
+    ----------
+    `cpu_model`: str
+        The model name of the cpu
+    `cpu_count`: int
+        The number of cpus of the machine
+    `tiramisu_build`: str
+        The Tiramisu library the programs are compiled with
+    `is_new_tiramisu`: bool
+        Whether the programs are compiled with the new Tiramisu
+    """
+
+    cpu_model: str
+    cpu_count: int
+    tiramisu_build: str
+    is_new_tiramisu: bool
+
+    @classmethod
+    def current(cls) -> MachineFingerprint:
+        if not BaseConfig.base_config:
+            raise ValueError("BaseConfig not initialized")
+        return cls(
+            cpu_model=get_cpu_model(),
+            cpu_count=os.cpu_count() or 0,
+            tiramisu_build=get_tiramisu_build(),
+            is_new_tiramisu=BaseConfig.base_config.tiramisu.is_new_tiramisu,
+        )
+
+    @property
+    def key(self) -> str:
+        return hashlib.sha256(
+            json.dumps(asdict(self), sort_keys=True).encode()
+        ).hexdigest()[:16]
+
+
+class BaselineStore:
+    """
+    Persistent store of the execution times of the unscheduled programs, indexed by the hash of the
+    program code and the fingerprint of the machine they were measured on.
+
+    Parameters
+    ----------
+    `path`: str
+        The path of the SQLite database of the store
+    """
+
+    instance: BaselineStore | None = None
+
+    def __init__(self, path: str):
+        self.path = path
+        with self.connect() as connection:
+            connection.execute(
+                """CREATE TABLE IF NOT EXISTS baselines (
+                    program_hash TEXT NOT NULL,
+                    machine TEXT NOT NULL,
+                    program_name TEXT,
+                    fingerprint TEXT,
+                    execution_times TEXT NOT NULL,
+                    measured_at REAL,
+                    PRIMARY KEY (program_hash, machine)
+                )"""
+            )
+
+    @classmethod
+    def get_instance(cls) -> BaselineStore:
+        """
+        Returns the store at the `baseline_store` path of the config
+        """
+        if not BaseConfig.base_config:
+            raise ValueError("BaseConfig not initialized")
+        path = BaseConfig.base_config.baseline_store
+        if cls.instance is None or cls.instance.path != path:
+            cls.instance = cls(path)
+        return cls.instance
+
+    def connect(self) -> ContextManager[sqlite3.Connection]:
+        return open_database(self.path)
+
+    def get(
+        self, program_hash: str, fingerprint: MachineFingerprint
+    ) -> List[float] | None:
+        with self.connect() as connection:
+            row = connection.execute(
+                "SELECT execution_times FROM baselines WHERE program_hash = ? AND machine = ?",
+                (program_hash, fingerprint.key),
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(
+        self,
+        program_hash: str,
+        fingerprint: MachineFingerprint,
+        execution_times: List[float],
+        program_name: str | None = None,
+    ):
+        with self.connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO baselines VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    program_hash,
+                    fingerprint.key,
+                    program_name,
+                    json.dumps(asdict(fingerprint)),
+                    json.dumps(execution_times),
+                    time.time(),
+                ),
+            )
+
+    def get_all(self, fingerprint: MachineFingerprint) -> Dict[str, List[float]]:
+        """
+        Returns the baselines measured on the machine, indexed by program hash
+        """
+        with self.connect() as connection:
+            rows = connection.execute(
+                "SELECT program_hash, execution_times FROM baselines WHERE machine = ?",
+                (fingerprint.key,),
+            ).fetchall()
+        return {program_hash: json.loads(times) for program_hash, times in rows}
@@ -0,0 +1,271 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Any, ContextManager, Dict, Iterable, List
+
+from athena.storage.sqlite_utils import open_database
+from athena.utils.config import BaseConfig
+
+# SQLite limits the number of parameters of a query
+MAX_QUERY_PARAMETERS = 900
+
+
+@dataclass
+class ScheduleResult:
+    """
+    What is known about a schedule of a program.
+
+    Attributes
+    ----------
+    `program_hash`: str
+        The hash of the code of the program
+    `schedule`: str
+        The string representation of the schedule
+    `legality`: bool | None
+        The legality of the schedule, None when it wasn't checked
+    `legality_error`: str | None
+        The error raised while checking the legality
+    `machine`: str | None
+        The fingerprint key of the machine the schedule was executed on
+    `execution_times`: List[float] | None
+        The execution times in milliseconds, None when the schedule wasn't executed on the machine
+    `build_time`: float | None
+        The time in seconds spent outside the measured runs (compilation and process startup)
+    `execution_error`: str | None
+        The error raised while executing the schedule
+    `measurement_info`: Dict[str, Any] | None
+        The settings the execution times were measured with
+    """
+
+    program_hash: str
+    schedule: str
+    legality: bool | None = None
+    legality_error: str | None = None
+    machine: str | None = None
+    execution_times: List[float] | None = None
+    build_time: float | None = None
+    execution_error: str | None = None
+    measurement_info: Dict[str, Any] | None = None
+
+
+class ResultStore:
+    """
+    Persistent store of the legality and execution results of schedules, indexed by program hash
+    and schedule string so that results are reused across search runs, machines and restarts.
+    Legality doesn't depend on the machine while execution results are stored per machine.
+
+    Parameters
+    ----------
+    `path`: str
+        The path of the SQLite database of the store
+    """
+
+    instance: ResultStore | None = None
+
+    def __init__(self, path: str):
+        self.path = path
+        with self.connect() as connection:
+            # WAL lets readers look results up while a worker is writing
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                """CREATE TABLE IF NOT EXISTS legality (
+                    program_hash TEXT NOT NULL,
+                    schedule TEXT NOT NULL,
+                    legality INTEGER,
+                    error TEXT,
+                    updated_at REAL,
+                    PRIMARY KEY (program_hash, schedule)
+                )"""
+            )
+            connection.execute(
+                """CREATE TABLE IF NOT EXISTS executions (
+                    program_hash TEXT NOT NULL,
+                    schedule TEXT NOT NULL,
+                    machine TEXT NOT NULL,
+                    execution_times TEXT,
+                    build_time REAL,
+                    error TEXT,
+                    measurement_info TEXT,
+                    updated_at REAL,
+                    PRIMARY KEY (program_hash, schedule, machine)
+                )"""
+            )
+
+    @classmethod
+    def get_instance(cls) -> ResultStore | None:
+        """
+        Returns the store at the `result_store` path of the config, None when no store is configured
+        """
+        if not BaseConfig.base_config:
+            raise ValueError("BaseConfig not initialized")
+        path = BaseConfig.base_config.result_store
+        if not path:
+            return None
+        if cls.instance is None or cls.instance.path != path:
+            cls.instance = cls(path)
+        return cls.instance
+
+    def connect(self) -> ContextManager[sqlite3.Connection]:
+        return open_database(self.path)
+
+    def record_legality(
+        self,
+        program_hash: str,
+        schedule: str,
+        legality: bool | None,
+        error: str | None = None,
+    ):
+        with self.connect() as connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO legality VALUES (?, ?, ?, ?, ?)",
+                (
+                    program_hash,
+                    schedule,
+                    None if legality is None else int(legality),
+                    error,
+                    time.time(),
+                ),
+            )
+
+    def record_execution(
+        self,
+        program_hash: str,
+        schedule: str,
+        machine: str,
+        execution_times: List[float] | None,
+        build_time: float | None = None,
+        error: str | None = None,
+        measurement_info: Dict[str, Any] | None = None,
+        append: bool = False,
+    ):
+        """
+        Records the execution of a schedule on a machine
+
+        Parameters
+        ----------
+        `execution_times`: List[float] | None
+            The execution times, None to only record the error of a failed execution without dropping the execution
+            times already recorded
+        `append`: bool
+            Add the execution times to the ones already recorded instead of replacing them
+        """
+        with self.connect() as connection:
+            if execution_times is None:
+                connection.execute(
+                    "INSERT INTO executions (program_hash, schedule, machine, error, updated_at) VALUES (?, ?, ?, ?, ?)"
+                    " ON CONFLICT (program_hash, schedule, machine) DO UPDATE SET error = excluded.error,"
+                    " updated_at = excluded.updated_at",
+                    (program_hash, schedule, machine, error, time.time()),
+                )
+                return
+            if append:
+                # read and write in a single write transaction so that concurrent appends aren't lost
+                connection.execute("BEGIN IMMEDIATE")
+                row = connection.execute(
+                    "SELECT execution_times FROM executions WHERE program_hash = ? AND schedule = ? AND machine = ?",
+                    (program_hash, schedule, machine),
+                ).fetchone()
+                if row and row[0]:
+                    execution_times = json.loads(row[0]) + execution_times
+            connection.execute(
+                "INSERT OR REPLACE INTO executions VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    program_hash,
+                    schedule,
+                    machine,
+                    None if execution_times is None else json.dumps(execution_times),
+                    build_time,
+                    error,
+                    None if measurement_info is None else json.dumps(measurement_info),
+                    time.time(),
+                ),
+            )
+
+    def get(
+        self, program_hash: str, schedule: str, machine: str | None = None
+    ) -> ScheduleResult | None:
+        return self.get_many(program_hash, [schedule], machine).get(schedule)
+
+    def get_many(
+        self,
+        program_hash: str,
+        schedules: Iterable[str] | None = None,
+        machine: str | None = None,
+    ) -> Dict[str, ScheduleResult]:
+        """
+        Looks up the results of many schedules of a program at once
+
+        Parameters
+        ----------
+        `program_hash`: str
+            The hash of the code of the program
+        `schedules`: Iterable[str] | None
+            The schedules to look up, all the schedules of the program when None
+        `machine`: str | None
+            The machine of the execution results, only the legality is looked up when None
+
+        Returns
+        -------
+        `Dict[str, ScheduleResult]`
+            The results indexed by schedule, schedules without any result are missing
+        """
+        results: Dict[str, ScheduleResult] = {}
+        schedule_chunks: List[List[str] | None] = [None]
+        if schedules is not None:
+            schedules = list(dict.fromkeys(schedules))
+            schedule_chunks = [
+                schedules[i : i + MAX_QUERY_PARAMETERS]
+                for i in range(0, len(schedules), MAX_QUERY_PARAMETERS)
+            ]
+
+        with self.connect() as connection:
+            for chunk in schedule_chunks:
+                condition, parameters = "", []
+                if chunk is not None:
+                    condition = f" AND schedule IN ({','.join('?' * len(chunk))})"
+                    parameters = chunk
+
+                for schedule, legality, error in connection.execute(
+                    "SELECT schedule, legality, error FROM legality WHERE program_hash = ?"
+                    + condition,
+                    [program_hash, *parameters],
+                ):
+                    results[schedule] = ScheduleResult(
+                        program_hash=program_hash,
+                        schedule=schedule,
+                        legality=None if legality is None else bool(legality),
+                        legality_error=error,
+                    )
+
+                if machine is None:
+                    continue
+
+                for (
+                    schedule,
+                    execution_times,
+                    build_time,
+                    error,
+                    measurement_info,
+                ) in connection.execute(
+                    "SELECT schedule, execution_times, build_time, error, measurement_info FROM executions"
+                    " WHERE program_hash = ? AND machine = ?" + condition,
+                    [program_hash, machine, *parameters],
+                ):
+                    result = results.setdefault(
+                        schedule, ScheduleResult(program_hash, schedule)
+                    )
+                    result.machine = machine
+                    result.execution_times = (
+                        None if execution_times is None else json.loads(execution_times)
+                    )
+                    result.build_time = build_time
+                    result.execution_error = error
+                    result.measurement_info = (
+                        None
+                        if measurement_info is None
+                        else json.loads(measurement_info)
+                    )
+        return results
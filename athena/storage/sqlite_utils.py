@@ -0,0 +1,20 @@
+import contextlib
+import os
+import sqlite3
+from typing import Iterator
+
+
+@contextlib.contextmanager
+def open_database(path: str, timeout: float = 60) -> Iterator[sqlite3.Connection]:
+    """
+    Opens a connection to the SQLite database at `path`, commits on success and always closes it.
+    A connection per operation keeps the stores usable from several threads and processes.
+    """
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    connection = sqlite3.connect(path, timeout=timeout)
+    try:
+        with connection:
+            yield connection
+    finally:
+        connection.close()
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+import uuid
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# tiramisu primitive type -> (numpy type, C type)
+tiramisu_types: Dict[str, Tuple[str, str]] = {
+    "p_boolean": ("bool", "bool"),
+    "p_int8": ("int8", "int8_t"),
+    "p_uint8": ("uint8", "uint8_t"),
+    "p_int16": ("int16", "int16_t"),
+    "p_uint16": ("uint16", "uint16_t"),
+    "p_int32": ("int32", "int32_t"),
+    "p_uint32": ("uint32", "uint32_t"),
+    "p_int64": ("int64", "int64_t"),
+    "p_uint64": ("uint64", "uint64_t"),
+    "p_float32": ("float32", "float"),
+    "p_float64": ("float64", "double"),
+}
+
+buffer_declaration_regex = re.compile(
+    r"buffer\s+(\w+)\s*\(\s*\"\w+\"\s*,\s*\{([^}]*)\}\s*,\s*(?:tiramisu::)?(\w+)\s*(?:,\s*(?:tiramisu::)?(\w+))?"
+)
+
+
+@dataclass
+class BufferDeclaration:
+    """
+    A buffer declared in the code of a tiramisu program.
+
+    Attributes
+    ----------
+    `name`: str
+        The name of the buffer variable
+    `shape`: Tuple[int, ...]
+        The sizes of the buffer in tiramisu order (the last dimension is the innermost)
+    `tiramisu_type`: str
+        The tiramisu primitive type of the elements, e.g. `p_int32`
+    `argument_type`: str | None
+        `a_input`, `a_output` or `a_temporary`
+    """
+
+    name: str
+    shape: Tuple[int, ...]
+    tiramisu_type: str
+    argument_type: str | None = None
+
+    @property
+    def dtype(self) -> np.dtype:
+        return np.dtype(tiramisu_types[self.tiramisu_type][0])
+
+    @property
+    def c_type(self) -> str:
+        return tiramisu_types[self.tiramisu_type][1]
+
+    @property
+    def nbytes(self) -> int:
+        return int(np.prod(self.shape)) * self.dtype.itemsize
+
+
+def parse_buffer_declarations(code: str) -> Dict[str, BufferDeclaration]:
+    """
+    Parses all the buffer declarations of a tiramisu program in a single pass
+
+    Parameters
+    ----------
+    `code`: str
+        The code of the tiramisu program
+
+    Returns
+    -------
+    `Dict[str, BufferDeclaration]`
+        The buffer declarations indexed by the name of the buffer variable
+    """
+    declarations = {}
+    for match in buffer_declaration_regex.finditer(code):
+        name, sizes, tiramisu_type, argument_type = match.groups()
+        if tiramisu_type not in tiramisu_types:
+            raise ValueError(f"Unsupported type {tiramisu_type} of buffer {name}")
+        declarations[name] = BufferDeclaration(
+            name=name,
+            shape=tuple(int(size) for size in re.findall(r"\d+", sizes)),
+            tiramisu_type=tiramisu_type,
+            argument_type=argument_type,
+        )
+    return declarations
+
+
+def get_default_buffers_folder() -> str:
+    # /dev/shm is backed by memory, which makes the buffers shareable without touching the disk
+    if os.path.isdir("/dev/shm"):
+        return "/dev/shm/athena_buffers"
+    return os.path.join(tempfile.gettempdir(), "athena_buffers")
+
+
+class BufferManager:
+    """
+    Allocates the IO buffers of tiramisu programs once and reuses them across measurements.
+
+    The buffers are memory mapped .npy files so that several measurement processes on the same
+    machine share the same buffers. The data of a mapped .npy file is 64 bytes aligned.
+    The files live as long as the buffers folder, `cleanup` deletes them once no process measures programs anymore.
+
+    Parameters
+    ----------
+    `folder`: str | None
+        The folder of the buffer files, defaults to a folder in /dev/shm when available
+    `fill`: bool
+        Whether to fill new buffers with random data, otherwise they are zeroed
+    `seed`: int
+        The seed of the data the buffers are filled with, the same seed gives the same data
+    """
+
+    def __init__(self, folder: str | None = None, fill: bool = True, seed: int = 0):
+        self.folder = folder if folder else get_default_buffers_folder()
+        self.fill = fill
+        self.seed = seed
+        self.buffers: Dict[str, List[np.ndarray]] = {}
+
+    def get_buffer_path(self, program_name: str, declaration: BufferDeclaration) -> str:
+        key = f"{declaration.shape}|{declaration.tiramisu_type}|{self.fill}|{self.seed}"
+        key_hash = hashlib.sha256(key.encode()).hexdigest()[:16]
+        return os.path.join(
+            self.folder, f"{program_name}_{declaration.name}_{key_hash}.buf"
+        )
+
+    def get_buffers(
+        self, program_name: str, declarations: List[BufferDeclaration]
+    ) -> List[np.ndarray]:
+        """
+        Returns the buffers of the program, allocating them on the first call
+
+        Parameters
+        ----------
+        `program_name`: str
+            The name of the program
+        `declarations`: List[BufferDeclaration]
+            The declarations of the buffers, in the order of the program arguments
+        """
+        if program_name not in self.buffers:
+            self.buffers[program_name] = [
+                self.map_buffer(program_name, declaration)
+                for declaration in declarations
+            ]
+        return self.buffers[program_name]
+
+    def map_buffer(
+        self, program_name: str, declaration: BufferDeclaration
+    ) -> np.ndarray:
+        path = self.get_buffer_path(program_name, declaration)
+        while True:
+            if not os.path.exists(path):
+                self.create_buffer(path, declaration)
+            try:
+                return np.lib.format.open_memmap(path, mode="r+")
+            except FileNotFoundError:
+                # the folder was cleaned up in between, the buffer is created again
+                continue
+
+    def create_buffer(self, path: str, declaration: BufferDeclaration):
+        os.makedirs(self.folder, exist_ok=True)
+        # write under a unique name then rename so that other processes never map a partially filled buffer
+        tmp_path = f"{path}.{uuid.uuid4().hex}"
+        array = np.lib.format.open_memmap(
+            tmp_path, mode="w+", dtype=declaration.dtype, shape=declaration.shape
+        )
+        if self.fill:
+            self.fill_buffer(array, declaration)
+        array.flush()
+        del array
+        os.replace(tmp_path, path)
+
+    def fill_buffer(self, array: np.ndarray, declaration: BufferDeclaration):
+        name_hash = int(hashlib.sha256(declaration.name.encode()).hexdigest()[:8], 16)
+        rng = np.random.default_rng([self.seed, name_hash])
+        if array.dtype.kind == "b":
+            array[...] = rng.integers(0, 2, size=array.shape).astype(bool)
+        elif array.dtype.kind in "iu":
+            array[...] = rng.integers(1, 10, size=array.shape, dtype=array.dtype)
+        else:
+            array[...] = rng.uniform(1, 10, size=array.shape)
+
+    def release(self, program_name: str, delete_files: bool = False):
+        """
+        Unmaps the buffers of the program and optionally deletes their files
+        """
+        arrays = self.buffers.pop(program_name, [])
+        paths = [array.filename for array in arrays]
+        del arrays
+        if delete_files:
+            for path in paths:
+                if path and os.path.exists(path):
+                    os.remove(path)
+
+    def release_all(self, delete_files: bool = False):
+        for program_name in list(self.buffers):
+            self.release(program_name, delete_files)
+
+    def cleanup(self):
+        """
+        Unmaps all the buffers and deletes the buffers folder, the buffers are created again when they are requested
+        """
+        self.release_all()
+        shutil.rmtree(self.folder, ignore_errors=True)
@@ -0,0 +1,473 @@
+from __future__ import annotations
+
+import bisect
+import itertools
+import math
+import random
+from dataclasses import dataclass
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+)
+
+from athena.tiramisu.tiramisu_actions import (
+    Distribution,
+    Fusion,
+    Interchange,
+    Parallelization,
+    Reversal,
+    Skewing,
+    Tiling2D,
+    Tiling3D,
+    TilingGeneral,
+    TiramisuAction,
+    TiramisuActionType,
+    Unrolling,
+)
+from athena.tiramisu.tiramisu_iterator_node import IteratorIdentifier
+from athena.tiramisu.tiramisu_tree import TiramisuTree
+
+DEFAULT_UNROLLING_FACTORS = [4, 8, 16]
+DEFAULT_TILING_SIZES = [32, 64, 128]
+# the factors of the skewing solver need a compilation, these are used instead when enumerating
+DEFAULT_SKEWING_FACTORS = [(1, 1)]
+
+# expansion candidates depend on the compiled program so they are not enumerated statically
+ENUMERATED_ACTION_TYPES = [
+    TiramisuActionType.INTERCHANGE,
+    TiramisuActionType.REVERSAL,
+    TiramisuActionType.SKEWING,
+    TiramisuActionType.PARALLELIZATION,
+    TiramisuActionType.TILING_2D,
+    TiramisuActionType.TILING_3D,
+    TiramisuActionType.TILING_GENERAL,
+    TiramisuActionType.UNROLLING,
+    TiramisuActionType.FUSION,
+    TiramisuActionType.DISTRIBUTION,
+]
+
+
+class CandidateSpec(NamedTuple):
+    """
+    A candidate action that isn't constructed yet.
+
+    Attributes
+    ----------
+    `action_class`: Type[TiramisuAction]
+        The class of the action
+    `iterators`: Tuple[str, ...]
+        The names of the iterators the action applies to
+    `params`: list
+        The parameters of the action constructor
+    """
+
+    action_class: Type[TiramisuAction]
+    iterators: Tuple[str, ...]
+    params: list
+
+    def build(self) -> TiramisuAction:
+        return self.action_class(list(self.params))
+
+
+@dataclass
+class CandidateFilter:
+    """
+    Static filters applied to the iterators of a candidate before the action is constructed.
+
+    Attributes
+    ----------
+    `max_depth`: int | None
+        The maximum level of the iterators of a candidate
+    `integer_bounds`: bool
+        Only keep candidates whose iterators have integer bounds
+    `perfect_nesting`: bool
+        Only keep candidates on several nested iterators when each one contains only the next one
+    `predicate`: Callable[[TiramisuTree, Tuple[str, ...]], bool] | None
+        An additional condition on the iterators of a candidate
+    """
+
+    max_depth: int | None = None
+    integer_bounds: bool = False
+    perfect_nesting: bool = False
+    predicate: Callable[[TiramisuTree, Tuple[str, ...]], bool] | None = None
+
+    def accepts(
+        self, tree: TiramisuTree, iterators: Tuple[str, ...], nested: bool = True
+    ) -> bool:
+        nodes = [tree.iterators[iterator] for iterator in iterators]
+        if self.max_depth is not None and any(
+            node.level > self.max_depth for node in nodes
+        ):
+            return False
+        if self.integer_bounds and not all(node.has_integer_bounds() for node in nodes):
+            return False
+        if self.perfect_nesting and nested and not is_perfectly_nested(tree, iterators):
+            return False
+        if self.predicate is not None and not self.predicate(tree, iterators):
+            return False
+        return True
+
+
+def is_perfectly_nested(tree: TiramisuTree, iterators: Sequence[str]) -> bool:
+    """
+    Checks that each iterator contains only the next one of the list
+    """
+    for outer, inner in itertools.pairwise(iterators):
+        node = tree.iterators[outer]
+        if node.child_iterators != [inner] or node.computations_list:
+            return False
+    return True
+
+
+def _iter_sections(sections: Dict[str, List[List[str]]]) -> Iterator[List[str]]:
+    for root_sections in sections.values():
+        for section in root_sections:
+            if len(section) > 1:
+                yield section
+
+
+def _iter_successive(section: List[str], length: int) -> Iterator[Tuple[str, ...]]:
+    for i in range(len(section) - length + 1):
+        yield tuple(section[i : i + length])
+
+
+def _iter_tiling_general_iterators(tree: TiramisuTree) -> Iterator[Tuple[str, ...]]:
+    # same candidates as `TilingGeneral.get_candidates`
+    for section in _iter_sections(TilingGeneral.get_imperfect_candidate_sections(tree)):
+        if len(tree.iterators[section[0]].child_iterators) > 1:
+            yield tuple(section)
+            continue
+        for candidate in itertools.chain(
+            _iter_successive(section, 2), _iter_successive(section, 3)
+        ):
+            if any(
+                tree.iterators[iterator].computations_list
+                for iterator in candidate[:-1]
+            ):
+                yield candidate
+
+
+@dataclass
+class _CandidatePool:
+    """
+    The iterators of a group of candidates, counted and indexed without enumerating them.
+
+    Attributes
+    ----------
+    `kind`: str
+        `combinations` for the pairs of `iterators`, `windows` for their successive runs of `length` iterators and
+        `tuples` when `iterators` holds the iterators of each candidate
+    `iterators`: Sequence
+        The iterator names, or the iterator tuples of the candidates for `tuples`
+    `length`: int
+        The number of iterators of each candidate
+    """
+
+    kind: str
+    iterators: Sequence
+    length: int
+
+    @property
+    def size(self) -> int:
+        if self.kind == "combinations":
+            return len(self.iterators) * (len(self.iterators) - 1) // 2
+        if self.kind == "windows":
+            return max(len(self.iterators) - self.length + 1, 0)
+        return len(self.iterators)
+
+    def iter_iterators(self) -> Iterator[Tuple[str, ...]]:
+        if self.kind == "combinations":
+            yield from itertools.combinations(self.iterators, 2)
+        elif self.kind == "windows":
+            yield from _iter_successive(list(self.iterators), self.length)
+        else:
+            yield from self.iterators
+
+    def get_iterators(self, index: int) -> Tuple[str, ...]:
+        if self.kind == "combinations":
+            # the pairs are indexed in colexicographic order: (0, 1), (0, 2), (1, 2), (0, 3), ...
+            second = (1 + math.isqrt(1 + 8 * index)) // 2
+            first = index - second * (second - 1) // 2
+            return (self.iterators[first], self.iterators[second])
+        if self.kind == "windows":
+            return tuple(self.iterators[index : index + self.length])
+        return self.iterators[index]
+
+
+def _get_fusion_pools(tree: TiramisuTree) -> List[_CandidatePool]:
+    # same candidates as `Fusion.get_candidates`, the pairs are counted instead of listed
+    pools = [_CandidatePool("combinations", tree.roots, 2)]
+
+    iterators_by_level: Dict[Tuple[int, str], List[str]] = {}
+    for iterator in tree.iterators.values():
+        iterators_by_level.setdefault(
+            (iterator.level, tree.get_root_of_node(iterator.name)), []
+        ).append(iterator.name)
+    for level_iterators in iterators_by_level.values():
+        pools.append(_CandidatePool("combinations", level_iterators, 2))
+    return pools
+
+
+def _get_candidate_pools(
+    tree: TiramisuTree, action_type: TiramisuActionType
+) -> List[_CandidatePool]:
+    if action_type in [
+        TiramisuActionType.INTERCHANGE,
+        TiramisuActionType.SKEWING,
+        TiramisuActionType.TILING_2D,
+        TiramisuActionType.TILING_3D,
+    ]:
+        pools = []
+        for section in _iter_sections(tree.get_candidate_sections()):
+            if action_type == TiramisuActionType.INTERCHANGE:
+                pools.append(_CandidatePool("combinations", section, 2))
+            elif action_type == TiramisuActionType.TILING_3D:
+                pools.append(_CandidatePool("windows", section, 3))
+            else:
+                pools.append(_CandidatePool("windows", section, 2))
+        return pools
+    elif action_type == TiramisuActionType.TILING_GENERAL:
+        # the candidates have different numbers of iterators, so different numbers of tile sizes
+        return [
+            _CandidatePool("tuples", [iterators], len(iterators))
+            for iterators in _iter_tiling_general_iterators(tree)
+        ]
+    elif action_type == TiramisuActionType.FUSION:
+        return _get_fusion_pools(tree)
+
+    candidates = []
+    for name, node in tree.iterators.items():
+        if action_type == TiramisuActionType.UNROLLING:
+            if not node.child_iterators and node.computations_list:
+                candidates.append((name,))
+        elif action_type == TiramisuActionType.DISTRIBUTION:
+            if len(node.computations_list) + len(node.child_iterators) > 1:
+                candidates.append((name,))
+        elif action_type in [
+            TiramisuActionType.PARALLELIZATION,
+            TiramisuActionType.REVERSAL,
+        ]:
+            candidates.append((name,))
+        else:
+            raise ValueError(f"Candidates of {action_type} can't be enumerated")
+    return [_CandidatePool("tuples", candidates, 1)]
+
+
+def _get_parameter_choices(
+    action_type: TiramisuActionType,
+    nb_iterators: int,
+    unrolling_factors: Sequence[int],
+    tiling_sizes: Sequence[int],
+    skewing_factors: Sequence[Tuple[int, int]],
+) -> List[list]:
+    # the parameters following the iterator identifiers of each candidate
+    if action_type == TiramisuActionType.UNROLLING:
+        return [[factor] for factor in unrolling_factors]
+    if action_type == TiramisuActionType.SKEWING:
+        return [list(factors) for factors in skewing_factors]
+    if action_type in [
+        TiramisuActionType.TILING_2D,
+        TiramisuActionType.TILING_3D,
+        TiramisuActionType.TILING_GENERAL,
+    ]:
+        return [
+            list(sizes)
+            for sizes in itertools.product(tiling_sizes, repeat=nb_iterators)
+        ]
+    return [[]]
+
+
+ACTION_CLASSES: Dict[TiramisuActionType, Type[TiramisuAction]] = {
+    TiramisuActionType.INTERCHANGE: Interchange,
+    TiramisuActionType.REVERSAL: Reversal,
+    TiramisuActionType.SKEWING: Skewing,
+    TiramisuActionType.PARALLELIZATION: Parallelization,
+    TiramisuActionType.TILING_2D: Tiling2D,
+    TiramisuActionType.TILING_3D: Tiling3D,
+    TiramisuActionType.TILING_GENERAL: TilingGeneral,
+    TiramisuActionType.UNROLLING: Unrolling,
+    TiramisuActionType.FUSION: Fusion,
+    TiramisuActionType.DISTRIBUTION: Distribution,
+}
+
+
+class _IteratorIds:
+    def __init__(self, tree: TiramisuTree):
+        self.tree = tree
+        self.ids: Dict[str, IteratorIdentifier] = {}
+
+    def get(self, iterators: Tuple[str, ...]) -> List[IteratorIdentifier]:
+        for iterator in iterators:
+            if iterator not in self.ids:
+                self.ids[iterator] = self.tree.get_iterator_id_from_name(iterator)
+        return [self.ids[iterator] for iterator in iterators]
+
+
+def iter_candidate_specs(
+    tree: TiramisuTree,
+    action_types: Iterable[TiramisuActionType] | None = None,
+    candidate_filter: CandidateFilter | None = None,
+    unrolling_factors: Sequence[int] = DEFAULT_UNROLLING_FACTORS,
+    tiling_sizes: Sequence[int] = DEFAULT_TILING_SIZES,
+    skewing_factors: Sequence[Tuple[int, int]] = DEFAULT_SKEWING_FACTORS,
+) -> Iterator[CandidateSpec]:
+    """
+    Lazily enumerates the candidate actions of a program tree with their parameters.
+    The candidates are generated while they are consumed and the filter is applied to their iterators
+    before their parameters are expanded.
+
+    Parameters
+    ----------
+    `tree`: TiramisuTree
+        The tree of the program
+    `action_types`: Iterable[TiramisuActionType] | None
+        The types of the actions to enumerate, all the types of `ENUMERATED_ACTION_TYPES` when None
+    `candidate_filter`: CandidateFilter | None
+        The static filter of the candidates
+    `unrolling_factors`: Sequence[int]
+        The factors of the unrolling candidates
+    `tiling_sizes`: Sequence[int]
+        The tile sizes of each tiled iterator
+    `skewing_factors`: Sequence[Tuple[int, int]]
+        The factors of the skewing candidates
+
+    Returns
+    -------
+    `Iterator[CandidateSpec]`
+        The candidates, to be constructed with `CandidateSpec.build`
+    """
+    if action_types is None:
+        action_types = ENUMERATED_ACTION_TYPES
+
+    iterator_ids = _IteratorIds(tree)
+    for action_type in action_types:
+        for pool in _get_candidate_pools(tree, action_type):
+            choices = _get_parameter_choices(
+                action_type,
+                pool.length,
+                unrolling_factors,
+                tiling_sizes,
+                skewing_factors,
+            )
+            for iterators in pool.iter_iterators():
+                if candidate_filter is not None and not candidate_filter.accepts(
+                    tree, iterators, nested=action_type != TiramisuActionType.FUSION
+                ):
+                    continue
+                ids = iterator_ids.get(iterators)
+                for params in choices:
+                    yield CandidateSpec(
+                        ACTION_CLASSES[action_type], iterators, [*ids, *params]
+                    )
+
+
+def iter_candidates(tree: TiramisuTree, **kwargs) -> Iterator[TiramisuAction]:
+    """
+    Lazily enumerates the candidate actions of a program tree, the keyword arguments are passed to `iter_candidate_specs`
+    """
+    for spec in iter_candidate_specs(tree, **kwargs):
+        yield spec.build()
+
+
+def sample_candidates(
+    tree: TiramisuTree,
+    k: int,
+    rng: random.Random | None = None,
+    action_types: Iterable[TiramisuActionType] | None = None,
+    candidate_filter: CandidateFilter | None = None,
+    unrolling_factors: Sequence[int] = DEFAULT_UNROLLING_FACTORS,
+    tiling_sizes: Sequence[int] = DEFAULT_TILING_SIZES,
+    skewing_factors: Sequence[Tuple[int, int]] = DEFAULT_SKEWING_FACTORS,
+) -> List[TiramisuAction]:
+    """
+    Samples `k` distinct candidate actions uniformly without enumerating the candidates.
+    The candidates of each action type are counted from their loop sections, random candidates are drawn by index and
+    the ones rejected by the filter are drawn again. When the filter rejects most of the candidates, the sample is
+    taken from the enumeration of the accepted ones instead.
+
+    Parameters
+    ----------
+    `tree`: TiramisuTree
+        The tree of the program
+    `k`: int
+        The number of candidates to sample, fewer are returned when there aren't enough candidates
+    `rng`: random.Random | None
+        The random generator of the sampling
+    The other parameters are the ones of `iter_candidate_specs`
+    """
+    rng = rng or random.Random()
+    if action_types is None:
+        action_types = ENUMERATED_ACTION_TYPES
+    action_types = list(action_types)
+
+    pools: List[Tuple[TiramisuActionType, _CandidatePool, List[list]]] = []
+    cumulative_sizes: List[int] = []
+    total = 0
+    for action_type in action_types:
+        for pool in _get_candidate_pools(tree, action_type):
+            choices = _get_parameter_choices(
+                action_type,
+                pool.length,
+                unrolling_factors,
+                tiling_sizes,
+                skewing_factors,
+            )
+            if pool.size and choices:
+                pools.append((action_type, pool, choices))
+                total += pool.size * len(choices)
+                cumulative_sizes.append(total)
+
+    def sample_accepted_specs() -> List[CandidateSpec]:
+        specs = list(
+            iter_candidate_specs(
+                tree,
+                action_types=action_types,
+                candidate_filter=candidate_filter,
+                unrolling_factors=unrolling_factors,
+                tiling_sizes=tiling_sizes,
+                skewing_factors=skewing_factors,
+            )
+        )
+        return rng.sample(specs, min(k, len(specs)))
+
+    # few candidates are cheaper to enumerate than to draw
+    max_draws = 4 * k + 16
+    if total <= max_draws:
+        return [spec.build() for spec in sample_accepted_specs()]
+
+    iterator_ids = _IteratorIds(tree)
+    drawn: Set[int] = set()
+    sample: List[CandidateSpec] = []
+    while len(sample) < k:
+        if len(drawn) == max_draws:
+            # the filter rejects most of the candidates, the sample is taken among the accepted ones
+            sample = sample_accepted_specs()
+            break
+        index = rng.randrange(total)
+        if index in drawn:
+            continue
+        drawn.add(index)
+        pool_index = bisect.bisect_right(cumulative_sizes, index)
+        action_type, pool, choices = pools[pool_index]
+        index -= cumulative_sizes[pool_index - 1] if pool_index else 0
+        iterators = pool.get_iterators(index // len(choices))
+        if candidate_filter is not None and not candidate_filter.accepts(
+            tree, iterators, nested=action_type != TiramisuActionType.FUSION
+        ):
+            continue
+        sample.append(
+            CandidateSpec(
+                ACTION_CLASSES[action_type],
+                iterators,
+                [*iterator_ids.get(iterators), *choices[index % len(choices)]],
+            )
+        )
+    return [spec.build() for spec in sample]
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, Iterable, List
+
+from athena.tiramisu.tiramisu_actions.tiramisu_action import (
+    TiramisuAction,
+    TiramisuActionType,
+)
+
+if TYPE_CHECKING:
+    from athena.tiramisu.schedule import Schedule
+
+# actions that only tag a loop, consecutive tags commute unless an unrolling splits the loop of the other tag
+TAG_ACTION_TYPES = [TiramisuActionType.PARALLELIZATION, TiramisuActionType.UNROLLING]
+
+# actions that cancel out when they are applied twice in a row
+INVOLUTION_ACTION_TYPES = [TiramisuActionType.INTERCHANGE, TiramisuActionType.REVERSAL]
+
+
+def canonical_action_str(action: TiramisuAction) -> str:
+    """
+    Returns the string representation of the action with its symmetric parameters in a fixed order
+    """
+    if action.type == TiramisuActionType.INTERCHANGE:
+        levels = sorted(param[1] for param in action.params)
+        return f"I(L{levels[0]},L{levels[1]},comps={action.comps})"
+    return str(action)
+
+
+def tags_commute(first: TiramisuAction, second: TiramisuAction) -> bool:
+    """
+    Whether two consecutive tags produce the same program in both orders. An unrolling splits its loop and shifts the
+    levels of the deeper loops, so it only commutes with the parallelization of a loop strictly above it.
+    """
+    if TiramisuActionType.UNROLLING not in [first.type, second.type]:
+        return True
+    if first.type == second.type:
+        return False
+    parallelization, unrolling = (
+        (first, second)
+        if first.type == TiramisuActionType.PARALLELIZATION
+        else (second, first)
+    )
+    return parallelization.params[0][1] < unrolling.params[0][1]
+
+
+def canonicalize_actions(actions: Iterable[TiramisuAction]) -> List[TiramisuAction]:
+    """
+    Rewrites a sequence of actions into a canonical sequence that produces the same program:
+    interchanges and reversals applied twice in a row cancel out, consecutive parallelizations and
+    unrollings are sorted as far as they commute and repeated parallelizations are dropped.
+
+    Parameters
+    ----------
+    `actions`: Iterable[TiramisuAction]
+        The actions in the order they are applied, initialized for the tree of the program
+
+    Returns
+    -------
+    `List[TiramisuAction]`
+        The actions of the canonical sequence
+    """
+    strings: Dict[int, str] = {}
+    stack: List[TiramisuAction] = []
+    for action in actions:
+        strings[id(action)] = canonical_action_str(action)
+        if (
+            stack
+            and action.type in INVOLUTION_ACTION_TYPES
+            and strings[id(stack[-1])] == strings[id(action)]
+        ):
+            stack.pop()
+        else:
+            stack.append(action)
+
+    canonical_actions: List[TiramisuAction] = []
+    tags: List[TiramisuAction] = []
+
+    def flush_tags():
+        # the smallest tag that commutes with all the tags before it comes next
+        seen = set()
+        while tags:
+            tag = min(
+                (
+                    tag
+                    for index, tag in enumerate(tags)
+                    if all(tags_commute(other, tag) for other in tags[:index])
+                ),
+                key=lambda tag: strings[id(tag)],
+            )
+            tags.remove(tag)
+            if tag.type == TiramisuActionType.UNROLLING:
+                # the loops of the next parallelizations are not the same anymore
+                seen.clear()
+            elif strings[id(tag)] in seen:
+                continue
+            else:
+                seen.add(strings[id(tag)])
+            canonical_actions.append(tag)
+
+    for action in stack:
+        if action.type in TAG_ACTION_TYPES:
+            tags.append(action)
+        else:
+            flush_tags()
+            canonical_actions.append(action)
+    flush_tags()
+    return canonical_actions
+
+
+def get_canonical_str(schedule: Schedule) -> str:
+    """
+    Returns the string representation of the canonical form of the schedule, equivalent schedules have the same one
+    """
+    return "|".join(
+        canonical_action_str(action)
+        for action in canonicalize_actions(schedule.optims_list)
+    )
+
+
+def deduplicate_schedules(schedules: Iterable[Schedule]) -> List[Schedule]:
+    """
+    Keeps the first schedule of each group of equivalent schedules of the same program
+    """
+    seen = set()
+    unique_schedules = []
+    for schedule in schedules:
+        key = (id(schedule.tiramisu_program), get_canonical_str(schedule))
+        if key not in seen:
+            seen.add(key)
+            unique_schedules.append(schedule)
+    return unique_schedules
@@ -1,11 +1,16 @@
 from __future__ import annotations
 
+import glob
+import hashlib
 import logging
 import os
 import re
 import subprocess
+import uuid
 from typing import TYPE_CHECKING, List
 
+from athena.tiramisu.measurement_host import MeasurementHost, MeasurementHostCrashed
+from athena.tiramisu.measurement_settings import MeasurementSettings, isolation_lock
 from athena.tiramisu.tiramisu_tree import TiramisuTree
 
 if TYPE_CHECKING:
@@ -249,14 +254,18 @@ class CompilingService:
                 "rm {}*".format(output_path),
             ]
         try:
-            compiler = subprocess.run(
-                ["\n".join(env_vars + shell_script)],
-                input=cpp_code,
-                capture_output=True,
-                text=True,
-                shell=True,
-                check=True,
-            )
+            with isolation_lock(
+                exclusive=False,
+                enabled=BaseConfig.base_config.tiramisu.isolate_measurements,
+            ):
+                compiler = subprocess.run(
+                    ["\n".join(env_vars + shell_script)],
+                    input=cpp_code,
+                    capture_output=True,
+                    text=True,
+                    shell=True,
+                    check=True,
+                )
 
             if compiler.stdout:
                 return compiler.stdout
@@ -433,6 +442,248 @@ class CompilingService:
         with open(output_path + extension, "w") as f:
             f.write(cpp_code)
 
+    @classmethod
+    def get_generator_compile_script(
+        cls, source_path: str, object_path: str, binary_path: str
+    ) -> List[str]:
+        """
+        Returns the shell commands that compile a tiramisu generator into an executable
+
+        Parameters
+        ----------
+        `source_path`: `str`
+            The path of the generator cpp file
+        `object_path`: `str`
+            The path of the intermediate object file
+        `binary_path`: `str`
+            The path of the generator executable
+
+        Returns
+        -------
+        `List[str]`
+            The commands to compile and link the generator
+        """
+        assert BaseConfig.base_config
+
+        if BaseConfig.base_config.tiramisu.is_new_tiramisu:
+            return [
+                # Compile intermidiate tiramisu file
+                f"$CXX -I$TIRAMISU_ROOT/3rdParty/Halide/install/include -I$TIRAMISU_ROOT/include -I$TIRAMISU_ROOT/3rdParty/isl/include  -Wl,--no-as-needed -ldl -g -fno-rtti   -lpthread -std=c++17 -O0 -o {object_path} -c {source_path}",
+                # Link generated file with executer
+                f"$CXX -Wl,--no-as-needed -ldl -g -fno-rtti -lpthread -std=c++17 -O0 {object_path} -o {binary_path}   -L$TIRAMISU_ROOT/build  -L$TIRAMISU_ROOT/3rdParty/Halide/install/lib64  -L$TIRAMISU_ROOT/3rdParty/isl/build/lib  -Wl,-rpath,$TIRAMISU_ROOT/build:$TIRAMISU_ROOT/3rdParty/Halide/install/lib64:$TIRAMISU_ROOT/3rdParty/isl/build/lib -ltiramisu -ltiramisu_auto_scheduler -lHalide -lisl",
+            ]
+        else:
+            return [
+                # Compile intermidiate tiramisu file
+                f"$CXX -I$TIRAMISU_ROOT/3rdParty/Halide/include -I$TIRAMISU_ROOT/include -I$TIRAMISU_ROOT/3rdParty/isl/include  -Wl,--no-as-needed -ldl -g -fno-rtti   -lpthread -std=c++11 -O0 -o {object_path} -c {source_path}",
+                # Link generated file with executer
+                f"$CXX -Wl,--no-as-needed -ldl -g -fno-rtti -lpthread -std=c++11 -O0 {object_path} -o {binary_path}   -L$TIRAMISU_ROOT/build  -L$TIRAMISU_ROOT/3rdParty/Halide/lib  -L$TIRAMISU_ROOT/3rdParty/isl/build/lib  -Wl,-rpath,$TIRAMISU_ROOT/build:$TIRAMISU_ROOT/3rdParty/Halide/lib:$TIRAMISU_ROOT/3rdParty/isl/build/lib -ltiramisu -ltiramisu_auto_scheduler -lHalide -lisl",
+            ]
+
+    @classmethod
+    def get_wrapper_compile_script(cls, tiramisu_program: TiramisuProgram) -> List[str]:
+        """
+        Returns the shell commands that compile the wrapper of the program against its generated shared object
+        """
+        assert BaseConfig.base_config
+
+        if BaseConfig.base_config.tiramisu.is_new_tiramisu:
+            return [
+                # compile the wrapper
+                f"$CXX -std=c++17 -fno-rtti -I$TIRAMISU_ROOT/include -I$TIRAMISU_ROOT/3rdParty/Halide/install/include -I$TIRAMISU_ROOT/3rdParty/isl/include/ -I$TIRAMISU_ROOT/benchmarks -L$TIRAMISU_ROOT/build -L$TIRAMISU_ROOT/3rdParty/Halide/install/lib64/ -L$TIRAMISU_ROOT/3rdParty/isl/build/lib -o {tiramisu_program.name}_wrapper -ltiramisu -lHalide -ldl -lpthread -lm -Wl,-rpath,$TIRAMISU_ROOT/build {tiramisu_program.name}_wrapper.cpp ./{tiramisu_program.name}.o.so -ltiramisu -lHalide -ldl -lpthread -lm -lisl",
+            ]
+        else:
+            return [
+                # compile the wrapper
+                f"$CXX -std=c++11 -fno-rtti -I$TIRAMISU_ROOT/include -I$TIRAMISU_ROOT/3rdParty/Halide/include -I$TIRAMISU_ROOT/3rdParty/isl/include/ -I$TIRAMISU_ROOT/benchmarks -L$TIRAMISU_ROOT/build -L$TIRAMISU_ROOT/3rdParty/Halide/lib/ -L$TIRAMISU_ROOT/3rdParty/isl/build/lib -o {tiramisu_program.name}_wrapper -ltiramisu -lHalide -ldl -lpthread -lm -Wl,-rpath,$TIRAMISU_ROOT/build {tiramisu_program.name}_wrapper.cpp ./{tiramisu_program.name}.o.so -ltiramisu -lHalide -ldl -lpthread -lm -lisl",
+            ]
+
+    @classmethod
+    def serialize_schedule(cls, optims_list: List[TiramisuAction]) -> str:
+        """
+        Serializes a schedule into the command file read at runtime by the schedule loader generator
+
+        The first line holds the schedule string as a comment, the following lines are the
+        tiramisu calls of every optimization lowered to one command per line.
+
+        Parameters
+        ----------
+        `optims_list`: `List[TiramisuAction]`
+            The list of optimizations to serialize
+
+        Returns
+        -------
+        `str`
+            The content of the schedule file
+
+        Raises
+        ------
+        `UnsupportedRuntimeSchedule`
+            If an optimization emits tiramisu code that the schedule loader cannot replay
+        """
+        lines = ["# " + "|".join([str(optim) for optim in optims_list])]
+
+        for optim in optims_list:
+            code = optim.tiramisu_optim_str
+            position = 0
+            for match in runtime_schedule_statement_regex.finditer(code):
+                if code[position : match.start()].strip():
+                    raise UnsupportedRuntimeSchedule(
+                        f"Cannot load {optim} at runtime: {code[position : match.start()].strip()}"
+                    )
+                position = match.end()
+                lines.append(cls._get_runtime_schedule_command(match, optim))
+            if code[position:].strip():
+                raise UnsupportedRuntimeSchedule(
+                    f"Cannot load {optim} at runtime: {code[position:].strip()}"
+                )
+
+        return "\n".join(lines) + "\n"
+
+    @classmethod
+    def _get_runtime_schedule_command(
+        cls, match: re.Match, optim: TiramisuAction
+    ) -> str:
+        if match.group("fusion_shift"):
+            fused_comps = [
+                comp.strip(" &") for comp in match.group("fused_comps").split(",")
+            ]
+            levels = [
+                level.strip() for level in match.group("fusion_levels").split(",")
+            ]
+            return " ".join(
+                ["fusion_shift", match.group("fusion_target"), str(len(fused_comps))]
+                + fused_comps
+                + levels
+            )
+        elif match.group("call"):
+            return runtime_schedule_calls[match.group("function")]
+        elif match.group("then_chain"):
+            chained = re.findall(
+                r"\.then\((\w+),\s*(-?\d+)\)", match.group("then_rest")
+            )
+            return " ".join(
+                ["then", match.group("then_first")]
+                + [f"{comp} {level}" for comp, level in chained]
+            )
+
+        method = match.group("method_name")
+        args = [arg.strip() for arg in match.group("method_args").split(",")]
+        if method == "expand":
+            args = []
+        elif not all(re.fullmatch(r"-?\d+", arg) for arg in args):
+            raise UnsupportedRuntimeSchedule(
+                f"Cannot load {optim} at runtime: non integer arguments {args}"
+            )
+        if len(args) not in runtime_schedule_methods_arity[method]:
+            raise UnsupportedRuntimeSchedule(
+                f"Cannot load {optim} at runtime: {method} with {len(args)} arguments"
+            )
+        return " ".join([method, match.group("method_comp")] + args)
+
+    @classmethod
+    def get_schedule_loader_code(cls, tiramisu_program: TiramisuProgram) -> str:
+        """
+        Returns the code of a generator that reads the schedule to apply from the file
+        given by the ATHENA_SCHEDULE_PATH environment variable before calling codegen
+
+        Parameters
+        ----------
+        `tiramisu_program`: `TiramisuProgram`
+            The program to generate the schedule loader for
+
+        Returns
+        -------
+        `str`
+            The generator code
+        """
+        if not tiramisu_program.original_str or not tiramisu_program.comps:
+            raise ValueError("The program is not loaded yet")
+
+        loader_code = schedule_loader_template.replace(
+            "$comps_map$",
+            ", ".join([f'{{"{comp}", &{comp}}}' for comp in tiramisu_program.comps]),
+        )
+        loader_code += "\n    " + tiramisu_program.code_gen_line + "\n"
+
+        # The wrapper include stays commented since the generator is compiled outside of the workspace
+        cpp_code = tiramisu_program.original_str.replace(
+            tiramisu_program.code_gen_line, loader_code
+        )
+        return "#include <fstream>\n#include <sstream>\n#include <map>\n" + cpp_code
+
+    @classmethod
+    def compile_schedule_loader_generator(
+        cls, tiramisu_program: TiramisuProgram
+    ) -> str:
+        """
+        Compiles the schedule loader generator of the program once and returns the path of its executable.
+        The executable is kept in the generators folder of the workspace and reused by all the schedules of the program.
+
+        Parameters
+        ----------
+        `tiramisu_program`: `TiramisuProgram`
+            The program to compile the generator for
+
+        Returns
+        -------
+        `str`
+            The path to the generator executable
+        """
+        if not BaseConfig.base_config:
+            raise ValueError("BaseConfig not initialized")
+
+        cpp_code = cls.get_schedule_loader_code(tiramisu_program)
+        code_hash = hashlib.sha256(cpp_code.encode()).hexdigest()[:16]
+
+        generators_folder = os.path.abspath(
+            os.path.join(BaseConfig.base_config.workspace, "generators")
+        )
+        os.makedirs(generators_folder, exist_ok=True)
+        generator_path = os.path.join(
+            generators_folder, f"{tiramisu_program.name}_{code_hash}"
+        )
+
+        if os.path.exists(generator_path + ".out"):
+            return generator_path + ".out"
+
+        # compile under a unique name and rename it so that concurrent builds of the same generator don't clash
+        build_path = f"{generator_path}_{uuid.uuid4().hex}"
+        cls.write_to_disk(cpp_code, build_path)
+
+        env_vars = [
+            f"export {key}={value}"
+            for key, value in BaseConfig.base_config.env_vars.items()
+        ]
+        shell_script = cls.get_generator_compile_script(
+            source_path=build_path + ".cpp",
+            object_path=build_path + ".o",
+            binary_path=build_path + ".out",
+        )
+        try:
+            with isolation_lock(
+                exclusive=False,
+                enabled=BaseConfig.base_config.tiramisu.isolate_measurements,
+            ):
+                subprocess.run(
+                    [" ; ".join(env_vars + shell_script)],
+                    capture_output=True,
+                    text=True,
+                    shell=True,
+                    check=True,
+                )
+            os.replace(build_path + ".out", generator_path + ".out")
+        except subprocess.CalledProcessError as e:
+            logging.error(f"Process terminated with error code: {e.returncode}")
+            logging.error(f"Error output: {e.stderr}")
+            raise e
+        finally:
+            for extension in [".cpp", ".o", ".out"]:
+                if os.path.exists(build_path + extension):
+                    os.remove(build_path + extension)
+
+        return generator_path + ".out"
+
     @classmethod
     def get_cpu_exec_times(
         cls,
@@ -441,6 +692,9 @@ class CompilingService:
         max_runs: int = 0,
         max_mins_per_schedule: float | None = None,
         delete_fiels: bool = True,
+        reuse_generator: bool | None = None,
+        execution_backend: str | None = None,
+        measurement_settings: MeasurementSettings | None = None,
     ) -> List[float]:
         """
         Returns the execution times of the program on the CPU after applying the optimizations in the optims_list
@@ -453,6 +707,14 @@ class CompilingService:
             The list of optimizations to apply on the program
         `max_runs`: `int`
             The maximum number of times to run the program
+        `reuse_generator`: `bool`
+            Whether to use the schedule loader generator compiled once per program instead of compiling
+            a generator with the schedule baked in. Defaults to the `reuse_generator` option of the config.
+        `execution_backend`: `str`
+            `"wrapper"` to run the program through its compiled wrapper executable or `"in_process"` to load the
+            generated shared object in the measurement host. Defaults to the `execution_backend` option of the config.
+        `measurement_settings`: `MeasurementSettings`
+            The thread count and placement of the measured kernels. Defaults to the settings of the config.
 
         Returns
         -------
@@ -469,16 +731,44 @@ class CompilingService:
             raise ValueError("The program is not loaded yet")
         if max_runs is None:
             max_runs = BaseConfig.base_config.tiramisu.max_runs
-        # Get the code of the schedule
-        cpp_code = cls.get_schedule_code(tiramisu_program, optims_list)
-        # Write the code to a file
+        if reuse_generator is None:
+            reuse_generator = BaseConfig.base_config.tiramisu.reuse_generator
+        if execution_backend is None:
+            execution_backend = BaseConfig.base_config.tiramisu.execution_backend
+        if execution_backend not in ["wrapper", "in_process"]:
+            raise ValueError(f"Unknown execution backend: {execution_backend}")
+        in_process = execution_backend == "in_process"
+        if measurement_settings is None:
+            measurement_settings = MeasurementSettings.from_config()
+
+        schedule_file = None
+        if reuse_generator:
+            try:
+                schedule_file = cls.serialize_schedule(optims_list)
+            except UnsupportedRuntimeSchedule as e:
+                logging.debug(f"Compiling the schedule in the generator instead: {e}")
+
         output_path = os.path.join(
             BaseConfig.base_config.workspace, tiramisu_program.name
         )
 
-        cls.write_to_disk(cpp_code, output_path + "_schedule")
+        if schedule_file is not None:
+            generator_path = cls.compile_schedule_loader_generator(tiramisu_program)
+            # Write the schedule to be loaded by the generator
+            cls.write_to_disk(schedule_file, output_path + "_schedule", ".txt")
+            schedule_code = schedule_file
+        else:
+            # Get the code of the schedule
+            schedule_code = cls.get_schedule_code(tiramisu_program, optims_list)
+            # Write the code to a file
+            cls.write_to_disk(schedule_code, output_path + "_schedule")
 
-        if tiramisu_program.wrapper_obj:
+        if in_process:
+            # only the header is needed, by the schedule file
+            cls.write_to_disk(
+                tiramisu_program.wrappers["h"], output_path + "_wrapper", ".h"
+            )
+        elif tiramisu_program.wrapper_obj:
             # write the object file to disk
             with open(output_path + "_wrapper", "wb") as f:
                 f.write(tiramisu_program.wrapper_obj)
@@ -504,72 +794,77 @@ class CompilingService:
 
         results = []
 
-        if BaseConfig.base_config.tiramisu.is_new_tiramisu:
-            # Making the tiramisu root path explicit to the env
-            shell_script = [
-                f"cd {BaseConfig.base_config.workspace}",
-                # Compile intermidiate tiramisu file
-                f"$CXX -I$TIRAMISU_ROOT/3rdParty/Halide/install/include -I$TIRAMISU_ROOT/include -I$TIRAMISU_ROOT/3rdParty/isl/include  -Wl,--no-as-needed -ldl -g -fno-rtti   -lpthread -std=c++17 -O0 -o {tiramisu_program.name}.o -c {tiramisu_program.name}_schedule.cpp",
-                # Link generated file with executer
-                f"$CXX -Wl,--no-as-needed -ldl -g -fno-rtti -lpthread -std=c++17 -O0 {tiramisu_program.name}.o -o {tiramisu_program.name}.out   -L$TIRAMISU_ROOT/build  -L$TIRAMISU_ROOT/3rdParty/Halide/install/lib64  -L$TIRAMISU_ROOT/3rdParty/isl/build/lib  -Wl,-rpath,$TIRAMISU_ROOT/build:$TIRAMISU_ROOT/3rdParty/Halide/install/lib64:$TIRAMISU_ROOT/3rdParty/isl/build/lib -ltiramisu -ltiramisu_auto_scheduler -lHalide -lisl",
-                # Run the generator
-                f"./{tiramisu_program.name}.out",
-                f"$CXX -shared -o {tiramisu_program.name}.o.so {tiramisu_program.name}.o",
+        shell_script = [f"cd {BaseConfig.base_config.workspace}"]
+        if schedule_file is not None:
+            shell_script += [
+                f"export ATHENA_SCHEDULE_PATH={tiramisu_program.name}_schedule.txt",
+                # Run the generator that loads the schedule at runtime
+                generator_path,
             ]
-
-            if not tiramisu_program.wrapper_obj:
-                shell_script += [
-                    # compile the wrapper
-                    f"$CXX -std=c++17 -fno-rtti -I$TIRAMISU_ROOT/include -I$TIRAMISU_ROOT/3rdParty/Halide/install/include -I$TIRAMISU_ROOT/3rdParty/isl/include/ -I$TIRAMISU_ROOT/benchmarks -L$TIRAMISU_ROOT/build -L$TIRAMISU_ROOT/3rdParty/Halide/install/lib64/ -L$TIRAMISU_ROOT/3rdParty/isl/build/lib -o {tiramisu_program.name}_wrapper -ltiramisu -lHalide -ldl -lpthread -lm -Wl,-rpath,$TIRAMISU_ROOT/build {tiramisu_program.name}_wrapper.cpp ./{tiramisu_program.name}.o.so -ltiramisu -lHalide -ldl -lpthread -lm -lisl",
-                ]
-
         else:
-            shell_script = [
-                f"cd {BaseConfig.base_config.workspace}",
-                # Compile intermidiate tiramisu file
-                f"$CXX -I$TIRAMISU_ROOT/3rdParty/Halide/include -I$TIRAMISU_ROOT/include -I$TIRAMISU_ROOT/3rdParty/isl/include  -Wl,--no-as-needed -ldl -g -fno-rtti   -lpthread -std=c++11 -O0 -o {tiramisu_program.name}.o -c {tiramisu_program.name}_schedule.cpp",
-                # Link generated file with executer
-                f"$CXX -Wl,--no-as-needed -ldl -g -fno-rtti -lpthread -std=c++11 -O0 {tiramisu_program.name}.o -o {tiramisu_program.name}.out   -L$TIRAMISU_ROOT/build  -L$TIRAMISU_ROOT/3rdParty/Halide/lib  -L$TIRAMISU_ROOT/3rdParty/isl/build/lib  -Wl,-rpath,$TIRAMISU_ROOT/build:$TIRAMISU_ROOT/3rdParty/Halide/lib:$TIRAMISU_ROOT/3rdParty/isl/build/lib -ltiramisu -ltiramisu_auto_scheduler -lHalide -lisl",
-                # Run the generator
-                f"./{tiramisu_program.name}.out",
-                f"$CXX -shared -o {tiramisu_program.name}.o.so {tiramisu_program.name}.o",
-            ]
+            shell_script += cls.get_generator_compile_script(
+                source_path=f"{tiramisu_program.name}_schedule.cpp",
+                object_path=f"{tiramisu_program.name}.o",
+                binary_path=f"{tiramisu_program.name}.out",
+            )
+            # Run the generator
+            shell_script.append(f"./{tiramisu_program.name}.out")
+        shell_script.append(
+            f"$CXX -shared -o {tiramisu_program.name}.o.so {tiramisu_program.name}.o"
+        )
 
-            if not tiramisu_program.wrapper_obj:
-                shell_script += [
-                    # compile the wrapper
-                    f"$CXX -std=c++11 -fno-rtti -I$TIRAMISU_ROOT/include -I$TIRAMISU_ROOT/3rdParty/Halide/include -I$TIRAMISU_ROOT/3rdParty/isl/include/ -I$TIRAMISU_ROOT/benchmarks -L$TIRAMISU_ROOT/build -L$TIRAMISU_ROOT/3rdParty/Halide/lib/ -L$TIRAMISU_ROOT/3rdParty/isl/build/lib -o {tiramisu_program.name}_wrapper -ltiramisu -lHalide -ldl -lpthread -lm -Wl,-rpath,$TIRAMISU_ROOT/build {tiramisu_program.name}_wrapper.cpp ./{tiramisu_program.name}.o.so -ltiramisu -lHalide -ldl -lpthread -lm -lisl",
-                ]
+        if not tiramisu_program.wrapper_obj and not in_process:
+            shell_script += cls.get_wrapper_compile_script(tiramisu_program)
 
         try:
             # run the compilation of the generator and wrapper
-            compiler = subprocess.run(
-                [" ; ".join(env_vars + shell_script)],
-                capture_output=True,
-                text=True,
-                shell=True,
-                check=True,
-            )
+            with isolation_lock(exclusive=False, enabled=measurement_settings.isolated):
+                compiler = subprocess.run(
+                    [" ; ".join(env_vars + shell_script)],
+                    capture_output=True,
+                    text=True,
+                    shell=True,
+                    check=True,
+                )
 
             halide_repr = compiler.stdout
             logging.debug(f"Generated Halide code:\n{halide_repr}")
 
+            if in_process:
+                return cls.get_in_process_exec_times(
+                    tiramisu_program=tiramisu_program,
+                    max_runs=max_runs,
+                    max_mins_per_schedule=max_mins_per_schedule,
+                    delete_files=delete_fiels,
+                    measurement_settings=measurement_settings,
+                )
+
+            if schedule_file is not None and not tiramisu_program.wrapper_obj:
+                # The wrapper only links against the generated shared object so it can be reused by the next schedules
+                with open(output_path + "_wrapper", "rb") as f:
+                    tiramisu_program.wrapper_obj = f.read()
+
             if max_mins_per_schedule:
                 # run the wrapper and get the execution time
-                compiler = subprocess.run(
-                    [
-                        " ; ".join(
-                            env_vars
-                            + CompilingService.get_n_runs_script(
-                                max_runs=1, tiramisu_program=tiramisu_program
+                with isolation_lock(
+                    exclusive=True, enabled=measurement_settings.isolated
+                ):
+                    compiler = subprocess.run(
+                        [
+                            " ; ".join(
+                                env_vars
+                                + CompilingService.get_n_runs_script(
+                                    max_runs=1,
+                                    tiramisu_program=tiramisu_program,
+                                    measurement_settings=measurement_settings,
+                                )
                             )
-                        )
-                    ],
-                    capture_output=True,
-                    text=True,
-                    shell=True,
-                    check=True,
-                )
+                        ],
+                        capture_output=True,
+                        text=True,
+                        shell=True,
+                        check=True,
+                    )
 
                 if compiler.stdout:
                     max_millis_per_run = max_mins_per_schedule * 60 * 1000
@@ -582,22 +877,24 @@ class CompilingService:
                     raise ScheduleExecutionCrashed("No output from schedule execution")
 
             # run the wrapper and get the execution time
-            compiler = subprocess.run(
-                [
-                    " ; ".join(
-                        env_vars
-                        + CompilingService.get_n_runs_script(
-                            max_runs=max_runs,
-                            tiramisu_program=tiramisu_program,
-                            delete_files=delete_fiels,
+            with isolation_lock(exclusive=True, enabled=measurement_settings.isolated):
+                compiler = subprocess.run(
+                    [
+                        " ; ".join(
+                            env_vars
+                            + CompilingService.get_n_runs_script(
+                                max_runs=max_runs,
+                                tiramisu_program=tiramisu_program,
+                                delete_files=delete_fiels,
+                                measurement_settings=measurement_settings,
+                            )
                         )
-                    )
-                ],
-                capture_output=True,
-                text=True,
-                shell=True,
-                check=True,
-            )
+                    ],
+                    capture_output=True,
+                    text=True,
+                    shell=True,
+                    check=True,
+                )
 
             # Extract the execution times from the output and return the minimum
             if compiler.stdout:
@@ -608,7 +905,7 @@ class CompilingService:
                 logging.error(compiler.stderr)
                 logging.error(compiler.stdout)
                 logging.error(
-                    f"The following schedule execution crashed: {tiramisu_program.name}, schedule: {optims_list} \n\n {cpp_code}\n\n"
+                    f"The following schedule execution crashed: {tiramisu_program.name}, schedule: {optims_list} \n\n {schedule_code}\n\n"
                 )
                 raise ScheduleExecutionCrashed("No output from schedule execution")
         except subprocess.CalledProcessError as e:
@@ -621,24 +918,246 @@ class CompilingService:
         except Exception as e:
             raise e
 
+    @classmethod
+    def get_in_process_exec_times(
+        cls,
+        tiramisu_program: TiramisuProgram,
+        max_runs: int,
+        max_mins_per_schedule: float | None = None,
+        delete_files: bool = True,
+        measurement_settings: MeasurementSettings | None = None,
+    ) -> List[float]:
+        """
+        Measures the shared object generated for the program in the measurement host process
+
+        Parameters
+        ----------
+        `tiramisu_program`: `TiramisuProgram`
+            The program whose shared object was generated in the workspace
+        `max_runs`: `int`
+            The number of times to run the program
+        `max_mins_per_schedule`: `float`
+            Reduce the number of runs if they take more than this number of minutes
+        `measurement_settings`: `MeasurementSettings`
+            The thread count and placement of the measured kernel
+
+        Returns
+        -------
+        `List[float]`
+            The execution times of the program in milliseconds
+        """
+        assert BaseConfig.base_config
+        assert tiramisu_program.name
+
+        shared_object_path = os.path.join(
+            BaseConfig.base_config.workspace, f"{tiramisu_program.name}.o.so"
+        )
+        buffer_declarations = tiramisu_program.IO_buffer_declarations
+        measurement_host = MeasurementHost.get_instance()
+        if measurement_settings is None:
+            measurement_settings = MeasurementSettings.from_config()
+
+        results: List[float] = []
+        try:
+            with isolation_lock(exclusive=True, enabled=measurement_settings.isolated):
+                if max_mins_per_schedule:
+                    results = measurement_host.measure(
+                        shared_object_path,
+                        tiramisu_program.name,
+                        buffer_declarations,
+                        1,
+                        measurement_settings,
+                    )
+                    max_millis_per_run = max_mins_per_schedule * 60 * 1000
+                    if results[0] > max_millis_per_run / max_runs:
+                        max_runs = max(0, int(max_millis_per_run / results[0]) - 1)
+
+                if max_runs:
+                    results += measurement_host.measure(
+                        shared_object_path,
+                        tiramisu_program.name,
+                        buffer_declarations,
+                        max_runs,
+                        measurement_settings,
+                    )
+        except MeasurementHostCrashed as e:
+            logging.error(str(e))
+            raise ScheduleExecutionCrashed(
+                f"Schedule execution crashed: function: {tiramisu_program.name}"
+            )
+        finally:
+            if delete_files:
+                for file_path in glob.glob(
+                    os.path.join(
+                        BaseConfig.base_config.workspace, f"{tiramisu_program.name}*"
+                    )
+                ):
+                    os.remove(file_path)
+
+        return results
+
     def get_n_runs_script(
-        tiramisu_program: TiramisuProgram, max_runs: int = 1, delete_files=False
+        tiramisu_program: TiramisuProgram,
+        max_runs: int = 1,
+        delete_files=False,
+        measurement_settings: MeasurementSettings | None = None,
     ):
-        return [
-            # cd to the workspace
-            f"cd {BaseConfig.base_config.workspace}",
-            #  set the env variables
-            f"export DYNAMIC_RUNS=0",
-            f"export MAX_RUNS={max_runs}",
-            f"export NB_EXEC={max_runs}",
-            # run the wrapper
-            f"./{tiramisu_program.name}_wrapper",
-            # Clean generated files
-            f"rm {tiramisu_program.name}*" if delete_files else "",
-        ]
+        if measurement_settings is None:
+            measurement_settings = MeasurementSettings()
+        return (
+            [
+                # cd to the workspace
+                f"cd {BaseConfig.base_config.workspace}",
+                #  set the env variables
+                f"export DYNAMIC_RUNS=0",
+                f"export MAX_RUNS={max_runs}",
+                f"export NB_EXEC={max_runs}",
+            ]
+            + [
+                f"export {key}={value}"
+                for key, value in measurement_settings.get_env_vars().items()
+            ]
+            + [
+                # run the wrapper, pinned to the cpus and NUMA node of the settings
+                f"{measurement_settings.get_command_prefix()} ./{tiramisu_program.name}_wrapper".strip(),
+                # Clean generated files
+                f"rm {tiramisu_program.name}*" if delete_files else "",
+            ]
+        )
 
 
 class ScheduleExecutionCrashed(Exception):
     """Raised when the execution of the schedule crashes"""
 
     pass
+
+
+class UnsupportedRuntimeSchedule(Exception):
+    """Raised when a schedule cannot be replayed by the schedule loader generator"""
+
+    pass
+
+
+# Tiramisu statements emitted by the optimizations that the schedule loader can replay
+runtime_schedule_statement_regex = re.compile(
+    r"""
+    (?P<fusion_shift>
+        std::vector<std::tuple<tiramisu::var,\s*int>>\s*factors\s*=\s*
+        tiramisu::global::get_implicit_function\(\)->correcting_loop_fusion_with_shifting\(
+        \{(?P<fused_comps>[^}]*)\},\s*(?P<fusion_target>\w+),\s*\{(?P<fusion_levels>[^}]*)\}\);
+        \s*for\s*\(const\s+auto\s*&tuple\s*:\s*factors\)\s*\{.*?\.shift\(var,\s*value\);\s*\}\s*\}
+    )
+    |(?P<call>(?P<function>clear_implicit_function_sched_graph|perform_full_dependency_analysis|prepare_schedules_for_legality_checks)\([^)]*\);)
+    |(?P<then_chain>(?P<then_first>\w+)(?P<then_rest>(?:\.then\(\w+,\s*-?\d+\))+);)
+    |(?P<method>(?P<method_comp>\w+)\.(?P<method_name>interchange|tag_parallel_level|unroll|skew|tile|loop_reversal|expand)\((?P<method_args>[^)]*)\);)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+runtime_schedule_calls = {
+    "clear_implicit_function_sched_graph": "clear_sched_graph",
+    "perform_full_dependency_analysis": "dependency_analysis",
+    "prepare_schedules_for_legality_checks": "prepare_legality",
+}
+
+runtime_schedule_methods_arity = {
+    "interchange": {2},
+    "tag_parallel_level": {1},
+    "unroll": {2},
+    "skew": {4},
+    "tile": {4, 6},
+    "loop_reversal": {1},
+    "expand": {0},
+}
+
+schedule_loader_template = """
+    // Apply the schedule read from the file given by ATHENA_SCHEDULE_PATH
+    {
+        std::map<std::string, tiramisu::computation *> athena_comps = {$comps_map$};
+        const char *athena_schedule_path = std::getenv("ATHENA_SCHEDULE_PATH");
+        if (athena_schedule_path == NULL)
+        {
+            std::cerr << "error: Environment Variable ATHENA_SCHEDULE_PATH not declared" << std::endl;
+            exit(1);
+        }
+        std::ifstream athena_schedule_file(athena_schedule_path);
+        if (!athena_schedule_file.is_open())
+        {
+            std::cerr << "error: Could not open the schedule file " << athena_schedule_path << std::endl;
+            exit(1);
+        }
+        std::string athena_line;
+        while (std::getline(athena_schedule_file, athena_line))
+        {
+            if (athena_line.empty() || athena_line[0] == '#')
+                continue;
+            std::istringstream athena_stream(athena_line);
+            std::string command, comp_name;
+            int value;
+            athena_stream >> command;
+            if (command == "clear_sched_graph")
+                clear_implicit_function_sched_graph();
+            else if (command == "dependency_analysis")
+                perform_full_dependency_analysis();
+            else if (command == "prepare_legality")
+                prepare_schedules_for_legality_checks(true);
+            else if (command == "then")
+            {
+                athena_stream >> comp_name;
+                tiramisu::computation *current = athena_comps.at(comp_name);
+                while (athena_stream >> comp_name >> value)
+                    current = &(current->then(*athena_comps.at(comp_name), value));
+            }
+            else if (command == "fusion_shift")
+            {
+                int nb_fused_comps;
+                athena_stream >> comp_name >> nb_fused_comps;
+                tiramisu::computation *target = athena_comps.at(comp_name);
+                std::vector<tiramisu::computation *> fused_comps;
+                for (int i = 0; i < nb_fused_comps; i++)
+                {
+                    athena_stream >> comp_name;
+                    fused_comps.push_back(athena_comps.at(comp_name));
+                }
+                std::vector<int> levels;
+                while (athena_stream >> value)
+                    levels.push_back(value);
+                std::vector<std::tuple<tiramisu::var, int>> factors = tiramisu::global::get_implicit_function()->correcting_loop_fusion_with_shifting(fused_comps, *target, levels);
+                for (const auto &tuple : factors)
+                {
+                    if (std::get<1>(tuple) != 0)
+                        target->shift(std::get<0>(tuple), std::get<1>(tuple));
+                }
+            }
+            else
+            {
+                athena_stream >> comp_name;
+                tiramisu::computation *comp = athena_comps.at(comp_name);
+                std::vector<int> args;
+                while (athena_stream >> value)
+                    args.push_back(value);
+                if (command == "interchange" && args.size() == 2)
+                    comp->interchange(args[0], args[1]);
+                else if (command == "tag_parallel_level" && args.size() == 1)
+                    comp->tag_parallel_level(args[0]);
+                else if (command == "unroll" && args.size() == 2)
+                    comp->unroll(args[0], args[1]);
+                else if (command == "skew" && args.size() == 4)
+                    comp->skew(args[0], args[1], args[2], args[3]);
+                else if (command == "tile" && args.size() == 4)
+                    comp->tile(args[0], args[1], args[2], args[3]);
+                else if (command == "tile" && args.size() == 6)
+                    comp->tile(args[0], args[1], args[2], args[3], args[4], args[5]);
+                else if (command == "loop_reversal" && args.size() == 1)
+                    comp->loop_reversal(args[0]);
+                else if (command == "expand" && args.empty())
+                    comp->expand(true);
+                else
+                {
+                    std::cerr << "error: Unsupported schedule command: " << athena_line << std::endl;
+                    exit(1);
+                }
+            }
+        }
+    }
+"""
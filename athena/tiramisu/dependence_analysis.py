@@ -0,0 +1,417 @@
+from __future__ import annotations
+
+import itertools
+import math
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Sequence, Set, Tuple
+
+import numpy as np
+
+from athena.tiramisu.tiramisu_actions.tiramisu_action import (
+    TiramisuAction,
+    TiramisuActionType,
+)
+
+write_access_regex = re.compile(
+    r"\{\s*(\w+)\[([^\]]*)\]\s*->\s*(\w+)\[([^\]]*)\]\s*(?::[^}]*)?\}"
+)
+affine_term_regex = re.compile(r"^(\d*)\*?([A-Za-z_]\w*)?$")
+
+
+def parse_affine_expression(expression: str, iterators: List[str]) -> List[int] | None:
+    """
+    Parses an affine expression of the iterators like `2i0 + i1 - 1` into its coefficients followed by its constant,
+    None when the expression isn't affine
+    """
+    coefficients = [0] * (len(iterators) + 1)
+    expression = expression.replace(" ", "")
+    if not expression:
+        return None
+    for term in re.findall(r"[+-]?[^+-]+", expression):
+        sign = -1 if term[0] == "-" else 1
+        match = affine_term_regex.match(term.lstrip("+-"))
+        if not match or not (match.group(1) or match.group(2)):
+            return None
+        factor, name = match.groups()
+        value = sign * int(factor) if factor else sign
+        if name is None:
+            coefficients[-1] += value
+        elif name in iterators:
+            coefficients[iterators.index(name)] += value
+        else:
+            return None
+    return coefficients
+
+
+def parse_write_access(
+    write_access_relation: str, iterators: List[str]
+) -> np.ndarray | None:
+    """
+    Returns the access matrix of the write of a computation, in the format of the access matrices of the annotations,
+    None when the write isn't affine
+    """
+    match = write_access_regex.search(write_access_relation)
+    if not match:
+        return None
+    rows = []
+    for expression in match.group(4).split(","):
+        row = parse_affine_expression(expression, iterators)
+        if row is None:
+            return None
+        rows.append(row)
+    return np.array(rows, dtype=np.int64).reshape(len(rows), len(iterators) + 1)
+
+
+def skewing_completion(factor_1: int, factor_2: int) -> Tuple[int, int] | None:
+    """
+    Returns `(gamma, sigma)` such that `factor_1 * sigma - factor_2 * gamma = 1`, None when the factors aren't coprime
+    """
+
+    def extended_gcd(a: int, b: int) -> Tuple[int, int, int]:
+        if b == 0:
+            return a, 1, 0
+        gcd, x, y = extended_gcd(b, a % b)
+        return gcd, y, x - (a // b) * y
+
+    gcd, x, y = extended_gcd(factor_1, factor_2)
+    if abs(gcd) != 1:
+        return None
+    # factor_1 * x + factor_2 * y = gcd
+    return -y * gcd, x * gcd
+
+
+@dataclass
+class Dependence:
+    """
+    A uniform dependence between two computations.
+
+    Attributes
+    ----------
+    `source`: str
+        The computation of the write
+    `target`: str
+        The computation of the other access
+    `buffer_id`: int
+        The buffer both computations access
+    `distance`: List[int | None]
+        The distance from the iteration of the write to the iteration of the other access for each of the loops
+        shared by both computations, None when the distance can take any value
+    """
+
+    source: str
+    target: str
+    buffer_id: int
+    distance: List[int | None]
+
+
+class DependenceAnalysis:
+    """
+    Dependence analysis of a program from the access matrices of its annotations.
+    The dependences between accesses with the same linear part are uniform, their distance vectors are
+    computed exactly and are used to check the legality of loop transformations without compiling the program.
+    The legality is unknown (None) for the actions that touch computations with non uniform or non affine accesses.
+
+    Attributes
+    ----------
+    `dependences`: List[Dependence]
+        The uniform dependences of the program
+    `unknown_computations`: Set[str]
+        The computations with at least one dependence that couldn't be analyzed
+    `signs`: np.ndarray
+        The direction of each dependence vector on each loop level, one row per lexicographically positive vector
+    `distances`: np.ndarray
+        The distance of each dependence vector on each loop level, NaN when it is unknown
+    """
+
+    def __init__(self):
+        self.computations_iterators: Dict[str, List[str]] = {}
+        self.dependences: List[Dependence] = []
+        self.unknown_computations: Set[str] = set()
+        self.signs = np.zeros((0, 0), dtype=np.int8)
+        self.distances = np.zeros((0, 0), dtype=np.float64)
+        # the depth of the loops shared by the computations of each vector
+        self.depths = np.zeros(0, dtype=np.int64)
+        self.sources = np.zeros(0, dtype=object)
+        self.targets = np.zeros(0, dtype=object)
+
+    @classmethod
+    def from_annotations(cls, annotations: Dict) -> DependenceAnalysis:
+        analysis = cls()
+        iterators_annotations = annotations["iterators"]
+        extents: Dict[str, int | None] = {}
+        for name, iterator in iterators_annotations.items():
+            try:
+                extents[name] = int(iterator["upper_bound"]) - int(
+                    iterator["lower_bound"]
+                )
+            except ValueError:
+                extents[name] = None
+
+        writes: List[Tuple[str, int, np.ndarray | None]] = []
+        accesses: List[Tuple[str, int, np.ndarray | None]] = []
+        for comp, computation in annotations["computations"].items():
+            analysis.computations_iterators[comp] = computation["iterators"]
+            write = parse_write_access(
+                computation["write_access_relation"], computation["iterators"]
+            )
+            writes.append((comp, computation["write_buffer_id"], write))
+            for access in computation["accesses"]:
+                accesses.append(
+                    (
+                        comp,
+                        access["buffer_id"],
+                        np.array(access["access_matrix"], dtype=np.int64),
+                    )
+                )
+
+        for source, buffer_id, write in writes:
+            # read after write, write after read and write after write
+            for target, access_buffer_id, access in accesses + writes:
+                if access_buffer_id != buffer_id:
+                    continue
+                if write is None or access is None:
+                    analysis.unknown_computations.update([source, target])
+                    continue
+                distance = analysis.get_distance(source, write, target, access)
+                if distance is None:
+                    analysis.unknown_computations.update([source, target])
+                elif distance is not False and analysis.is_feasible(
+                    source, distance, extents
+                ):
+                    analysis.dependences.append(
+                        Dependence(source, target, buffer_id, distance)
+                    )
+
+        analysis.build_vectors()
+        return analysis
+
+    def get_shared_iterators(self, comp_1: str, comp_2: str) -> List[str]:
+        shared = []
+        for iterator_1, iterator_2 in zip(
+            self.computations_iterators[comp_1], self.computations_iterators[comp_2]
+        ):
+            if iterator_1 != iterator_2:
+                break
+            shared.append(iterator_1)
+        return shared
+
+    def get_distance(
+        self, source: str, write: np.ndarray, target: str, access: np.ndarray
+    ) -> List[int | None] | None | bool:
+        """
+        Solves `write(i) = access(j)` for the distance `j - i` on the loops shared by both computations.
+
+        Returns
+        -------
+        The distance vector, False when the accesses never touch the same element and None when the dependence isn't uniform
+        """
+        if write.shape[0] != access.shape[0]:
+            return None
+        depth = len(self.get_shared_iterators(source, target))
+        source_depth = len(self.computations_iterators[source])
+        target_depth = len(self.computations_iterators[target])
+        # the accesses must only depend on the shared loops
+        if np.any(write[:, depth:source_depth]) or np.any(
+            access[:, depth:target_depth]
+        ):
+            return None
+        linear = write[:, :depth]
+        if not np.array_equal(linear, access[:, :depth]):
+            return None
+
+        # columns of zeros are loops the accessed element doesn't depend on
+        free = ~np.any(linear, axis=0)
+        constrained = linear[:, ~free]
+        rhs = write[:, -1] - access[:, -1]
+        if constrained.shape[1] == 0:
+            if np.any(rhs):
+                return False
+            return [None] * depth
+        if np.linalg.matrix_rank(constrained) < constrained.shape[1]:
+            return None
+        solution = np.linalg.lstsq(constrained, rhs, rcond=None)[0]
+        rounded = np.round(solution)
+        if not np.allclose(solution, rounded) or not np.array_equal(
+            constrained @ rounded.astype(np.int64), rhs
+        ):
+            return False
+
+        distance: List[int | None] = [None] * depth
+        constrained_levels = np.flatnonzero(~free)
+        for level, value in zip(constrained_levels, rounded.astype(np.int64)):
+            distance[level] = int(value)
+        return distance
+
+    def is_feasible(
+        self, source: str, distance: List[int | None], extents: Dict[str, int | None]
+    ) -> bool:
+        # distances larger than the loop extents can't happen
+        for iterator, value in zip(self.computations_iterators[source], distance):
+            extent = extents.get(iterator)
+            if value is not None and extent is not None and abs(value) >= extent:
+                return False
+        return True
+
+    def build_vectors(self):
+        """
+        Expands the dependences into lexicographically positive direction vectors
+        """
+        max_depth = max(
+            [len(dependence.distance) for dependence in self.dependences], default=0
+        )
+        vectors: Dict[Tuple, Tuple[str, str, int]] = {}
+        for dependence in self.dependences:
+            choices = [
+                [(0, 0.0), (1, math.nan), (-1, math.nan)]
+                if value is None
+                else [(int(np.sign(value)), float(value))]
+                for value in dependence.distance
+            ]
+            for entries in itertools.product(*choices):
+                signs = [sign for sign, _ in entries]
+                distances = [distance for _, distance in entries]
+                nonzero = [sign for sign in signs if sign != 0]
+                if not nonzero:
+                    # dependences within an iteration are preserved by the loop transformations
+                    continue
+                if nonzero[0] < 0:
+                    signs = [-sign for sign in signs]
+                    distances = [-distance for distance in distances]
+                padding = max_depth - len(signs)
+                key = (
+                    tuple(signs + [0] * padding),
+                    # None instead of NaN so that equal vectors have equal keys, numpy converts it back to NaN
+                    tuple(
+                        None if math.isnan(distance) else distance
+                        for distance in distances + [0.0] * padding
+                    ),
+                    dependence.source,
+                    dependence.target,
+                )
+                vectors[key] = (
+                    dependence.source,
+                    dependence.target,
+                    len(dependence.distance),
+                )
+
+        self.signs = np.array([key[0] for key in vectors], dtype=np.int8).reshape(
+            len(vectors), max_depth
+        )
+        self.distances = np.array(
+            [key[1] for key in vectors], dtype=np.float64
+        ).reshape(len(vectors), max_depth)
+        self.sources = np.array([value[0] for value in vectors.values()], dtype=object)
+        self.targets = np.array([value[1] for value in vectors.values()], dtype=object)
+        self.depths = np.array([value[2] for value in vectors.values()], dtype=np.int64)
+
+    @staticmethod
+    def is_lexicographically_positive(signs: np.ndarray) -> np.ndarray:
+        nonzero = signs != 0
+        first = np.argmax(nonzero, axis=1)
+        first_signs = signs[np.arange(len(signs)), first]
+        return ~np.any(nonzero, axis=1) | (first_signs > 0)
+
+    def check_actions(
+        self, actions: Sequence[TiramisuAction], comps: Sequence[Sequence[str]]
+    ) -> bool | None:
+        """
+        Checks the legality of a sequence of loop transformations
+
+        Parameters
+        ----------
+        `actions`: Sequence[TiramisuAction]
+            The actions in the order they are applied
+        `comps`: Sequence[Sequence[str]]
+            The computations transformed by each action
+
+        Returns
+        -------
+        Whether the sequence is legal, None when it contains actions that can't be checked by the analysis
+        """
+        signs = self.signs.copy()
+        distances = self.distances.copy()
+        unrolled = False
+
+        for action, action_comps in zip(actions, comps):
+            if action.type == TiramisuActionType.UNROLLING:
+                # unrolling doesn't change the execution order but splits the loop, the levels of the next actions
+                # no longer match the levels of the vectors
+                unrolled = True
+                continue
+            if unrolled:
+                return None
+            if action.type not in [
+                TiramisuActionType.PARALLELIZATION,
+                TiramisuActionType.INTERCHANGE,
+                TiramisuActionType.REVERSAL,
+                TiramisuActionType.SKEWING,
+            ]:
+                return None
+            if self.unknown_computations.intersection(action_comps):
+                return None
+
+            levels = [param[1] for param in action.params if isinstance(param, tuple)]
+            relevant = (
+                np.isin(self.sources, list(action_comps))
+                | np.isin(self.targets, list(action_comps))
+            ) & (self.depths > max(levels))
+            if not np.any(relevant):
+                continue
+            rows = np.flatnonzero(relevant)
+
+            if action.type == TiramisuActionType.PARALLELIZATION:
+                level = levels[0]
+                carried = np.argmax(signs[rows] != 0, axis=1) == level
+                if np.any(carried):
+                    return False
+                continue
+
+            new_signs = signs[rows].copy()
+            new_distances = distances[rows].copy()
+            if action.type == TiramisuActionType.INTERCHANGE:
+                new_signs[:, levels] = new_signs[:, levels[::-1]]
+                new_distances[:, levels] = new_distances[:, levels[::-1]]
+            elif action.type == TiramisuActionType.REVERSAL:
+                new_signs[:, levels[0]] *= -1
+                new_distances[:, levels[0]] *= -1
+            else:
+                factor_1, factor_2 = [
+                    param for param in action.params if isinstance(param, int)
+                ]
+                completion = skewing_completion(factor_1, factor_2)
+                if completion is None:
+                    return None
+                gamma, sigma = completion
+                outer, inner = levels
+                # vectors carried by outer loops are not affected
+                affected = ~np.any(new_signs[:, :outer] != 0, axis=1)
+                if np.any(np.isnan(new_distances[affected][:, levels])):
+                    return None
+                outer_distances = new_distances[:, outer].copy()
+                inner_distances = new_distances[:, inner].copy()
+                new_distances[affected, outer] = (
+                    factor_1 * outer_distances + factor_2 * inner_distances
+                )[affected]
+                new_distances[affected, inner] = (
+                    gamma * outer_distances + sigma * inner_distances
+                )[affected]
+                new_signs[affected, outer] = np.sign(new_distances[affected, outer])
+                new_signs[affected, inner] = np.sign(new_distances[affected, inner])
+
+            if not np.all(self.is_lexicographically_positive(new_signs)):
+                return False
+            signs[rows] = new_signs
+            distances[rows] = new_distances
+
+        return True
+
+    def check_schedule(self, schedule) -> bool | None:
+        """
+        Checks the legality of the actions of a schedule, None when the compiler has to check it
+        """
+        if any(action.comps is None for action in schedule.optims_list):
+            return None
+        return self.check_actions(
+            schedule.optims_list, [action.comps for action in schedule.optims_list]
+        )
@@ -0,0 +1,286 @@
+from __future__ import annotations
+
+import _ctypes
+import ctypes
+import logging
+import multiprocessing
+import os
+import shutil
+import time
+import uuid
+from typing import List, Tuple
+
+import numpy as np
+
+from athena.tiramisu.buffer_manager import BufferDeclaration, BufferManager
+from athena.tiramisu.measurement_settings import MeasurementSettings
+
+
+class HalideType(ctypes.Structure):
+    _fields_ = [
+        ("code", ctypes.c_uint8),
+        ("bits", ctypes.c_uint8),
+        ("lanes", ctypes.c_uint16),
+    ]
+
+
+class HalideDimension(ctypes.Structure):
+    _fields_ = [
+        ("min", ctypes.c_int32),
+        ("extent", ctypes.c_int32),
+        ("stride", ctypes.c_int32),
+        ("flags", ctypes.c_uint32),
+    ]
+
+
+class HalideBuffer(ctypes.Structure):
+    """
+    ctypes mirror of Halide's `halide_buffer_t`
+    """
+
+    _fields_ = [
+        ("device", ctypes.c_uint64),
+        ("device_interface", ctypes.c_void_p),
+        ("host", ctypes.POINTER(ctypes.c_uint8)),
+        ("flags", ctypes.c_uint64),
+        ("type", HalideType),
+        ("dimensions", ctypes.c_int32),
+        ("dim", ctypes.POINTER(HalideDimension)),
+        ("padding", ctypes.c_void_p),
+    ]
+
+
+# halide_type_code_t values, booleans are 1 bit unsigned integers
+halide_type_codes = {"i": 0, "u": 1, "b": 1, "f": 2}
+
+
+def to_halide_buffer(array: np.ndarray) -> Tuple[HalideBuffer, ctypes.Array]:
+    """
+    Wraps a numpy array into a halide_buffer_t without copying it.
+    Halide's first dimension is the innermost one so the numpy axes are reversed.
+
+    Returns
+    -------
+    The buffer and its dimensions array, which must be kept alive as long as the buffer is used.
+    """
+    if array.dtype.kind not in halide_type_codes:
+        raise ValueError(f"Unsupported buffer type {array.dtype}")
+
+    dimensions = (HalideDimension * array.ndim)()
+    for index, (extent, stride) in enumerate(
+        zip(reversed(array.shape), reversed(array.strides))
+    ):
+        dimensions[index] = HalideDimension(0, extent, stride // array.itemsize, 0)
+
+    buffer = HalideBuffer()
+    buffer.host = array.ctypes.data_as(ctypes.POINTER(ctypes.c_uint8))
+    buffer.type = HalideType(
+        halide_type_codes[array.dtype.kind],
+        1 if array.dtype.kind == "b" else array.dtype.itemsize * 8,
+        1,
+    )
+    buffer.dimensions = array.ndim
+    buffer.dim = dimensions
+    return buffer, dimensions
+
+
+class KernelRunner:
+    """
+    Loads generated kernels in the current process and times them.
+    The IO buffers are allocated once per program by the buffer manager and reused by all the kernels of the program.
+    """
+
+    def __init__(self, buffer_manager: BufferManager | None = None):
+        self.buffer_manager = buffer_manager if buffer_manager else BufferManager()
+        self.program_name: str | None = None
+        self.arrays: List[np.ndarray] = []
+        self.halide_buffers: List[Tuple[HalideBuffer, ctypes.Array]] = []
+
+    def set_buffers(
+        self, program_name: str, buffer_declarations: List[BufferDeclaration]
+    ):
+        if program_name == self.program_name:
+            return
+
+        # only keep the buffers of the program being measured
+        self.release()
+        self.arrays = self.buffer_manager.get_buffers(program_name, buffer_declarations)
+        self.halide_buffers = [to_halide_buffer(array) for array in self.arrays]
+        self.program_name = program_name
+
+    def release(self):
+        if self.program_name is not None:
+            self.halide_buffers = []
+            self.arrays = []
+            self.buffer_manager.release(self.program_name)
+            self.program_name = None
+
+    def run(self, shared_object_path: str, function_name: str, nb_runs: int):
+        # Copy the shared object under a unique name since dlopen returns the cached handle of an already loaded path
+        loaded_path = f"{shared_object_path}.{uuid.uuid4().hex}.so"
+        shutil.copy(shared_object_path, loaded_path)
+        library = ctypes.CDLL(os.path.abspath(loaded_path), mode=ctypes.RTLD_LOCAL)
+        try:
+            kernel = getattr(library, function_name)
+            kernel.restype = ctypes.c_int
+            kernel.argtypes = [ctypes.POINTER(HalideBuffer)] * len(self.halide_buffers)
+            args = [ctypes.byref(buffer) for buffer, _ in self.halide_buffers]
+
+            results = []
+            for _ in range(nb_runs):
+                begin = time.perf_counter_ns()
+                error_code = kernel(*args)
+                end = time.perf_counter_ns()
+                if error_code != 0:
+                    raise RuntimeError(
+                        f"{function_name} returned the error code {error_code}"
+                    )
+                results.append((end - begin) / 1000000)
+            return results
+        finally:
+            _ctypes.dlclose(library._handle)
+            os.remove(loaded_path)
+
+
+def measurement_host_main(
+    connection,
+    buffers_folder: str | None = None,
+    measurement_settings: MeasurementSettings | None = None,
+):
+    """
+    Main loop of the measurement host process
+    """
+    if measurement_settings is not None:
+        measurement_settings.apply_to_current_process()
+    runner = KernelRunner(BufferManager(folder=buffers_folder))
+    try:
+        while True:
+            message = connection.recv()
+            if message[0] == "close":
+                break
+            _, shared_object_path, function_name, buffer_declarations, nb_runs = message
+            try:
+                runner.set_buffers(function_name, buffer_declarations)
+                connection.send(
+                    ("ok", runner.run(shared_object_path, function_name, nb_runs))
+                )
+            except Exception as e:
+                connection.send(("error", repr(e)))
+    finally:
+        runner.release()
+
+
+class MeasurementHost:
+    """
+    Persistent process in which the generated kernels are loaded and measured.
+    Running the kernels out of the main process protects it from crashing kernels,
+    the host is restarted on the next measurement after a crash.
+    """
+
+    instance: MeasurementHost | None = None
+
+    def __init__(self, buffers_folder: str | None = None):
+        self.buffers_folder = buffers_folder
+        self.measurement_settings = MeasurementSettings()
+        self.process = None
+        self.connection = None
+
+    @classmethod
+    def get_instance(cls) -> MeasurementHost:
+        if cls.instance is None:
+            cls.instance = cls()
+        return cls.instance
+
+    def start(self, measurement_settings: MeasurementSettings | None = None):
+        if measurement_settings is not None:
+            self.measurement_settings = measurement_settings
+        context = multiprocessing.get_context("spawn")
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(
+            target=measurement_host_main,
+            args=(child_connection, self.buffers_folder, self.measurement_settings),
+            daemon=True,
+        )
+        self.process.start()
+        child_connection.close()
+
+    def is_alive(self) -> bool:
+        return self.process is not None and self.process.is_alive()
+
+    def measure(
+        self,
+        shared_object_path: str,
+        function_name: str,
+        buffer_declarations: List[BufferDeclaration],
+        nb_runs: int,
+        measurement_settings: MeasurementSettings | None = None,
+    ) -> List[float]:
+        """
+        Runs the kernel `function_name` of the shared object `nb_runs` times and returns the execution times in milliseconds
+
+        Parameters
+        ----------
+        `shared_object_path`: `str`
+            The path of the shared object containing the kernel
+        `function_name`: `str`
+            The name of the kernel function
+        `buffer_declarations`: `List[BufferDeclaration]`
+            The declarations of the buffers passed as arguments to the kernel
+        `nb_runs`: `int`
+            The number of times to run the kernel
+        `measurement_settings`: `MeasurementSettings`
+            The thread count and placement of the host, it is restarted when they change
+        """
+        if (
+            measurement_settings is not None
+            and measurement_settings != self.measurement_settings
+        ):
+            self.close()
+            self.measurement_settings = measurement_settings
+        if not self.is_alive():
+            self.start()
+        assert self.connection
+
+        try:
+            self.connection.send(
+                (
+                    "measure",
+                    shared_object_path,
+                    function_name,
+                    buffer_declarations,
+                    nb_runs,
+                )
+            )
+            status, result = self.connection.recv()
+        except (EOFError, BrokenPipeError, ConnectionResetError):
+            exit_code = self.process.exitcode if self.process else None
+            self.close()
+            raise MeasurementHostCrashed(
+                f"The measurement host crashed while running {function_name} (exit code {exit_code})"
+            )
+
+        if status != "ok":
+            raise MeasurementHostCrashed(
+                f"Error while running {function_name}: {result}"
+            )
+        return result
+
+    def close(self):
+        if self.is_alive():
+            assert self.connection
+            try:
+                self.connection.send(("close",))
+            except (BrokenPipeError, OSError):
+                pass
+            self.process.join(timeout=5)
+            if self.process.is_alive():
+                logging.warning("Killing the unresponsive measurement host")
+                self.process.kill()
+        self.process = None
+        self.connection = None
+
+
+class MeasurementHostCrashed(Exception):
+    """Raised when a kernel crashes or fails in the measurement host"""
+
+    pass
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import contextlib
+import fcntl
+import os
+import shutil
+import socket
+import tempfile
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Iterator, List
+
+from athena.utils.config import BaseConfig
+
+
+def parse_cpu_list(cpu_list: str) -> List[int]:
+    """
+    Parses a cpu list in the format used by taskset and sysfs, e.g. `"0-3,8,10-11"`
+    """
+    cpus = []
+    for part in cpu_list.replace(" ", "").split(","):
+        if not part:
+            continue
+        if "-" in part:
+            first, last = part.split("-")
+            cpus += list(range(int(first), int(last) + 1))
+        else:
+            cpus.append(int(part))
+    return sorted(set(cpus))
+
+
+def format_cpu_list(cpus: List[int]) -> str:
+    return ",".join(str(cpu) for cpu in cpus)
+
+
+def get_numa_node_cpus(numa_node: int) -> List[int]:
+    with open(f"/sys/devices/system/node/node{numa_node}/cpulist") as cpulist_file:
+        return parse_cpu_list(cpulist_file.read().strip())
+
+
+@dataclass
+class MeasurementSettings:
+    """
+    Controls how the kernels are placed on the machine while they are measured.
+    The settings are recorded alongside the execution times they produced.
+
+    Attributes
+    ----------
+    `nb_threads`: int | None
+        The number of threads of the Halide thread pool, passed with `HL_NUM_THREADS`
+    `cpus`: List[int] | None
+        The cpus the kernels are pinned to
+    `numa_node`: int | None
+        The NUMA node the kernels and their memory are bound to
+    `isolated`: bool
+        Whether measurements wait for the running compilations of the machine to finish
+        and block new ones while they run
+    """
+
+    nb_threads: int | None = None
+    cpus: List[int] | None = None
+    numa_node: int | None = None
+    isolated: bool = False
+
+    @classmethod
+    def from_config(cls) -> MeasurementSettings:
+        if not BaseConfig.base_config:
+            raise ValueError("BaseConfig not initialized")
+        config = BaseConfig.base_config.tiramisu
+        return cls(
+            nb_threads=config.nb_threads,
+            cpus=parse_cpu_list(config.cpu_affinity) if config.cpu_affinity else None,
+            numa_node=config.numa_node,
+            isolated=config.isolate_measurements,
+        )
+
+    def get_env_vars(self) -> Dict[str, str]:
+        if self.nb_threads is None:
+            return {}
+        return {"HL_NUM_THREADS": str(self.nb_threads)}
+
+    def get_command_prefix(self) -> str:
+        """
+        Returns the prefix binding a shell command to the cpus and NUMA node of the settings
+        """
+        prefix = []
+        if self.numa_node is not None:
+            if shutil.which("numactl") is None:
+                raise ValueError(
+                    "numactl is needed to bind the measurements to a NUMA node"
+                )
+            prefix.append(
+                f"numactl --cpunodebind={self.numa_node} --membind={self.numa_node}"
+            )
+        if self.cpus:
+            prefix.append(f"taskset -c {format_cpu_list(self.cpus)}")
+        return " ".join(prefix)
+
+    def get_allowed_cpus(self) -> List[int] | None:
+        if self.numa_node is None:
+            return self.cpus
+        node_cpus = get_numa_node_cpus(self.numa_node)
+        if self.cpus:
+            return [cpu for cpu in self.cpus if cpu in node_cpus]
+        return node_cpus
+
+    def apply_to_current_process(self):
+        """
+        Applies the settings to the current process, used by the in-process measurement host.
+        The memory of a NUMA node can't be bound from python, it is allocated on the node of
+        the pinned cpus by the first touch policy.
+        """
+        os.environ.update(self.get_env_vars())
+        allowed_cpus = self.get_allowed_cpus()
+        if allowed_cpus:
+            os.sched_setaffinity(0, allowed_cpus)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns the settings with the information of the machine they were applied on
+        """
+        return {
+            **asdict(self),
+            "hostname": socket.gethostname(),
+            "cpu_count": os.cpu_count(),
+        }
+
+
+@contextlib.contextmanager
+def isolation_lock(exclusive: bool, enabled: bool = True) -> Iterator[None]:
+    """
+    Lock shared by the processes of a machine to isolate measurements from compilations.
+    Compilations hold the lock in shared mode and measurements in exclusive mode.
+
+    Parameters
+    ----------
+    `exclusive`: bool
+        Whether to take the lock in exclusive mode
+    `enabled`: bool
+        When disabled the lock is not taken
+    """
+    if not enabled:
+        yield
+        return
+    # the lock is per machine, so it doesn't live in the workspace which may be shared between nodes
+    lock_path = os.path.join(tempfile.gettempdir(), "athena_measurement.lock")
+    with open(lock_path, "a") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -1,13 +1,26 @@
 from __future__ import annotations
 
-import ast
-import re
+import time
 from copy import deepcopy
-from typing import TYPE_CHECKING, List
-
-from athena.tiramisu.compiling_service import CompilingService
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Tuple
+
+from athena.storage.baseline_store import MachineFingerprint, get_program_hash
+from athena.storage.result_store import ResultStore, ScheduleResult
+from athena.tiramisu.canonicalization import get_canonical_str
+from athena.tiramisu.compiling_service import (
+    CompilingService,
+    ScheduleExecutionCrashed,
+)
+from athena.tiramisu.measurement_settings import MeasurementSettings
+from athena.tiramisu.schedule_parser import (
+    build_action,
+    format_parsed_action,
+    parse_sched_str,
+)
+from athena.tiramisu.static_filter import StaticVerdict, classify_schedule
 from athena.tiramisu.tiramisu_actions.tiramisu_action import TiramisuActionType
 from athena.tiramisu.tiramisu_tree import TiramisuTree
+from athena.utils.config import BaseConfig
 
 if TYPE_CHECKING:
     from .tiramisu_actions.tiramisu_action import TiramisuAction
@@ -36,6 +49,8 @@ class Schedule:
         else:
             self.tree = None
         self.legality: bool | None = None
+        # settings under which the last execution times of the schedule were measured
+        self.measurement_info: Dict[str, Any] | None = None
 
     def set_tiramisu_program(self, tiramisu_program: TiramisuProgram) -> None:
         self.tiramisu_program = tiramisu_program
@@ -85,14 +100,28 @@ class Schedule:
         nb_exec_tiems=1,
         max_mins_per_schedule: float | None = None,
         delete_files: bool = True,
+        reuse_generator: bool | None = None,
+        execution_backend: str | None = None,
+        measurement_settings: MeasurementSettings | None = None,
+        use_stored_results: bool = False,
     ) -> List[float]:
         """
         Applies the schedule to the Tiramisu program.
+        When a result store is configured, the execution times and errors are recorded in it.
 
         Parameters
         ----------
         `nb_exec_times` : int
             The number of times the Tiramisu program will be executed after applying the schedule.
+        `reuse_generator` : bool
+            Whether to load the schedule at runtime in a generator compiled once per program. Defaults to the config option.
+        `execution_backend` : str
+            `"wrapper"` or `"in_process"`, how the generated code is run. Defaults to the config option.
+        `measurement_settings` : MeasurementSettings
+            The thread count and placement of the program, recorded in `measurement_info`. Defaults to the config options.
+        `use_stored_results` : bool
+            Return the execution times stored for this machine instead of executing the schedule when there are enough of them,
+            otherwise fail without executing schedules that are known to crash.
         Returns
         -------
         The execution time of the Tiramisu program after applying the schedule.
@@ -106,12 +135,76 @@ class Schedule:
         if self.legality == False:
             raise Exception("Schedule is not legal")
 
-        return CompilingService.get_cpu_exec_times(
-            self.tiramisu_program,
-            self.optims_list,
-            nb_exec_tiems,
-            max_mins_per_schedule,
-            delete_files,
+        if measurement_settings is None:
+            measurement_settings = MeasurementSettings.from_config()
+
+        result_store = ResultStore.get_instance()
+        machine = MachineFingerprint.current().key if result_store else None
+        if result_store and use_stored_results:
+            assert machine
+            stored_result = self.get_stored_result(machine)
+            if (
+                stored_result
+                and stored_result.execution_times
+                and len(stored_result.execution_times) >= nb_exec_tiems
+            ):
+                self.measurement_info = stored_result.measurement_info
+                return stored_result.execution_times[:nb_exec_tiems]
+            if stored_result and stored_result.execution_error:
+                raise ScheduleExecutionCrashed(stored_result.execution_error)
+
+        start = time.perf_counter()
+        try:
+            execution_times = CompilingService.get_cpu_exec_times(
+                self.tiramisu_program,
+                self.optims_list,
+                nb_exec_tiems,
+                max_mins_per_schedule,
+                delete_files,
+                reuse_generator,
+                execution_backend,
+                measurement_settings,
+            )
+        except ScheduleExecutionCrashed as e:
+            if result_store:
+                assert machine
+                result_store.record_execution(
+                    get_program_hash(self.tiramisu_program),
+                    self.canonical_str(),
+                    machine,
+                    None,
+                    error=str(e),
+                )
+            raise e
+        self.measurement_info = measurement_settings.to_dict()
+
+        if result_store:
+            assert machine
+            result_store.record_execution(
+                get_program_hash(self.tiramisu_program),
+                self.canonical_str(),
+                machine,
+                execution_times,
+                build_time=time.perf_counter() - start - sum(execution_times) / 1000,
+                measurement_info=self.measurement_info,
+                append=True,
+            )
+        return execution_times
+
+    def get_stored_result(self, machine: str | None = None) -> ScheduleResult | None:
+        """
+        Returns the result of the schedule in the configured result store, None if there is no store or no result.
+
+        Parameters
+        ----------
+        `machine` : str
+            The fingerprint key of the machine of the execution results, only the legality is looked up when None.
+        """
+        result_store = ResultStore.get_instance()
+        if result_store is None or self.tiramisu_program is None:
+            return None
+        return result_store.get(
+            get_program_hash(self.tiramisu_program), self.canonical_str(), machine
         )
 
     def is_legal(self, with_ast: bool = False) -> bool:
@@ -126,10 +219,53 @@ class Schedule:
         if self.tiramisu_program is None:
             raise Exception("No Tiramisu program to apply the schedule to")
 
-        legality, new_tree = CompilingService.compile_legality(self, with_ast=with_ast)
+        assert BaseConfig.base_config
+        if (
+            BaseConfig.base_config.tiramisu.static_legality_check
+            and not with_ast
+            and classify_schedule(self).verdict == StaticVerdict.ILLEGAL
+        ):
+            self.legality = False
+            return self.legality
+
+        if BaseConfig.base_config.tiramisu.dependence_analysis and not with_ast:
+            dependence_analysis = self.tiramisu_program.get_dependence_analysis()
+            legality = (
+                dependence_analysis.check_schedule(self)
+                if dependence_analysis
+                else None
+            )
+            if legality is not None:
+                self.legality = legality
+                return self.legality
+
+        result_store = ResultStore.get_instance()
+        if result_store and not with_ast:
+            stored_result = self.get_stored_result()
+            if stored_result and stored_result.legality is not None:
+                self.legality = stored_result.legality
+                return self.legality
+
+        try:
+            legality, new_tree = CompilingService.compile_legality(
+                self, with_ast=with_ast
+            )
+        except Exception as e:
+            if result_store:
+                result_store.record_legality(
+                    get_program_hash(self.tiramisu_program),
+                    self.canonical_str(),
+                    None,
+                    repr(e),
+                )
+            raise e
 
         assert isinstance(legality, bool)
         self.legality = legality
+        if result_store:
+            result_store.record_legality(
+                get_program_hash(self.tiramisu_program), self.canonical_str(), legality
+            )
         if with_ast:
             assert new_tree
             self.tree = new_tree
@@ -139,204 +275,71 @@ class Schedule:
     def from_sched_str(
         cls, sched_str: str, tiramisu_program: TiramisuProgram
     ) -> "Schedule":
+        """
+        Creates the schedule of a program from its string representation, `Schedule.from_sched_str(str(schedule), program) == schedule`.
+
+        Raises
+        ------
+        `ScheduleParseError`
+            When the string doesn't follow the grammar of the schedules or doesn't apply to the program
+        """
         schedule = cls(tiramisu_program)
         assert schedule.tree
-        for optimization_str in sched_str.split("|"):
-            if optimization_str == "":
-                continue
-            if optimization_str[0] == "P":
-                # extract loop level and comps using P\(L(\d),comps=\[([\w',]*)
-                regex = r"P\(L(\d),comps=\[([\w', ]*)\]\)"
-                match = re.match(regex, optimization_str)
-                if match:
-                    loop_level = int(match.group(1))
-                    comps = match.group(2).split(",")
-                    comps = [comp.strip("' ") for comp in comps]
-                    schedule.add_optimizations(
-                        [
-                            tiramisu_actions.Parallelization(
-                                [(comps[0], loop_level)],
-                            )
-                        ]
-                    )
-
-            elif optimization_str[0] == "U":
-                # extract loop level, factor and comps using U\(L(\d),(\d+),comps=\[([\w',]*)\]\)
-                regex = r"U\(L(\d),(\d+),comps=\[([\w', ]*)\]\)"
-                match = re.match(regex, optimization_str)
-                if match:
-                    loop_level = int(match.group(1))
-                    factor = int(match.group(2))
-                    comps = match.group(3).split(",")
-                    comps = [comp.strip("' ") for comp in comps]
-                    schedule.add_optimizations(
-                        [
-                            tiramisu_actions.Unrolling(
-                                [
-                                    (comps[0], loop_level),
-                                    factor,
-                                ],
-                            )
-                        ]
-                    )
-            elif optimization_str[0] == "I":
-                regex = r"I\(L(\d),L(\d),comps=\[([\w', ]*)\]\)"
-                match = re.match(regex, optimization_str)
-                if match:
-                    first_loop_level = int(match.group(1))
-                    second_loop_level = int(match.group(2))
-                    comps = match.group(3).split(",")
-                    comps = [comp.strip("' ") for comp in comps]
-                    schedule.add_optimizations(
-                        [
-                            tiramisu_actions.Interchange(
-                                [
-                                    (comps[0], first_loop_level),
-                                    (comps[0], second_loop_level),
-                                ],
-                            )
-                        ]
-                    )
-            elif optimization_str[0] == "R":
-                regex = r"R\(L(\d),comps=\[([\w', ]*)\]\)"
-                match = re.match(regex, optimization_str)
-                if match:
-                    loop_level = int(match.group(1))
-                    comps = match.group(2).split(",")
-                    comps = [comp.strip("' ") for comp in comps]
-                    schedule.add_optimizations(
-                        [
-                            tiramisu_actions.Reversal(
-                                [(comps[0], loop_level)],
-                            )
-                        ]
-                    )
-            elif optimization_str[:2] == "T2":
-                regex = r"T2\(L(\d),L(\d),(\d+),(\d+),comps=\[([\w', ]*)\]\)"
-                match = re.match(regex, optimization_str)
-                if match:
-                    outer_loop_level = int(match.group(1))
-                    inner_loop_level = int(match.group(2))
-                    outer_loop_factor = int(match.group(3))
-                    inner_loop_factor = int(match.group(4))
-                    comps = match.group(5).split(",")
-                    comps = [comp.strip("' ").strip() for comp in comps]
-                    schedule.add_optimizations(
-                        [
-                            tiramisu_actions.Tiling2D(
-                                [
-                                    (comps[0], outer_loop_level),
-                                    (comps[0], inner_loop_level),
-                                    outer_loop_factor,
-                                    inner_loop_factor,
-                                ],
-                            )
-                        ]
-                    )
-            elif optimization_str[:2] == "T3":
-                regex = (
-                    r"T3\(L(\d),L(\d),L(\d),(\d+),(\d+),(\d+),comps=\[([\w', ]*)\]\)"
+        for parsed_action in parse_sched_str(sched_str):
+            schedule.add_optimizations([build_action(parsed_action, schedule.tree)])
+        return schedule
+
+    @classmethod
+    def from_sched_strs(
+        cls, sched_strs: Iterable[str], tiramisu_program: TiramisuProgram
+    ) -> List[Schedule]:
+        """
+        Creates the schedules of a program from their string representations. The schedules sharing a prefix
+        of actions share the work of applying it, including the compilations needed to update the tree.
+
+        Raises
+        ------
+        `ScheduleParseError`
+            When a string doesn't follow the grammar of the schedules or doesn't apply to the program
+        """
+        prefixes: Dict[Tuple[str, ...], Schedule] = {(): cls(tiramisu_program)}
+        schedules = []
+        for sched_str in sched_strs:
+            parsed_actions = parse_sched_str(sched_str)
+            action_strs = tuple(
+                format_parsed_action(parsed_action) for parsed_action in parsed_actions
+            )
+            length = len(action_strs)
+            while action_strs[:length] not in prefixes:
+                length -= 1
+            schedule = prefixes[action_strs[:length]]
+            for index in range(length, len(action_strs)):
+                schedule = schedule.branch()
+                assert schedule.tree
+                schedule.add_optimizations(
+                    [build_action(parsed_actions[index], schedule.tree)]
                 )
-                match = re.match(regex, optimization_str)
-                if match:
-                    outer_loop_level = int(match.group(1))
-                    middle_loop_level = int(match.group(2))
-                    inner_loop_level = int(match.group(3))
-                    outer_loop_factor = int(match.group(4))
-                    middle_loop_factor = int(match.group(5))
-                    inner_loop_factor = int(match.group(6))
-                    comps = match.group(7).split(",")
-                    comps = [comp.strip("' ").strip() for comp in comps]
-                    schedule.add_optimizations(
-                        [
-                            tiramisu_actions.Tiling3D(
-                                [
-                                    (comps[0], outer_loop_level),
-                                    (comps[0], middle_loop_level),
-                                    (comps[0], inner_loop_level),
-                                    outer_loop_factor,
-                                    middle_loop_factor,
-                                    inner_loop_factor,
-                                ],
-                            )
-                        ]
-                    )
-            elif optimization_str[0] == "S":
-                regex = r"S\(L(\d),L(\d),(-?\d+),(-?\d+),comps=\[([\w', ]*)\]\)"
-                match = re.match(regex, optimization_str)
-                if match:
-                    outer_loop_level = int(match.group(1))
-                    inner_loop_level = int(match.group(2))
-                    outer_loop_factor = int(match.group(3))
-                    inner_loop_factor = int(match.group(4))
-                    comps = match.group(5).split(",")
-                    comps = [comp.strip("' ").strip() for comp in comps]
-                    schedule.add_optimizations(
-                        [
-                            tiramisu_actions.Skewing(
-                                [
-                                    (comps[0], outer_loop_level),
-                                    (comps[0], inner_loop_level),
-                                    outer_loop_factor,
-                                    inner_loop_factor,
-                                ],
-                            )
-                        ]
-                    )
-            elif optimization_str[0] == "F":
-                regex = r"F\(L(\d),comps=\[([\w', ]*)\]\)"
-                match = re.match(regex, optimization_str)
-                if match:
-                    loop_level = int(match.group(1))
-                    comps = match.group(2).split(",")
-                    comps = [comp.strip("' ").strip() for comp in comps]
-                    schedule.add_optimizations(
-                        [
-                            tiramisu_actions.Fusion(
-                                [
-                                    (comps[0], loop_level),
-                                    (comps[1], loop_level),
-                                ],
-                            )
-                        ]
-                    )
-            elif optimization_str[0] == "D":
-                regex = r"D\(L(\d),comps=\[([\w', ]*)\],distribution=([\[\]'\w, ]*)\)"
-                match = re.match(regex, optimization_str)
-                if match:
-                    loop_level = int(match.group(1))
-                    comps = match.group(2).split(",")
-                    comps = [comp.strip("' ").strip() for comp in comps]
-                    distribution = ast.literal_eval(match.group(3))
-                    assert isinstance(distribution, list)
-                    schedule.add_optimizations(
-                        [
-                            tiramisu_actions.Distribution(
-                                [
-                                    (comps[0], loop_level),
-                                ],
-                                distribution,
-                            )
-                        ]
-                    )
-            elif optimization_str[0] == "E":
-                regex = r"E\(comps=\[([\w', ]*)\]\)"
-                match = re.match(regex, optimization_str)
-                if match:
-                    comp = match.group(1).strip("' ")
-                    schedule.add_optimizations(
-                        [
-                            tiramisu_actions.Expansion(
-                                [comp],
-                            )
-                        ]
-                    )
-            elif optimization_str[:2] == "TG":
-                raise NotImplementedError
-                # regex =
+                prefixes[action_strs[: index + 1]] = schedule
+            schedules.append(schedule.branch())
+        return schedules
 
+    def branch(self) -> Schedule:
+        """
+        Returns a copy of the schedule that shares its actions without applying them again
+        """
+        schedule = Schedule()
+        schedule.tiramisu_program = self.tiramisu_program
+        schedule.tree = deepcopy(self.tree)
+        schedule.optims_list = list(self.optims_list)
         return schedule
 
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Schedule):
+            return NotImplemented
+        return self.tiramisu_program is other.tiramisu_program and str(self) == str(
+            other
+        )
+
     def __str__(self) -> str:
         """
         Generates a string representation of the schedule.
@@ -349,6 +352,14 @@ class Schedule:
     def __repr__(self) -> str:
         return self.__str__()
 
+    def canonical_str(self) -> str:
+        """
+        Returns the string representation of the canonical form of the schedule.
+        Equivalent schedules, e.g. with interchanges that cancel out or with their parallelizations and unrollings
+        in a different order, have the same canonical string and share their results in the result store.
+        """
+        return get_canonical_str(self)
+
     def copy(self) -> Schedule:
         """
         Returns a copy of the schedule.
@@ -0,0 +1,387 @@
+from __future__ import annotations
+
+import functools
+import re
+from typing import Dict, List, NamedTuple, Tuple
+
+from athena.tiramisu import tiramisu_actions
+from athena.tiramisu.tiramisu_actions.tiramisu_action import TiramisuAction
+from athena.tiramisu.tiramisu_iterator_node import IteratorNode
+from athena.tiramisu.tiramisu_tree import TiramisuTree
+
+# a single pass over the schedule string splits it into tokens, any other character is an error
+token_regex = re.compile(
+    r"""
+    (?P<LEVEL>L\d+)(?![\w])
+    |(?P<INT>-?\d+)
+    |(?P<KEY>comps|distribution)=
+    |(?P<STRING>'[^']*'|"[^"]*")
+    |(?P<NAME>[A-Za-z_]\w*)
+    |(?P<PUNCT>[()\[\],|])
+    |(?P<SPACE>\s+)
+    |(?P<MISMATCH>.)
+    """,
+    re.VERBOSE,
+)
+
+# the number of loop levels and integer arguments of each action, None when it can be any number
+ACTION_SIGNATURES: Dict[str, Tuple[int | None, int | None]] = {
+    "P": (1, 0),
+    "U": (1, 1),
+    "I": (2, 0),
+    "R": (1, 0),
+    "S": (2, 2),
+    "T2": (2, 2),
+    "T3": (3, 3),
+    "TG": (None, None),
+    "F": (1, 0),
+    "D": (1, 0),
+    "E": (0, 0),
+}
+
+
+class ScheduleParseError(ValueError):
+    """Raised when a schedule string doesn't follow the grammar of the schedules."""
+
+
+class Token(NamedTuple):
+    kind: str
+    value: str
+    position: int
+
+
+class ParsedAction(NamedTuple):
+    """
+    An action of a schedule string, independent of the program it is applied to.
+
+    Attributes
+    ----------
+    `name`: str
+        The name of the action in the schedule string, e.g. `T2`
+    `levels`: Tuple[int, ...]
+        The loop levels of the action
+    `factors`: Tuple[int, ...]
+        The integer arguments of the action
+    `comps`: Tuple[str, ...]
+        The computations of the action
+    `distribution`: Tuple[Tuple[str, ...], ...] | None
+        The groups of computations of a distribution
+    """
+
+    name: str
+    levels: Tuple[int, ...]
+    factors: Tuple[int, ...]
+    comps: Tuple[str, ...]
+    distribution: Tuple[Tuple[str, ...], ...] | None = None
+
+
+def tokenize(sched_str: str) -> List[Token]:
+    tokens = []
+    for match in token_regex.finditer(sched_str):
+        kind = match.lastgroup
+        assert kind
+        if kind == "SPACE":
+            continue
+        if kind == "MISMATCH":
+            raise ScheduleParseError(
+                f"Unexpected character {match.group()!r} at position {match.start()} of {sched_str!r}"
+            )
+        value = match.group(kind)
+        if kind == "STRING":
+            value = value[1:-1]
+        tokens.append(Token(kind, value, match.start()))
+    return tokens
+
+
+class _Parser:
+    def __init__(self, sched_str: str):
+        self.sched_str = sched_str
+        self.tokens = tokenize(sched_str)
+        self.position = 0
+
+    def error(self, message: str) -> ScheduleParseError:
+        if self.position < len(self.tokens):
+            location = f"at position {self.tokens[self.position].position}"
+        else:
+            location = "at the end"
+        return ScheduleParseError(f"{message} {location} of {self.sched_str!r}")
+
+    def peek(self) -> Token | None:
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return None
+
+    def expect(self, kind: str, value: str | None = None) -> Token:
+        token = self.peek()
+        if token is None or token.kind != kind or (value and token.value != value):
+            raise self.error(f"Expected {value or kind}")
+        self.position += 1
+        return token
+
+    def accept(self, kind: str, value: str | None = None) -> Token | None:
+        token = self.peek()
+        if (
+            token is not None
+            and token.kind == kind
+            and (not value or token.value == value)
+        ):
+            self.position += 1
+            return token
+        return None
+
+    def parse_schedule(self) -> List[ParsedAction]:
+        actions: List[ParsedAction] = []
+        while self.peek() is not None:
+            if self.accept("PUNCT", "|"):
+                # empty actions are allowed, e.g. a trailing separator
+                continue
+            actions.append(self.parse_action())
+            if self.peek() is not None:
+                self.expect("PUNCT", "|")
+        return actions
+
+    def parse_name_list(self) -> Tuple[str, ...]:
+        self.expect("PUNCT", "[")
+        names: List[str] = []
+        while not self.accept("PUNCT", "]"):
+            if names:
+                self.expect("PUNCT", ",")
+            token = self.peek()
+            if token is None or token.kind not in ["STRING", "NAME", "LEVEL"]:
+                raise self.error("Expected a computation name")
+            self.position += 1
+            names.append(token.value)
+        return tuple(names)
+
+    def parse_action(self) -> ParsedAction:
+        name_token = self.peek()
+        if name_token is None or name_token.kind != "NAME":
+            raise self.error("Expected an action")
+        name = name_token.value
+        if name not in ACTION_SIGNATURES:
+            raise self.error(f"Unknown action {name!r}")
+        self.position += 1
+        self.expect("PUNCT", "(")
+
+        levels: List[int] = []
+        factors: List[int] = []
+        comps: Tuple[str, ...] | None = None
+        distribution: Tuple[Tuple[str, ...], ...] | None = None
+        first = True
+        while not self.accept("PUNCT", ")"):
+            if not first:
+                self.expect("PUNCT", ",")
+            first = False
+            token = self.peek()
+            if token is None:
+                raise self.error("Unterminated action")
+            if token.kind == "LEVEL":
+                if factors or comps is not None:
+                    raise self.error("Loop levels must come first")
+                levels.append(int(token.value[1:]))
+                self.position += 1
+            elif token.kind == "INT":
+                if comps is not None:
+                    raise self.error(
+                        "Integer arguments must come before the computations"
+                    )
+                factors.append(int(token.value))
+                self.position += 1
+            elif token.kind == "KEY" and token.value == "comps":
+                self.position += 1
+                comps = self.parse_name_list()
+            elif token.kind == "KEY" and token.value == "distribution":
+                self.position += 1
+                self.expect("PUNCT", "[")
+                groups: List[Tuple[str, ...]] = []
+                while not self.accept("PUNCT", "]"):
+                    if groups:
+                        self.expect("PUNCT", ",")
+                    groups.append(self.parse_name_list())
+                distribution = tuple(groups)
+            else:
+                raise self.error("Unexpected argument")
+
+        nb_levels, nb_factors = ACTION_SIGNATURES[name]
+        if name == "TG":
+            nb_levels = nb_factors = len(levels)
+            if not levels:
+                raise self.error("TG needs at least one loop level")
+        if len(levels) != nb_levels or len(factors) != nb_factors:
+            raise self.error(
+                f"{name} takes {nb_levels} loop levels and {nb_factors} integer arguments,"
+                f" got {len(levels)} and {len(factors)}"
+            )
+        if not comps:
+            raise self.error(f"{name} needs its computations")
+        if (name == "D") != (distribution is not None):
+            raise self.error("Only distributions take a distribution argument")
+        if name == "E" and len(comps) != 1:
+            raise self.error("E takes a single computation")
+        return ParsedAction(name, tuple(levels), tuple(factors), comps, distribution)
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def parse_sched_str(sched_str: str) -> Tuple[ParsedAction, ...]:
+    """
+    Parses a schedule string into its actions, independently of the program it applies to
+
+    Raises
+    ------
+    `ScheduleParseError`
+        When the string doesn't follow the grammar of the schedules
+    """
+    return tuple(_Parser(sched_str).parse_schedule())
+
+
+def split_sched_str(sched_str: str) -> List[str]:
+    """
+    Splits a schedule string into the strings of its actions, checking its grammar
+    """
+    return [
+        format_parsed_action(parsed_action)
+        for parsed_action in parse_sched_str(sched_str)
+    ]
+
+
+def format_parsed_action(parsed_action: ParsedAction) -> str:
+    arguments = [f"L{level}" for level in parsed_action.levels]
+    arguments += [str(factor) for factor in parsed_action.factors]
+    if parsed_action.name == "D":
+        assert parsed_action.distribution is not None
+        arguments.append(f"comps=[{','.join(parsed_action.comps)}]")
+        arguments.append(
+            f"distribution={[list(group) for group in parsed_action.distribution]}"
+        )
+    else:
+        arguments.append(f"comps={list(parsed_action.comps)}")
+    return f"{parsed_action.name}({','.join(arguments)})"
+
+
+def _check_comps(comps: Tuple[str, ...], tree: TiramisuTree):
+    for comp in comps:
+        if comp not in tree.computations:
+            raise ScheduleParseError(f"Unknown computation {comp!r}")
+
+
+def _get_loop_path(comp: str, tree: TiramisuTree) -> List[IteratorNode]:
+    # the loops containing the computation, from the outermost one
+    iterator = tree.get_iterator_of_computation(comp)
+    path = []
+    while iterator is not None:
+        path.append(iterator)
+        iterator = (
+            tree.iterators[iterator.parent_iterator]
+            if iterator.parent_iterator
+            else None
+        )
+    return path[::-1]
+
+
+def _get_tiled_iterators(
+    parsed_action: ParsedAction, tree: TiramisuTree
+) -> List[Tuple[str, int]]:
+    # the levels of TG don't name the computations of their loops, each level is matched with the next loop at that
+    # level containing one of the computations, or nested in a loop already matched when the loop has no computation
+    candidates: Dict[int, List[str]] = {}
+    for comp in parsed_action.comps:
+        for iterator in _get_loop_path(comp, tree):
+            level_candidates = candidates.setdefault(iterator.level, [])
+            if iterator.name not in level_candidates:
+                level_candidates.append(iterator.name)
+
+    tiled: List[str] = []
+    for level in parsed_action.levels:
+        level_candidates = candidates.get(level, []) + [
+            child
+            for iterator in tiled
+            for child in tree.iterators[iterator].child_iterators
+            if tree.iterators[child].level == level
+        ]
+        iterator = next(
+            (candidate for candidate in level_candidates if candidate not in tiled),
+            None,
+        )
+        if iterator is None:
+            raise ScheduleParseError(
+                f"No loop at level {level} contains the computations of TG"
+            )
+        tiled.append(iterator)
+    return [tree.get_iterator_id_from_name(iterator) for iterator in tiled]
+
+
+def build_action(parsed_action: ParsedAction, tree: TiramisuTree) -> TiramisuAction:
+    """
+    Creates the action of a parsed schedule string for the tree it is applied to
+
+    Raises
+    ------
+    `ScheduleParseError`
+        When the action doesn't apply to the tree
+    """
+    _check_comps(parsed_action.comps, tree)
+    name = parsed_action.name
+    comp = parsed_action.comps[0]
+    levels = parsed_action.levels
+    factors = list(parsed_action.factors)
+    try:
+        if name != "TG":
+            for level in levels:
+                if level not in [
+                    iterator.level for iterator in _get_loop_path(comp, tree)
+                ]:
+                    raise ScheduleParseError(
+                        f"{format_parsed_action(parsed_action)} doesn't apply to the program: "
+                        f"{comp} has no loop at level {level}"
+                    )
+        if name == "P":
+            return tiramisu_actions.Parallelization([(comp, levels[0])])
+        if name == "U":
+            return tiramisu_actions.Unrolling([(comp, levels[0]), factors[0]])
+        if name == "I":
+            return tiramisu_actions.Interchange([(comp, levels[0]), (comp, levels[1])])
+        if name == "R":
+            return tiramisu_actions.Reversal([(comp, levels[0])])
+        if name == "S":
+            return tiramisu_actions.Skewing(
+                [(comp, levels[0]), (comp, levels[1]), *factors]
+            )
+        if name == "T2":
+            return tiramisu_actions.Tiling2D(
+                [(comp, levels[0]), (comp, levels[1]), *factors]
+            )
+        if name == "T3":
+            return tiramisu_actions.Tiling3D(
+                [(comp, levels[0]), (comp, levels[1]), (comp, levels[2]), *factors]
+            )
+        if name == "TG":
+            return tiramisu_actions.TilingGeneral(
+                [*_get_tiled_iterators(parsed_action, tree), *factors]
+            )
+        if name == "F":
+            # the second loop is the one of the first computation outside of the first loop
+            first_iterator = tree.get_iterator_of_computation(comp, levels[0])
+            first_comps = tree.get_iterator_subtree_computations(first_iterator.name)
+            other_comps = [
+                other for other in parsed_action.comps if other not in first_comps
+            ]
+            if not other_comps:
+                raise ScheduleParseError("F needs computations of two loops")
+            return tiramisu_actions.Fusion(
+                [(comp, levels[0]), (other_comps[0], levels[0])]
+            )
+        if name == "D":
+            assert parsed_action.distribution is not None
+            for group in parsed_action.distribution:
+                _check_comps(group, tree)
+            return tiramisu_actions.Distribution(
+                [(comp, levels[0])],
+                [list(group) for group in parsed_action.distribution],
+            )
+        return tiramisu_actions.Expansion([comp])
+    except ScheduleParseError:
+        raise
+    except (ValueError, KeyError) as e:
+        raise ScheduleParseError(
+            f"{format_parsed_action(parsed_action)} doesn't apply to the program: {e}"
+        ) from e
@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from enum import Enum
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Sequence,
+    Tuple,
+)
+
+from athena.tiramisu.tiramisu_actions.tiramisu_action import (
+    TiramisuAction,
+    TiramisuActionType,
+)
+from athena.tiramisu.tiramisu_iterator_node import IteratorIdentifier, IteratorNode
+from athena.tiramisu.tiramisu_tree import TiramisuTree
+
+if TYPE_CHECKING:
+    from athena.tiramisu.schedule import Schedule
+
+
+class StaticVerdict(Enum):
+    """The verdict of the static checks on an action."""
+
+    # the compiler would reject the action
+    ILLEGAL = "illegal"
+    # the action is legal or not but can't make the program faster
+    USELESS = "useless"
+    # the static rules can't tell, the compiler has to check the action
+    NEEDS_CHECK = "needs_check"
+
+
+@dataclass
+class StaticCheckResult:
+    """
+    Attributes
+    ----------
+    `verdict`: StaticVerdict
+        The verdict of the first rule that decided, `NEEDS_CHECK` when no rule decided
+    `rule`: str | None
+        The name of the rule that decided
+    `reason`: str | None
+        Why the rule decided
+    """
+
+    verdict: StaticVerdict
+    rule: str | None = None
+    reason: str | None = None
+
+
+# a rule receives the action, the iterators it applies to in the tree before the action
+# and the previous actions of the schedule, and returns a verdict with its reason when it decides
+StaticRule = Callable[
+    [TiramisuAction, List[IteratorNode], TiramisuTree, Sequence[TiramisuAction]],
+    Tuple[StaticVerdict, str] | None,
+]
+
+STATIC_RULES: Dict[TiramisuActionType, List[Tuple[str, StaticRule]]] = {}
+
+
+def static_rule(*action_types: TiramisuActionType):
+    """
+    Registers a rule for the given action types, rules are evaluated in the order they are registered
+    """
+
+    def register(rule: StaticRule) -> StaticRule:
+        for action_type in action_types:
+            STATIC_RULES.setdefault(action_type, []).append((rule.__name__, rule))
+        return rule
+
+    return register
+
+
+def get_extent(node: IteratorNode) -> int | None:
+    """
+    Returns the number of iterations of the loop, None when its bounds aren't integers
+    """
+    if not node.has_integer_bounds():
+        return None
+    return (
+        int(node.upper_bound)
+        - int(node.lower_bound)
+        + (1 if node.upper_bound_inclusive else 0)
+    )
+
+
+def get_action_iterator_ids(action: TiramisuAction) -> List[IteratorIdentifier]:
+    return [param for param in action.params if isinstance(param, tuple)]
+
+
+def get_action_factors(action: TiramisuAction) -> List[int]:
+    return [param for param in action.params if isinstance(param, int)]
+
+
+def is_ancestor(tree: TiramisuTree, ancestor: str, iterator: str) -> bool:
+    parent = tree.iterators[iterator].parent_iterator
+    while parent is not None:
+        if parent == ancestor:
+            return True
+        parent = tree.iterators[parent].parent_iterator
+    return False
+
+
+@static_rule(TiramisuActionType.UNROLLING)
+def unrolling_bounds(action, iterators, tree, previous_actions):
+    if not iterators[0].has_integer_bounds():
+        return StaticVerdict.ILLEGAL, "unrolled loops must have constant bounds"
+    extent = get_extent(iterators[0])
+    if extent is not None and action.params[1] > extent:
+        return (
+            StaticVerdict.USELESS,
+            f"unrolling factor {action.params[1]} is larger than the extent {extent}",
+        )
+    return None
+
+
+@static_rule(
+    TiramisuActionType.TILING_2D,
+    TiramisuActionType.TILING_3D,
+    TiramisuActionType.TILING_GENERAL,
+)
+def tiling_sizes(action, iterators, tree, previous_actions):
+    for iterator, size in zip(iterators, get_action_factors(action)):
+        extent = get_extent(iterator)
+        if extent is not None and size >= extent:
+            return (
+                StaticVerdict.USELESS,
+                f"tile size {size} of {iterator.name} is not smaller than its extent {extent}",
+            )
+    return None
+
+
+@static_rule(TiramisuActionType.PARALLELIZATION, TiramisuActionType.REVERSAL)
+def single_iteration(action, iterators, tree, previous_actions):
+    extent = get_extent(iterators[0])
+    if extent is not None and extent <= 1:
+        return StaticVerdict.USELESS, f"{iterators[0].name} has a single iteration"
+    return None
+
+
+@static_rule(TiramisuActionType.PARALLELIZATION)
+def nested_parallelization(action, iterators, tree, previous_actions):
+    iterator = iterators[0].name
+    for previous_action in previous_actions:
+        if not previous_action.is_parallelization():
+            continue
+        try:
+            parallel_iterator = tree.get_iterator_of_computation(
+                *previous_action.params[0]
+            ).name
+        except (ValueError, KeyError):
+            # the previous action was applied to a loop that isn't in this tree anymore
+            continue
+        if parallel_iterator == iterator:
+            return StaticVerdict.USELESS, f"{iterator} is already parallel"
+        if is_ancestor(tree, parallel_iterator, iterator) or is_ancestor(
+            tree, iterator, parallel_iterator
+        ):
+            return (
+                StaticVerdict.USELESS,
+                f"{iterator} is nested with the parallel loop {parallel_iterator}",
+            )
+    return None
+
+
+@static_rule(TiramisuActionType.INTERCHANGE, TiramisuActionType.SKEWING)
+def same_loop(action, iterators, tree, previous_actions):
+    if iterators[0].name == iterators[1].name:
+        return StaticVerdict.ILLEGAL, f"{iterators[0].name} is used twice"
+    return None
+
+
+@static_rule(TiramisuActionType.INTERCHANGE)
+def interchange_non_rectangular(action, iterators, tree, previous_actions):
+    for iterator in iterators:
+        if iterator.has_non_rectangular():
+            return (
+                StaticVerdict.ILLEGAL,
+                f"{iterator.name} has non rectangular bounds",
+            )
+    return None
+
+
+def classify_action(
+    action: TiramisuAction,
+    tree: TiramisuTree,
+    previous_actions: Sequence[TiramisuAction] = (),
+) -> StaticCheckResult:
+    """
+    Classifies an action with the static rules without calling the compiler
+
+    Parameters
+    ----------
+    `action`: TiramisuAction
+        The action to classify
+    `tree`: TiramisuTree
+        The tree of the program before the action is applied
+    `previous_actions`: Sequence[TiramisuAction]
+        The actions applied before the action
+
+    Returns
+    -------
+    `StaticCheckResult`
+        The verdict of the first rule that decided, `NEEDS_CHECK` when no rule decided
+    """
+    try:
+        iterators = [
+            tree.get_iterator_of_computation(*iterator_id)
+            for iterator_id in get_action_iterator_ids(action)
+        ]
+    except (ValueError, KeyError):
+        return StaticCheckResult(
+            StaticVerdict.ILLEGAL,
+            "missing_iterator",
+            "the action applies to a loop that isn't in the program",
+        )
+
+    for name, rule in STATIC_RULES.get(action.type, []):
+        decision = rule(action, iterators, tree, previous_actions)
+        if decision is not None:
+            verdict, reason = decision
+            return StaticCheckResult(verdict, name, reason)
+    return StaticCheckResult(StaticVerdict.NEEDS_CHECK)
+
+
+def classify_candidates(
+    schedule: Schedule, candidates: Iterable[TiramisuAction]
+) -> Iterator[Tuple[TiramisuAction, StaticCheckResult]]:
+    """
+    Classifies candidate actions to be added to the end of a schedule
+    """
+    assert schedule.tree
+    for candidate in candidates:
+        yield candidate, classify_action(candidate, schedule.tree, schedule.optims_list)
+
+
+def filter_candidates(
+    schedule: Schedule,
+    candidates: Iterable[TiramisuAction],
+    keep_useless: bool = False,
+) -> Iterator[TiramisuAction]:
+    """
+    Drops the candidates of a schedule that the static rules find illegal, and useless unless `keep_useless` is set
+    """
+    for candidate, result in classify_candidates(schedule, candidates):
+        if result.verdict == StaticVerdict.NEEDS_CHECK or (
+            keep_useless and result.verdict == StaticVerdict.USELESS
+        ):
+            yield candidate
+
+
+def classify_schedule(schedule: Schedule) -> StaticCheckResult:
+    """
+    Classifies the actions of a schedule in order, returns the first verdict that isn't `NEEDS_CHECK`
+    """
+    for index, action in enumerate(schedule.optims_list):
+        # the actions keep a copy of the tree they were initialized with
+        tree = getattr(action, "tree", None)
+        if tree is None:
+            continue
+        result = classify_action(action, tree, schedule.optims_list[:index])
+        if result.verdict != StaticVerdict.NEEDS_CHECK:
+            return result
+    return StaticCheckResult(StaticVerdict.NEEDS_CHECK)
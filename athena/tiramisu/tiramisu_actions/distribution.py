@@ -54,6 +54,8 @@ class Distribution(TiramisuAction):
             # Add the computation of the iterator itself
             for comp in iterator.computations_list:
                 self.children.append([comp])
+            # same comps as the action built from its string, which is given its children
+            self.comps = self.children
         else:
             for child_list in self.children:
                 for index, child in enumerate(child_list):
@@ -13,6 +13,7 @@ class IteratorNode:
         child_iterators: List[str],
         computations_list: List[str],
         level: int,
+        upper_bound_inclusive: bool = False,
     ):
         self.name = name
         self.parent_iterator = parent_iterator
@@ -21,6 +22,8 @@ class IteratorNode:
         self.child_iterators = child_iterators
         self.computations_list = computations_list
         self.level = level
+        # the bounds of the annotations exclude the upper bound while the ISL AST loop conditions include it
+        self.upper_bound_inclusive = upper_bound_inclusive
 
     def add_child(self, child: str) -> None:
         self.child_iterators.append(child)
@@ -53,6 +56,7 @@ class IteratorNode:
             child_iterators=[child + suffix for child in self.child_iterators],
             computations_list=[comp + suffix for comp in self.computations_list],
             level=self.level,
+            upper_bound_inclusive=self.upper_bound_inclusive,
         )
 
     def __str__(self) -> str:
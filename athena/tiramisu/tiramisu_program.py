@@ -1,11 +1,38 @@
+import functools
 import json
 import random
 import re
 from pathlib import Path
 from typing import Dict, List
 
+from athena.storage.baseline_store import (
+    BaselineStore,
+    MachineFingerprint,
+    get_program_hash,
+)
+from athena.tiramisu.buffer_manager import BufferDeclaration, parse_buffer_declarations
 from athena.tiramisu.compiling_service import CompilingService
+from athena.tiramisu.dependence_analysis import DependenceAnalysis
 from athena.tiramisu.tiramisu_tree import TiramisuTree
+from athena.utils.config import BaseConfig
+
+code_body_regex = re.compile(r"(tiramisu::init(?s:.)+)tiramisu::codegen")
+function_name_regex = re.compile(r"tiramisu::init\(\"(\w+)\"\);")
+computation_name_regex = re.compile(r"computation (\w+)\(")
+code_gen_line_regex = re.compile(r"tiramisu::codegen\({.+;")
+code_gen_buffers_regex = re.compile(r"{(.+)}")
+identifier_regex = re.compile(r"\w+")
+
+# attributes parsed from the code on first access, reset when the code is loaded
+lazy_code_attributes = [
+    "body",
+    "comps",
+    "code_gen_line",
+    "IO_buffer_names",
+    "IO_buffer_declarations",
+    "buffer_sizes",
+    "wrappers",
+]
 
 
 class TiramisuProgram:
@@ -32,26 +59,29 @@ class TiramisuProgram:
     `initial_execution_times`: dict
         The initial execution times of the function
     `current_machine_initial_execution_time`: float
-        The initial execution time of the function on the current machine
+        The initial execution time of the function on the current machine, loaded from the baseline
+        store or measured on first access
     `tree`: TiramisuTree
         The tree of the function
+
+    The attributes derived from the code (`body`, `comps`, `code_gen_line`, the buffers and the `wrappers`)
+    are parsed on first access and cached.
     """
 
     def __init__(self: "TiramisuProgram"):
         self.file_path = ""
         self.annotations: Dict | None = None
         self.isl_ast_string: str | None = None
-        self.comps: list[str] | None = None
         self.name: str | None = None
         # self.schedules_legality = {}
         # self.schedules_solver = {}
         self.schedules_dict: Dict = {}
         self.original_str: str | None = None
-        self.wrappers: Dict | None = None
         self.initial_execution_times = {}
-        # self.current_machine_initial_execution_time: float | None = None
+        self._current_machine_initial_execution_time: float | None = None
         self.tree: TiramisuTree = None
         self.wrapper_obj: bytes | None = None
+        self._dependence_analysis: DependenceAnalysis | None = None
 
     @classmethod
     def from_dict(
@@ -72,12 +102,18 @@ class TiramisuProgram:
         if "schedules_dict" in data:
             tiramisu_prog.schedules_dict = data["schedules_dict"]
 
-            # Initialize the initial_execution_times attribute and the current_machine_initial_execution_time attribute
-            if "initial_execution_times" in data:
-                tiramisu_prog.initial_execution_times = data["initial_execution_times"]
-            # if cfg.Config.config.tiramisu.hpc_name in data["initial_execution_times"]:
-            #     tiramisu_prog.current_machine_initial_execution_time = min(data[
-            #         "initial_execution_times"][cfg.Config.config.tiramisu.hpc_name])
+        # Initialize the initial_execution_times attribute and the current_machine_initial_execution_time attribute
+        if data.get("initial_execution_times"):
+            tiramisu_prog.initial_execution_times = data["initial_execution_times"]
+            hpc_name = (
+                BaseConfig.base_config.tiramisu.hpc_name
+                if BaseConfig.base_config
+                else None
+            )
+            if hpc_name in tiramisu_prog.initial_execution_times:
+                tiramisu_prog._current_machine_initial_execution_time = min(
+                    tiramisu_prog.initial_execution_times[hpc_name]
+                )
 
         if load_code_lines:
             tiramisu_prog.load_code_lines(original_str)
@@ -85,20 +121,7 @@ class TiramisuProgram:
         if wrapper_obj:
             tiramisu_prog.wrapper_obj = wrapper_obj
 
-        # construct the wrapper code
-        wrapper_cpp, wrapper_header = tiramisu_prog.construct_wrapper_code()
-
-        tiramisu_prog.wrappers = {"cpp": wrapper_cpp, "h": wrapper_header}
-        # If the current_machine_initial_execution_time attribute is not found in the data, compute itcio
-        # if not tiramisu_prog.current_machine_initial_execution_time:
-        #     tmp_exec_times = CompilingModule.CompilingService.get_cpu_exec_times(
-        #         tiramisu_program=tiramisu_prog, optims_list=[])
-        #     # Store the minimum execution time in the initial_execution_time attribute
-        #     tiramisu_prog.current_machine_initial_execution_time = min(
-        #         tmp_exec_times)
-
-        #     tiramisu_prog.initial_execution_times[
-        #         cfg.Config.config.tiramisu.hpc_name] = tmp_exec_times
+        # The wrappers and the current_machine_initial_execution_time are built on first access
 
         # After taking the neccessary fields return the instance
         if load_tree:
@@ -135,11 +158,6 @@ class TiramisuProgram:
         tiramisu_prog.file_path = file_path
         tiramisu_prog.load_code_lines()
 
-        # load the wrapper code
-        wrapper_cpp, wrapper_header = tiramisu_prog.construct_wrapper_code()
-
-        tiramisu_prog.wrappers = {"cpp": wrapper_cpp, "h": wrapper_header}
-
         if load_annotations:
             tiramisu_prog.annotations = json.loads(
                 CompilingService.compile_annotations(tiramisu_prog)
@@ -169,7 +187,8 @@ class TiramisuProgram:
 
     def load_code_lines(self, original_str: str | None = None):
         """
-        This function loads the file code , it is necessary to generate legality check code and annotations
+        This function loads the file code , it is necessary to generate legality check code and annotations.
+        The attributes derived from the code are parsed when they are first accessed.
         """
 
         if original_str:
@@ -183,38 +202,123 @@ class TiramisuProgram:
             if len(Path(self.file_path).parts) > 1
             else "."
         ) + "/"
-        self.body = re.findall(
-            r"(tiramisu::init(?s:.)+)tiramisu::codegen", self.original_str
-        )[0]
-        self.name = re.findall(r"tiramisu::init\(\"(\w+)\"\);", self.original_str)[0]
+        name_match = function_name_regex.search(self.original_str)
+        if name_match is None:
+            raise ValueError("No tiramisu::init call found in the code")
+        self.name = name_match.group(1)
         # Remove the wrapper include from the original string
         self.wrapper_str = f'#include "{self.name}_wrapper.h"'
         self.original_str = self.original_str.replace(
             self.wrapper_str, f"// {self.wrapper_str}"
         )
-        self.comps = re.findall(r"computation (\w+)\(", self.original_str)
-        self.code_gen_line = re.findall(r"tiramisu::codegen\({.+;", self.original_str)[
-            0
-        ]
-        buffers_vect = re.findall(r"{(.+)}", self.code_gen_line)[0]
-        self.IO_buffer_names = re.findall(r"\w+", buffers_vect)
-        self.buffer_sizes = []
-        for buf_name in self.IO_buffer_names:
-            sizes_vect = re.findall(
-                r"buffer " + buf_name + ".*{(.*)}", self.original_str
-            )[0]
-            self.buffer_sizes.append(re.findall(r"\d+", sizes_vect))
+        for attribute in lazy_code_attributes:
+            self.__dict__.pop(attribute, None)
         self.wrapper_is_compiled = False
 
+    def get_code(self) -> str:
+        if self.original_str is None:
+            raise ValueError("The code of the program is not loaded")
+        return self.original_str
+
+    @functools.cached_property
+    def body(self) -> str:
+        return code_body_regex.findall(self.get_code())[0]
+
+    @functools.cached_property
+    def comps(self) -> List[str] | None:
+        if self.original_str is None:
+            return None
+        return computation_name_regex.findall(self.original_str)
+
+    @functools.cached_property
+    def code_gen_line(self) -> str:
+        return code_gen_line_regex.findall(self.get_code())[0]
+
+    @functools.cached_property
+    def IO_buffer_names(self) -> List[str]:
+        buffers_vect = code_gen_buffers_regex.findall(self.code_gen_line)[0]
+        return identifier_regex.findall(buffers_vect)
+
+    @functools.cached_property
+    def IO_buffer_declarations(self) -> List[BufferDeclaration]:
+        # all the buffer declarations are parsed in a single pass over the code
+        buffer_declarations = parse_buffer_declarations(self.get_code())
+        return [buffer_declarations[buf_name] for buf_name in self.IO_buffer_names]
+
+    @functools.cached_property
+    def buffer_sizes(self) -> List[List[str]]:
+        return [
+            [str(size) for size in declaration.shape]
+            for declaration in self.IO_buffer_declarations
+        ]
+
+    @functools.cached_property
+    def wrappers(self) -> Dict[str, str] | None:
+        if self.original_str is None:
+            return None
+        wrapper_cpp, wrapper_header = self.construct_wrapper_code()
+        return {"cpp": wrapper_cpp, "h": wrapper_header}
+
+    def get_dependence_analysis(self) -> DependenceAnalysis | None:
+        """
+        Returns the dependence analysis of the annotations of the program, None when they aren't loaded
+        """
+        if not self.annotations:
+            return None
+        if self._dependence_analysis is None:
+            self._dependence_analysis = DependenceAnalysis.from_annotations(
+                self.annotations
+            )
+        return self._dependence_analysis
+
+    @property
+    def current_machine_initial_execution_time(self) -> float:
+        if self._current_machine_initial_execution_time is None:
+            self._current_machine_initial_execution_time = min(
+                self.get_current_machine_initial_execution_times()
+            )
+        return self._current_machine_initial_execution_time
+
+    @current_machine_initial_execution_time.setter
+    def current_machine_initial_execution_time(self, value: float | None):
+        self._current_machine_initial_execution_time = value
+
+    def get_current_machine_initial_execution_times(self) -> List[float]:
+        """
+        Returns the execution times of the unscheduled program on the current machine.
+        They are looked up in the baseline store and only measured, then stored, when missing.
+        """
+        fingerprint = MachineFingerprint.current()
+        if fingerprint.key in self.initial_execution_times:
+            return self.initial_execution_times[fingerprint.key]
+
+        baseline_store = BaselineStore.get_instance()
+        program_hash = get_program_hash(self)
+        execution_times = baseline_store.get(program_hash, fingerprint)
+        if execution_times is None:
+            assert BaseConfig.base_config
+            execution_times = CompilingService.get_cpu_exec_times(
+                tiramisu_program=self,
+                optims_list=[],
+                max_runs=BaseConfig.base_config.tiramisu.max_runs,
+            )
+            baseline_store.put(
+                program_hash, fingerprint, execution_times, program_name=self.name
+            )
+
+        self.initial_execution_times[fingerprint.key] = execution_times
+        return execution_times
+
     def construct_wrapper_code(
         self,
     ):  # construct the wrapper.cpp and wrapper.h from the program
         buffers_init_lines = ""
         for i, buffer_name in enumerate(self.IO_buffer_names):
+            c_type = self.IO_buffer_declarations[i].c_type
             buffers_init_lines += f"""
-    double *c_{buffer_name} = (double*)malloc({'*'.join(self.buffer_sizes[i][::-1])}* sizeof(double));
-    parallel_init_buffer(c_{buffer_name}, {'*'.join(self.buffer_sizes[i][::-1])}, (double){str(random.randint(1,10))});
-    Halide::Buffer<double> {buffer_name}(c_{buffer_name}, {','.join(self.buffer_sizes[i][::-1])});
+    {c_type} *c_{buffer_name} = ({c_type}*)malloc({'*'.join(self.buffer_sizes[i][::-1])}* sizeof({c_type}));
+    parallel_init_buffer(c_{buffer_name}, {'*'.join(self.buffer_sizes[i][::-1])}, ({c_type}){str(random.randint(1,10))});
+    Halide::Buffer<{c_type}> {buffer_name}(c_{buffer_name}, {','.join(self.buffer_sizes[i][::-1])});
     """
         if self.name is None:
             raise Exception("TiramisuProgram.name is None")
@@ -286,33 +390,36 @@ wrapper_h_template = """#include <tiramisu/utils.h>
 #include <vector>
 
 #define NB_THREAD_INIT 48
+template <typename T>
 struct args {
-    double *buf;
+    T *buf;
     unsigned long long int part_start;
     unsigned long long int part_end;
-    double value;
+    T value;
 };
 
+template <typename T>
 void *init_part(void *params)
 {
-   double *buffer = ((struct args*) params)->buf;
-   unsigned long long int start = ((struct args*) params)->part_start;
-   unsigned long long int end = ((struct args*) params)->part_end;
-   double val = ((struct args*) params)->value;
+   T *buffer = ((struct args<T>*) params)->buf;
+   unsigned long long int start = ((struct args<T>*) params)->part_start;
+   unsigned long long int end = ((struct args<T>*) params)->part_end;
+   T val = ((struct args<T>*) params)->value;
    for (unsigned long long int k = start; k < end; k++){
        buffer[k]=val;
    }
    pthread_exit(NULL);
 }
 
-void parallel_init_buffer(double* buf, unsigned long long int size, double value){
+template <typename T>
+void parallel_init_buffer(T* buf, unsigned long long int size, T value){
     pthread_t threads[NB_THREAD_INIT]; 
-    struct args params[NB_THREAD_INIT];
+    struct args<T> params[NB_THREAD_INIT];
     for (int i = 0; i < NB_THREAD_INIT; i++) {
         unsigned long long int start = i*size/NB_THREAD_INIT;
         unsigned long long int end = std::min((i+1)*size/NB_THREAD_INIT, size);
-        params[i] = (struct args){buf, start, end, value};
-        pthread_create(&threads[i], NULL, init_part, (void*)&(params[i])); 
+        params[i] = args<T>{buf, start, end, value};
+        pthread_create(&threads[i], NULL, init_part<T>, (void*)&(params[i])); 
     }
     for (int i = 0; i < NB_THREAD_INIT; i++) 
         pthread_join(threads[i], NULL); 
@@ -160,6 +160,7 @@ class TiramisuTree:
 
                 # Get the upper bound from the loop condition
                 matched_upper_bound = re.match(upper_bound_regex, loop_condition)
+                upper_bound_inclusive = matched_upper_bound is not None
                 if matched_upper_bound:
                     upper_bound = matched_upper_bound.group(1)
                 else:
@@ -189,6 +190,7 @@ class TiramisuTree:
                     if iterator_level == 0
                     else level_iterator_map[iterator_level - 1][-1],
                     level=iterator_level,
+                    upper_bound_inclusive=upper_bound_inclusive,
                 )
                 if iterator_level not in level_iterator_map:
                     level_iterator_map[iterator_level] = []
@@ -9,12 +9,23 @@ import yaml
 class TiramisuConfig:
     is_new_tiramisu: bool = False
     max_runs: int = 30
+    reuse_generator: bool = False
+    execution_backend: Literal["wrapper", "in_process"] = "wrapper"
+    nb_threads: int | None = None
+    cpu_affinity: str | None = None
+    numa_node: int | None = None
+    isolate_measurements: bool = False
+    hpc_name: str | None = None
+    static_legality_check: bool = True
+    dependence_analysis: bool = True
 
 
 @dataclass
 class AthenaConfig:
     tiramisu: TiramisuConfig
     workspace: str = "workspace"
+    baseline_store: str = "baselines.db"
+    result_store: str | None = None
     env_vars: Dict[str, str] = field(default_factory=dict)
 
     def __post_init__(self):
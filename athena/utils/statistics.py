@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Callable, List, Literal, Sequence, Tuple
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from athena.tiramisu.schedule import Schedule
+
+Decision = Literal["faster", "slower", "equivalent", "undecided"]
+
+
+@dataclass
+class ComparisonResult:
+    """
+    Result of the comparison of the execution times of a candidate against a reference.
+
+    Attributes
+    ----------
+    `speedup`: float
+        The estimated speedup of the candidate over the reference, the ratio of their medians
+    `low`: float
+        Lower bound of the confidence interval of the speedup
+    `high`: float
+        Upper bound of the confidence interval of the speedup
+    `p_value`: float
+        Two-sided Mann–Whitney p-value of the two samples coming from the same distribution
+    `decision`: str
+        `"faster"` or `"slower"` when the candidate is significantly faster or slower than the reference,
+        `"equivalent"` when the speedup is within the tolerance and `"undecided"` otherwise
+    `reference_times`: List[float]
+        The execution times of the reference
+    `candidate_times`: List[float]
+        The execution times of the candidate
+    """
+
+    speedup: float
+    low: float
+    high: float
+    p_value: float
+    decision: Decision
+    reference_times: List[float] = field(default_factory=list)
+    candidate_times: List[float] = field(default_factory=list)
+
+    @property
+    def is_decided(self) -> bool:
+        return self.decision != "undecided"
+
+
+def bootstrap_speedup(
+    reference_times: Sequence[float],
+    candidate_times: Sequence[float],
+    confidence: float = 0.95,
+    nb_resamples: int = 2000,
+    seed: int | None = 0,
+) -> Tuple[float, float, float]:
+    """
+    Estimates the speedup of the candidate over the reference as the ratio of the medians of
+    their execution times, with a percentile bootstrap confidence interval
+
+    Returns
+    -------
+    The speedup and the bounds of its confidence interval
+    """
+    reference = np.asarray(reference_times, dtype=np.float64)
+    candidate = np.asarray(candidate_times, dtype=np.float64)
+    if reference.size == 0 or candidate.size == 0:
+        raise ValueError("Both samples must contain at least one execution time")
+
+    rng = np.random.default_rng(seed)
+    # resample both samples at once, one row per bootstrap replicate
+    reference_medians = np.median(
+        rng.choice(reference, size=(nb_resamples, reference.size)), axis=1
+    )
+    candidate_medians = np.median(
+        rng.choice(candidate, size=(nb_resamples, candidate.size)), axis=1
+    )
+    ratios = reference_medians / candidate_medians
+
+    alpha = 1 - confidence
+    low, high = np.quantile(ratios, [alpha / 2, 1 - alpha / 2])
+    return (
+        float(np.median(reference) / np.median(candidate)),
+        float(low),
+        float(high),
+    )
+
+
+def mann_whitney_u(
+    reference_times: Sequence[float], candidate_times: Sequence[float]
+) -> Tuple[float, float]:
+    """
+    Mann–Whitney U test with the normal approximation and the tie correction
+
+    Returns
+    -------
+    The U statistic of the reference sample and the two-sided p-value
+    """
+    reference = np.asarray(reference_times, dtype=np.float64)
+    candidate = np.asarray(candidate_times, dtype=np.float64)
+    n1, n2 = reference.size, candidate.size
+    if n1 == 0 or n2 == 0:
+        raise ValueError("Both samples must contain at least one execution time")
+
+    values = np.concatenate([reference, candidate])
+    # average ranks of tied values
+    _, inverse, counts = np.unique(values, return_inverse=True, return_counts=True)
+    last_ranks = np.cumsum(counts)
+    average_ranks = last_ranks - (counts - 1) / 2
+    ranks = average_ranks[inverse]
+
+    u = float(ranks[:n1].sum() - n1 * (n1 + 1) / 2)
+    n = n1 + n2
+    tie_correction = float((counts**3 - counts).sum()) / (n * (n - 1)) if n > 1 else 0
+    variance = n1 * n2 / 12 * ((n + 1) - tie_correction)
+    if variance <= 0:
+        return u, 1.0
+
+    z = (abs(u - n1 * n2 / 2) - 0.5) / math.sqrt(variance)
+    p_value = math.erfc(max(z, 0) / math.sqrt(2))
+    return u, min(1.0, p_value)
+
+
+def compare_timings(
+    reference_times: Sequence[float],
+    candidate_times: Sequence[float],
+    method: Literal["bootstrap", "mann_whitney"] = "bootstrap",
+    confidence: float = 0.95,
+    tolerance: float = 0.02,
+    seed: int | None = 0,
+) -> ComparisonResult:
+    """
+    Compares the execution times of a candidate against a reference while accounting for the measurement noise
+
+    Parameters
+    ----------
+    `reference_times`: Sequence[float]
+        The execution times of the reference, e.g. the current best schedule
+    `candidate_times`: Sequence[float]
+        The execution times of the candidate
+    `method`: str
+        `"bootstrap"` decides with the confidence interval of the speedup, `"mann_whitney"` with the p-value of the rank test
+    `confidence`: float
+        The confidence level of the decision
+    `tolerance`: float
+        Speedups within `[1 / (1 + tolerance), 1 + tolerance]` are considered equivalent
+
+    Returns
+    -------
+    `ComparisonResult`
+        The speedup of the candidate over the reference and the decision
+    """
+    if method not in ["bootstrap", "mann_whitney"]:
+        raise ValueError(f"Unknown comparison method: {method}")
+
+    speedup, low, high = bootstrap_speedup(
+        reference_times, candidate_times, confidence=confidence, seed=seed
+    )
+    _, p_value = mann_whitney_u(reference_times, candidate_times)
+
+    decision: Decision = "undecided"
+    if method == "bootstrap":
+        if low > 1:
+            decision = "faster"
+        elif high < 1:
+            decision = "slower"
+        elif low >= 1 / (1 + tolerance) and high <= 1 + tolerance:
+            decision = "equivalent"
+    else:
+        if p_value < 1 - confidence:
+            decision = "faster" if speedup > 1 else "slower"
+        elif low >= 1 / (1 + tolerance) and high <= 1 + tolerance:
+            decision = "equivalent"
+
+    return ComparisonResult(
+        speedup=speedup,
+        low=low,
+        high=high,
+        p_value=p_value,
+        decision=decision,
+        reference_times=list(reference_times),
+        candidate_times=list(candidate_times),
+    )
+
+
+def evaluate_until_decided(
+    measure_reference: Callable[[int], List[float]],
+    measure_candidate: Callable[[int], List[float]],
+    initial_runs: int = 5,
+    additional_runs: int = 5,
+    max_runs: int = 30,
+    reference_times: Sequence[float] | None = None,
+    **comparison_kwargs,
+) -> ComparisonResult:
+    """
+    Measures the reference and the candidate and keeps adding repetitions only while their comparison is ambiguous
+
+    Parameters
+    ----------
+    `measure_reference`: Callable[[int], List[float]]
+        Returns the given number of execution times of the reference
+    `measure_candidate`: Callable[[int], List[float]]
+        Returns the given number of execution times of the candidate
+    `initial_runs`: int
+        The number of runs of each side before the first comparison
+    `additional_runs`: int
+        The number of runs added to each side while the comparison is undecided
+    `max_runs`: int
+        The maximum number of runs of each side
+    `reference_times`: Sequence[float] | None
+        Execution times of the reference that were already measured, e.g. for the current best schedule
+    `comparison_kwargs`:
+        Passed to `compare_timings`
+
+    Returns
+    -------
+    `ComparisonResult`
+        The last comparison, which may still be undecided once `max_runs` is reached
+    """
+    reference = list(reference_times) if reference_times else []
+    candidate: List[float] = []
+
+    def top_up(times: List[float], measure: Callable[[int], List[float]], target):
+        if len(times) < target:
+            times += measure(target - len(times))
+
+    target = min(initial_runs, max_runs)
+    while True:
+        top_up(reference, measure_reference, target)
+        top_up(candidate, measure_candidate, target)
+        result = compare_timings(reference, candidate, **comparison_kwargs)
+        if result.is_decided or target >= max_runs:
+            return result
+        target = min(target + additional_runs, max_runs)
+
+
+def compare_schedules(
+    reference: Schedule, candidate: Schedule, **kwargs
+) -> ComparisonResult:
+    """
+    Compares the execution times of two schedules, running repetitions only while the comparison is ambiguous.
+    The keyword arguments are passed to `evaluate_until_decided`.
+    """
+    return evaluate_until_decided(
+        measure_reference=lambda nb_runs: reference.execute(nb_exec_tiems=nb_runs),
+        measure_candidate=lambda nb_runs: candidate.execute(nb_exec_tiems=nb_runs),
+        **kwargs,
+    )
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+import tests.utils as test_utils
+from athena.cost_models.cost_model import (
+    AnalyticalCostModel,
+    CostModel,
+    FunctionCostModel,
+    get_cost_model,
+)
+from athena.tiramisu.schedule import Schedule
+from athena.utils.config import BaseConfig
+
+
+def test_analytical_cost_model():
+    BaseConfig.init()
+    program = test_utils.interchange_example()
+    schedules = Schedule.from_sched_strs(
+        [
+            "",
+            "P(L0,comps=['comp00'])",
+            "I(L1,L2,comps=['comp00'])",
+            "U(L2,8,comps=['comp00'])",
+        ],
+        program,
+    )
+    model = AnalyticalCostModel(nb_cores=8)
+
+    predictions = model.predict(schedules)
+    assert predictions.shape == (4,)
+    assert predictions[0] == 1.0
+    # parallelizing the outermost loop uses the 8 cores
+    assert predictions[1] == pytest.approx(8 * 0.9)
+    # the innermost loop walks the last dimension of the buffers, moving it outwards breaks the contiguous accesses
+    assert predictions[2] < 1.0
+    assert predictions[3] > 1.0
+
+    ranked = model.rank(schedules, k=2)
+    assert [schedule for schedule, _ in ranked] == [schedules[1], schedules[3]]
+    assert model(schedules[1]) == predictions[1]
+
+
+def test_external_cost_models():
+    BaseConfig.init()
+    program = test_utils.interchange_example()
+    schedules = [Schedule(program), Schedule(program)]
+
+    model = get_cost_model(
+        "function", predict_function=lambda schedules: [2.0] * len(schedules)
+    )
+    assert isinstance(model, FunctionCostModel)
+    assert np.array_equal(model.predict(schedules), [2.0, 2.0])
+    with pytest.raises(ValueError):
+        FunctionCostModel(lambda schedules: [1.0]).predict(schedules)
+
+    model = get_cost_model("athena.cost_models.cost_model:AnalyticalCostModel")
+    assert isinstance(model, AnalyticalCostModel)
+    with pytest.raises(ValueError):
+        get_cost_model("unknown")
+    with pytest.raises(NotImplementedError):
+        CostModel().predict(schedules)
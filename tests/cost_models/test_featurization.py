@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+import tests.utils as test_utils
+from athena.cost_models.featurization import (
+    FeaturizationError,
+    FeaturizedCostModel,
+    ScheduleFeaturizer,
+)
+from athena.tiramisu.schedule import Schedule
+from athena.utils.config import BaseConfig
+
+
+def test_featurize_batch():
+    BaseConfig.init()
+    program = test_utils.interchange_example()
+    schedules = Schedule.from_sched_strs(
+        [
+            "",
+            "I(L0,L2,comps=['comp00'])|P(L0,comps=['comp00'])",
+            "S(L0,L1,1,1,comps=['comp00'])|R(L2,comps=['comp00'])|U(L2,8,comps=['comp00'])",
+        ],
+        program,
+    )
+    featurizer = ScheduleFeaturizer(max_comps=2, max_depth=4, max_actions=4)
+
+    features = featurizer.featurize(schedules)
+    for name, shape in featurizer.get_shapes().items():
+        assert features[name].shape == (3, *shape)
+
+    assert features["comp_mask"][0].tolist() == [1, 0]
+    assert features["loop_extents"][0, 0].tolist() == pytest.approx(
+        [5, 5, np.log2(96), 0]
+    )
+    # the reads and the write buf00[i1, i2]
+    assert features["access_mask"][0, 0].sum() == 3
+    assert features["access_matrices"][0, 0, 2, :2, :].tolist() == [
+        [0, 1, 0, 0, 0],
+        [0, 0, 1, 0, 0],
+    ]
+
+    assert features["action_mask"].sum(axis=1).tolist() == [0, 2, 3]
+    assert features["transformations"][1, 0, :3, :3].tolist() == [
+        [0, 0, 1],
+        [0, 1, 0],
+        [1, 0, 0],
+    ]
+    assert features["parallel"][1, 0].tolist() == [1, 0, 0, 0]
+    assert features["transformations"][2, 0, :3, :3].tolist() == [
+        [1, 1, 0],
+        [-1, 0, 0],
+        [0, 0, -1],
+    ]
+    assert features["unrolling"][2, 0, 2] == 3
+
+    # the program features are computed once
+    assert len(featurizer._programs) == 1
+
+    with pytest.raises(FeaturizationError):
+        ScheduleFeaturizer(max_depth=2).featurize(schedules)
+    with pytest.raises(FeaturizationError):
+        ScheduleFeaturizer(max_actions=2).featurize(schedules)
+
+
+def test_featurized_cost_model():
+    BaseConfig.init()
+    program = test_utils.interchange_example()
+    schedules = Schedule.from_sched_strs(
+        ["", "P(L0,comps=['comp00'])|U(L2,4,comps=['comp00'])"], program
+    )
+
+    model = FeaturizedCostModel(
+        lambda features: 1 + features["parallel"].sum(axis=(1, 2))
+    )
+    assert model.predict(schedules).tolist() == [1.0, 2.0]
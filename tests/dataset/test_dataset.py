@@ -0,0 +1,57 @@
+import pytest
+
+import tests.utils as test_utils
+from athena.dataset.dataset import Dataset, DatasetWriter, convert_pickled_dataset
+from athena.utils.config import BaseConfig
+
+
+def test_convert_pickled_dataset(tmp_path):
+    BaseConfig.init()
+    test_data, test_cpps = test_utils.load_test_data()
+
+    nb_programs = convert_pickled_dataset(
+        "examples/test_data.pkl",
+        "examples/test_data_cpps.pkl",
+        str(tmp_path / "dataset"),
+        shard_size=10000,
+    )
+
+    with Dataset(str(tmp_path / "dataset")) as dataset:
+        assert nb_programs == len(dataset) == len(test_data)
+        assert list(dataset.names) == sorted(test_data)
+
+        record = dataset["function837782"]
+        assert record.annotations == test_data["function837782"]["program_annotation"]
+        assert record.data == test_data["function837782"]
+        assert record.cpp_code == test_cpps["function837782"]
+        assert record.wrapper_obj is None
+
+        program = record.to_tiramisu_program()
+        assert program.name == "function837782"
+        assert program.tree.roots == test_utils.interchange_example().tree.roots
+
+        # the records are split across several shards
+        assert len({int(entry["shard"]) for entry in dataset.index}) > 1
+
+
+def test_dataset_lookup(tmp_path):
+    with DatasetWriter(str(tmp_path / "dataset")) as writer:
+        writer.add("b", {"program_annotation": {"computations": {}}}, "code b", b"\0")
+        writer.add("a", {"program_annotation": None, "extra": 1})
+
+    with Dataset(str(tmp_path / "dataset")) as dataset:
+        assert "a" in dataset and "c" not in dataset
+        assert dataset["b"].wrapper_obj == b"\0"
+        assert dataset["a"].data == {"program_annotation": None, "extra": 1}
+        assert dataset["a"].cpp_code is None
+        assert [record.name for record in dataset.iter_records(start=1)] == ["b"]
+        with pytest.raises(KeyError):
+            dataset["c"]
+
+
+def test_duplicate_names(tmp_path):
+    writer = DatasetWriter(str(tmp_path / "dataset"))
+    writer.add("a", {})
+    writer.add("a", {})
+    with pytest.raises(ValueError):
+        writer.close()
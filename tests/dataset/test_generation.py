@@ -0,0 +1,116 @@
+import json
+import os
+import random
+
+import tests.utils as test_utils
+from athena.dataset.generation import (
+    CHECKPOINT_FILE,
+    ShardedRecordWriter,
+    get_shard_paths,
+    iter_records,
+    run_generation,
+    sample_schedule,
+)
+from athena.tiramisu.tiramisu_actions import TiramisuActionType
+from athena.utils.config import BaseConfig
+
+ACTION_TYPES = [
+    TiramisuActionType.PARALLELIZATION,
+    TiramisuActionType.INTERCHANGE,
+    TiramisuActionType.UNROLLING,
+]
+
+
+def get_backend():
+    return test_utils.FakeBackend(
+        lambda sched_str: float(len(sched_str)),
+        is_legal=lambda sched_str: "P(L1" not in sched_str,
+        machine="worker",
+        baseline_time=100.0,
+    )
+
+
+def get_programs():
+    programs = []
+    for name in ["program0", "program1"]:
+        program = test_utils.interchange_example()
+        program.name = name
+        programs.append(program)
+    return programs
+
+
+def test_sample_schedule():
+    BaseConfig.init()
+    program = test_utils.interchange_example()
+    rng = random.Random(0)
+
+    for _ in range(5):
+        schedule = sample_schedule(program, 3, rng, action_types=ACTION_TYPES)
+        assert 1 <= len(schedule.optims_list) <= 3
+        assert all(action.type in ACTION_TYPES for action in schedule.optims_list)
+
+
+def test_sharded_record_writer(tmp_path):
+    folder = str(tmp_path / "records")
+    with ShardedRecordWriter(folder, shard_records=2) as writer:
+        for index in range(3):
+            assert writer.add({"program": "p", "canonical_schedule": str(index)})
+        assert not writer.add({"program": "p", "canonical_schedule": "0"})
+        writer.finish_program("p")
+        # the last record isn't in a complete shard yet
+        assert len(get_shard_paths(folder)) == 1
+        assert writer.completed_programs == set()
+
+    assert len(get_shard_paths(folder)) == 2
+    with open(os.path.join(folder, CHECKPOINT_FILE)) as f:
+        assert json.load(f)["completed_programs"] == ["p"]
+
+    # the records of an interrupted shard are dropped
+    writer = ShardedRecordWriter(folder, shard_records=2)
+    assert writer.contains("p", "2")
+    writer.add({"program": "q", "canonical_schedule": "0"})
+    writer.shard_file.close()
+    writer = ShardedRecordWriter(folder, shard_records=2)
+    assert not writer.contains("q", "0")
+    assert writer.next_shard_id == 2
+    assert len(list(iter_records(folder))) == 3
+
+
+def test_run_generation(tmp_path):
+    BaseConfig.init()
+    folder = str(tmp_path / "records")
+    backend = get_backend()
+
+    stats = run_generation(
+        get_programs(),
+        folder,
+        nb_schedules=4,
+        backend=backend,
+        shard_records=3,
+        max_depth=2,
+        action_types=ACTION_TYPES,
+    )
+
+    records = list(iter_records(folder))
+    assert stats["processed"] == 2 and stats["records"] == len(records)
+    # the schedules of a program are measured in a single batch
+    assert len(backend.batches) == 2
+    assert all(record["legal"] for record in records)
+    keys = {(record["program"], record["canonical_schedule"]) for record in records}
+    assert len(keys) == len(records)
+    assert all(
+        record["execution_times"] == [float(len(record["schedule"]))]
+        for record in records
+    )
+    # the records hold the machine and the baseline reported by the worker
+    assert all(
+        record["machine"] == "worker" and record["baseline_time"] == 100.0
+        for record in records
+    )
+
+    # the completed programs are skipped when the generation is resumed
+    stats = run_generation(
+        get_programs(), folder, nb_schedules=4, backend=backend, shard_records=3
+    )
+    assert stats == {"processed": 0, "skipped": 2, "records": 0}
+    assert len(backend.batches) == 2
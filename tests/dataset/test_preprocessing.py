@@ -0,0 +1,74 @@
+import os
+import shutil
+
+from athena.dataset.dataset import Dataset
+from athena.dataset.preprocessing import FAILURES_FILE, main, run_preprocessing
+from athena.utils.config import BaseConfig
+
+
+def test_run_preprocessing(tmp_path):
+    BaseConfig.init()
+    input_folder = tmp_path / "generators"
+    input_folder.mkdir()
+    shutil.copy("examples/function_matmul_MEDIUM.cpp", input_folder)
+    shutil.copy("examples/function_blur_MINI_generator.cpp", input_folder)
+    (input_folder / "broken.cpp").write_text("int main() { return 0; }")
+    output_folder = str(tmp_path / "dataset")
+
+    stats = run_preprocessing(str(input_folder), output_folder, steps=[], nb_workers=2)
+
+    assert stats == {"processed": 2, "skipped": 0, "failed": 1}
+    assert os.path.exists(os.path.join(output_folder, FAILURES_FILE))
+    with Dataset(output_folder) as dataset:
+        assert len(dataset) == 2
+        record = dataset[0]
+        assert record.cpp_code and "tiramisu::codegen" in record.cpp_code
+
+    # the processed programs are not processed again
+    stats = run_preprocessing(
+        str(input_folder), output_folder, steps=[], retry_failed=False
+    )
+    assert stats == {"processed": 0, "skipped": 3, "failed": 0}
+    with Dataset(output_folder) as dataset:
+        assert len(dataset) == 2
+
+
+def test_preprocessing_subfolders(tmp_path):
+    BaseConfig.init()
+    input_folder = tmp_path / "generators"
+    for subfolder, example in [
+        ("matmul", "examples/function_matmul_MEDIUM.cpp"),
+        ("blur", "examples/function_blur_MINI_generator.cpp"),
+    ]:
+        (input_folder / subfolder).mkdir(parents=True)
+        shutil.copy(example, input_folder / subfolder / "generator.cpp")
+    output_folder = str(tmp_path / "dataset")
+
+    stats = run_preprocessing(str(input_folder), output_folder, steps=[])
+
+    # the generators with the same file name are staged separately
+    assert stats == {"processed": 2, "skipped": 0, "failed": 0}
+    with Dataset(output_folder) as dataset:
+        assert len(dataset) == 2
+
+
+def test_preprocessing_cli(tmp_path):
+    input_folder = tmp_path / "generators"
+    input_folder.mkdir()
+    shutil.copy("examples/function_matmul_MEDIUM.cpp", input_folder)
+
+    main(
+        [
+            str(input_folder),
+            str(tmp_path / "dataset"),
+            "--steps",
+            "",
+            "--workers",
+            "1",
+            "--clean-staging",
+        ]
+    )
+
+    with Dataset(str(tmp_path / "dataset")) as dataset:
+        assert len(dataset) == 1
+    assert not os.path.exists(tmp_path / "dataset" / "staging")
@@ -0,0 +1,111 @@
+import os
+import time
+
+import tests.utils as test_utils
+from athena.evaluation.backend import (
+    EvaluationBackend,
+    EvaluationResult,
+    evaluate_schedule,
+    get_speedup,
+)
+from athena.storage.baseline_store import MachineFingerprint
+from athena.tiramisu.schedule import Schedule
+from athena.utils.config import BaseConfig
+
+
+def test_evaluate_schedule_in_job_workspace(monkeypatch, tmp_path):
+    BaseConfig.init()
+    BaseConfig.base_config.workspace = str(tmp_path)
+    program = test_utils.interchange_example()
+    machine = MachineFingerprint.current().key
+    program.initial_execution_times[machine] = [5.0, 4.0]
+    workspaces = []
+
+    def is_legal(schedule, with_ast=False):
+        workspaces.append(BaseConfig.base_config.workspace)
+        assert os.path.isdir(
+            os.path.join(BaseConfig.base_config.workspace, "generators")
+        )
+        return True
+
+    def execute(schedule, nb_exec_tiems=1, **kwargs):
+        if "U(" in str(schedule):
+            raise RuntimeError("crashed")
+        return [2.0, 1.0]
+
+    monkeypatch.setattr(Schedule, "is_legal", is_legal)
+    monkeypatch.setattr(Schedule, "execute", execute)
+
+    result = evaluate_schedule(program, "P(L0,comps=['comp00'])")
+    assert result.legal and result.execution_time == 1.0
+    # the result carries the baseline of the machine it was measured on
+    assert result.machine == machine and result.baseline_time == 4.0
+    assert get_speedup(program, result) == 4.0
+    assert evaluate_schedule(program, "", measure=False).baseline_time is None
+    result = evaluate_schedule(program, "U(L2,4,comps=['comp00'])")
+    assert result.legal and result.execution_times is None
+    assert result.error == "RuntimeError: crashed"
+    result = evaluate_schedule(program, "P(L7,comps=['comp00'])")
+    assert result.legal is None and result.error
+
+    # each job had a workspace of its own, removed when it finished
+    assert len(set(workspaces)) == 3
+    assert all(os.path.dirname(workspace) == str(tmp_path) for workspace in workspaces)
+    assert os.listdir(tmp_path) == ["generators"]
+    assert BaseConfig.base_config.workspace == str(tmp_path)
+
+
+def test_backend_timeout(monkeypatch, tmp_path):
+    BaseConfig.init()
+    BaseConfig.base_config.workspace = str(tmp_path)
+    program = test_utils.interchange_example()
+    monkeypatch.setattr(Schedule, "is_legal", lambda schedule, with_ast=False: False)
+
+    with EvaluationBackend() as backend:
+        results = backend.evaluate(
+            program, ["", "R(L0,comps=['comp00'])"], measure=False
+        )
+        assert [result.sched_str for result in results] == [
+            "",
+            "R(L0,comps=['comp00'])",
+        ]
+        assert backend.evaluate(program, [""], timeout=0) == []
+
+
+def test_backend_stops_running_evaluations(monkeypatch):
+    BaseConfig.init()
+    program = test_utils.interchange_example()
+
+    def is_legal(schedule, with_ast=False):
+        if str(schedule):
+            time.sleep(60)
+        return False
+
+    # the forked workers inherit the patched method
+    monkeypatch.setattr(Schedule, "is_legal", is_legal)
+
+    with EvaluationBackend(nb_workers=2) as backend:
+        start = time.monotonic()
+        results = backend.evaluate(
+            program, ["", "R(L0,comps=['comp00'])"], measure=False, timeout=2
+        )
+        assert [result.sched_str for result in results] == [""]
+        assert time.monotonic() - start < 30 and backend.executor is None
+
+        # a new pool runs the next evaluations
+        assert len(backend.evaluate(program, [""], measure=False)) == 1
+        processes = list(backend.executor._processes.values())
+    assert processes and not any(process.is_alive() for process in processes)
+
+
+def test_get_speedup():
+    BaseConfig.init()
+    program = test_utils.interchange_example()
+    program.current_machine_initial_execution_time = 10.0
+
+    # the baseline of the measurement machine is preferred to the one of the current machine
+    assert get_speedup(program, EvaluationResult("", True, [5.0])) == 2.0
+    assert (
+        get_speedup(program, EvaluationResult("", True, [5.0], baseline_time=20.0))
+        == 4.0
+    )
@@ -0,0 +1,118 @@
+import threading
+
+import tests.utils as test_utils
+from athena.evaluation.backend import EvaluationResult
+from athena.evaluation.work_queue import (
+    EXECUTION_JOB,
+    LEGALITY_JOB,
+    QueueBackend,
+    QueueWorker,
+    SQLiteWorkQueue,
+)
+from athena.storage.baseline_store import get_program_hash
+from athena.utils.config import BaseConfig
+
+
+class FakeWorker(QueueWorker):
+    def process(self, job):
+        result = EvaluationResult(job.sched_str, legal="P(L1" not in job.sched_str)
+        if job.kind == EXECUTION_JOB:
+            assert job.legality
+            result.execution_times = [float(len(job.sched_str))]
+        self.queue.complete(job.job_id, result)
+        self.nb_processed += 1
+        return result
+
+
+def test_publish_and_load_program(tmp_path):
+    BaseConfig.init()
+    program = test_utils.interchange_example()
+    queue = SQLiteWorkQueue(str(tmp_path / "queue.db"))
+    program_id = queue.publish_program(program)
+
+    loaded = SQLiteWorkQueue(queue.path).load_program(program_id)
+    assert loaded.name == program.name
+    assert get_program_hash(loaded) == program_id
+    assert loaded.annotations == program.annotations
+    assert list(loaded.tree.iterators) == list(program.tree.iterators)
+
+
+def test_claim(tmp_path):
+    queue = SQLiteWorkQueue(str(tmp_path / "queue.db"), lease_timeout=0, max_attempts=2)
+    low = queue.submit("program", ["A"], LEGALITY_JOB)
+    high = queue.submit("program", ["B"], LEGALITY_JOB, priority=1.0)
+    execution = queue.submit("program", ["C"], EXECUTION_JOB, legalities=[True])
+
+    job = queue.claim("worker0", [EXECUTION_JOB])
+    assert job and job.job_id == execution[0] and job.legality is True
+    # the jobs with the highest priority are claimed first
+    job = queue.claim("worker0", [LEGALITY_JOB])
+    assert job and job.job_id == high[0]
+    queue.complete(job.job_id, EvaluationResult("B", legal=True))
+    assert queue.get_results(high)[high[0]].legal
+
+    # a job whose lease expired is given to another worker, until its attempts are exhausted
+    job = queue.claim("worker0", [LEGALITY_JOB])
+    assert job and job.job_id == low[0]
+    job = queue.claim("worker1", [LEGALITY_JOB])
+    assert job and job.job_id == low[0]
+    assert queue.claim("worker2", [LEGALITY_JOB]) is None
+    assert queue.get_results(low)[low[0]].error
+
+    queue.cancel(execution)
+    assert queue.get_counts() == {"done": 2}
+
+
+def test_queue_backend(tmp_path):
+    BaseConfig.init()
+    program = test_utils.interchange_example()
+    queue = SQLiteWorkQueue(str(tmp_path / "queue.db"))
+    sched_strs = ["P(L0,comps=['comp00'])", "P(L1,comps=['comp00'])"]
+
+    # legality jobs and execution jobs are evaluated by different workers
+    workers = [
+        FakeWorker(SQLiteWorkQueue(queue.path), [kind])
+        for kind in [LEGALITY_JOB, EXECUTION_JOB]
+    ]
+    threads = [
+        threading.Thread(
+            target=worker.run,
+            kwargs={"idle_timeout": 2, "poll_interval": 0.01},
+        )
+        for worker in workers
+    ]
+    for thread in threads:
+        thread.start()
+    backend = QueueBackend(queue, poll_interval=0.01)
+    results = backend.evaluate(program, sched_strs)
+    legality_results = backend.evaluate(program, sched_strs, measure=False)
+    for thread in threads:
+        thread.join()
+
+    assert [result.legal for result in results] == [True, False]
+    assert results[0].execution_times == [float(len(sched_strs[0]))]
+    assert results[1].execution_times is None
+    assert all(result.execution_times is None for result in legality_results)
+    assert workers[0].nb_processed == 4 and workers[1].nb_processed == 1
+
+
+def test_queue_backend_timeout(tmp_path):
+    BaseConfig.init()
+    program = test_utils.interchange_example()
+    queue = SQLiteWorkQueue(str(tmp_path / "queue.db"))
+    backend = QueueBackend(queue, poll_interval=0.01)
+
+    # without workers, the jobs are cancelled when the timeout is reached
+    assert backend.evaluate(program, ["P(L0,comps=['comp00'])"], timeout=0.05) == []
+    assert queue.get_counts() == {}
+
+
+def test_worker_records_errors(tmp_path):
+    queue = SQLiteWorkQueue(str(tmp_path / "queue.db"))
+    job_ids = queue.submit("unknown", ["P(L0,comps=['comp00'])"], LEGALITY_JOB)
+
+    worker = QueueWorker(queue)
+    worker.run(max_jobs=1)
+
+    result = queue.get_results(job_ids)[job_ids[0]]
+    assert result.legal is None and "isn't published" in result.error
@@ -0,0 +1,91 @@
+import tests.utils as test_utils
+from athena.cost_models.cost_model import FunctionCostModel
+from athena.search_methods.beam_search import beam_search
+from athena.tiramisu.tiramisu_actions import TiramisuActionType
+from athena.utils.config import BaseConfig
+
+ACTION_TYPES = [
+    TiramisuActionType.PARALLELIZATION,
+    TiramisuActionType.INTERCHANGE,
+    TiramisuActionType.UNROLLING,
+]
+
+
+def get_time(sched_str):
+    # parallelizing the outermost loop after interchanging it is the fastest
+    time = 8.0 if sched_str.startswith("I(L0,L1") else 10.0
+    if "P(L0" in sched_str:
+        time /= 2
+    return time
+
+
+def get_backend():
+    return test_utils.FakeBackend(
+        get_time, is_legal=lambda sched_str: "P(L1" not in sched_str
+    )
+
+
+def test_beam_search():
+    BaseConfig.init()
+    program = test_utils.interchange_example()
+    program.current_machine_initial_execution_time = 10.0
+    backend = get_backend()
+
+    result = beam_search(
+        program, beam_size=2, max_depth=2, backend=backend, action_types=ACTION_TYPES
+    )
+
+    assert result.best_speedup == 2.5
+    assert str(result.best_schedule) == (
+        "I(L0,L1,comps=['comp00'])|P(L0,comps=['comp00'])"
+    )
+    assert result.depth == 2 and not result.budget_exhausted
+    assert result.nb_evaluated == sum(len(batch) for batch in backend.batches)
+    # the children of the whole beam are evaluated in a single batch
+    assert len(backend.batches) == 2
+    # equivalent schedules are only evaluated once
+    assert len(set(backend.batches[1])) == len(backend.batches[1])
+
+
+def test_beam_search_predictor_and_budget():
+    BaseConfig.init()
+    program = test_utils.interchange_example()
+    backend = get_backend()
+
+    result = beam_search(
+        program,
+        max_depth=1,
+        backend=backend,
+        predictor=lambda schedule: 3.0 if "U(" in str(schedule) else 1.5,
+        action_types=ACTION_TYPES,
+    )
+    assert result.best_speedup == 3.0
+    assert str(result.best_schedule).startswith("U(")
+
+    result = beam_search(program, backend=backend, time_budget=0)
+    assert result.budget_exhausted and result.nb_evaluated == 0
+    assert not result.best_schedule.optims_list
+
+
+def test_beam_search_measures_top_predictions():
+    BaseConfig.init()
+    program = test_utils.interchange_example()
+    program.current_machine_initial_execution_time = 10.0
+    backend = get_backend()
+    cost_model = FunctionCostModel(
+        lambda schedules: [
+            2.0 if "P(L0" in str(schedule) else 1.0 for schedule in schedules
+        ]
+    )
+
+    result = beam_search(
+        program,
+        beam_size=1,
+        max_depth=1,
+        backend=backend,
+        cost_model=cost_model,
+        nb_measured=1,
+        action_types=ACTION_TYPES,
+    )
+    assert backend.batches == [["P(L0,comps=['comp00'])"]]
+    assert result.best_speedup == 2.0
@@ -0,0 +1,183 @@
+import json
+import pytest
+
+import tests.utils as test_utils
+from athena.search_methods.beam_search import beam_search
+from athena.search_methods.checkpoint import SearchCheckpoint
+from athena.search_methods.evolutionary import EvolutionarySearch
+from athena.search_methods.mcts import MonteCarloTreeSearch
+from athena.tiramisu.tiramisu_actions import TiramisuActionType
+from athena.utils.config import BaseConfig
+
+ACTION_TYPES = [
+    TiramisuActionType.PARALLELIZATION,
+    TiramisuActionType.INTERCHANGE,
+    TiramisuActionType.UNROLLING,
+]
+
+
+def get_time(sched_str):
+    time = 10.0
+    if "P(L0" in sched_str:
+        time /= 2
+    if "U(L2" in sched_str:
+        time /= 2
+    return time
+
+
+def get_program():
+    BaseConfig.init()
+    program = test_utils.interchange_example()
+    program.current_machine_initial_execution_time = 10.0
+    return program
+
+
+def test_beam_search_resumes(tmp_path):
+    program = get_program()
+    path = str(tmp_path / "beam.json")
+    backend = test_utils.FakeBackend(get_time)
+
+    first = beam_search(
+        program,
+        beam_size=2,
+        max_depth=1,
+        backend=backend,
+        checkpoint=path,
+        action_types=ACTION_TYPES,
+    )
+    nb_first = len(backend.evaluated)
+    result = beam_search(
+        program,
+        beam_size=2,
+        max_depth=2,
+        backend=backend,
+        checkpoint=path,
+        action_types=ACTION_TYPES,
+    )
+
+    assert first.depth == 1 and result.depth == 2
+    assert result.best_speedup == 4.0
+    assert result.nb_evaluated == len(backend.evaluated) > nb_first
+    # the first level isn't evaluated again
+    assert len(set(backend.evaluated)) == len(backend.evaluated)
+    assert all(sched_str.count("|") == 1 for sched_str in backend.evaluated[nb_first:])
+
+
+def test_beam_search_resumes_a_partial_level(tmp_path):
+    program = get_program()
+    kwargs = dict(beam_size=2, max_depth=2, action_types=ACTION_TYPES)
+    uninterrupted_backend = test_utils.FakeBackend(get_time)
+    uninterrupted = beam_search(program, backend=uninterrupted_backend, **kwargs)
+
+    path = str(tmp_path / "beam.json")
+    backend = test_utils.FakeBackend(get_time, limit=3)
+    first = beam_search(program, backend=backend, checkpoint=path, **kwargs)
+    assert first.budget_exhausted and first.depth == 0
+    backend.limit = None
+    resumed = beam_search(program, backend=backend, checkpoint=path, **kwargs)
+
+    # the children of the first level left by the budget are evaluated before the second level
+    assert backend.evaluated == uninterrupted_backend.evaluated
+    assert resumed.depth == uninterrupted.depth == 2
+    assert resumed.best_speedup == uninterrupted.best_speedup == 4.0
+    assert resumed.nb_evaluated == len(backend.evaluated)
+
+
+def test_mcts_resumes(tmp_path):
+    program = get_program()
+    path = str(tmp_path / "mcts.json")
+    backend = test_utils.FakeBackend(get_time)
+
+    search = MonteCarloTreeSearch(
+        program,
+        backend=backend,
+        max_depth=2,
+        checkpoint=path,
+        action_types=ACTION_TYPES,
+    )
+    search.run(max_evaluations=3)
+    search = MonteCarloTreeSearch(
+        program,
+        backend=backend,
+        max_depth=2,
+        checkpoint=path,
+        action_types=ACTION_TYPES,
+    )
+    assert search.nb_evaluated == 3 and len(search.table) == 4
+    result = search.run(max_evaluations=20)
+
+    assert result.nb_evaluated == len(backend.evaluated) == 23
+    assert result.best_speedup == 4.0
+    assert len(set(backend.evaluated)) == len(backend.evaluated)
+
+
+def test_evolutionary_search_resumes(tmp_path):
+    program = get_program()
+    kwargs = dict(population_size=6, max_depth=3, action_types=ACTION_TYPES, seed=0)
+
+    backend = test_utils.FakeBackend(get_time)
+    uninterrupted = EvolutionarySearch(program, backend=backend, **kwargs).run(
+        nb_generations=4
+    )
+
+    path = str(tmp_path / "evolution.json")
+    resumed_backend = test_utils.FakeBackend(get_time)
+    EvolutionarySearch(program, backend=resumed_backend, checkpoint=path, **kwargs).run(
+        nb_generations=2
+    )
+    search = EvolutionarySearch(
+        program, backend=resumed_backend, checkpoint=path, **kwargs
+    )
+    assert search.nb_generations == 3 and len(search.population) == 6
+    resumed = search.run(nb_generations=4)
+
+    # the random generator is restored so the resumed search evaluates the same schedules
+    assert resumed_backend.evaluated == backend.evaluated
+    assert resumed.nb_generations == uninterrupted.nb_generations == 5
+    assert resumed.best_speedup == uninterrupted.best_speedup
+
+
+def test_evolutionary_search_resumes_a_partial_generation(tmp_path):
+    program = get_program()
+    kwargs = dict(population_size=6, max_depth=3, action_types=ACTION_TYPES, seed=0)
+    backend = test_utils.FakeBackend(get_time)
+    uninterrupted = EvolutionarySearch(program, backend=backend, **kwargs).run(
+        nb_generations=3
+    )
+
+    path = str(tmp_path / "evolution.json")
+    resumed_backend = test_utils.FakeBackend(get_time, limit=4)
+    first = EvolutionarySearch(
+        program, backend=resumed_backend, checkpoint=path, **kwargs
+    ).run(nb_generations=3)
+    assert first.budget_exhausted and first.nb_generations == 0
+    resumed_backend.limit = None
+    resumed = EvolutionarySearch(
+        program, backend=resumed_backend, checkpoint=path, **kwargs
+    ).run(nb_generations=3)
+
+    # the schedules of the initial population left by the budget are evaluated before it evolves
+    assert resumed_backend.evaluated == backend.evaluated
+    assert resumed.nb_generations == uninterrupted.nb_generations == 4
+    assert resumed.best_speedup == uninterrupted.best_speedup
+
+
+def test_checkpoint_of_another_search(tmp_path):
+    program = get_program()
+    path = str(tmp_path / "beam.json")
+    beam_search(
+        program,
+        max_depth=1,
+        backend=test_utils.FakeBackend(get_time),
+        checkpoint=path,
+        action_types=ACTION_TYPES,
+    )
+    with open(path) as f:
+        assert json.load(f)["method"] == "beam_search"
+
+    with pytest.raises(ValueError):
+        MonteCarloTreeSearch(
+            program,
+            backend=test_utils.FakeBackend(get_time),
+            checkpoint=SearchCheckpoint(path),
+        )
@@ -0,0 +1,124 @@
+import functools
+
+import tests.utils as test_utils
+from athena.search_methods.beam_search import beam_search
+from athena.search_methods.driver import (
+    BudgetedBackend,
+    SearchBudget,
+    SearchDriver,
+    SearchReport,
+)
+from athena.search_methods.mcts import mcts_search
+from athena.tiramisu.tiramisu_actions import TiramisuActionType
+from athena.utils.config import BaseConfig
+
+ACTION_TYPES = [
+    TiramisuActionType.PARALLELIZATION,
+    TiramisuActionType.INTERCHANGE,
+    TiramisuActionType.UNROLLING,
+]
+
+
+def get_programs():
+    BaseConfig.init()
+    programs = []
+    for name in ["program0", "program1"]:
+        program = test_utils.interchange_example()
+        program.name = name
+        program.current_machine_initial_execution_time = 10.0
+        programs.append(program)
+    return programs
+
+
+def test_budgeted_backend():
+    program = get_programs()[0]
+    improvements = []
+    backend = BudgetedBackend(
+        test_utils.FakeBackend(),
+        SearchBudget(evaluations=3, execution_time=100.0),
+        SearchReport(program.name),
+        on_improvement=lambda report: improvements.append(report.best_schedule),
+    )
+
+    results = backend.evaluate(program, ["A", "B", "P(L0)", "D"])
+    assert [result.sched_str for result in results] == ["A", "B", "P(L0)"]
+    assert backend.is_exhausted() and backend.evaluate(program, ["D"]) == []
+    assert backend.report.nb_evaluations == 3
+    assert backend.report.execution_time == 25.0
+    assert backend.report.best_speedup == 2.0
+    assert improvements == ["P(L0)"]
+
+    backend = BudgetedBackend(
+        test_utils.FakeBackend(),
+        SearchBudget(execution_time=15.0),
+        SearchReport(program.name),
+    )
+    assert len(backend.evaluate(program, ["A", "B"])) == 2
+    assert backend.evaluate(program, ["C"]) == []
+
+    # the speedups are computed against the baseline of the worker measuring the schedule
+    backend = BudgetedBackend(
+        test_utils.FakeBackend(machine="worker", baseline_time=20.0),
+        SearchBudget(),
+        SearchReport(program.name),
+    )
+    backend.evaluate(program, ["P(L0)"])
+    assert backend.report.best_speedup == 4.0
+
+
+def test_driver_interleaves_programs(tmp_path):
+    programs = get_programs()
+    backend = test_utils.FakeBackend()
+    driver = SearchDriver(
+        functools.partial(
+            beam_search, beam_size=2, max_depth=3, action_types=ACTION_TYPES
+        ),
+        backend=backend,
+        program_budget=SearchBudget(evaluations=10),
+        slice_budget=SearchBudget(evaluations=4),
+        checkpoint_folder=str(tmp_path),
+    )
+
+    reports = driver.run(programs)
+
+    assert [report.nb_evaluations for report in reports.values()] == [10, 10]
+    assert all(not report.finished for report in reports.values())
+    assert all(report.best_speedup == 2.0 for report in reports.values())
+    # the programs take turns with slices of their budgets
+    assert backend.programs[:4] == ["program0", "program1"] * 2
+    evaluated = [
+        (name, sched_str)
+        for name, batch in zip(backend.programs, backend.batches)
+        for sched_str in batch
+    ]
+    assert len(set(evaluated)) == len(evaluated)
+
+
+def test_driver_total_budget():
+    programs = get_programs()
+    driver = SearchDriver(
+        functools.partial(mcts_search, max_depth=2, action_types=ACTION_TYPES),
+        backend=test_utils.FakeBackend(),
+        total_budget=SearchBudget(evaluations=12),
+    )
+
+    reports = driver.run(programs)
+
+    # the suite budget is shared equally
+    assert [report.nb_evaluations for report in reports.values()] == [6, 6]
+
+
+def test_driver_finishes_searches():
+    programs = get_programs()
+    driver = SearchDriver(
+        functools.partial(
+            beam_search, beam_size=1, max_depth=1, action_types=ACTION_TYPES
+        ),
+        backend=test_utils.FakeBackend(),
+        slice_budget=SearchBudget(evaluations=3),
+    )
+
+    reports = driver.run(programs)
+
+    assert all(report.finished for report in reports.values())
+    assert all(report.best_schedule.startswith("P(L0") for report in reports.values())
@@ -0,0 +1,81 @@
+import tests.utils as test_utils
+from athena.search_methods.evolutionary import EvolutionarySearch, evolutionary_search
+from athena.tiramisu.schedule_parser import parse_sched_str
+from athena.tiramisu.tiramisu_actions import TiramisuActionType
+from athena.utils.config import BaseConfig
+
+ACTION_TYPES = [
+    TiramisuActionType.PARALLELIZATION,
+    TiramisuActionType.INTERCHANGE,
+    TiramisuActionType.UNROLLING,
+    TiramisuActionType.SKEWING,
+]
+
+
+def get_time(sched_str):
+    time = 10.0
+    if "P(L0" in sched_str:
+        time /= 2
+    if "U(L2,16" in sched_str:
+        time /= 2
+    return time
+
+
+def test_evolutionary_search():
+    BaseConfig.init()
+    program = test_utils.interchange_example()
+    program.current_machine_initial_execution_time = 10.0
+    backend = test_utils.FakeBackend(get_time)
+
+    result = evolutionary_search(
+        program,
+        nb_generations=8,
+        backend=backend,
+        population_size=12,
+        max_depth=3,
+        action_types=ACTION_TYPES,
+        seed=0,
+    )
+
+    assert result.best_speedup == 4.0
+    assert result.nb_generations == 9
+    # each generation is one batch and no schedule is evaluated twice
+    assert len(backend.batches) <= result.nb_generations
+    evaluated = backend.evaluated
+    assert len(evaluated) == len(set(evaluated)) == result.nb_evaluated
+
+
+def test_mutations_respect_domains():
+    BaseConfig.init()
+    program = test_utils.interchange_example()
+    search = EvolutionarySearch(
+        program,
+        backend=test_utils.FakeBackend(get_time),
+        action_types=ACTION_TYPES,
+        unrolling_factors=[2, 32],
+        max_depth=4,
+        seed=1,
+    )
+
+    for _ in range(30):
+        schedule = search.mutate(search.random_schedule())
+        genome = parse_sched_str(str(schedule))
+        assert len(genome) <= 4
+        for gene in genome:
+            if gene.name == "U":
+                assert gene.factors[0] in [2, 32]
+            if gene.name == "S":
+                assert gene.factors == (1, 1)
+
+    # actions that don't apply anymore are dropped when decoding
+    genome = parse_sched_str(
+        "I(L0,L1,comps=['comp00'])|P(L5,comps=['comp00'])|U(L2,2,comps=['comp00'])"
+    )
+    assert str(search.decode(genome)) == (
+        "I(L0,L1,comps=['comp00'])|U(L2,2,comps=['comp00'])"
+    )
+
+    # the genomes sharing a prefix reuse its decoded schedule
+    gene, child = search.random_gene(search.decode(genome[:1]))
+    assert search.decode([*genome[:1], gene]) is child
+    assert search.decode(genome[:1]) is search.decode(genome[:2])
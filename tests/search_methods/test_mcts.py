@@ -0,0 +1,92 @@
+import math
+
+import tests.utils as test_utils
+from athena.search_methods.mcts import (
+    MCTSNode,
+    MonteCarloTreeSearch,
+    TranspositionTable,
+    mcts_search,
+)
+from athena.tiramisu.schedule import Schedule
+from athena.tiramisu.tiramisu_actions import Parallelization, TiramisuActionType
+from athena.utils.config import BaseConfig
+
+ACTION_TYPES = [
+    TiramisuActionType.PARALLELIZATION,
+    TiramisuActionType.INTERCHANGE,
+    TiramisuActionType.REVERSAL,
+]
+
+
+def get_backend():
+    return test_utils.FakeBackend(is_legal=lambda sched_str: "R(" not in sched_str)
+
+
+def test_uct():
+    node = MCTSNode(Schedule(), "")
+    assert node.uct(1, 1.0) == math.inf
+    node.visits, node.total_reward = 2, 3.0
+    assert node.uct(4, 0.0) == 1.5
+    # a rollout in flight lowers the value of the node
+    node.virtual_loss = 1
+    assert node.uct(4, 0.0) == 1.0
+
+
+def test_mcts_search():
+    BaseConfig.init()
+    program = test_utils.interchange_example()
+    program.current_machine_initial_execution_time = 10.0
+    backend = get_backend()
+
+    result = mcts_search(
+        program,
+        max_evaluations=100,
+        backend=backend,
+        nb_parallel=4,
+        max_depth=2,
+        action_types=ACTION_TYPES,
+    )
+
+    assert result.best_speedup == 2.0
+    assert "P(L0" in str(result.best_schedule)
+    assert result.nb_evaluated == len(backend.evaluated)
+    # the whole tree was explored without evaluating equivalent schedules twice
+    assert not result.budget_exhausted
+    canonical_strs = [
+        Schedule.from_sched_str(sched_str, program).canonical_str()
+        for sched_str in backend.evaluated
+    ]
+    assert len(set(canonical_strs)) == len(canonical_strs)
+    # illegal schedules aren't expanded
+    assert not any(
+        "R(" in sched_str.split("|")[0]
+        for sched_str in backend.evaluated
+        if "|" in sched_str
+    )
+
+
+def test_transposition_table_is_shared():
+    BaseConfig.init()
+    program = test_utils.interchange_example()
+    program.current_machine_initial_execution_time = 10.0
+    backend = get_backend()
+    table = TranspositionTable()
+
+    search = MonteCarloTreeSearch(
+        program, backend=backend, table=table, action_types=ACTION_TYPES
+    )
+    result = search.run(max_evaluations=3)
+    assert result.budget_exhausted and result.nb_evaluated == 3
+    assert all(node.virtual_loss == 0 for node in table.nodes.values())
+
+    schedule = Schedule(program)
+    schedule.add_optimizations([Parallelization([("comp00", 0)])])
+    node = table.get_or_create(schedule)
+    assert node.reward == 2.0
+    assert node is table.nodes[schedule.canonical_str()]
+
+    # a new search on the same table starts from the statistics of the previous one
+    search = MonteCarloTreeSearch(
+        program, backend=backend, table=table, action_types=ACTION_TYPES
+    )
+    assert search.root.visits == 3
@@ -0,0 +1,134 @@
+import functools
+import math
+import threading
+import time
+from types import SimpleNamespace
+from concurrent.futures import Future, wait
+from typing import List
+
+import tests.utils as test_utils
+from athena.evaluation.backend import EvaluationResult
+from athena.search_methods.beam_search import beam_search
+from athena.search_methods.driver import SearchBudget, SearchReport
+from athena.search_methods.scheduler import (
+    ProgramState,
+    SearchScheduler,
+    expected_gain,
+)
+from athena.tiramisu.tiramisu_actions import TiramisuActionType
+from athena.utils.config import BaseConfig
+
+ACTION_TYPES = [
+    TiramisuActionType.PARALLELIZATION,
+    TiramisuActionType.INTERCHANGE,
+]
+
+
+class FakeScheduler(SearchScheduler):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.submitted: List[tuple] = []
+
+    def submit(self, evaluation):
+        self.submitted.append(
+            (evaluation.state.tiramisu_program.name, evaluation.sched_str)
+        )
+        future = Future()
+        future.set_result(
+            EvaluationResult(
+                evaluation.sched_str,
+                True,
+                [5.0 if "P(L0" in evaluation.sched_str else 10.0],
+            )
+        )
+        return future
+
+
+def get_programs(nb_programs=3):
+    BaseConfig.init()
+    programs = []
+    for index in range(nb_programs):
+        program = test_utils.interchange_example()
+        program.name = f"program{index}"
+        program.current_machine_initial_execution_time = 10.0
+        programs.append(program)
+    return programs
+
+
+def test_expected_gain():
+    program = get_programs(1)[0]
+    state = ProgramState(program, SearchReport(program.name))
+    assert expected_gain(state) == math.inf
+    state.best_time, state.nb_evaluations = 8.0, 3
+    assert expected_gain(state) == 4.0
+    state.recent_improvement = 0.5
+    assert expected_gain(state) == 6.0
+
+
+def test_dispatch_by_priority():
+    programs = get_programs(2)
+    states = [ProgramState(program, SearchReport(program.name)) for program in programs]
+    states[1].best_time = 1.0
+    scheduler = FakeScheduler(
+        None, priority_function=lambda state: state.best_time or 0.0
+    )
+
+    futures = scheduler.enqueue(states[0], ["A", "B"], True)
+    futures += scheduler.enqueue(states[1], ["C"], True)
+    cancelled = scheduler.enqueue(states[0], ["D"], True)[0]
+    cancelled.cancel()
+    scheduler.start()
+    wait(futures)
+    scheduler.stop()
+
+    assert scheduler.submitted == [
+        ("program1", "C"),
+        ("program0", "A"),
+        ("program0", "B"),
+    ]
+    assert [future.result().sched_str for future in futures] == ["A", "B", "C"]
+    assert states[0].nb_evaluations == 2 and scheduler.nb_running == 0
+
+
+def test_scheduler_runs_searches_concurrently():
+    programs = get_programs()
+    improvements = []
+    scheduler = FakeScheduler(
+        functools.partial(
+            beam_search, beam_size=2, max_depth=2, action_types=ACTION_TYPES
+        ),
+        nb_workers=2,
+        program_budget=SearchBudget(evaluations=8),
+        on_improvement=lambda report: improvements.append(report.program),
+    )
+
+    reports = scheduler.run(programs)
+
+    assert sorted(reports) == ["program0", "program1", "program2"]
+    for report in reports.values():
+        assert report.nb_evaluations == 8 and not report.finished
+        assert report.best_speedup == 2.0 and "P(L0" in report.best_schedule
+    assert sorted(improvements) == ["program0", "program1", "program2"]
+    assert len(scheduler.submitted) == 24
+    assert scheduler.dispatcher is None and not scheduler.pending
+
+
+def test_scheduler_bounds_concurrent_searches():
+    programs = get_programs(5)
+    lock = threading.Lock()
+    running = [0]
+    max_running = [0]
+
+    def search_method(tiramisu_program, backend):
+        with lock:
+            running[0] += 1
+            max_running[0] = max(max_running[0], running[0])
+        time.sleep(0.05)
+        with lock:
+            running[0] -= 1
+        return SimpleNamespace(budget_exhausted=False)
+
+    reports = FakeScheduler(search_method, nb_workers=1).run(programs)
+
+    assert all(report.finished for report in reports.values())
+    assert max_running[0] == 2
@@ -0,0 +1,64 @@
+import tests.utils as test_utils
+from athena.storage.baseline_store import (
+    BaselineStore,
+    MachineFingerprint,
+    get_program_hash,
+)
+from athena.tiramisu.compiling_service import CompilingService
+from athena.utils.config import BaseConfig
+
+
+def test_baseline_store(tmp_path):
+    BaseConfig.init()
+    store = BaselineStore(str(tmp_path / "baselines.db"))
+    fingerprint = MachineFingerprint.current()
+    other_machine = MachineFingerprint("other cpu", 4, "", False)
+
+    assert store.get("program", fingerprint) is None
+
+    store.put("program", fingerprint, [1.0, 2.0], program_name="function1")
+    assert store.get("program", fingerprint) == [1.0, 2.0]
+    assert store.get("program", other_machine) is None
+
+    # the store persists across instances
+    assert BaselineStore(str(tmp_path / "baselines.db")).get_all(fingerprint) == {
+        "program": [1.0, 2.0]
+    }
+
+
+def test_machine_fingerprint():
+    BaseConfig.init()
+    assert MachineFingerprint.current().key == MachineFingerprint.current().key
+    assert (
+        MachineFingerprint("cpu", 4, "", False).key
+        != MachineFingerprint("cpu", 8, "", False).key
+    )
+
+
+def test_program_initial_execution_time(tmp_path, monkeypatch):
+    BaseConfig.init()
+    assert BaseConfig.base_config
+    BaseConfig.base_config.baseline_store = str(tmp_path / "baselines.db")
+    measurements = []
+
+    def get_cpu_exec_times(tiramisu_program, optims_list, max_runs, **kwargs):
+        measurements.append(optims_list)
+        return [3.0, 2.0, 4.0]
+
+    monkeypatch.setattr(CompilingService, "get_cpu_exec_times", get_cpu_exec_times)
+
+    try:
+        sample = test_utils.interchange_example()
+        assert sample.current_machine_initial_execution_time == 2.0
+        assert sample.current_machine_initial_execution_time == 2.0
+        assert measurements == [[]]
+
+        # another instance of the same program uses the stored baseline
+        sample = test_utils.interchange_example()
+        assert sample.current_machine_initial_execution_time == 2.0
+        assert measurements == [[]]
+        assert BaselineStore.get_instance().get(
+            get_program_hash(sample), MachineFingerprint.current()
+        ) == [3.0, 2.0, 4.0]
+    finally:
+        BaseConfig.init()
@@ -0,0 +1,159 @@
+import threading
+
+import pytest
+
+import tests.utils as test_utils
+from athena.storage.baseline_store import MachineFingerprint, get_program_hash
+from athena.storage.result_store import ResultStore
+from athena.tiramisu.compiling_service import (
+    CompilingService,
+    ScheduleExecutionCrashed,
+)
+from athena.tiramisu.schedule import Schedule
+from athena.tiramisu.tiramisu_actions.interchange import Interchange
+from athena.utils.config import BaseConfig
+
+
+def test_result_store(tmp_path):
+    store = ResultStore(str(tmp_path / "results.db"))
+
+    store.record_legality("program", "I(L0,L1,comps=['comp00'])", True)
+    store.record_legality("program", "P(L1,comps=['comp00'])", False)
+    store.record_execution(
+        "program", "I(L0,L1,comps=['comp00'])", "machine", [2.0, 1.0], build_time=3
+    )
+    store.record_execution(
+        "program", "I(L0,L1,comps=['comp00'])", "machine", [1.5], append=True
+    )
+
+    results = store.get_many(
+        "program",
+        ["I(L0,L1,comps=['comp00'])", "P(L1,comps=['comp00'])", "unknown"],
+        machine="machine",
+    )
+
+    assert set(results) == {"I(L0,L1,comps=['comp00'])", "P(L1,comps=['comp00'])"}
+    assert results["I(L0,L1,comps=['comp00'])"].legality is True
+    assert results["I(L0,L1,comps=['comp00'])"].execution_times == [2.0, 1.0, 1.5]
+    assert results["P(L1,comps=['comp00'])"].legality is False
+    assert results["P(L1,comps=['comp00'])"].execution_times is None
+
+    # the execution results are per machine
+    result = store.get("program", "I(L0,L1,comps=['comp00'])", machine="other")
+    assert result and result.execution_times is None
+    assert len(store.get_many("program")) == 2
+
+    # a crash is recorded without dropping the execution times
+    store.record_execution(
+        "program", "I(L0,L1,comps=['comp00'])", "machine", None, error="crashed"
+    )
+    store.record_execution("program", "crashing", "machine", None, error="crashed")
+    result = store.get("program", "I(L0,L1,comps=['comp00'])", machine="machine")
+    assert result and result.execution_times == [2.0, 1.0, 1.5]
+    assert result.execution_error == "crashed"
+    result = store.get("program", "crashing", machine="machine")
+    assert result and result.execution_times is None
+
+
+def test_result_store_concurrent_appends(tmp_path):
+    store = ResultStore(str(tmp_path / "results.db"))
+
+    def append(index):
+        for i in range(10):
+            store.record_execution(
+                "program", "schedule", "machine", [index * 10 + i], append=True
+            )
+
+    threads = [threading.Thread(target=append, args=(index,)) for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    result = store.get("program", "schedule", machine="machine")
+    assert result and sorted(result.execution_times) == list(range(40))
+
+
+def test_result_store_bulk_lookup(tmp_path):
+    store = ResultStore(str(tmp_path / "results.db"))
+    schedules = [f"U(L2,{factor},comps=['comp00'])" for factor in range(2000)]
+    for schedule in schedules[::2]:
+        store.record_legality("program", schedule, True)
+
+    assert len(store.get_many("program", schedules)) == 1000
+
+
+def test_schedule_uses_result_store(tmp_path, monkeypatch):
+    BaseConfig.init()
+    assert BaseConfig.base_config
+    BaseConfig.base_config.result_store = str(tmp_path / "results.db")
+    # the legality of the interchange comes from the store, not from the dependence analysis
+    BaseConfig.base_config.tiramisu.dependence_analysis = False
+    compilations = []
+
+    def compile_legality(schedule, with_ast=False):
+        compilations.append(str(schedule))
+        return True, None
+
+    def get_cpu_exec_times(*args, **kwargs):
+        compilations.append("execution")
+        return [1.0, 2.0]
+
+    monkeypatch.setattr(CompilingService, "compile_legality", compile_legality)
+    monkeypatch.setattr(CompilingService, "get_cpu_exec_times", get_cpu_exec_times)
+
+    try:
+        sample = test_utils.interchange_example()
+        schedule = Schedule(sample)
+        schedule.add_optimizations([Interchange([("comp00", 0), ("comp00", 1)])])
+
+        assert schedule.is_legal()
+        assert schedule.execute(nb_exec_tiems=2) == [1.0, 2.0]
+        assert compilations == [str(schedule), "execution"]
+
+        # another run finds the results in the store
+        schedule = Schedule(sample)
+        schedule.add_optimizations([Interchange([("comp00", 0), ("comp00", 1)])])
+        assert schedule.is_legal()
+        assert schedule.execute(nb_exec_tiems=2, use_stored_results=True) == [1.0, 2.0]
+        assert compilations == [str(schedule), "execution"]
+
+        result = ResultStore(BaseConfig.base_config.result_store).get(
+            get_program_hash(sample), str(schedule), MachineFingerprint.current().key
+        )
+        assert result and result.build_time is not None
+    finally:
+        BaseConfig.init()
+
+
+def test_schedule_records_crashes(tmp_path, monkeypatch):
+    BaseConfig.init()
+    assert BaseConfig.base_config
+    BaseConfig.base_config.result_store = str(tmp_path / "results.db")
+
+    def get_cpu_exec_times(*args, **kwargs):
+        raise ScheduleExecutionCrashed("crashed")
+
+    monkeypatch.setattr(CompilingService, "get_cpu_exec_times", get_cpu_exec_times)
+
+    try:
+        schedule = Schedule(test_utils.interchange_example())
+        machine = MachineFingerprint.current().key
+        # a time measured before the crash
+        ResultStore(BaseConfig.base_config.result_store).record_execution(
+            get_program_hash(schedule.tiramisu_program),
+            schedule.canonical_str(),
+            machine,
+            [1.0],
+        )
+        with pytest.raises(ScheduleExecutionCrashed):
+            schedule.execute()
+
+        result = schedule.get_stored_result(machine)
+        assert result and result.execution_error == "crashed"
+        assert result.execution_times == [1.0]
+        assert schedule.execute(nb_exec_tiems=1, use_stored_results=True) == [1.0]
+        with pytest.raises(ScheduleExecutionCrashed):
+            schedule.execute(nb_exec_tiems=2, use_stored_results=True)
+    finally:
+        BaseConfig.init()
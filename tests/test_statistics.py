@@ -0,0 +1,60 @@
+import numpy as np
+
+from athena.utils.statistics import (
+    bootstrap_speedup,
+    compare_timings,
+    evaluate_until_decided,
+    mann_whitney_u,
+)
+
+
+def test_bootstrap_speedup():
+    speedup, low, high = bootstrap_speedup([10, 10.1, 9.9, 10.2], [5, 5.1, 4.9, 5])
+
+    assert 1.9 < speedup < 2.1
+    assert low <= speedup <= high
+
+
+def test_mann_whitney_u():
+    u, p_value = mann_whitney_u([1, 2, 3, 4, 5, 6], [7, 8, 9, 10, 11, 12])
+    assert u == 0
+    assert p_value < 0.01
+
+    _, p_value = mann_whitney_u([1, 2, 3], [1, 2, 3])
+    assert p_value == 1
+
+
+def test_compare_timings():
+    rng = np.random.default_rng(0)
+    reference = list(10 + rng.normal(0, 0.1, 20))
+
+    assert compare_timings(reference, [t / 2 for t in reference]).decision == "faster"
+    assert compare_timings(reference, [t * 2 for t in reference]).decision == "slower"
+    assert (
+        compare_timings(reference, reference, method="mann_whitney").decision
+        == "equivalent"
+    )
+    assert compare_timings([10, 5], [6, 11]).decision == "undecided"
+
+
+def test_evaluate_until_decided():
+    rng = np.random.default_rng(0)
+    calls = []
+
+    def measure(mean):
+        def measure_runs(nb_runs):
+            calls.append(nb_runs)
+            return list(mean * rng.lognormal(0, 0.2, nb_runs))
+
+        return measure_runs
+
+    # a large speedup is decided with the initial runs
+    result = evaluate_until_decided(measure(10), measure(1), max_runs=30)
+    assert result.decision == "faster"
+    assert calls == [5, 5]
+
+    # a small speedup needs more runs
+    calls.clear()
+    result = evaluate_until_decided(measure(10), measure(9.5), max_runs=30)
+    assert sum(calls) > 10
+    assert len(result.candidate_times) <= 30
@@ -0,0 +1,129 @@
+import os
+
+import numpy as np
+
+from athena.tiramisu.buffer_manager import (
+    BufferDeclaration,
+    BufferManager,
+    parse_buffer_declarations,
+)
+from athena.tiramisu.tiramisu_program import TiramisuProgram
+
+
+def test_parse_buffer_declarations():
+    with open("examples/function_matmul_MEDIUM.cpp") as f:
+        declarations = parse_buffer_declarations(f.read())
+
+    assert list(declarations) == ["buf02", "buf00", "buf01"]
+    assert declarations["buf02"] == BufferDeclaration(
+        name="buf02",
+        shape=(192, 256),
+        tiramisu_type="p_int32",
+        argument_type="a_output",
+    )
+    assert declarations["buf00"].dtype == np.int32
+    assert declarations["buf00"].c_type == "int32_t"
+    assert declarations["buf00"].nbytes == 192 * 320 * 4
+
+
+def test_parse_namespaced_buffer_declarations():
+    declarations = parse_buffer_declarations(
+        'tiramisu::buffer buff_A("buff_A", {8, 4}, tiramisu::p_uint8, tiramisu::a_input);'
+    )
+
+    assert declarations["buff_A"] == BufferDeclaration(
+        name="buff_A", shape=(8, 4), tiramisu_type="p_uint8", argument_type="a_input"
+    )
+
+
+def test_wrapper_buffer_types():
+    tiramisu_program = TiramisuProgram.from_file("examples/function_matmul_MEDIUM.cpp")
+
+    assert [
+        declaration.name for declaration in tiramisu_program.IO_buffer_declarations
+    ] == ["buf02", "buf00", "buf01"]
+    assert "Halide::Buffer<int32_t> buf02" in tiramisu_program.wrappers["cpp"]
+    assert "double *c_" not in tiramisu_program.wrappers["cpp"]
+
+
+def test_get_buffers(tmp_path):
+    declarations = [
+        BufferDeclaration("out", (4, 6), "p_float32", "a_output"),
+        BufferDeclaration("in", (6,), "p_int32", "a_input"),
+    ]
+    buffer_manager = BufferManager(folder=str(tmp_path))
+
+    buffers = buffer_manager.get_buffers("program", declarations)
+
+    assert [buffer.shape for buffer in buffers] == [(4, 6), (6,)]
+    assert [buffer.dtype for buffer in buffers] == [np.float32, np.int32]
+    assert buffers[0].ctypes.data % 64 == 0
+    assert buffer_manager.get_buffers("program", declarations) is buffers
+
+    # another manager, e.g. in another measurement process, maps the same data
+    other_buffers = BufferManager(folder=str(tmp_path)).get_buffers(
+        "program", declarations
+    )
+    buffers[1][0] = 42
+    buffers[1].flush()
+    assert other_buffers[1][0] == 42
+
+
+def test_reproducible_fill(tmp_path):
+    declarations = [BufferDeclaration("in", (32,), "p_float64", "a_input")]
+
+    first = BufferManager(folder=str(tmp_path / "a"), seed=3).get_buffers(
+        "program", declarations
+    )
+    second = BufferManager(folder=str(tmp_path / "b"), seed=3).get_buffers(
+        "program", declarations
+    )
+    other_seed = BufferManager(folder=str(tmp_path / "c"), seed=4).get_buffers(
+        "program", declarations
+    )
+    not_filled = BufferManager(folder=str(tmp_path / "d"), fill=False).get_buffers(
+        "program", declarations
+    )
+
+    assert np.array_equal(first[0], second[0])
+    assert not np.array_equal(first[0], other_seed[0])
+    assert np.all(not_filled[0] == 0)
+
+
+def test_release(tmp_path):
+    declarations = [BufferDeclaration("in", (8,), "p_int8", "a_input")]
+    buffer_manager = BufferManager(folder=str(tmp_path))
+    buffer_manager.get_buffers("program", declarations)
+    buffer_path = buffer_manager.get_buffer_path("program", declarations[0])
+
+    buffer_manager.release("program")
+    assert "program" not in buffer_manager.buffers
+
+    buffer_manager.get_buffers("program", declarations)
+    buffer_manager.release("program", delete_files=True)
+    assert not (tmp_path / buffer_path).exists()
+
+
+def test_cleanup(tmp_path, monkeypatch):
+    declarations = [BufferDeclaration("in", (8,), "p_int8", "a_input")]
+    folder = tmp_path / "buffers"
+    buffer_manager = BufferManager(folder=str(folder))
+    other_buffer_manager = BufferManager(folder=str(folder))
+    buffer_manager.get_buffers("program", declarations)
+
+    buffer_manager.cleanup()
+    assert not buffer_manager.buffers and not folder.exists()
+
+    # a buffer deleted after its existence was checked is created again
+    open_memmap = np.lib.format.open_memmap
+    deleted = []
+
+    def open_deleted_memmap(path, mode="r+", **kwargs):
+        if mode == "r+" and not deleted:
+            deleted.append(path)
+            os.remove(path)
+        return open_memmap(path, mode=mode, **kwargs)
+
+    monkeypatch.setattr(np.lib.format, "open_memmap", open_deleted_memmap)
+    buffers = other_buffer_manager.get_buffers("program", declarations)
+    assert deleted and buffers[0].shape == (8,) and len(list(folder.iterdir())) == 1
@@ -0,0 +1,176 @@
+import itertools
+import random
+
+import tests.utils as test_utils
+from athena.tiramisu import candidates
+from athena.tiramisu.candidates import (
+    CandidateFilter,
+    is_perfectly_nested,
+    iter_candidate_specs,
+    iter_candidates,
+    sample_candidates,
+)
+from athena.tiramisu.tiramisu_actions import (
+    Fusion,
+    Interchange,
+    TiramisuActionType,
+    Unrolling,
+)
+from athena.tiramisu.tiramisu_iterator_node import IteratorNode
+from athena.tiramisu.tiramisu_tree import TiramisuTree
+from athena.utils.config import BaseConfig
+
+
+def test_iter_candidates_matches_get_candidates():
+    BaseConfig.init()
+    tree = test_utils.interchange_example().tree
+
+    interchanges = [
+        spec.iterators
+        for spec in iter_candidate_specs(
+            tree, action_types=[TiramisuActionType.INTERCHANGE]
+        )
+    ]
+    assert interchanges == [
+        candidate
+        for candidates in Interchange.get_candidates(tree).values()
+        for candidate in candidates
+    ]
+
+    sample = test_utils.fusion_sample()
+    fusions = [
+        spec.iterators
+        for spec in iter_candidate_specs(
+            sample.tree, action_types=[TiramisuActionType.FUSION]
+        )
+    ]
+    assert sorted(fusions) == sorted(Fusion.get_candidates(sample.tree))
+
+
+def test_iter_candidates_params():
+    BaseConfig.init()
+    tree = test_utils.interchange_example().tree
+
+    unrollings = list(
+        iter_candidates(
+            tree,
+            action_types=[TiramisuActionType.UNROLLING],
+            unrolling_factors=[4, 8],
+        )
+    )
+    assert all(isinstance(action, Unrolling) for action in unrollings)
+    assert [action.params for action in unrollings] == [
+        [("comp00", 2), 4],
+        [("comp00", 2), 8],
+    ]
+
+    tilings = list(
+        iter_candidates(
+            tree, action_types=[TiramisuActionType.TILING_2D], tiling_sizes=[32, 64]
+        )
+    )
+    # 2 pairs of successive loops with 4 combinations of tile sizes each
+    assert len(tilings) == 8
+    assert tilings[0].params == [("comp00", 0), ("comp00", 1), 32, 32]
+
+
+def test_iter_candidates_is_lazy():
+    BaseConfig.init()
+    tree = test_utils.tree_test_sample()
+
+    candidates = iter_candidates(tree)
+    first = list(itertools.islice(candidates, 3))
+    assert len(first) == 3
+    # the remaining candidates are still available
+    assert next(candidates) is not None
+
+
+def test_candidate_filter():
+    BaseConfig.init()
+    tree = test_utils.tree_test_sample()
+
+    assert is_perfectly_nested(tree, ["j", "k"])
+    assert not is_perfectly_nested(tree, ["root", "i"])
+
+    shallow = list(
+        iter_candidate_specs(
+            tree,
+            action_types=[TiramisuActionType.PARALLELIZATION],
+            candidate_filter=CandidateFilter(max_depth=1),
+        )
+    )
+    assert [spec.iterators for spec in shallow] == [("root",), ("i",), ("j",)]
+
+    tree.iterators["k"].upper_bound = "N"
+    bounded = list(
+        iter_candidate_specs(
+            tree,
+            action_types=[TiramisuActionType.REVERSAL],
+            candidate_filter=CandidateFilter(integer_bounds=True),
+        )
+    )
+    assert ("k",) not in [spec.iterators for spec in bounded]
+    assert len(bounded) == 5
+
+    perfect = CandidateFilter(perfect_nesting=True)
+    assert not list(
+        iter_candidate_specs(
+            tree,
+            action_types=[TiramisuActionType.TILING_GENERAL],
+            candidate_filter=perfect,
+        )
+    )
+    # fusion candidates are siblings, the nesting filter doesn't apply to them
+    assert list(
+        iter_candidate_specs(
+            tree, action_types=[TiramisuActionType.FUSION], candidate_filter=perfect
+        )
+    )
+
+
+def test_sample_candidates():
+    BaseConfig.init()
+    tree = test_utils.tree_test_sample()
+
+    sample = sample_candidates(tree, 5, rng=random.Random(0))
+    assert len(sample) == 5
+    assert sample == sample_candidates(tree, 5, rng=random.Random(0))
+
+    all_candidates = list(iter_candidates(tree))
+    assert len(sample_candidates(tree, len(all_candidates) + 10)) == len(all_candidates)
+
+
+def test_sample_candidates_without_enumeration(monkeypatch):
+    BaseConfig.init()
+    # 200 independent loops, with 19900 fusion candidates
+    tree = TiramisuTree()
+    for index in range(200):
+        name = f"i{index}"
+        tree.add_root(name)
+        tree.iterators[name] = IteratorNode(
+            name=name,
+            parent_iterator=None,
+            lower_bound=0,
+            upper_bound=10,
+            child_iterators=[],
+            computations_list=[f"comp{index}"],
+            level=0,
+        )
+        tree.computations.append(f"comp{index}")
+        tree.computations_absolute_order[f"comp{index}"] = index
+
+    pool = candidates._CandidatePool("combinations", tree.roots[:6], 2)
+    assert [pool.get_iterators(index) for index in range(pool.size)] == sorted(
+        itertools.combinations(tree.roots[:6], 2),
+        key=lambda pair: (tree.roots.index(pair[1]), tree.roots.index(pair[0])),
+    )
+
+    def iter_candidate_specs(*args, **kwargs):
+        raise AssertionError("the candidates shouldn't be enumerated")
+
+    monkeypatch.setattr(candidates, "iter_candidate_specs", iter_candidate_specs)
+    sample = sample_candidates(
+        tree, 5, rng=random.Random(0), action_types=[TiramisuActionType.FUSION]
+    )
+    assert len(sample) == 5 and all(isinstance(action, Fusion) for action in sample)
+    assert len({tuple(action.params) for action in sample}) == 5
@@ -0,0 +1,97 @@
+import tests.utils as test_utils
+from athena.tiramisu.canonicalization import deduplicate_schedules
+from athena.tiramisu.schedule import Schedule
+from athena.tiramisu.tiramisu_actions import (
+    Interchange,
+    Parallelization,
+    Reversal,
+    Unrolling,
+)
+from athena.utils.config import BaseConfig
+
+
+def make_schedule(program, actions):
+    schedule = Schedule(program)
+    schedule.add_optimizations(actions)
+    return schedule
+
+
+def test_canonical_str():
+    BaseConfig.init()
+    program = test_utils.interchange_example()
+
+    assert (
+        make_schedule(
+            program,
+            [
+                Interchange([("comp00", 0), ("comp00", 1)]),
+                Interchange([("comp00", 1), ("comp00", 0)]),
+            ],
+        ).canonical_str()
+        == ""
+    )
+
+    schedule = make_schedule(
+        program,
+        [
+            Unrolling([("comp00", 2), 4]),
+            Reversal([("comp00", 1)]),
+            Reversal([("comp00", 1)]),
+            Parallelization([("comp00", 0)]),
+            Parallelization([("comp00", 0)]),
+        ],
+    )
+    assert schedule.canonical_str() == str(
+        make_schedule(
+            program,
+            [Parallelization([("comp00", 0)]), Unrolling([("comp00", 2), 4])],
+        )
+    )
+
+    # the unrolling splits the parallelized loop
+    schedule = make_schedule(
+        program,
+        [Unrolling([("comp00", 1), 4]), Parallelization([("comp00", 2)])],
+    )
+    assert schedule.canonical_str() == str(schedule)
+    assert (
+        make_schedule(
+            program,
+            [Parallelization([("comp00", 2)]), Unrolling([("comp00", 1), 4])],
+        ).canonical_str()
+        != schedule.canonical_str()
+    )
+
+    # tags don't commute with the interchanges
+    schedule = make_schedule(
+        program,
+        [
+            Parallelization([("comp00", 0)]),
+            Interchange([("comp00", 0), ("comp00", 1)]),
+        ],
+    )
+    assert schedule.canonical_str() == str(schedule)
+
+
+def test_deduplicate_schedules():
+    BaseConfig.init()
+    program = test_utils.interchange_example()
+
+    schedules = [
+        make_schedule(program, [Interchange([("comp00", 0), ("comp00", 1)])]),
+        make_schedule(program, [Interchange([("comp00", 1), ("comp00", 0)])]),
+        make_schedule(
+            program,
+            [Unrolling([("comp00", 2), 4]), Parallelization([("comp00", 0)])],
+        ),
+        make_schedule(
+            program,
+            [Parallelization([("comp00", 0)]), Unrolling([("comp00", 2), 4])],
+        ),
+        make_schedule(program, [Reversal([("comp00", 2)])]),
+    ]
+    assert deduplicate_schedules(schedules) == [
+        schedules[0],
+        schedules[2],
+        schedules[4],
+    ]
@@ -0,0 +1,75 @@
+import pytest
+
+import tests.utils as test_utils
+from athena.tiramisu.compiling_service import (
+    CompilingService,
+    UnsupportedRuntimeSchedule,
+)
+from athena.tiramisu.schedule import Schedule
+from athena.tiramisu.tiramisu_actions.fusion import Fusion
+from athena.tiramisu.tiramisu_actions.interchange import Interchange
+from athena.tiramisu.tiramisu_actions.parallelization import Parallelization
+from athena.tiramisu.tiramisu_actions.tiling_general import TilingGeneral
+from athena.tiramisu.tiramisu_actions.unrolling import Unrolling
+from athena.utils.config import BaseConfig
+
+
+def test_serialize_schedule():
+    BaseConfig.init()
+    sample = test_utils.interchange_example()
+    schedule = Schedule(sample)
+    schedule.add_optimizations(
+        [
+            Interchange([("comp00", 0), ("comp00", 1)]),
+            Parallelization([("comp00", 0)]),
+            Unrolling([("comp00", 2), 4]),
+        ]
+    )
+
+    schedule_file = CompilingService.serialize_schedule(schedule.optims_list)
+
+    assert schedule_file.split("\n") == [
+        f"# {schedule}",
+        "interchange comp00 0 1",
+        "tag_parallel_level comp00 0",
+        "unroll comp00 2 4",
+        "",
+    ]
+
+
+def test_serialize_fusion():
+    BaseConfig.init()
+    sample = test_utils.fusion_sample()
+    fusion = Fusion([("comp03", 3), ("comp04", 3)])
+    fusion.initialize_action_for_tree(sample.tree)
+
+    schedule_file = CompilingService.serialize_schedule([fusion])
+
+    assert schedule_file.split("\n")[1:] == [
+        "dependency_analysis",
+        "clear_sched_graph",
+        "then comp01 comp03 0 comp04 3",
+        "prepare_legality",
+        "fusion_shift comp04 1 comp03 0 1 2 3",
+        "",
+    ]
+
+
+def test_serialize_unsupported_schedule():
+    BaseConfig.init()
+    tiling = TilingGeneral([("comp03", 3), 4])
+    tiling.tiramisu_optim_str = "comp03.tile(3, 4);\n"
+
+    with pytest.raises(UnsupportedRuntimeSchedule):
+        CompilingService.serialize_schedule([tiling])
+
+
+def test_get_schedule_loader_code():
+    BaseConfig.init()
+    sample = test_utils.interchange_example()
+
+    cpp_code = CompilingService.get_schedule_loader_code(sample)
+
+    assert '{{"comp00", &comp00}}' in cpp_code
+    assert 'std::getenv("ATHENA_SCHEDULE_PATH")' in cpp_code
+    assert cpp_code.index("ATHENA_SCHEDULE_PATH") < cpp_code.index(sample.code_gen_line)
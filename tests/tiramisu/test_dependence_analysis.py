@@ -0,0 +1,143 @@
+import tests.utils as test_utils
+from athena.tiramisu.dependence_analysis import (
+    DependenceAnalysis,
+    parse_affine_expression,
+    parse_write_access,
+    skewing_completion,
+)
+from athena.tiramisu.schedule import Schedule
+from athena.tiramisu.tiramisu_actions import (
+    Interchange,
+    Parallelization,
+    Reversal,
+    Skewing,
+    Tiling2D,
+    Unrolling,
+)
+from athena.utils.config import BaseConfig
+
+
+def stencil_annotations(write_access_relation="{ comp00[i0, i1] -> buf00[i0, i1] }"):
+    # comp00(i0, i1) = comp00(i0 - 1, i1) + comp00(i0, i1 - 1)
+    return {
+        "iterators": {
+            "i0": {
+                "lower_bound": "1",
+                "upper_bound": "128",
+                "parent_iterator": None,
+                "child_iterators": ["i1"],
+                "computations_list": [],
+            },
+            "i1": {
+                "lower_bound": "1",
+                "upper_bound": "128",
+                "parent_iterator": "i0",
+                "child_iterators": [],
+                "computations_list": ["comp00"],
+            },
+        },
+        "computations": {
+            "comp00": {
+                "absolute_order": 1,
+                "iterators": ["i0", "i1"],
+                "write_access_relation": write_access_relation,
+                "write_buffer_id": 0,
+                "accesses": [
+                    {"buffer_id": 0, "access_matrix": [[1, 0, -1], [0, 1, 0]]},
+                    {"buffer_id": 0, "access_matrix": [[1, 0, 0], [0, 1, -1]]},
+                ],
+            }
+        },
+    }
+
+
+def test_parse_write_access():
+    assert parse_affine_expression("2i0 + i1 - 1", ["i0", "i1"]) == [2, 1, -1]
+    assert parse_affine_expression("floor(i0/2)", ["i0", "i1"]) is None
+    assert parse_write_access(
+        "{ comp00[i0, i1, i2] -> buf00[i1, i2 + 1] }", ["i0", "i1", "i2"]
+    ).tolist() == [[0, 1, 0, 0], [0, 0, 1, 1]]
+
+
+def test_skewing_completion():
+    for factors in [(1, 1), (2, 1), (3, 2), (1, -1)]:
+        gamma, sigma = skewing_completion(*factors)
+        assert factors[0] * sigma - factors[1] * gamma == 1
+    assert skewing_completion(2, 4) is None
+
+
+def test_stencil_dependences():
+    analysis = DependenceAnalysis.from_annotations(stencil_annotations())
+    assert sorted(dependence.distance for dependence in analysis.dependences) == [
+        [0, 0],
+        [0, 1],
+        [1, 0],
+    ]
+
+    def check(*actions):
+        return analysis.check_actions(actions, [["comp00"]] * len(actions))
+
+    assert check(Interchange([("comp00", 0), ("comp00", 1)]))
+    assert check(Parallelization([("comp00", 0)])) is False
+    assert check(Parallelization([("comp00", 1)])) is False
+    assert check(Reversal([("comp00", 1)])) is False
+    # the wavefront makes the inner loop parallel
+    assert check(
+        Skewing([("comp00", 0), ("comp00", 1), 1, 1]),
+        Parallelization([("comp00", 1)]),
+    )
+    assert check(Skewing([("comp00", 0), ("comp00", 1), 1, -1])) is False
+    # tiling is left to the compiler
+    assert check(Tiling2D([("comp00", 0), ("comp00", 1), 32, 32])) is None
+    # so are the actions following an unrolling, which splits the unrolled loop
+    assert check(Unrolling([("comp00", 1), 4]))
+    assert (
+        check(Unrolling([("comp00", 0), 4]), Parallelization([("comp00", 1)])) is None
+    )
+
+
+def test_non_affine_accesses():
+    analysis = DependenceAnalysis.from_annotations(
+        stencil_annotations("{ comp00[i0, i1] -> buf00[floor(i0/2), i1] }")
+    )
+    assert analysis.unknown_computations == {"comp00"}
+    assert (
+        analysis.check_actions(
+            [Interchange([("comp00", 0), ("comp00", 1)])], [["comp00"]]
+        )
+        is None
+    )
+
+
+def test_schedule_legality_from_annotations(monkeypatch):
+    BaseConfig.init()
+    program = test_utils.interchange_example()
+
+    def compile_legality(schedule, with_ast=False):
+        raise AssertionError("the compiler shouldn't be called")
+
+    monkeypatch.setattr(
+        "athena.tiramisu.compiling_service.CompilingService.compile_legality",
+        compile_legality,
+    )
+
+    # comp00 is a reduction over i0
+    schedule = Schedule(program)
+    schedule.add_optimizations([Parallelization([("comp00", 0)])])
+    assert not schedule.is_legal()
+
+    schedule = Schedule(program)
+    schedule.add_optimizations(
+        [
+            Interchange([("comp00", 0), ("comp00", 1)]),
+            Parallelization([("comp00", 0)]),
+        ]
+    )
+    assert schedule.is_legal()
+
+    # the parallelized loop is the inner half of the unrolled reduction loop, it is left to the compiler
+    schedule = Schedule(program)
+    schedule.add_optimizations(
+        [Unrolling([("comp00", 0), 4]), Parallelization([("comp00", 1)])]
+    )
+    assert program.get_dependence_analysis().check_schedule(schedule) is None
@@ -0,0 +1,131 @@
+import shutil
+import subprocess
+
+import numpy as np
+import pytest
+
+from athena.tiramisu.buffer_manager import BufferDeclaration, BufferManager
+from athena.tiramisu.measurement_host import (
+    KernelRunner,
+    MeasurementHost,
+    MeasurementHostCrashed,
+    to_halide_buffer,
+)
+
+kernels_code = """
+#include <stdint.h>
+
+typedef struct { uint8_t code; uint8_t bits; uint16_t lanes; } halide_type_t;
+typedef struct { int32_t min, extent, stride; uint32_t flags; } halide_dimension_t;
+typedef struct {
+    uint64_t device;
+    void *device_interface;
+    uint8_t *host;
+    uint64_t flags;
+    halide_type_t type;
+    int32_t dimensions;
+    halide_dimension_t *dim;
+    void *padding;
+} halide_buffer_t;
+
+int double_kernel(halide_buffer_t *output, halide_buffer_t *input) {
+    double *out = (double *)output->host;
+    double *in = (double *)input->host;
+    for (int j = 0; j < output->dim[1].extent; j++)
+        for (int i = 0; i < output->dim[0].extent; i++)
+            out[j * output->dim[1].stride + i] = 2 * in[j * input->dim[1].stride + i];
+    return 0;
+}
+
+int crashing_kernel(halide_buffer_t *output, halide_buffer_t *input) {
+    *(volatile int *)0 = 0;
+    return 0;
+}
+"""
+
+requires_compiler = pytest.mark.skipif(
+    shutil.which("gcc") is None, reason="gcc is needed to build the test kernels"
+)
+
+
+@pytest.fixture
+def kernels_library(tmp_path):
+    source = tmp_path / "kernels.c"
+    source.write_text(kernels_code)
+    library = tmp_path / "kernels.so"
+    subprocess.run(
+        ["gcc", "-shared", "-fPIC", "-o", str(library), str(source)], check=True
+    )
+    return str(library)
+
+
+def test_to_halide_buffer():
+    array = np.zeros((3, 5), dtype=np.int32)
+    buffer, dimensions = to_halide_buffer(array)
+
+    assert buffer.dimensions == 2
+    assert (buffer.type.code, buffer.type.bits, buffer.type.lanes) == (0, 32, 1)
+    assert [(dimensions[i].extent, dimensions[i].stride) for i in range(2)] == [
+        (5, 1),
+        (3, 5),
+    ]
+
+
+def test_to_halide_buffer_bool():
+    buffer, _ = to_halide_buffer(np.zeros((4,), dtype=bool))
+
+    assert (buffer.type.code, buffer.type.bits) == (1, 1)
+
+
+@requires_compiler
+def test_kernel_runner(kernels_library, tmp_path):
+    runner = KernelRunner(BufferManager(folder=str(tmp_path / "buffers")))
+    buffer_declarations = [
+        BufferDeclaration("output", (4, 8), "p_float64", "a_output"),
+        BufferDeclaration("input", (4, 8), "p_float64", "a_input"),
+    ]
+    runner.set_buffers("double_kernel", buffer_declarations)
+    input_array = np.array(runner.arrays[1])
+
+    results = runner.run(kernels_library, "double_kernel", 3)
+
+    assert len(results) == 3
+    assert np.array_equal(runner.arrays[0], 2 * input_array)
+
+    # buffers are reused for the same program
+    arrays = runner.arrays
+    runner.set_buffers("double_kernel", buffer_declarations)
+    assert runner.arrays is arrays
+
+    # the files of the buffers are kept for the other measurement processes
+    runner.set_buffers("other_kernel", buffer_declarations[:1])
+    runner.release()
+    assert len(list((tmp_path / "buffers").iterdir())) == 3
+
+
+@requires_compiler
+def test_measurement_host(kernels_library, tmp_path):
+    measurement_host = MeasurementHost(buffers_folder=str(tmp_path / "buffers"))
+    buffer_declarations = [
+        BufferDeclaration("output", (16, 16), "p_float64", "a_output"),
+        BufferDeclaration("input", (16, 16), "p_float64", "a_input"),
+    ]
+    try:
+        results = measurement_host.measure(
+            kernels_library, "double_kernel", buffer_declarations, 5
+        )
+        assert len(results) == 5
+
+        with pytest.raises(MeasurementHostCrashed):
+            measurement_host.measure(
+                kernels_library, "crashing_kernel", buffer_declarations, 1
+            )
+        assert not measurement_host.is_alive()
+
+        # the host is restarted after a crash
+        results = measurement_host.measure(
+            kernels_library, "double_kernel", buffer_declarations, 2
+        )
+        assert len(results) == 2
+    finally:
+        measurement_host.close()
@@ -0,0 +1,83 @@
+import fcntl
+import os
+import tempfile
+
+import tests.utils as test_utils
+from athena.tiramisu.compiling_service import CompilingService
+from athena.tiramisu.measurement_settings import (
+    MeasurementSettings,
+    isolation_lock,
+    parse_cpu_list,
+)
+from athena.utils.config import BaseConfig
+
+
+def test_parse_cpu_list():
+    assert parse_cpu_list("0-3,8, 10-11") == [0, 1, 2, 3, 8, 10, 11]
+    assert parse_cpu_list("2") == [2]
+
+
+def test_from_config():
+    BaseConfig.init()
+    assert BaseConfig.base_config
+    BaseConfig.base_config.tiramisu.nb_threads = 4
+    BaseConfig.base_config.tiramisu.cpu_affinity = "0-3"
+
+    try:
+        settings = MeasurementSettings.from_config()
+    finally:
+        BaseConfig.init()
+
+    assert settings == MeasurementSettings(nb_threads=4, cpus=[0, 1, 2, 3])
+    assert settings.get_env_vars() == {"HL_NUM_THREADS": "4"}
+    assert settings.get_command_prefix() == "taskset -c 0,1,2,3"
+
+
+def test_get_n_runs_script():
+    BaseConfig.init()
+    sample = test_utils.interchange_example()
+
+    script = CompilingService.get_n_runs_script(
+        tiramisu_program=sample,
+        max_runs=5,
+        measurement_settings=MeasurementSettings(nb_threads=2, cpus=[0, 1]),
+    )
+
+    assert "export HL_NUM_THREADS=2" in script
+    assert f"taskset -c 0,1 ./{sample.name}_wrapper" in script
+
+    script = CompilingService.get_n_runs_script(tiramisu_program=sample, max_runs=5)
+    assert f"./{sample.name}_wrapper" in script
+
+
+def test_apply_to_current_process():
+    allowed_cpus = sorted(os.sched_getaffinity(0))
+    environ = dict(os.environ)
+    try:
+        MeasurementSettings(
+            nb_threads=3, cpus=allowed_cpus[:1]
+        ).apply_to_current_process()
+        assert os.sched_getaffinity(0) == set(allowed_cpus[:1])
+        assert os.environ["HL_NUM_THREADS"] == "3"
+    finally:
+        os.sched_setaffinity(0, allowed_cpus)
+        os.environ.clear()
+        os.environ.update(environ)
+
+
+def test_isolation_lock():
+    lock_path = os.path.join(tempfile.gettempdir(), "athena_measurement.lock")
+
+    with isolation_lock(exclusive=False):
+        # other compilations can share the lock
+        with open(lock_path) as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_SH | fcntl.LOCK_NB)
+
+    with isolation_lock(exclusive=True):
+        with open(lock_path) as lock_file:
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_SH | fcntl.LOCK_NB)
+                blocked = False
+            except BlockingIOError:
+                blocked = True
+        assert blocked
@@ -0,0 +1,166 @@
+import copy
+
+import pytest
+
+import tests.utils as test_utils
+from athena.tiramisu.schedule import Schedule
+from athena.tiramisu.schedule_parser import (
+    ParsedAction,
+    ScheduleParseError,
+    build_action,
+    parse_sched_str,
+    split_sched_str,
+)
+from athena.tiramisu.tiramisu_actions import (
+    Distribution,
+    Expansion,
+    Fusion,
+    Interchange,
+    Parallelization,
+    Reversal,
+    Skewing,
+    Tiling2D,
+    Tiling3D,
+    TilingGeneral,
+    Unrolling,
+)
+from athena.utils.config import BaseConfig
+
+
+def test_parse_sched_str():
+    assert parse_sched_str("U(L12,16,comps=['comp00'])|") == (
+        ParsedAction("U", (12,), (16,), ("comp00",)),
+    )
+    assert parse_sched_str("TG(L0,L1,L1,32,32,8,comps=['comp00', 'comp01'])") == (
+        ParsedAction("TG", (0, 1, 1), (32, 32, 8), ("comp00", "comp01")),
+    )
+    assert parse_sched_str(
+        "D(L0,comps=[comp00],distribution=[['comp00'], ['comp01', 'comp02']])"
+    ) == (
+        ParsedAction("D", (0,), (), ("comp00",), (("comp00",), ("comp01", "comp02"))),
+    )
+    assert split_sched_str("S(L0, L1, 1, -1, comps=['comp00'])|E(comps=['A'])") == [
+        "S(L0,L1,1,-1,comps=['comp00'])",
+        "E(comps=['A'])",
+    ]
+
+
+@pytest.mark.parametrize(
+    "sched_str",
+    [
+        "X(L0,comps=['comp00'])",
+        "P(L0,L1,comps=['comp00'])",
+        "U(L0,comps=['comp00'])",
+        "T2(L0,L1,32,comps=['comp00'])",
+        "P(L0)",
+        "P(L0,comps=['comp00']",
+        "P(L0,comps=['comp00'])P(L1,comps=['comp00'])",
+        "P(L0,comps=['comp00'])#",
+        "U(L0,comps=['comp00'],4)",
+    ],
+)
+def test_parse_errors(sched_str):
+    with pytest.raises(ScheduleParseError):
+        parse_sched_str(sched_str)
+
+
+def test_build_action_errors():
+    BaseConfig.init()
+    program = test_utils.interchange_example()
+
+    with pytest.raises(ScheduleParseError):
+        build_action(parse_sched_str("P(L0,comps=['comp01'])")[0], program.tree)
+    with pytest.raises(ScheduleParseError):
+        Schedule.from_sched_str("P(L5,comps=['comp00'])", program)
+
+
+def test_round_trip():
+    BaseConfig.init()
+    program = test_utils.interchange_example()
+
+    schedule = Schedule(program)
+    schedule.add_optimizations(
+        [
+            Interchange([("comp00", 0), ("comp00", 2)]),
+            Skewing([("comp00", 0), ("comp00", 1), 1, 1]),
+            Reversal([("comp00", 1)]),
+            Parallelization([("comp00", 0)]),
+            Unrolling([("comp00", 2), 4]),
+        ]
+    )
+
+    new_schedule = Schedule.from_sched_str(str(schedule), program)
+    assert new_schedule == schedule
+    for action, new_action in zip(schedule.optims_list, new_schedule.optims_list):
+        assert action == new_action
+
+
+@pytest.mark.parametrize(
+    "get_tree, action",
+    [
+        (
+            lambda: test_utils.tiling_2d_sample().tree,
+            Tiling2D([("comp00", 0), ("comp00", 1), 32, 32]),
+        ),
+        (
+            lambda: test_utils.tiling_3d_sample().tree,
+            Tiling3D([("comp00", 0), ("comp00", 1), ("comp00", 2), 32, 64, 128]),
+        ),
+        # the levels of TG repeat
+        (
+            test_utils.tree_test_sample,
+            TilingGeneral(
+                [
+                    ("comp01", 0),
+                    ("comp01", 1),
+                    ("comp03", 1),
+                    ("comp03", 2),
+                    ("comp03", 3),
+                    ("comp04", 3),
+                    *[32] * 6,
+                ]
+            ),
+        ),
+        # the second loop has no computation of its own
+        (
+            test_utils.tree_test_sample_2,
+            TilingGeneral([("comp05", 1), ("comp03", 2), 32, 64]),
+        ),
+        (
+            lambda: test_utils.fusion_sample().tree,
+            Fusion([("comp03", 3), ("comp04", 3)]),
+        ),
+        (lambda: test_utils.fusion_sample().tree, Distribution([("comp01", 0)])),
+        (lambda: test_utils.fusion_sample().tree, Expansion(["comp01"])),
+    ],
+)
+def test_action_round_trip(get_tree, action):
+    # applying these actions to a schedule recompiles the tree, their strings are parsed back for the tree directly
+    BaseConfig.init()
+    tree = get_tree()
+    action.initialize_action_for_tree(copy.deepcopy(tree))
+
+    parsed_actions = parse_sched_str(str(action))
+    assert len(parsed_actions) == 1
+    new_action = build_action(parsed_actions[0], tree)
+    new_action.initialize_action_for_tree(copy.deepcopy(tree))
+    assert new_action == action and str(new_action) == str(action)
+
+
+def test_from_sched_strs_shares_prefixes():
+    BaseConfig.init()
+    program = test_utils.interchange_example()
+
+    sched_strs = [
+        "I(L0,L1,comps=['comp00'])|P(L0,comps=['comp00'])",
+        "I(L0,L1,comps=['comp00'])|U(L2,4,comps=['comp00'])",
+        "I(L0,L1,comps=['comp00'])",
+        "",
+    ]
+    schedules = Schedule.from_sched_strs(sched_strs, program)
+
+    assert [str(schedule) for schedule in schedules] == sched_strs
+    assert schedules[0].optims_list[0] is schedules[1].optims_list[0]
+    assert schedules[0].optims_list is not schedules[2].optims_list
+    for sched_str, schedule in zip(sched_strs, schedules):
+        assert schedule == Schedule.from_sched_str(sched_str, program)
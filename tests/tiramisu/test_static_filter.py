@@ -0,0 +1,125 @@
+import tests.utils as test_utils
+from athena.tiramisu.schedule import Schedule
+from athena.tiramisu.static_filter import (
+    StaticVerdict,
+    classify_action,
+    classify_schedule,
+    filter_candidates,
+    get_extent,
+)
+from athena.tiramisu.tiramisu_actions import (
+    Interchange,
+    Parallelization,
+    Reversal,
+    Tiling2D,
+    Unrolling,
+)
+from athena.tiramisu.tiramisu_tree import TiramisuTree
+from athena.utils.config import BaseConfig
+
+
+def test_unrolling_rules():
+    BaseConfig.init()
+    tree = test_utils.interchange_example().tree
+
+    assert (
+        classify_action(Unrolling([("comp00", 2), 4]), tree).verdict
+        == StaticVerdict.NEEDS_CHECK
+    )
+    result = classify_action(Unrolling([("comp00", 2), 128]), tree)
+    assert result.verdict == StaticVerdict.USELESS
+    assert result.rule == "unrolling_bounds"
+
+    tree.iterators["i2"].upper_bound = "N"
+    assert (
+        classify_action(Unrolling([("comp00", 2), 4]), tree).verdict
+        == StaticVerdict.ILLEGAL
+    )
+
+
+def test_tiling_rules():
+    BaseConfig.init()
+    tree = test_utils.interchange_example().tree
+
+    assert (
+        classify_action(Tiling2D([("comp00", 0), ("comp00", 1), 16, 16]), tree).verdict
+        == StaticVerdict.NEEDS_CHECK
+    )
+    # the extent of i1 is 32
+    assert (
+        classify_action(Tiling2D([("comp00", 0), ("comp00", 1), 16, 32]), tree).verdict
+        == StaticVerdict.USELESS
+    )
+
+
+def test_isl_ast_tree_extents():
+    BaseConfig.init()
+    # the loop conditions of the ISL AST include their upper bound
+    tree = TiramisuTree.from_isl_ast_string_list(
+        [
+            "0|iterator|c1|0|c1 <= 1|1",
+            "1|iterator|c3|0|c3 <= 31|1",
+            "2|computation|comp00",
+        ]
+    )
+
+    assert get_extent(tree.iterators["c1"]) == 2
+    assert get_extent(tree.iterators["c3"]) == 32
+    assert (
+        classify_action(Parallelization([("comp00", 0)]), tree).verdict
+        == StaticVerdict.NEEDS_CHECK
+    )
+    assert (
+        classify_action(Unrolling([("comp00", 1), 32]), tree).verdict
+        == StaticVerdict.NEEDS_CHECK
+    )
+
+
+def test_interchange_rules():
+    BaseConfig.init()
+    tree = test_utils.interchange_example().tree
+
+    interchange = Interchange([("comp00", 0), ("comp00", 1)])
+    assert classify_action(interchange, tree).verdict == StaticVerdict.NEEDS_CHECK
+
+    tree.iterators["i1"].upper_bound = "i0"
+    result = classify_action(interchange, tree)
+    assert result.verdict == StaticVerdict.ILLEGAL
+    assert result.rule == "interchange_non_rectangular"
+
+    assert (
+        classify_action(Interchange([("comp00", 0), ("comp01", 1)]), tree).verdict
+        == StaticVerdict.ILLEGAL
+    )
+
+
+def test_parallelization_rules():
+    BaseConfig.init()
+    program = test_utils.interchange_example()
+    schedule = Schedule(program)
+    schedule.add_optimizations([Parallelization([("comp00", 0)])])
+
+    candidates = [
+        Parallelization([("comp00", 0)]),
+        Parallelization([("comp00", 1)]),
+        Reversal([("comp00", 1)]),
+    ]
+    assert list(filter_candidates(schedule, candidates)) == [candidates[2]]
+    assert list(filter_candidates(schedule, candidates, keep_useless=True)) == (
+        candidates
+    )
+
+
+def test_classify_schedule():
+    BaseConfig.init()
+    program = test_utils.interchange_example()
+    program.tree.iterators["i2"].upper_bound = "N"
+    schedule = Schedule(program)
+    schedule.add_optimizations(
+        [Parallelization([("comp00", 0)]), Unrolling([("comp00", 2), 4])]
+    )
+
+    result = classify_schedule(schedule)
+    assert result.verdict == StaticVerdict.ILLEGAL
+    # rejected without calling the compiler
+    assert not schedule.is_legal()
@@ -0,0 +1,46 @@
+import tests.utils as test_utils
+from athena.tiramisu.tiramisu_program import TiramisuProgram
+from athena.utils.config import BaseConfig
+
+
+def test_lazy_code_attributes():
+    BaseConfig.init()
+    sample = test_utils.interchange_example()
+
+    # only the attributes needed by the tree are computed when loading a program
+    assert "wrappers" not in sample.__dict__
+    assert "IO_buffer_declarations" not in sample.__dict__
+
+    assert sample.wrappers and f"int {sample.name}(" in sample.wrappers["h"]
+    assert sample.wrappers is sample.wrappers
+    assert sample.comps == ["comp00"]
+    assert sample.code_gen_line.startswith("tiramisu::codegen({")
+
+
+def test_load_code_lines_resets_attributes():
+    tiramisu_program = TiramisuProgram.from_file("examples/function_matmul_MEDIUM.cpp")
+    assert tiramisu_program.IO_buffer_names == ["buf02", "buf00", "buf01"]
+    assert tiramisu_program.buffer_sizes == [
+        ["192", "256"],
+        ["192", "320"],
+        ["320", "256"],
+    ]
+
+    with open("examples/function_blur_MINI_generator.cpp") as f:
+        tiramisu_program.load_code_lines(f.read())
+
+    assert tiramisu_program.IO_buffer_names == ["input_buf", "output_buf"]
+    assert tiramisu_program.buffer_sizes == [["5", "18", "34"], ["5", "18", "34"]]
+
+
+def test_from_dict_without_code():
+    BaseConfig.init()
+    test_data, _ = test_utils.load_test_data()
+
+    tiramisu_program = TiramisuProgram.from_dict(
+        "function837782", test_data["function837782"], load_code_lines=False
+    )
+
+    assert tiramisu_program.comps == ["comp00"]
+    assert tiramisu_program.wrappers is None
+    assert tiramisu_program.tree is not None
@@ -1,6 +1,7 @@
 import pickle
-from typing import Tuple
+from typing import Callable, List, Tuple
 
+from athena.evaluation.backend import EvaluationBackend, EvaluationResult
 from athena.tiramisu.tiramisu_iterator_node import IteratorNode
 from athena.tiramisu.tiramisu_program import TiramisuProgram
 from athena.tiramisu.tiramisu_tree import TiramisuTree
@@ -584,3 +585,66 @@ def expansion_sample():
     )
 
     return tiramisu_func
+
+
+def outer_parallelization_time(sched_str: str) -> float:
+    # parallelizing the outermost loop halves the execution time
+    return 5.0 if "P(L0" in sched_str else 10.0
+
+
+class FakeBackend(EvaluationBackend):
+    """
+    Evaluates schedules from their strings without compiling them.
+
+    Parameters
+    ----------
+    `get_time`: Callable[[str], float]
+        The execution time of a schedule
+    `is_legal`: Callable[[str], bool]
+        The legality of a schedule, all the schedules are legal by default
+    `limit`: int | None
+        The number of evaluations left in the budget, the batches are cut to it
+    `machine`: str | None
+        The machine reported with the results
+    `baseline_time`: float | None
+        The baseline reported with the results
+    """
+
+    def __init__(
+        self,
+        get_time: Callable[[str], float] = outer_parallelization_time,
+        is_legal: Callable[[str], bool] = lambda sched_str: True,
+        limit: int | None = None,
+        machine: str | None = None,
+        baseline_time: float | None = None,
+    ):
+        super().__init__()
+        self.get_time = get_time
+        self.is_legal = is_legal
+        self.limit = limit
+        self.machine = machine
+        self.baseline_time = baseline_time
+        # the name of the program and the schedules of each batch
+        self.programs: List[str] = []
+        self.batches: List[List[str]] = []
+
+    @property
+    def evaluated(self) -> List[str]:
+        return [sched_str for batch in self.batches for sched_str in batch]
+
+    def evaluate(self, tiramisu_program, sched_strs, measure=True, timeout=None):
+        if self.limit is not None:
+            sched_strs = sched_strs[: self.limit]
+            self.limit -= len(sched_strs)
+        self.programs.append(tiramisu_program.name)
+        self.batches.append(list(sched_strs))
+        return [
+            EvaluationResult(
+                sched_str,
+                legal=self.is_legal(sched_str),
+                execution_times=[self.get_time(sched_str)] if measure else None,
+                machine=self.machine,
+                baseline_time=self.baseline_time,
+            )
+            for sched_str in sched_strs
+        ]